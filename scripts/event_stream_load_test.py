@@ -0,0 +1,145 @@
+"""
+Load test for the event stream. It connects many websocket clients, makes
+them join project rooms, publishes events through the Redis message queue
+like the API does and measures how many messages are delivered per second.
+
+It requires a running event stream and the email of an admin user (admins
+can join any project room, so project ids don't need to exist):
+
+    python scripts/event_stream_load_test.py \\
+        --url http://localhost:5001 --email admin@example.com \\
+        --clients 400 --projects 20 --events 2000
+
+Use --broadcast to publish events to every client, which is how events were
+delivered before project rooms.
+"""
+import argparse
+import threading
+import time
+import uuid
+
+import socketio
+
+from flask_jwt_extended import create_access_token
+from flask_socketio import SocketIO
+
+from zou.app import app
+from zou.app.services import auth_service
+from zou.app.stores import publisher_store
+
+
+class Counter(object):
+    def __init__(self):
+        self.value = 0
+        self.last_time = None
+        self.lock = threading.Lock()
+
+    def increment(self, *args):
+        with self.lock:
+            self.value += 1
+            self.last_time = time.time()
+
+
+def get_token(email):
+    with app.app_context():
+        access_token = create_access_token(identity=email)
+        auth_service.register_tokens(app, access_token)
+    return access_token
+
+
+def connect_clients(url, token, project_ids, nb_clients, counter):
+    """
+    Connect clients and make each of them join a project room (round robin).
+    It returns the clients and the number of clients by project.
+    """
+    clients = []
+    members = {project_id: 0 for project_id in project_ids}
+    for index in range(nb_clients):
+        project_id = project_ids[index % len(project_ids)]
+        client = socketio.Client(reconnection=False)
+        client.on("load-test:event", counter.increment, namespace="/events")
+        client.connect(
+            "%s?jwt=%s" % (url, token),
+            namespaces=["/events"],
+            transports=["websocket"],
+        )
+        client.call(
+            "project:join", {"project_id": project_id}, namespace="/events"
+        )
+        members[project_id] += 1
+        clients.append(client)
+    return (clients, members)
+
+
+def publish_events(project_ids, nb_events, broadcast):
+    """
+    Publish events through the Redis message queue, round robin on project
+    rooms. It returns the time at which publishing started.
+    """
+    publisher = SocketIO(message_queue=publisher_store.redis_url)
+    start = time.time()
+    for index in range(nb_events):
+        project_id = project_ids[index % len(project_ids)]
+        room = None if broadcast else "project:%s" % project_id
+        publisher.emit(
+            "load-test:event",
+            {"index": index, "project_id": project_id},
+            namespace="/events",
+            room=room,
+        )
+    return start
+
+
+def run(args):
+    project_ids = [str(uuid.uuid4()) for _ in range(args.projects)]
+    counter = Counter()
+    token = get_token(args.email)
+    print("Connecting %s clients..." % args.clients)
+    (clients, members) = connect_clients(
+        args.url, token, project_ids, args.clients, counter
+    )
+
+    if args.broadcast:
+        expected = args.events * args.clients
+    else:
+        expected = sum(
+            members[project_ids[index % len(project_ids)]]
+            for index in range(args.events)
+        )
+
+    print("Publishing %s events..." % args.events)
+    start = publish_events(project_ids, args.events, args.broadcast)
+    deadline = time.time() + args.timeout
+    while counter.value < expected and time.time() < deadline:
+        time.sleep(0.1)
+
+    duration = max((counter.last_time or time.time()) - start, 0.001)
+    print(
+        "%s/%s messages delivered in %.2fs: %.0f messages/s, "
+        "%.1f messages by client."
+        % (
+            counter.value,
+            expected,
+            duration,
+            counter.value / duration,
+            counter.value / float(args.clients),
+        )
+    )
+    for client in clients:
+        client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:5001")
+    parser.add_argument("--email", required=True, help="Admin user email")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--broadcast", action="store_true")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
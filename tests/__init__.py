@@ -0,0 +1,5 @@
+import os
+
+# Movies are processed in the request during tests, the pool of workers
+# would finish the job after the test assertions.
+os.environ.setdefault("PREVIEW_PROCESSING_WORKERS", "0")
@@ -0,0 +1,19 @@
+"""
+Benchmarks measure the duration of heavy operations on large data sets. They
+are slow, so they are skipped unless the ZOU_BENCHMARKS environment variable
+is set to true:
+
+    ZOU_BENCHMARKS=true py.test tests/benchmarks -s
+"""
+import os
+import unittest
+
+
+def benchmark(test_case_class):
+    """
+    Decorate a test case class to skip it unless benchmarks are enabled.
+    """
+    return unittest.skipUnless(
+        os.getenv("ZOU_BENCHMARKS", "false").lower() == "true",
+        "Benchmarks are enabled with ZOU_BENCHMARKS=true",
+    )(test_case_class)
@@ -0,0 +1,72 @@
+import datetime
+import time
+
+from tests.base import ApiDBTestCase
+from tests.benchmarks import benchmark
+
+from zou.app import db
+from zou.app.models.entity import Entity
+from zou.app.models.task import Task, assignees_table
+from zou.app.utils import fields
+
+
+@benchmark
+class TasksCsvExportBenchmark(ApiDBTestCase):
+
+    def setUp(self):
+        super(TasksCsvExportBenchmark, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_asset()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+
+    def test_benchmark_export(self):
+        now = datetime.datetime.utcnow()
+        entities = [
+            {
+                "id": fields.gen_uuid(),
+                "created_at": now,
+                "updated_at": now,
+                "name": "Asset %05d" % index,
+                "project_id": self.project.id,
+                "entity_type_id": self.asset_type.id,
+            }
+            for index in range(20000)
+        ]
+        Entity.create_all_ignore_conflicts(entities)
+        tasks = [
+            {
+                "id": fields.gen_uuid(),
+                "created_at": now,
+                "updated_at": now,
+                "name": "Task %s" % index,
+                "project_id": self.project.id,
+                "task_type_id": self.task_type.id,
+                "task_status_id": self.task_status.id,
+                "entity_id": entity["id"],
+                "assigner_id": self.assigner.id,
+            }
+            for entity in entities
+            for index in range(10)
+        ]
+        Task.create_all_ignore_conflicts(tasks)
+        assignations = [
+            {"task": task["id"], "person": self.person.id} for task in tasks
+        ]
+        for index in range(0, len(assignations), 10000):
+            db.session.execute(
+                assignees_table.insert(), assignations[index : index + 10000]
+            )
+        db.session.commit()
+
+        start = time.time()
+        csv_tasks = self.get_raw("/export/csv/tasks.csv")
+        duration = time.time() - start
+        self.assertEqual(len(csv_tasks.split("\r\n")), 200003)
+        print("Export of 200001 tasks: %.4fs" % duration)
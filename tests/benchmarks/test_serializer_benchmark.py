@@ -0,0 +1,43 @@
+import timeit
+
+from tests.base import ApiDBTestCase
+from tests.benchmarks import benchmark
+from tests.models.test_serializer import serialize_with_introspection
+
+from zou.app.models.entity import Entity
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.task import Task
+
+
+@benchmark
+class SerializerBenchmark(ApiDBTestCase):
+
+    def setUp(self):
+        super(SerializerBenchmark, self).setUp()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_shot_task()
+        for revision in range(1, 51):
+            self.generate_fixture_preview_file(revision)
+        for index in range(50):
+            self.generate_fixture_shot("P%03d" % index)
+        self.models = {
+            "Task": Task.query.all(),
+            "Entity": Entity.query.all(),
+            "PreviewFile": PreviewFile.query.all(),
+        }
+
+    def test_benchmark(self):
+        for (name, models) in self.models.items():
+            introspection_duration = timeit.timeit(
+                lambda: [serialize_with_introspection(m) for m in models],
+                number=20,
+            )
+            compiled_duration = timeit.timeit(
+                lambda: [m.serialize() for m in models],
+                number=20,
+            )
+            print(
+                "%s: introspection %.4fs, compiled %.4fs"
+                % (name, introspection_duration, compiled_duration)
+            )
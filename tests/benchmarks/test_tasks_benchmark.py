@@ -0,0 +1,51 @@
+import datetime
+import time
+
+from tests.base import ApiDBTestCase
+from tests.benchmarks import benchmark
+
+from zou.app.models.entity import Entity
+from zou.app.services import tasks_service
+from zou.app.utils import fields
+
+
+@benchmark
+class TasksServiceBenchmark(ApiDBTestCase):
+
+    def setUp(self):
+        super(TasksServiceBenchmark, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+
+    def test_benchmark_create_tasks(self):
+        now = datetime.datetime.utcnow()
+        entities = [
+            {
+                "id": fields.gen_uuid(),
+                "created_at": now,
+                "updated_at": now,
+                "name": "S%05d" % index,
+                "project_id": self.project.id,
+                "entity_type_id": self.shot.entity_type_id,
+                "parent_id": self.sequence.id,
+            }
+            for index in range(10000)
+        ]
+        Entity.create_all_ignore_conflicts(entities)
+        entities = [
+            {"id": str(entity["id"]), "project_id": str(self.project.id)}
+            for entity in entities
+        ]
+        task_type = self.task_type.serialize()
+
+        start = time.time()
+        task_ids = tasks_service.create_tasks(task_type, entities)
+        duration = time.time() - start
+        self.assertEqual(len(task_ids), 10000)
+        print("Bulk creation of 10000 tasks: %.4fs" % duration)
@@ -0,0 +1,80 @@
+import os
+import shutil
+import timeit
+import unittest
+
+from PIL import Image
+
+from tests.benchmarks import benchmark
+
+from zou.app.utils import thumbnail, fs
+
+TEST_FOLDER = os.path.join("tests", "tmp")
+
+
+@benchmark
+class ThumbnailBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        super(ThumbnailBenchmark, self).setUp()
+        fs.mkdir_p(TEST_FOLDER)
+
+    def tearDown(self):
+        super(ThumbnailBenchmark, self).tearDown()
+        fs.rm_rf(TEST_FOLDER)
+
+    def test_benchmark_generate_preview_variants(self):
+        """
+        Compare variant generation with the former implementation (one copy
+        and one full decode per variant) on large pictures.
+        """
+        fixtures = []
+        for (index, extension) in enumerate(["png", "jpg"]):
+            path = os.path.join(TEST_FOLDER, "large-%s.%s" % (index, extension))
+            im = Image.effect_noise((3840, 2160), 64).convert("RGB")
+            im.save(path)
+            fixtures.append(path)
+
+        def generate(generate_variants):
+            for path in fixtures:
+                for (_, variant_path) in generate_variants(path, "bench"):
+                    os.remove(variant_path)
+
+        former_duration = timeit.timeit(
+            lambda: generate(generate_preview_variants_with_copies), number=2
+        )
+        single_pass_duration = timeit.timeit(
+            lambda: generate(thumbnail.generate_preview_variants), number=2
+        )
+        print(
+            "Preview variants: copies %.4fs, single pass %.4fs"
+            % (former_duration, single_pass_duration)
+        )
+
+
+def generate_preview_variants_with_copies(original_path, instance_id):
+    """
+    Former implementation of the variant generation. It is kept as a
+    reference for comparison.
+    """
+    variants = [
+        ("thumbnails", thumbnail.RECTANGLE_SIZE),
+        ("thumbnails-square", thumbnail.SQUARE_SIZE),
+        ("previews", thumbnail.PREVIEW_SIZE),
+    ]
+    result = []
+    for (picture_type, size) in variants:
+        picture_path = os.path.join(
+            os.path.dirname(original_path),
+            "%s-%s.png" % (picture_type, instance_id),
+        )
+        shutil.copyfile(original_path, picture_path)
+        im = Image.open(picture_path)
+        (width, height) = size
+        if height == 0:
+            size = thumbnail.get_full_size_from_width(im, width)
+        else:
+            im = thumbnail.prepare_image_for_thumbnail(im, size)
+        im.resize(size, Image.LANCZOS).save(picture_path, "PNG")
+        result.append((picture_type, picture_path))
+    return result
@@ -67,3 +67,10 @@ class EventsRoutesTestCase(ApiDBTestCase):
         self.assertEqual(len(events), 6)
         events = self.get("/data/events/last?only_files=true")
         self.assertEqual(len(events), 2)
+
+    def test_events_stored_at_request_end(self):
+        self.post("/data/entity-types", {"name": "Props"})
+        self.post("/data/entity-types", {"name": "FX"})
+        events = ApiEvent.query.filter_by(name="asset-type:new").all()
+        self.assertEqual(len(events), 2)
+        self.assertEqual(str(events[0].user_id), self.user["id"])
@@ -25,3 +25,14 @@ class TasksCsvExportTestCase(ApiDBTestCase):
 Cosmos Landromat;Modeling;Shaders;Props;Tree;Ema Peel;John Doe;50;40;2017-02-20;2017-02-22;2017-02-28;Open\r
 """
         self.assertEqual(csv_tasks, expected_result)
+
+    def test_get_output_files_several_assignees(self):
+        self.task.assignees.append(self.assigner)
+        self.task.save()
+        self.generate_fixture_task(name="Unassigned")
+        self.task.update({"assignees": []})
+
+        lines = self.get_raw("/export/csv/tasks.csv").split("\r\n")
+        self.assertEqual(len(lines), 4)
+        assignees = set(line.split(";")[6] for line in lines[1:3])
+        self.assertEqual(assignees, {"Ema Peel, John Doe", ""})
@@ -30,3 +30,38 @@ class PaginationTestCase(ApiDBTestCase):
         self.assertEqual(pagination_infos["page"], 2)
         self.assertEqual(pagination_infos["offset"], 100)
         self.assertEqual(pagination_infos["limit"], 100)
+
+    def test_cursor(self):
+        result = self.get("data/persons?cursor=&limit=100")
+        self.assertEqual(len(result["data"]), 100)
+        self.assertEqual(result["limit"], 100)
+        self.assertTrue("estimated_total" in result)
+        ids = [person["id"] for person in result["data"]]
+        while result["next_cursor"] is not None:
+            result = self.get(
+                "data/persons?cursor=%s&limit=100" % result["next_cursor"]
+            )
+            ids += [person["id"] for person in result["data"]]
+        self.assertEqual(len(ids), 251)
+        self.assertEqual(len(set(ids)), 251)
+
+    def test_cursor_filtered(self):
+        result = self.get("data/persons?cursor=&role=admin")
+        self.assertTrue(len(result["data"]) > 0)
+        self.assertFalse("estimated_total" in result)
+
+    def test_cursor_without_update_date(self):
+        Person.query.update({"updated_at": None}, synchronize_session=False)
+        Person.commit()
+        result = self.get("data/persons?cursor=&limit=100")
+        ids = [person["id"] for person in result["data"]]
+        while result["next_cursor"] is not None:
+            result = self.get(
+                "data/persons?cursor=%s&limit=100" % result["next_cursor"]
+            )
+            ids += [person["id"] for person in result["data"]]
+        self.assertEqual(len(set(ids)), 251)
+
+    def test_cursor_wrong_value(self):
+        self.get("data/persons?cursor=wrong", 400)
+        self.get("data/persons?cursor=&limit=0", 400)
@@ -0,0 +1,63 @@
+from sqlalchemy.inspection import inspect
+
+from tests.base import ApiDBTestCase
+
+from zou.app import db
+from zou.app.models.entity import Entity
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.task import Task
+from zou.app.utils.fields import serialize_value
+
+
+def serialize_with_introspection(model, relations=False):
+    """
+    Former implementation of the serializer: it introspects the model on
+    every call. It is kept as a reference for comparison.
+    """
+    attrs = inspect(model).attrs.keys()
+    obj_dict = {
+        attr: serialize_value(getattr(model, attr))
+        for attr in attrs
+        if relations or not model.is_join(attr)
+    }
+    obj_dict["type"] = type(model).__name__
+    return obj_dict
+
+
+class SerializerTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(SerializerTestCase, self).setUp()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_shot_task()
+        for revision in range(1, 51):
+            self.generate_fixture_preview_file(revision)
+        for index in range(50):
+            self.generate_fixture_shot("P%03d" % index)
+        self.models = {
+            "Task": Task.query.all(),
+            "Entity": Entity.query.all(),
+            "PreviewFile": PreviewFile.query.all(),
+        }
+
+    def test_serialize(self):
+        for models in self.models.values():
+            for model in models:
+                self.assertEqual(
+                    model.serialize(), serialize_with_introspection(model)
+                )
+                self.assertEqual(
+                    model.serialize(relations=True),
+                    serialize_with_introspection(model, relations=True),
+                )
+
+    def test_serialize_does_not_load_relations(self):
+        task = Task.get(self.task.id)
+        db.session.expire(task, ["assignees"])
+        task.serialize()
+        self.assertIn("assignees", inspect(task).unloaded)
+        self.assertEqual(
+            task.serialize(relations=True)["assignees"],
+            [str(self.person.id)],
+        )
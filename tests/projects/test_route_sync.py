@@ -64,6 +64,13 @@ class ProjectSyncRouteTestCase(ApiDBTestCase):
             self.get("/data/projects/%s/notifications" % self.project_id)
         self.assertEqual(len(notitfications), 1)
 
+    def test_get_notifications_wrong_limit(self):
+        path = "/data/projects/%s/notifications?cursor=" % self.project_id
+        self.get(path + "&limit=abc", 400)
+        self.get(path + "&limit=0", 400)
+        result = self.get(path + "&limit=1")
+        self.assertEqual(len(result["data"]), 1)
+
     def test_get_preview_files(self):
         preview_files = \
             self.get("/data/projects/%s/preview-files" % self.project_id)
@@ -159,6 +159,51 @@ class BreakdownServiceTestCase(ApiDBTestCase):
         self.assertEqual(cast_in[0]["sequence_name"], self.sequence.name)
         self.assertEqual(cast_in[0]["episode_name"], self.episode.name)
 
+    def test_update_casting_diff(self):
+        breakdown_service.update_casting(self.shot.id, [
+            {"asset_id": self.asset_id, "nb_occurences": 1},
+            {"asset_id": self.asset_character_id, "nb_occurences": 3}
+        ])
+        breakdown_service.update_casting(self.shot.id, [
+            {"asset_id": self.asset_id, "nb_occurences": 2, "label": "fixed"}
+        ])
+        casting = breakdown_service.get_casting(self.shot.id)
+        self.assertEqual(len(casting), 1)
+        self.assertEqual(casting[0]["asset_id"], self.asset_id)
+        self.assertEqual(casting[0]["nb_occurences"], 2)
+        self.assertEqual(casting[0]["label"], "fixed")
+
+        breakdown_service.update_casting(self.shot.id, [])
+        self.assertListEqual(breakdown_service.get_casting(self.shot.id), [])
+
+    def test_get_project_casting(self):
+        breakdown_service.update_casting(self.shot.id, [
+            {"asset_id": self.asset_id, "nb_occurences": 1},
+            {"asset_id": self.asset_character_id, "nb_occurences": 3}
+        ])
+        breakdown_service.update_casting(self.asset.id, [
+            {"asset_id": self.asset_character_id, "nb_occurences": 1}
+        ])
+        self.generate_fixture_shot("SH02")
+        breakdown_service.update_casting(self.shot.id, [
+            {"asset_id": self.asset_id, "nb_occurences": 1}
+        ])
+        shot_02_id = str(self.shot.id)
+        self.generate_fixture_shot("SH03")
+
+        casting = breakdown_service.get_project_casting(self.project.id)
+        self.assertEqual(len(casting), 2)
+        self.assertEqual(len(casting[self.shot_id]), 2)
+        self.assertEqual(len(casting[shot_02_id]), 1)
+        self.assertNotIn(str(self.shot.id), casting)
+        self.assertNotIn(self.asset_id, casting)
+        castings = list(
+            breakdown_service.get_project_casting_iterator(
+                self.project.id, episode_id=self.episode.id
+            )
+        )
+        self.assertEqual(len(castings), 2)
+
     def test_add_instance_to_shot(self):
         instances = breakdown_service.get_asset_instances_for_shot(self.shot.id)
         self.assertEqual(instances, {})
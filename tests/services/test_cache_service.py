@@ -0,0 +1,293 @@
+import uuid
+
+from tests.base import ApiDBTestCase
+
+from zou.app.blueprints.crud import routes as crud_routes
+from zou.app.blueprints.crud.base import BaseModelResource
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
+from zou.app.models.person import Person
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+from zou.app.services import (
+    assets_service,
+    cache_service,
+    entities_service,
+    files_service,
+    persons_service,
+    projects_service,
+    shots_service,
+    tasks_service,
+)
+from zou.app.utils import cache, events
+
+
+class CacheServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(CacheServiceTestCase, self).setUp()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_shot_task()
+        self.generate_fixture_preview_file()
+        self.task_id = str(self.task.id)
+        self.shot_task_id = str(self.shot_task.id)
+        self.asset_id = str(self.asset.id)
+        self.shot_id = str(self.shot.id)
+        self.project_id = str(self.project.id)
+        self.person_id = str(self.person.id)
+
+    def assert_invalidated(self, event_name, data, getter, update, check):
+        """
+        Prime the cache, change the database without clearing the cache,
+        emit the event and check that the getter returns fresh data.
+        """
+        getter()
+        update()
+        self.assertFalse(check(getter()))
+        events.emit(event_name, data, persist=False)
+        self.assertTrue(check(getter()))
+
+    def test_task_events(self):
+        for event_name in ["task:update", "task:assign", "task:delete"]:
+            priority = Task.get(self.task_id).priority or 0
+            self.assert_invalidated(
+                event_name,
+                {"task_id": self.task_id},
+                lambda: tasks_service.get_task(self.task_id),
+                lambda: Task.get(self.task_id).update(
+                    {"priority": priority + 1}
+                ),
+                lambda task: task["priority"] == priority + 1,
+            )
+
+    def test_task_events_full_entities(self):
+        self.assert_invalidated(
+            "task:update",
+            {"task_id": self.shot_task_id},
+            lambda: shots_service.get_full_shot(self.shot_id),
+            lambda: Task.get(self.shot_task_id).update({"priority": 3}),
+            lambda shot: shot["tasks"][0]["priority"] == 3,
+        )
+        self.assert_invalidated(
+            "task:update",
+            {"task_id": self.task_id},
+            lambda: assets_service.get_full_asset(self.asset_id),
+            lambda: Task.get(self.task_id).update({"priority": 4}),
+            lambda asset: asset["tasks"][0]["priority"] == 4,
+        )
+        self.assert_invalidated(
+            "task:update",
+            {"task_id": self.task_id},
+            lambda: tasks_service.get_full_task(self.task_id),
+            lambda: Task.get(self.task_id).update({"priority": 5}),
+            lambda task: task["priority"] == 5,
+        )
+
+    def test_entity_events(self):
+        self.assert_invalidated(
+            "shot:update",
+            {"shot_id": self.shot_id},
+            lambda: shots_service.get_shot(self.shot_id),
+            lambda: Entity.get(self.shot_id).update({"name": "P02"}),
+            lambda shot: shot["name"] == "P02",
+        )
+        self.assert_invalidated(
+            "shot:update",
+            {"shot_id": self.shot_id},
+            lambda: shots_service.get_full_shot(self.shot_id),
+            lambda: Entity.get(self.shot_id).update({"name": "P03"}),
+            lambda shot: shot["name"] == "P03",
+        )
+        self.assert_invalidated(
+            "asset:update",
+            {"asset_id": self.asset_id},
+            lambda: assets_service.get_full_asset(self.asset_id),
+            lambda: Entity.get(self.asset_id).update({"name": "Tree 2"}),
+            lambda asset: asset["name"] == "Tree 2",
+        )
+        self.assert_invalidated(
+            "asset:update",
+            {"asset_id": self.asset_id},
+            lambda: entities_service.get_entity(self.asset_id),
+            lambda: Entity.get(self.asset_id).update({"name": "Tree 3"}),
+            lambda asset: asset["name"] == "Tree 3",
+        )
+        self.assert_invalidated(
+            "sequence:update",
+            {"sequence_id": str(self.sequence.id)},
+            lambda: shots_service.get_full_shot(self.shot_id),
+            lambda: Entity.get(self.sequence.id).update({"name": "S02"}),
+            lambda shot: shot["sequence_name"] == "S02",
+        )
+
+    def test_person_events(self):
+        self.assert_invalidated(
+            "person:update",
+            {"person_id": self.person_id},
+            lambda: persons_service.get_person(self.person_id),
+            lambda: Person.get(self.person_id).update({"first_name": "Jo"}),
+            lambda person: person["first_name"] == "Jo",
+        )
+        self.assert_invalidated(
+            "person:update",
+            {"person_id": self.person_id},
+            lambda: tasks_service.get_full_task(self.task_id),
+            lambda: Person.get(self.person_id).update({"first_name": "Ja"}),
+            lambda task: task["persons"][0]["first_name"] == "Ja",
+        )
+
+    def test_project_events(self):
+        self.assert_invalidated(
+            "project:update",
+            {"project_id": self.project_id},
+            lambda: projects_service.get_project(self.project_id),
+            lambda: Project.get(self.project_id).update({"name": "Cosmos 2"}),
+            lambda project: project["name"] == "Cosmos 2",
+        )
+        self.assert_invalidated(
+            "project:update",
+            {"project_id": self.project_id},
+            lambda: shots_service.get_full_shot(self.shot_id),
+            lambda: Project.get(self.project_id).update({"name": "Cosmos 3"}),
+            lambda shot: shot["project_name"] == "Cosmos 3",
+        )
+
+    def test_type_and_status_events(self):
+        task_type_id = str(self.task_type.id)
+        self.assert_invalidated(
+            "task-type:update",
+            {"task_type_id": task_type_id},
+            lambda: tasks_service.get_task_type(task_type_id),
+            lambda: TaskType.get(task_type_id).update({"name": "Shading"}),
+            lambda task_type: task_type["name"] == "Shading",
+        )
+        task_status_id = str(self.task_status.id)
+        self.assert_invalidated(
+            "task-status:update",
+            {"task_status_id": task_status_id},
+            lambda: tasks_service.get_task_status(task_status_id),
+            lambda: TaskStatus.get(task_status_id).update({"name": "Ready"}),
+            lambda task_status: task_status["name"] == "Ready",
+        )
+        asset_type_id = str(self.asset_type.id)
+        self.assert_invalidated(
+            "asset-type:update",
+            {"asset_type_id": asset_type_id},
+            lambda: entities_service.get_entity_type(asset_type_id),
+            lambda: EntityType.get(asset_type_id).update({"name": "Prop"}),
+            lambda asset_type: asset_type["name"] == "Prop",
+        )
+
+    def test_preview_file_events(self):
+        preview_file_id = str(self.preview_file.id)
+        self.assert_invalidated(
+            "preview-file:update",
+            {"preview_file_id": preview_file_id},
+            lambda: files_service.get_preview_file(preview_file_id),
+            lambda: PreviewFile.get(preview_file_id).update({"revision": 3}),
+            lambda preview_file: preview_file["revision"] == 3,
+        )
+
+    def test_crud_events_are_registered(self):
+        """
+        Every update and delete event emitted by CRUD routes of a model that
+        has memoized getters must be linked to cache invalidations.
+        """
+        memoized_tables = [
+            "comment",
+            "custom_action",
+            "entity_type",
+            "person",
+            "preview_file",
+            "project",
+            "project_status",
+            "search_filter",
+            "task",
+            "task_status",
+            "task_type",
+        ]
+        invalidation_map = cache_service.build_invalidation_map()
+        for (_, resource) in crud_routes:
+            if not issubclass(resource, BaseModelResource):
+                continue
+            table_name = resource().model.__tablename__
+            if table_name not in memoized_tables:
+                continue
+            event_prefix = table_name.replace("_", "-")
+            if table_name == "entity_type":
+                event_prefix = "asset-type"
+            data_field = "%s_id" % event_prefix.replace("-", "_")
+            for action in ["update", "delete"]:
+                event_name = "%s:%s" % (event_prefix, action)
+                self.assert_targets(
+                    invalidation_map, event_name, data_field
+                )
+        for entity_type in ["shot", "asset", "sequence", "episode", "scene"]:
+            for action in ["update", "delete"]:
+                self.assert_targets(
+                    invalidation_map,
+                    "%s:%s" % (entity_type, action),
+                    "%s_id" % entity_type,
+                )
+
+    def assert_targets(self, invalidation_map, event_name, data_field):
+        """
+        Check that given event invalidates memoized functions only and that
+        the entries to remove are read from the field set in event data.
+        """
+        self.assertIn(event_name, invalidation_map)
+        self.assertTrue(len(invalidation_map[event_name]) > 0)
+        for (function, key) in invalidation_map[event_name]:
+            self.assertTrue(hasattr(function, "local_namespace"))
+            if isinstance(key, str):
+                self.assertEqual(key, data_field)
+
+    def test_key_functions(self):
+        self.assertEqual(
+            cache_service.get_task_entity_ids({"task_id": self.task_id}),
+            [self.asset_id],
+        )
+        self.assertEqual(
+            cache_service.get_task_entity_ids(
+                {"task_id": self.shot_task_id}
+            ),
+            [self.shot_id],
+        )
+        self.assertIsNone(cache_service.get_task_entity_ids({}))
+        self.assertIsNone(
+            cache_service.get_task_entity_ids({"task_id": str(uuid.uuid4())})
+        )
+        self.assertEqual(
+            cache_service.get_team_member_ids(
+                {"project_id": self.project_id, "person_id": self.person_id}
+            ),
+            [self.person_id],
+        )
+        self.assertIsNone(
+            cache_service.get_team_member_ids({"project_id": self.project_id})
+        )
+        self.assertEqual(
+            cache_service.get_batch_entity_ids(
+                {"entity_ids": [self.shot_id, self.asset_id]}
+            ),
+            [self.shot_id, self.asset_id],
+        )
+        self.assertEqual(
+            cache_service.get_batch_task_ids({"task_ids": [self.task_id]}),
+            [self.task_id],
+        )
+
+    def test_registered_in_emit(self):
+        targets = cache.invalidation_map["task:update"]
+        self.assertIn((tasks_service.get_task, "task_id"), targets)
+        self.assertIn(
+            (shots_service.get_full_shot, cache_service.get_task_entity_ids),
+            targets,
+        )
+        self.assertEqual(
+            targets, cache_service.build_invalidation_map()["task:update"]
+        )
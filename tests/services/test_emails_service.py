@@ -58,3 +58,26 @@ Kitsu Team""")
                 self.shot_task.id
             )
         )
+
+    def test_build_notification_messages(self):
+        messages = {"email_message": "Hello", "slack_message": "Hi"}
+        self.person.update({
+            "notifications_enabled": True,
+            "notifications_slack_enabled": True,
+            "notifications_slack_userid": "john"
+        })
+        (emails, slack_messages) = emails_service.build_notification_messages(
+            self.person, "Subject", messages
+        )
+        self.assertEqual(len(emails), 1)
+        self.assertEqual(emails[0][0], "Subject")
+        self.assertTrue(emails[0][1].startswith("Hello"))
+        self.assertEqual(emails[0][2], self.person.email)
+        self.assertEqual(slack_messages, [("", "john", "Hi")])
+
+        self.person.update({"notifications_digest_enabled": True})
+        (emails, slack_messages) = emails_service.build_notification_messages(
+            self.person, "Subject", messages
+        )
+        self.assertEqual(emails, [])
+        self.assertEqual(len(slack_messages), 1)
@@ -1,6 +1,12 @@
+import datetime
+import gzip
+import json
+import os
+import tempfile
 import time
 from tests.base import ApiDBTestCase
 
+from zou.app.models.event import ApiEvent
 from zou.app.utils import fields
 from zou.app.services import (
     events_service,
@@ -62,3 +68,26 @@ class EventsServiceTestCase(ApiDBTestCase):
         self.assertEqual(len(login_logs), 4)
         login_logs = events_service.get_last_login_logs(page_size=2)
         self.assertEqual(len(login_logs), 2)
+
+    def test_remove_old_events(self):
+        now = datetime.datetime.utcnow()
+        for days in [400, 200, 100, 10, 1]:
+            ApiEvent.create(
+                name="task:update",
+                created_at=now - datetime.timedelta(days=days),
+            )
+        (_, archive_path) = tempfile.mkstemp(suffix=".gz")
+        os.remove(archive_path)
+        try:
+            result = events_service.remove_old_events(
+                150, archive_path=archive_path, batch_size=1
+            )
+            self.assertEqual(result["archived"], 2)
+            self.assertEqual(result["deleted"], 2)
+            self.assertEqual(ApiEvent.query.count(), 3)
+            with gzip.open(archive_path, "rt") as archive_file:
+                archived_events = [json.loads(line) for line in archive_file]
+            self.assertEqual(len(archived_events), 2)
+            self.assertEqual(archived_events[0]["name"], "task:update")
+        finally:
+            os.remove(archive_path)
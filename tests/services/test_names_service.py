@@ -54,3 +54,47 @@ class NamesServiceTestCase(ApiDBTestCase):
         )
         name = names_service.get_preview_file_name(preview_file["id"])
         self.assertEqual(name, "cosmos_landromat_props_tree_shaders_v3.mp4")
+
+    def test_get_full_entity_names(self):
+        names = names_service.get_full_entity_names(
+            [str(self.asset.id), str(self.shot.id)]
+        )
+        self.assertEqual(names[str(self.asset.id)], ("Props / Tree", None))
+        self.assertEqual(
+            names[str(self.shot.id)],
+            ("E01 / S01 / P01", str(self.episode.id)),
+        )
+        self.assertEqual(names_service.get_full_entity_names([]), {})
+
+    def test_get_preview_file_names(self):
+        shot_preview_file = files_service.create_preview_file(
+            "main",
+            3,
+            self.shot_task["id"],
+            self.user["id"],
+            source="webgui"
+        )
+        asset_preview_file = files_service.create_preview_file(
+            "main",
+            3,
+            self.asset_task["id"],
+            self.user["id"],
+            source="webgui"
+        )
+        preview_file_ids = [shot_preview_file["id"], asset_preview_file["id"]]
+        names = names_service.get_preview_file_names(preview_file_ids)
+        for preview_file_id in preview_file_ids:
+            self.assertEqual(
+                names[preview_file_id],
+                names_service.get_preview_file_name(preview_file_id),
+            )
+
+        names = self.post(
+            "/actions/preview-files/names",
+            {"preview_file_ids": preview_file_ids},
+            200,
+        )
+        self.assertEqual(
+            names[shot_preview_file["id"]],
+            "cosmos_landromat_e01_s01_p01_animation_v3.mp4",
+        )
@@ -1,7 +1,14 @@
+import datetime
+
 from tests.base import ApiDBTestCase
 
 from zou.app.models.notification import Notification
-from zou.app.services import notifications_service, tasks_service
+from zou.app.models.person import Person
+from zou.app.services import (
+    emails_service,
+    notifications_service,
+    tasks_service
+)
 
 
 class NotificationsServiceTestCase(ApiDBTestCase):
@@ -66,6 +73,25 @@ class NotificationsServiceTestCase(ApiDBTestCase):
         self.assertEqual(len(notifications), 1)
         self.assertEqual(str(notifications[0].author_id), self.user["id"])
 
+    def test_create_notifications_for_task_and_comment_emails(self):
+        self.generate_fixture_comment()
+        calls = []
+
+        def send_comment_notifications(recipient_ids, mention_ids, *args):
+            calls.append((list(recipient_ids), list(mention_ids)))
+
+        create_notifications = \
+            notifications_service.create_notifications_for_task_and_comment
+        send_func = emails_service.send_comment_notifications
+        emails_service.send_comment_notifications = send_comment_notifications
+        try:
+            create_notifications(self.task_dict, self.comment)
+            create_notifications(self.task_dict, self.comment)
+        finally:
+            emails_service.send_comment_notifications = send_func
+        self.assertEqual(calls[0], ([str(self.person.id)], []))
+        self.assertEqual(calls[1], ([], []))
+
     def test_create_notifications_for_task_and_comment_with_mentions(self):
         self.generate_fixture_comment()
         self.comment["mentions"] = [self.person.id]
@@ -76,6 +102,80 @@ class NotificationsServiceTestCase(ApiDBTestCase):
         notifications = Notification.get_all()
         self.assertEqual(len(notifications), 2)
 
+    def test_create_notifications(self):
+        self.generate_fixture_comment()
+        person_ids = [str(self.person.id), self.person_dict["id"]]
+        created = notifications_service.create_notifications(
+            person_ids,
+            self.user["id"],
+            self.task_dict["id"],
+            comment_id=self.comment["id"]
+        )
+        self.assertEqual(set(created.keys()), set(person_ids))
+        created = notifications_service.create_notifications(
+            person_ids,
+            self.user["id"],
+            self.task_dict["id"],
+            comment_id=self.comment["id"]
+        )
+        self.assertEqual(created, {})
+        self.assertEqual(len(Notification.get_all()), 2)
+
+    def test_get_digest_notifications(self):
+        self.generate_fixture_comment()
+        self.person.update({
+            "notifications_enabled": True,
+            "notifications_digest_enabled": True
+        })
+        notifications_service.create_notifications_for_task_and_comment(
+            self.task_dict,
+            self.comment
+        )
+        until = datetime.datetime.utcnow()
+        notifications = notifications_service.get_digest_notifications(until)
+        self.assertEqual(list(notifications.keys()), [str(self.person.id)])
+        self.assertEqual(len(notifications[str(self.person.id)]), 1)
+
+        Notification.get_all()[0].update({"read": True})
+        notifications = notifications_service.get_digest_notifications(until)
+        self.assertEqual(notifications, {})
+
+    def test_send_notification_digests(self):
+        self.generate_fixture_comment()
+        self.person.update({
+            "notifications_enabled": True,
+            "notifications_digest_enabled": True
+        })
+        notifications_service.create_notifications_for_task_and_comment(
+            self.task_dict,
+            self.comment
+        )
+        sent_notifications = []
+
+        def send_notification_digests(notifications_by_person):
+            sent_notifications.append(notifications_by_person)
+            return len(notifications_by_person)
+
+        send_func = emails_service.send_notification_digests
+        emails_service.send_notification_digests = send_notification_digests
+        try:
+            self.assertEqual(
+                notifications_service.send_notification_digests(), 1
+            )
+            self.assertEqual(
+                notifications_service.send_notification_digests(), 0
+            )
+        finally:
+            emails_service.send_notification_digests = send_func
+        self.assertEqual(
+            list(sent_notifications[0].keys()),
+            [str(self.person.id)]
+        )
+        self.assertEqual(sent_notifications[1], {})
+        self.assertIsNotNone(
+            Person.get(self.person.id).notifications_digest_sent_at
+        )
+
     def test_create_assignation_notification(self):
         self.generate_fixture_comment()
         notifications_service.create_assignation_notification(
@@ -1,6 +1,18 @@
+import datetime
+
 from tests.base import ApiDBTestCase
 
-from zou.app.services import persons_service, tasks_service
+from zou.app.models.comment import Comment
+from zou.app.models.person import Person
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.models.time_spent import TimeSpent
+from zou.app.services import (
+    deletion_service,
+    persons_service,
+    projects_service,
+    tasks_service,
+)
 from zou.app.services.exception import PersonNotFoundException
 from zou.app.utils import auth
 
@@ -112,3 +124,31 @@ class PersonServiceTestCase(ApiDBTestCase):
         self.assertEqual(len(logs), 2)
         self.assertEqual(logs[0]["person_id"], person["id"])
         self.assertEqual(logs[0]["date"], date_2)
+
+    def test_remove_person(self):
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_asset()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        tasks_service.assign_task(self.task.id, self.person_id)
+        projects_service.add_team_member(self.project.id, self.person_id)
+        comment = self.generate_fixture_comment()
+        TimeSpent.create(
+            person_id=self.person_id,
+            task_id=self.task.id,
+            date=datetime.date(2017, 9, 23),
+            duration=3600
+        )
+
+        deletion_service.remove_person(self.person_id)
+        self.assertIsNone(Person.get(self.person_id))
+        self.assertIsNone(Comment.get(comment["id"]))
+        self.assertEqual(len(TimeSpent.get_all()), 0)
+        task = Task.get(self.task.id)
+        self.assertEqual(task.assignees, [])
+        self.assertEqual(Project.get(self.project.id).team, [])
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+from tests.base import ApiDBTestCase
+
+from zou.app import app
+from zou.app.services import files_service, preview_files_service
+from zou.app.stores import file_store
+
+
+class PreviewFilesServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(PreviewFilesServiceTestCase, self).setUp()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_preview_file()
+        self.preview_file_id = str(self.preview_file.id)
+        self.tmp_folder = app.config["TMP_DIR"]
+        if not os.path.exists(self.tmp_folder):
+            os.makedirs(self.tmp_folder)
+
+    def test_default_status(self):
+        preview_file = files_service.get_preview_file(self.preview_file_id)
+        self.assertEqual(preview_file["status"], "ready")
+
+    def test_start_movie_processing_broken(self):
+        movie_path = os.path.join(
+            self.tmp_folder, "%s.mp4.tmp" % self.preview_file_id
+        )
+        shutil.copyfile(
+            self.get_fixture_file_path("thumbnails/th01.png"), movie_path
+        )
+        preview_file = preview_files_service.start_movie_processing(
+            self.preview_file_id, movie_path, "movie"
+        )
+        self.assertEqual(preview_file["status"], "processing")
+        self.assertEqual(preview_file["extension"], "mp4")
+        self.assertFalse(os.path.exists(movie_path))
+
+        preview_file = files_service.get_preview_file(self.preview_file_id)
+        self.assertEqual(preview_file["status"], "broken")
+        self.assertTrue(
+            file_store.exists_movie("source", self.preview_file_id)
+        )
+        file_store.remove_movie("source", self.preview_file_id)
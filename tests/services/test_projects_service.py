@@ -1,13 +1,18 @@
 from tests.base import ApiDBTestCase
 
+from zou.app.models.comment import Comment
 from zou.app.models.entity import Entity
 from zou.app.models.project import Project
 from zou.app.models.metadata_descriptor import MetadataDescriptor
+from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project_status import ProjectStatus
+from zou.app.models.task import Task
+from zou.app.models.task_stats import TaskStats
 from zou.app.services import (
     breakdown_service,
     deletion_service,
-    projects_service
+    projects_service,
+    stats_service
 )
 from zou.app.services.exception import ProjectNotFoundException
 
@@ -180,9 +185,25 @@ class ProjectServiceTestCase(ApiDBTestCase):
             self.shot.id, self.asset.id
         )
 
+        self.generate_fixture_comment()
+        self.generate_fixture_preview_file()
+        self.asset.update({"preview_file_id": self.preview_file.id})
+        comment = Comment.get(self.comment["id"])
+        comment.previews.append(self.preview_file)
+        comment.save()
+
         project_id = str(self.project.id)
+        stats_service.rebuild_project_stats(project_id)
+        self.assertGreater(
+            len(TaskStats.get_all_by(project_id=project_id)), 0
+        )
         deletion_service.remove_project(project_id)
         self.assertIsNone(Project.get(project_id))
+        self.assertEqual(len(TaskStats.get_all_by(project_id=project_id)), 0)
+        self.assertEqual(len(Task.get_all_by(project_id=project_id)), 0)
+        self.assertEqual(len(Entity.get_all_by(project_id=project_id)), 0)
+        self.assertIsNone(Comment.get(self.comment["id"]))
+        self.assertIsNone(PreviewFile.get(self.preview_file.id))
 
     def test_is_tv_show(self):
         self.assertFalse(projects_service.is_tv_show(self.project.serialize()))
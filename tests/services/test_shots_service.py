@@ -96,6 +96,34 @@ class ShotUtilsTestCase(ApiDBTestCase):
             str(self.shot_task.task_type_id)
         )
 
+    def test_get_shots_and_tasks_iterator(self):
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_type()
+        self.generate_fixture_shot_task()
+        self.generate_fixture_shot_task(name="Secondary")
+        self.shot_task.assignees.append(self.assigner)
+        self.shot_task.save()
+
+        shots = shots_service.get_shots_and_tasks_iterator(
+            {"project_id": self.project.id}
+        )
+        self.assertFalse(isinstance(shots, list))
+        shots = list(shots)
+        self.assertEqual(len(shots), 1)
+        self.assertEqual(shots[0]["project_name"], self.project.name)
+        self.assertEqual(shots[0]["episode_name"], self.episode.name)
+        self.assertEqual(shots[0]["type"], "Shot")
+        self.assertEqual(len(shots[0]["tasks"]), 2)
+        assignees = [
+            sorted(task["assignees"]) for task in shots[0]["tasks"]
+        ]
+        self.assertIn(
+            sorted([str(self.person.id), str(self.assigner.id)]), assignees
+        )
+
     def test_get_shot(self):
         self.assertEqual(
             str(self.shot.id),
@@ -0,0 +1,133 @@
+from tests.base import ApiDBTestCase
+
+from zou.app.models.entity_type import EntityType
+from zou.app.models.task_stats import TaskStats
+from zou.app.services import (
+    assets_service,
+    deletion_service,
+    shots_service,
+    stats_service,
+    tasks_service,
+)
+
+
+class StatsServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(StatsServiceTestCase, self).setUp()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_shot_task()
+        self.generate_fixture_task_status_wip()
+        self.project_id = str(self.project.id)
+        self.episode_id = str(self.episode.id)
+        self.sequence_id = str(self.sequence.id)
+        self.asset_type_id = str(self.asset_type.id)
+        self.task_type_id = str(self.task_type_animation.id)
+        self.task_status_id = str(self.task_status.id)
+        self.task_status_wip_id = str(self.task_status_wip.id)
+        stats_service.rebuild_project_stats(self.project_id)
+
+    def test_get_episode_stats(self):
+        stats = shots_service.get_episode_stats_for_project(self.project_id)
+        self.assertEqual(
+            stats[self.episode_id][self.task_type_id][self.task_status_id],
+            {"name": "opn", "color": "#FFFFFF", "count": 1, "frames": 0},
+        )
+        self.assertEqual(
+            stats["all"]["all"][self.task_status_id]["count"], 1
+        )
+
+    def test_get_sequence_stats(self):
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        self.assertEqual(set(stats.keys()), {self.sequence_id, "all"})
+        self.assertEqual(
+            stats[self.sequence_id]["all"][self.task_status_id]["count"], 1
+        )
+
+    def test_get_asset_type_stats(self):
+        stats = assets_service.get_asset_type_stats_for_project(
+            self.project_id
+        )
+        self.assertEqual(set(stats.keys()), {self.asset_type_id, "all"})
+        task_type_id = str(self.task_type.id)
+        self.assertEqual(
+            stats[self.asset_type_id][task_type_id][self.task_status_id][
+                "count"
+            ],
+            1,
+        )
+
+    def test_update_from_events(self):
+        tasks_service.update_task(
+            self.shot_task.id, {"task_status_id": self.task_status_wip_id}
+        )
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        task_stats = stats[self.sequence_id][self.task_type_id]
+        self.assertNotIn(self.task_status_id, task_stats)
+        self.assertEqual(task_stats[self.task_status_wip_id]["count"], 1)
+
+        deletion_service.remove_task(self.shot_task.id)
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        self.assertEqual(stats, {})
+
+    def test_rebuild_stats(self):
+        stats = shots_service.get_episode_stats_for_project(self.project_id)
+        stats_service.rebuild_stats()
+        self.assertEqual(
+            shots_service.get_episode_stats_for_project(self.project_id),
+            stats,
+        )
+
+    def test_move_shot(self):
+        sequence = self.generate_fixture_sequence("S02")
+        sequence_id = str(sequence.id)
+        shots_service.update_shot(self.shot.id, {"parent_id": sequence_id})
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        self.assertEqual(set(stats.keys()), {sequence_id, "all"})
+        self.assertEqual(
+            stats[sequence_id]["all"][self.task_status_id]["count"], 1
+        )
+
+    def test_change_asset_type(self):
+        asset_type_id = str(EntityType.create(name="Character").id)
+        assets_service.update_asset(
+            self.asset.id, {"entity_type_id": asset_type_id}
+        )
+        stats = assets_service.get_asset_type_stats_for_project(
+            self.project_id
+        )
+        self.assertEqual(set(stats.keys()), {asset_type_id, "all"})
+
+    def test_update_without_move(self):
+        refreshes = []
+        refresh_sequence_stats = stats_service.refresh_sequence_stats
+        rebuild_project_stats = stats_service.rebuild_project_stats
+        stats_service.refresh_sequence_stats = (
+            lambda *args: refreshes.append(args)
+        )
+        stats_service.rebuild_project_stats = (
+            lambda *args: refreshes.append(args)
+        )
+        try:
+            shots_service.update_shot(self.shot.id, {"name": "P02"})
+            shots_service.update_shot(
+                self.shot.id, {"parent_id": self.sequence_id}
+            )
+        finally:
+            stats_service.refresh_sequence_stats = refresh_sequence_stats
+            stats_service.rebuild_project_stats = rebuild_project_stats
+        self.assertEqual(refreshes, [])
+
+    def test_replace_stats_rollback(self):
+        def compute_rows():
+            raise ValueError("Stats failure")
+
+        with self.assertRaises(ValueError):
+            stats_service.replace_stats(
+                self.project_id,
+                self.sequence_id,
+                TaskStats.query.filter_by(sequence_id=self.sequence_id),
+                compute_rows,
+            )
+        self.assertTrue(TaskStats.query.count() > 0)
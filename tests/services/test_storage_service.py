@@ -0,0 +1,81 @@
+import os
+
+from tests.base import ApiDBTestCase
+
+from zou.app.services import storage_service
+from zou.app.stores import file_store
+from zou.app.utils import fields
+
+
+class StorageServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(StorageServiceTestCase, self).setUp()
+        file_store.clear()
+        self.generate_shot_suite()
+        self.generate_assigned_task()
+        self.generate_fixture_preview_file()
+        self.file_path = self.get_fixture_file_path("thumbnails/th01.png")
+        self.size = os.path.getsize(self.file_path)
+        self.orphan_id = fields.gen_uuid()
+        for prefix in ["previews", "thumbnails"]:
+            file_store.add_picture(
+                prefix, str(self.preview_file.id), self.file_path
+            )
+            file_store.add_picture(prefix, str(self.orphan_id), self.file_path)
+        file_store.add_picture(
+            "thumbnails", str(self.person.id), self.file_path
+        )
+        file_store.add_file("dbbackup", "2020-01-01-zou-db.sql", self.file_path)
+
+    def tearDown(self):
+        file_store.clear()
+        super(StorageServiceTestCase, self).tearDown()
+
+    def test_parse_key(self):
+        self.assertEqual(
+            storage_service.parse_key(
+                "thumbnails-square-63e453f1-9655-49ad-acba-ff7f27c49e9d"
+            ),
+            ("thumbnails-square", "63e453f1-9655-49ad-acba-ff7f27c49e9d")
+        )
+        self.assertEqual(
+            storage_service.parse_key("dbbackup-2020-01-01-zou-db.sql"),
+            (None, None)
+        )
+
+    def test_list_stored_files(self):
+        keys = [key for (key, _) in file_store.list_stored_files(
+            file_store.pictures
+        )]
+        self.assertEqual(len(keys), 5)
+        self.assertIn("thumbnails-%s" % self.person.id, keys)
+
+    def test_collect_garbage_dry_run(self):
+        result = storage_service.collect_garbage(dry_run=True)
+        stats = result["pictures"]
+        self.assertEqual(stats[storage_service.SCANNED], 5)
+        self.assertEqual(stats[storage_service.ORPHANS], 2)
+        self.assertEqual(stats[storage_service.REMOVED], 0)
+        self.assertEqual(stats["size"], 2 * self.size)
+        self.assertEqual(result["files"][storage_service.IGNORED], 1)
+        self.assertTrue(
+            file_store.exists_picture("previews", str(self.orphan_id))
+        )
+
+    def test_collect_garbage(self):
+        result = storage_service.collect_garbage(max_workers=2, max_rate=100)
+        self.assertEqual(result["pictures"][storage_service.REMOVED], 2)
+        for prefix in ["previews", "thumbnails"]:
+            self.assertFalse(
+                file_store.exists_picture(prefix, str(self.orphan_id))
+            )
+            self.assertTrue(
+                file_store.exists_picture(prefix, str(self.preview_file.id))
+            )
+        self.assertTrue(
+            file_store.exists_picture("thumbnails", str(self.person.id))
+        )
+        self.assertTrue(
+            file_store.exists_file("dbbackup", "2020-01-01-zou-db.sql")
+        )
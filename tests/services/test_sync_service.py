@@ -1,3 +1,5 @@
+import os
+import tempfile
 import uuid
 import gazu
 
@@ -5,6 +7,7 @@ from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity
 from zou.app.models.project import Project
+from zou.app.models.task import Task
 from zou.app.services import sync_service
 from zou.app.utils import events
 
@@ -91,3 +94,72 @@ class SyncServiceTestCase(ApiDBTestCase):
         events.register("task:update", "handle_event", self)
         sync_service.forward_base_event("task", "update", {"task_id": "test"})
         self.assertTrue("task_id" in self.last_event_data)
+
+    def test_import_entries(self):
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        task_id = str(uuid.uuid4())
+        task = {
+            "id": task_id,
+            "type": "Task",
+            "name": "Main",
+            "project_id": str(self.project.id),
+            "task_type_id": str(self.task_type.id),
+            "task_status_id": str(self.task_status.id),
+            "entity_id": str(self.asset.id),
+            "assigner_id": str(self.assigner.id),
+            "assignees": [str(self.person.id), str(uuid.uuid4())],
+        }
+        sync_service.import_entries(Task, [task])
+        task_db = Task.get(task_id)
+        self.assertEqual(task_db.name, "Main")
+        self.assertEqual(
+            [str(person.id) for person in task_db.assignees],
+            [str(self.person.id)],
+        )
+
+        task_update = dict(task, name="Main 2", duration=10, assignees=[])
+        sync_service.import_entries(Task, [task, task_update])
+        task_db = Task.get(task_id)
+        self.assertEqual(task_db.name, "Main 2")
+        self.assertEqual(task_db.duration, 10)
+        self.assertEqual(task_db.assignees, [])
+
+    def test_run_sync_steps(self):
+        (checkpoint_file, checkpoint_file_path) = tempfile.mkstemp()
+        os.close(checkpoint_file)
+        os.remove(checkpoint_file_path)
+        saved = []
+
+        def save(pages):
+            saved.extend(pages)
+            return len(pages)
+
+        def get_steps():
+            return [
+                (
+                    "step-%s" % index,
+                    "step %s" % index,
+                    lambda index=index: [index],
+                    save,
+                )
+                for index in range(10)
+            ]
+
+        sync_service.run_sync_steps(
+            get_steps()[:4],
+            max_workers=2,
+            checkpoint_file_path=checkpoint_file_path,
+        )
+        self.assertEqual(saved, [0, 1, 2, 3])
+        sync_service.run_sync_steps(
+            get_steps(),
+            max_workers=2,
+            checkpoint_file_path=checkpoint_file_path,
+        )
+        self.assertEqual(saved, list(range(10)))
+        sync_service.clear_checkpoint(checkpoint_file_path)
+        self.assertFalse(os.path.exists(checkpoint_file_path))
@@ -24,6 +24,15 @@ class ToReviewHandler(object):
         self.data = data
 
 
+class BatchHandler(object):
+
+    def __init__(self):
+        self.data = None
+
+    def handle_event(self, data):
+        self.data = data
+
+
 class TaskServiceTestCase(ApiDBTestCase):
 
     def setUp(self):
@@ -99,6 +108,29 @@ class TaskServiceTestCase(ApiDBTestCase):
         self.assertEqual(task["project_id"], shot["project_id"])
         self.assertEqual(task["task_status_id"], status["id"])
 
+    def test_create_tasks(self):
+        shot = self.shot.serialize()
+        asset = self.asset.serialize()
+        task_type = self.task_type.serialize()
+        status = tasks_service.get_todo_status()
+        tasks_service.create_task(task_type, shot)
+        handler = BatchHandler()
+        events.register("task:new-batch", "handle_batch", handler)
+
+        task_ids = tasks_service.create_tasks(task_type, [shot, asset])
+        self.assertEqual(len(task_ids), 1)
+        self.assertEqual(handler.data["task_ids"], task_ids)
+        self.assertEqual(handler.data["entity_ids"], [asset["id"]])
+        task = tasks_service.get_task(task_ids[0])
+        self.assertEqual(task["entity_id"], asset["id"])
+        self.assertEqual(task["task_type_id"], task_type["id"])
+        self.assertEqual(task["task_status_id"], status["id"])
+        tasks = tasks_service.get_created_tasks(task_type, task_ids)
+        self.assertEqual(tasks[0]["task_type_name"], task_type["name"])
+
+        task_ids = tasks_service.create_tasks(task_type, [shot, asset])
+        self.assertEqual(task_ids, [])
+
     def test_status_to_wip(self):
         events.register(
             "task:start",
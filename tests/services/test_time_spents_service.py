@@ -78,6 +78,42 @@ class TimeSpentsServiceTestCase(ApiDBTestCase):
         self.assertEqual(week_table["23"][self.person_id], 800)
         self.assertTrue("1" not in week_table)
 
+    def test_get_year_table(self):
+        year_table = time_spents_service.get_year_table()
+        self.assertEqual(year_table["2018"][self.person_id], 2000)
+        self.assertEqual(year_table["2018"][self.user_id], 600)
+        self.assertEqual(year_table["2019"][self.person_id], 850)
+
+    def test_get_table_breakdown(self):
+        project_id = str(self.project.id)
+        month_table = time_spents_service.get_month_table("2018", "project")
+        self.assertEqual(month_table["6"][self.person_id][project_id], 1400)
+        self.assertEqual(month_table["6"][self.user_id][project_id], 600)
+
+        department_id = str(self.department.id)
+        department_animation_id = str(self.department_animation.id)
+        day_table = time_spents_service.get_day_table(
+            "2018", "06", "department"
+        )
+        self.assertEqual(day_table["4"][self.person_id][department_id], 500)
+        self.assertEqual(
+            day_table["4"][self.person_id][department_animation_id], 300
+        )
+
+    def test_get_table_cache_invalidation(self):
+        month_table = time_spents_service.get_month_table("2018")
+        self.assertEqual(month_table["6"][self.person_id], 1400)
+        tasks_service.create_or_update_time_spent(
+            self.task_id, self.person_id, "2018-06-05", 100
+        )
+        month_table = time_spents_service.get_month_table("2018")
+        self.assertEqual(month_table["6"][self.person_id], 1500)
+        tasks_service.create_or_update_time_spent(
+            self.task_id, self.person_id, "2018-06-05", 0
+        )
+        month_table = time_spents_service.get_month_table("2018")
+        self.assertEqual(month_table["6"][self.person_id], 1400)
+
     def test_get_month_time_spents(self):
         tasks = time_spents_service.get_month_time_spents(
             self.person_id,
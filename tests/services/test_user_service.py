@@ -73,13 +73,29 @@ class UserServiceTestCase(ApiDBTestCase):
             self.assertTrue(
                 user_service.check_project_access(str(self.project_id)))
 
+    def test_get_project_access(self):
+        person_id = self.get_current_user()["id"]
+        access = user_service.get_project_access(person_id)
+        self.assertEqual(access["project_ids"], set())
+
+        projects_service.add_team_member(str(self.project_id), person_id)
+        access = user_service.get_project_access(person_id)
+        self.assertEqual(access["project_ids"], set([str(self.project_id)]))
+        self.assertEqual(
+            access["open_project_ids"], set([str(self.project_id)])
+        )
+
+        projects_service.remove_team_member(str(self.project_id), person_id)
+        access = user_service.get_project_access(person_id)
+        self.assertEqual(access["project_ids"], set())
+
     def test_related_projects(self):
         projects = user_service.related_projects()
         self.assertEqual(len(projects), 0)
 
-        self.project.team.append(self.get_current_user_raw())
-
-        self.project.save()
+        projects_service.add_team_member(
+            str(self.project_id), self.get_current_user()["id"]
+        )
         projects = user_service.related_projects()
         self.assertEqual(len(projects), 1)
         self.assertEqual(projects[0]["id"], str(self.project_id))
@@ -78,6 +78,27 @@ class BreakdownTestCase(ApiDBTestCase):
         self.assertEqual(cast_in[0]["sequence_name"], self.sequence.name)
         self.assertEqual(cast_in[0]["episode_name"], self.episode.name)
 
+    def test_get_project_casting(self):
+        self.shot_id = str(self.shot.id)
+        self.asset_id = str(self.asset.id)
+        path = "/data/projects/%s/entities/%s/casting" % (
+            self.project.id,
+            self.shot_id
+        )
+        self.put(path, [{"asset_id": self.asset_id, "nb_occurences": 2}], 200)
+
+        casting = self.get("/data/projects/%s/casting" % self.project.id)
+        self.assertEqual(len(casting[self.shot_id]), 1)
+        self.assertEqual(casting[self.shot_id][0]["asset_id"], self.asset_id)
+        self.assertEqual(casting[self.shot_id][0]["nb_occurences"], 2)
+
+        castings = self.get(
+            "/data/projects/%s/casting?stream=true" % self.project.id
+        )
+        self.assertEqual(len(castings), 1)
+        self.assertEqual(castings[0]["shot_id"], self.shot_id)
+        self.assertEqual(len(castings[0]["casting"]), 1)
+
     def test_get_assets_for_shots(self):
         self.entities = self.generate_data(
             Entity, 3,
@@ -1,6 +1,12 @@
+import json
+import os
+import uuid
+
 from tests.base import ApiDBTestCase
 
+from zou.app.blueprints.source.csv.base import run_import_job
 from zou.app.models.entity import EntityLink
+from zou.app.stores import file_store
 
 
 class ImportCsvCastingTestCase(ApiDBTestCase):
@@ -77,3 +83,39 @@ class ImportCsvCastingTestCase(ApiDBTestCase):
 
         links = EntityLink.query.all()
         self.assertEqual(len(links), 12)
+
+    def test_import_casting_wrong_rows(self):
+        path = "/import/csv/projects/%s/casting" % self.project_id
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "casting_wrong.csv")
+        )
+        result = json.loads(self.upload_file(path, file_path_fixture, 400))
+        self.assertEqual(
+            [error["line"] for error in result["errors"]], [3, 4, 5]
+        )
+        self.assertEqual(
+            result["errors"][1]["message"],
+            "Shot or asset not found: E02 / SEQ02 / SH01"
+        )
+        self.assertEqual(
+            result["errors"][2]["message"],
+            "Asset not found: Character / Paul"
+        )
+        self.assertEqual(len(EntityLink.query.all()), 0)
+
+    def test_import_casting_job(self):
+        file_id = str(uuid.uuid4())
+        file_store.add_file(
+            "csv-imports",
+            file_id,
+            self.get_fixture_file_path(os.path.join("csv", "casting.csv")),
+        )
+        result = run_import_job(
+            "zou.app.blueprints.source.csv.casting",
+            "CastingCsvImportResource",
+            file_id,
+            self.project_id,
+        )
+        self.assertEqual(result["status_code"], 201)
+        self.assertFalse(file_store.exists_file("csv-imports", file_id))
+        self.assertEqual(len(EntityLink.query.all()), 12)
@@ -1,8 +1,19 @@
+import json
 import os
+import uuid
+
+from flask_jwt_extended import verify_jwt_in_request
 
 from tests.base import ApiDBTestCase
 
+from zou.app import app
+from zou.app.blueprints.source.csv.base import (
+    CsvImportJobResource,
+    run_import_job,
+)
 from zou.app.models.person import Person
+from zou.app.stores import file_store
+from zou.app.utils.permissions import PermissionDenied
 
 
 class ImportCsvPersonsTestCase(ApiDBTestCase):
@@ -23,3 +34,56 @@ class ImportCsvPersonsTestCase(ApiDBTestCase):
 
         persons = Person.query.all()
         self.assertEqual(len(persons), 3)
+
+    def test_import_persons_twice(self):
+        self.upload_csv("/import/csv/persons", "persons")
+        self.upload_csv("/import/csv/persons", "persons")
+        persons = Person.query.all()
+        self.assertEqual(len(persons), 3)
+
+    def test_import_persons_wrong_rows(self):
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "persons_wrong.csv")
+        )
+        result = json.loads(
+            self.upload_file("/import/csv/persons", file_path_fixture, 400)
+        )
+        self.assertEqual([error["line"] for error in result["errors"]], [3])
+        self.assertEqual(len(Person.query.all()), 1)
+
+    def test_import_persons_job(self):
+        file_id = str(uuid.uuid4())
+        file_store.add_file(
+            "csv-imports",
+            file_id,
+            self.get_fixture_file_path(os.path.join("csv", "persons.csv")),
+        )
+        result = run_import_job(
+            "zou.app.blueprints.source.csv.persons",
+            "PersonsCsvImportResource",
+            file_id,
+        )
+        self.assertEqual(result["status_code"], 201)
+        self.assertEqual(len(result["result"]), 2)
+        self.assertFalse(file_store.exists_file("csv-imports", file_id))
+        self.assertEqual(len(Person.query.all()), 3)
+
+    def test_import_job_permissions(self):
+        resource = CsvImportJobResource()
+        job = type("Job", (object,), {})()
+        job.meta = {"person_id": self.user["id"], "project_id": None}
+        self.generate_fixture_user_manager()
+        self.log_in_manager()
+        with app.test_request_context(headers=self.base_headers):
+            verify_jwt_in_request()
+            self.assertRaises(
+                PermissionDenied, resource.check_job_permissions, job
+            )
+            job.meta["person_id"] = self.user_manager["id"]
+            self.assertTrue(resource.check_job_permissions(job))
+
+        self.log_in_admin()
+        job.meta["person_id"] = None
+        with app.test_request_context(headers=self.base_headers):
+            verify_jwt_in_request()
+            self.assertTrue(resource.check_job_permissions(job))
@@ -1,3 +1,4 @@
+import json
 import os
 
 from tests.base import ApiDBTestCase
@@ -36,3 +37,37 @@ class ImportCsvShotsTestCase(ApiDBTestCase):
 
         shot = shots[0]
         self.assertEqual(shot["data"].get("contractor", None), "contractor 1")
+
+    def test_import_shots_semicolon(self):
+        path = "/import/csv/projects/%s/shots" % self.project.id
+        self.project.update({"production_type": "tvshow"})
+        self.upload_csv(path, "shots_semicolon")
+
+        shots = shots_service.get_shots()
+        self.assertEqual(len(shots), 2)
+        self.assertEqual(
+            set(shot["data"]["frame_out"] for shot in shots), {"100", "200"}
+        )
+
+    def test_import_shots_wrong_rows(self):
+        path = "/import/csv/projects/%s/shots" % self.project.id
+        self.project.update({"production_type": "tvshow"})
+        file_path_fixture = self.get_fixture_file_path(
+            os.path.join("csv", "shots_wrong.csv")
+        )
+        result = json.loads(
+            self.upload_file(path, file_path_fixture, code=400)
+        )
+        self.assertEqual([error["line"] for error in result["errors"]], [3, 4])
+        self.assertEqual(len(shots_service.get_episodes()), 0)
+        self.assertEqual(len(shots_service.get_sequences()), 0)
+        self.assertEqual(len(shots_service.get_shots()), 0)
+
+    def test_import_shots_twice(self):
+        path = "/import/csv/projects/%s/shots" % self.project.id
+        self.project.update({"production_type": "tvshow"})
+        self.upload_csv(path, "shots")
+        self.upload_csv(path, "shots")
+
+        self.assertEqual(len(shots_service.get_sequences()), 3)
+        self.assertEqual(len(shots_service.get_shots()), 4)
@@ -49,3 +49,25 @@ class FileStoreTestCase(unittest.TestCase):
         file_name = "thumbnails-63e453f1-9655-49ad-acba-ff7f27c49e9d"
         result_path = file_store.path(file_store.pictures, file_name)
         self.assertTrue(os.path.exists(result_path))
+
+    def test_open_movie_range(self):
+        file_path_fixture = self.get_fixture_file_path("thumbnails/th01.png")
+        movie_id = "63e453f1-9655-49ad-acba-ff7f27c49e9d"
+        file_store.add_movie("previews", movie_id, file_path_fixture)
+        with open(file_path_fixture, "rb") as fixture_file:
+            content = fixture_file.read()
+
+        self.assertEqual(
+            file_store.get_movie_file_size("previews", movie_id), len(content)
+        )
+        self.assertEqual(
+            b"".join(file_store.open_movie("previews", movie_id)), content
+        )
+        self.assertEqual(
+            b"".join(file_store.open_movie("previews", movie_id, 10, 19)),
+            content[10:20],
+        )
+        self.assertEqual(
+            b"".join(file_store.open_movie("previews", movie_id, 100)),
+            content[100:],
+        )
@@ -1,5 +1,8 @@
+from sqlalchemy import event
+
 from tests.base import ApiDBTestCase
 
+from zou.app import db
 from zou.app.models.entity import Entity, EntityLink
 from zou.app.models.news import News
 from zou.app.models.project import Project
@@ -51,6 +54,25 @@ class CreateFromImportTestCase(ApiDBTestCase):
         project = Project.get(project_id)
         self.assertEqual(project.name, project_name)
 
+    def test_project_list_team(self):
+        project_dict = {
+            "team": [str(self.person.id), str(self.assigner.id)],
+            "id": str(self.project.id),
+            "name": self.project.name,
+            "project_status_id": str(self.open_status.id),
+            "type": "Project"
+        }
+        Project.create_from_import_list([dict(project_dict)])
+        project = Project.get(self.project.id)
+        self.assertEqual(len(project.team), 2)
+        project_dict["team"] = [str(self.assigner.id)]
+        Project.create_from_import_list([dict(project_dict)])
+        project = Project.get(self.project.id)
+        self.assertEqual(
+            [str(person.id) for person in project.team],
+            [str(self.assigner.id)]
+        )
+
     def test_entity(self):
         entity_dict = {
             "id": "49ed2011-3186-4405-8dc8-d6cb3a68ff1c",
@@ -70,6 +92,51 @@ class CreateFromImportTestCase(ApiDBTestCase):
         entity = Entity.get(entity_dict["id"])
         self.assertEqual(entity_dict["name"], entity.name)
 
+    def test_entity_list(self):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        shot_dicts = [
+            {
+                "id": shot_id,
+                "name": name,
+                "project_id": str(self.project.id),
+                "sequence_id": str(self.sequence.id),
+                "preview_file_id": "c3f4a6cb-2b42-4f5a-8d3e-0c0b3d9e1a57",
+                "frame_in": 10,
+                "data": {},
+                "type": "Shot"
+            }
+            for (shot_id, name) in [
+                ("dd3b1d1c-4b39-4ba0-9bd8-2a1b7c0b4e11", "P10"),
+                ("a4d7c4f0-95c9-4d6e-8e2c-4c2f1d9e2b22", "P11"),
+            ]
+        ]
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            Entity.create_from_import_list(shot_dicts)
+        finally:
+            event.remove(
+                db.engine, "before_cursor_execute", before_cursor_execute
+            )
+        for table_name in ["preview_file", "entity_type"]:
+            self.assertEqual(
+                len([
+                    statement for statement in statements
+                    if statement.startswith("SELECT")
+                    and "FROM %s" % table_name in statement
+                ]),
+                1
+            )
+        for shot_dict in shot_dicts:
+            shot = Entity.get(shot_dict["id"])
+            self.assertEqual(shot.entity_type_id, self.shot_type.id)
+            self.assertEqual(shot.parent_id, self.sequence.id)
+            self.assertIsNone(shot.preview_file_id)
+            self.assertEqual(shot.data["frame_in"], 10)
+
     def test_entity_link(self):
         entity_link_dict = {
             "id": "726f9b44-526f-4fce-a979-6bf8bc8962a4",
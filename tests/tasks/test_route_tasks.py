@@ -63,6 +63,22 @@ class TaskRoutesTestCase(ApiDBTestCase):
         self.assertEqual(task["task_type_id"], self.task_type_id)
         self.assertEqual(task["entity_id"], self.shot_id)
 
+    def test_create_tasks(self):
+        path = "/actions/projects/%s/task-types/%s/create-tasks" % (
+            self.project.id,
+            self.task_type_id,
+        )
+        result = self.post(path, {"entity_ids": [self.shot_id, self.asset_id]})
+        self.assertEqual(len(result["task_ids"]), 2)
+        result = self.post(path, {"entity_ids": [self.shot_id]})
+        self.assertEqual(result["task_ids"], [])
+
+        tasks = self.get("/data/tasks")
+        self.assertEqual(
+            {task["entity_id"] for task in tasks},
+            {self.shot_id, self.asset_id},
+        )
+
     def test_task_assign(self):
         self.generate_fixture_task()
         person_id = str(self.person.id)
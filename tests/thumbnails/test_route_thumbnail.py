@@ -1,9 +1,11 @@
+import io
 import os
 
 from tests.base import ApiDBTestCase
 
+from zou.app import config
 from zou.app.utils import fs, thumbnail
-from zou.app.services import assets_service
+from zou.app.services import assets_service, files_service
 from zou.app.models.entity import Entity
 
 from PIL import Image
@@ -95,6 +97,39 @@ class RouteThumbnailTestCase(ApiDBTestCase):
         result_image = Image.open(result_file_path)
         self.assertEqual(result_image.size, (100, 100))
 
+    def test_add_preview_thumbnail_format(self):
+        path = "/pictures/preview-files/%s" % self.preview_file_id
+        file_path_fixture = self.get_fixture_file_path(
+                os.path.join("thumbnails", "th01.png"))
+        thumbnail_format = config.THUMBNAIL_FORMAT
+        config.THUMBNAIL_FORMAT = "webp"
+        try:
+            self.upload_file(path, file_path_fixture)
+        finally:
+            config.THUMBNAIL_FORMAT = thumbnail_format
+
+        preview_file = files_service.get_preview_file(self.preview_file_id)
+        self.assertEqual(preview_file["thumbnail_format"], "webp")
+
+        for picture_type in ["thumbnails", "thumbnails-square"]:
+            response = self.app.get(
+                "/pictures/%s/preview-files/%s.png" % (
+                    picture_type,
+                    self.preview_file_id
+                ),
+                headers=self.base_headers
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "image/webp")
+            result_image = Image.open(io.BytesIO(response.data))
+            self.assertEqual(result_image.format, "WEBP")
+
+        response = self.app.get(
+            "/pictures/previews/preview-files/%s.png" % self.preview_file_id,
+            headers=self.base_headers
+        )
+        self.assertEqual(response.mimetype, "image/png")
+
     def test_set_main_preview(self):
         path = "/pictures/preview-files/%s" % self.preview_file_id
 
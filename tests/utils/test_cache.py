@@ -21,6 +21,11 @@ class CacheTestCase(unittest.TestCase):
         import random
         return parameter + str(random.randrange(1, 50))
 
+    @cache.memoize_function(50)
+    def memoized_counter(self, parameter):
+        self.called = self.called + 1
+        return "%s-%s" % (parameter, self.called)
+
     def test_memoize(self):
         result = self.memoized_function2("param1")
         result2 = self.memoized_function2("param1")
@@ -28,3 +33,74 @@ class CacheTestCase(unittest.TestCase):
 
         self.assertEqual(result, result2)
         self.assertNotEqual(result, result3)
+
+    def test_local_cache(self):
+        local_cache = cache.LocalCache(2, 1024)
+        local_cache.set(("ns", "a"), {"value": 1}, 50)
+        local_cache.set(("ns", "b"), {"value": 2}, 50)
+        self.assertEqual(local_cache.get(("ns", "a")), {"value": 1})
+        local_cache.set(("ns", "c"), {"value": 3}, 50)
+        self.assertIsNone(local_cache.get(("ns", "b")))
+        self.assertEqual(local_cache.get(("ns", "c")), {"value": 3})
+
+        result = local_cache.get(("ns", "a"))
+        result["value"] = 4
+        self.assertEqual(local_cache.get(("ns", "a")), {"value": 1})
+
+        local_cache.set(("ns", "d"), "x" * 2048, 50)
+        self.assertIsNone(local_cache.get(("ns", "d")))
+        local_cache.set(("ns", "e"), "e", -1)
+        self.assertIsNone(local_cache.get(("ns", "e")))
+
+        local_cache.delete_namespace("ns")
+        self.assertIsNone(local_cache.get(("ns", "a")))
+        self.assertEqual(local_cache.size, 0)
+
+    def test_memoize_local_tier(self):
+        previous_local_cache = cache.local_cache
+        cache.local_cache = cache.LocalCache(100, 1024 * 1024)
+        namespace = self.memoized_counter.local_namespace
+        try:
+            cache.clear()
+            cache.reset_stats()
+            result = self.memoized_counter("param1")
+            self.assertEqual(result, self.memoized_counter("param1"))
+            self.assertEqual(self.called, 1)
+            self.assertEqual(
+                cache.get_stats()[namespace],
+                {"local_hits": 1, "remote_hits": 0, "misses": 1}
+            )
+
+            cache.evict_local(namespace)
+            self.assertEqual(result, self.memoized_counter("param1"))
+            self.assertEqual(self.called, 1)
+            self.assertEqual(cache.get_stats()[namespace]["remote_hits"], 1)
+
+            cache.cache.delete_memoized(self.memoized_counter)
+            self.assertEqual(len(cache.local_cache.entries), 0)
+            result2 = self.memoized_counter("param1")
+            self.assertNotEqual(result, result2)
+            self.assertEqual(self.called, 2)
+            self.assertEqual(result2, self.memoized_counter("param1"))
+            self.assertEqual(
+                cache.get_stats()[namespace],
+                {"local_hits": 2, "remote_hits": 1, "misses": 2}
+            )
+
+            cache.clear()
+            self.assertEqual(len(cache.local_cache.entries), 0)
+        finally:
+            cache.local_cache = previous_local_cache
+
+    def test_stats(self):
+        cache.clear()
+        cache.reset_stats()
+        self.memoized_function2("param1")
+        self.memoized_function2("param1")
+        stats = cache.get_stats()
+        namespace = "tests.utils.test_cache.CacheTestCase.memoized_function2"
+        self.assertEqual(stats[namespace]["misses"], 1)
+        self.assertEqual(
+            stats[namespace]["local_hits"] + stats[namespace]["remote_hits"],
+            1
+        )
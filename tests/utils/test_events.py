@@ -55,3 +55,34 @@ class EventsTestCase(ApiDBTestCase):
         event_models = events_service.get_last_events()
         self.assertEqual(len(event_models), 4)
         self.assertEqual(event_models[0]["name"], "task:new")
+
+    def test_emit_with_project(self):
+        received = []
+
+        def listener(event, data):
+            received.append(data)
+
+        events.register_listeners({"task:update": [listener]})
+        try:
+            events.emit("task:update", {"task_id": "task-1"}, project_id="p1")
+        finally:
+            events.listeners["task:update"].remove(listener)
+        self.assertEqual(received[0]["project_id"], "p1")
+        event_models = events_service.get_last_events()
+        self.assertEqual(event_models[0]["data"]["project_id"], "p1")
+
+    def test_get_room(self):
+        self.assertEqual(
+            events.get_room("task:update", {"project_id": "p1"}, True),
+            "project:p1",
+        )
+        self.assertIsNone(
+            events.get_room("project:update", {"project_id": "p1"})
+        )
+        self.assertEqual(
+            events.get_room(
+                "notification:new",
+                {"notification_id": "n1", "person_id": "u1"},
+            ),
+            "person:u1",
+        )
@@ -0,0 +1,90 @@
+import unittest
+
+from zou.app.utils import movie_utils
+
+
+class MovieUtilsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(MovieUtilsTestCase, self).setUp()
+        self.video = {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "profile": "High",
+            "level": 40,
+            "time_base": "1/24000",
+            "pix_fmt": "yuv420p",
+            "width": 1920,
+            "height": 1080,
+            "sample_aspect_ratio": "1:1",
+            "r_frame_rate": "24000/1001",
+        }
+        self.audio = {
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "48000",
+            "channels": 2,
+        }
+
+    def test_get_frame_rate(self):
+        self.assertAlmostEqual(
+            movie_utils.get_frame_rate(self.video), 23.976, places=3
+        )
+        self.assertEqual(movie_utils.get_frame_rate({"r_frame_rate": "0/0"}), 0)
+
+    def test_is_video_conform(self):
+        self.assertTrue(
+            movie_utils.is_video_conform(self.video, 1920, 1080, "23.98")
+        )
+        self.assertFalse(
+            movie_utils.is_video_conform(self.video, 1920, 1080, "24.00")
+        )
+        self.assertFalse(
+            movie_utils.is_video_conform(self.video, 1280, 720, "23.98")
+        )
+        self.assertFalse(movie_utils.is_video_conform(None, 1920, 1080, "24"))
+        self.video["codec_name"] = "prores"
+        self.assertFalse(
+            movie_utils.is_video_conform(self.video, 1920, 1080, "23.98")
+        )
+
+    def test_is_video_conform_encoding_profile(self):
+        encoding_profile = movie_utils.get_encoding_profile(self.video)
+        self.assertTrue(
+            movie_utils.is_video_conform(
+                self.video, 1920, 1080, "23.98", encoding_profile
+            )
+        )
+        for (key, value) in [
+            ("profile", "Main"),
+            ("level", 41),
+            ("time_base", "1/12288"),
+        ]:
+            video = dict(self.video)
+            video[key] = value
+            self.assertFalse(
+                movie_utils.is_video_conform(
+                    video, 1920, 1080, "23.98", encoding_profile
+                )
+            )
+        self.video["profile"] = "Extended"
+        self.assertFalse(
+            movie_utils.is_video_conform(self.video, 1920, 1080, "23.98")
+        )
+
+    def test_get_encoding_options(self):
+        self.assertEqual(
+            movie_utils.get_encoding_options(None), {"profile:v": "high"}
+        )
+        options = movie_utils.get_encoding_options(
+            movie_utils.get_encoding_profile(self.video)
+        )
+        self.assertEqual(options["profile:v"], "high")
+        self.assertEqual(options["level"], "4.0")
+        self.assertEqual(options["video_track_timescale"], "24000")
+
+    def test_is_audio_conform(self):
+        self.assertTrue(movie_utils.is_audio_conform(self.audio))
+        self.assertFalse(movie_utils.is_audio_conform(None))
+        self.audio["sample_rate"] = "44100"
+        self.assertFalse(movie_utils.is_audio_conform(self.audio))
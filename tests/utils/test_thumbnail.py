@@ -141,3 +141,32 @@ class ThumbnailTestCase(unittest.TestCase):
         )
         self.assertTrue(os.path.exists(file_path))
         self.assertTrue(Image.open(file_path).size, thumbnail.SQUARE_SIZE)
+
+    def test_generate_preview_variants_formats(self):
+        preview_id = "123413-12313"
+        file_path_fixture = self.get_fixture_file_path("thumbnails/th04.jpg")
+        original_path = os.path.join(TEST_FOLDER, "%s.jpg" % preview_id)
+        fs.copyfile(file_path_fixture, original_path)
+        variants = dict(
+            thumbnail.generate_preview_variants(
+                original_path, preview_id, thumbnail_format="jpeg"
+            )
+        )
+        self.assertTrue(variants["thumbnails"].endswith(".jpeg"))
+        self.assertEqual(
+            Image.open(variants["thumbnails"]).size, thumbnail.RECTANGLE_SIZE
+        )
+        self.assertEqual(Image.open(variants["thumbnails"]).format, "JPEG")
+        self.assertEqual(
+            Image.open(variants["thumbnails-square"]).size,
+            thumbnail.SQUARE_SIZE,
+        )
+        self.assertEqual(Image.open(variants["previews"]).format, "PNG")
+        self.assertEqual(
+            Image.open(variants["previews"]).size[0], thumbnail.PREVIEW_SIZE[0]
+        )
+
+    def test_get_mimetype(self):
+        self.assertEqual(thumbnail.get_mimetype("png"), "image/png")
+        self.assertEqual(thumbnail.get_mimetype("jpeg"), "image/jpeg")
+        self.assertEqual(thumbnail.get_mimetype("webp"), "image/webp")
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from zou.app.utils import transfer_utils
+
+
+class TransferUtilsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.source_folder = os.path.join(self.folder, "source")
+        self.destination_folder = os.path.join(self.folder, "destination")
+        os.makedirs(self.source_folder)
+        os.makedirs(self.destination_folder)
+        self.manifest_path = os.path.join(self.folder, "manifest")
+        self.nb_runs = 0
+        for index in range(10):
+            with open(self.get_source_path(index), "wb") as source_file:
+                source_file.write(b"x" * (index + 1))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def get_source_path(self, index):
+        return os.path.join(self.source_folder, "file-%s" % index)
+
+    def get_destination_path(self, index):
+        return os.path.join(self.destination_folder, "file-%s" % index)
+
+    def copy(self, index):
+        self.nb_runs += 1
+        shutil.copyfile(
+            self.get_source_path(index), self.get_destination_path(index)
+        )
+
+    def get_transfers(self, nb_files=10, run=None):
+        return [
+            transfer_utils.Transfer(
+                key="file-%s" % index,
+                run=lambda index=index: (run or self.copy)(index),
+                get_source_size=lambda index=index: (
+                    transfer_utils.get_local_file_size(
+                        self.get_source_path(index)
+                    )
+                ),
+                get_destination_size=lambda index=index: (
+                    transfer_utils.get_local_file_size(
+                        self.get_destination_path(index)
+                    )
+                ),
+            )
+            for index in range(nb_files)
+        ]
+
+    def test_run_transfers(self):
+        self.copy(0)
+        self.nb_runs = 0
+        stats = transfer_utils.run_transfers(
+            self.get_transfers(),
+            max_workers=3,
+            manifest_path=self.manifest_path,
+        )
+        self.assertEqual(stats[transfer_utils.TRANSFERRED], 9)
+        self.assertEqual(stats[transfer_utils.SKIPPED], 1)
+        self.assertEqual(stats["size"], sum(range(2, 11)))
+        self.assertEqual(self.nb_runs, 9)
+        for index in range(10):
+            self.assertEqual(
+                os.path.getsize(self.get_destination_path(index)), index + 1
+            )
+        self.assertIn("9 files transferred", transfer_utils.format_stats(stats))
+
+    def test_run_transfers_again(self):
+        transfer_utils.run_transfers(
+            self.get_transfers(5), manifest_path=self.manifest_path
+        )
+        with open(self.get_source_path(0), "wb") as source_file:
+            source_file.write(b"changed")
+        self.nb_runs = 0
+        stats = transfer_utils.run_transfers(
+            self.get_transfers(), manifest_path=self.manifest_path
+        )
+        self.assertEqual(stats[transfer_utils.TRANSFERRED], 6)
+        self.assertEqual(stats[transfer_utils.SKIPPED], 4)
+        self.assertEqual(self.nb_runs, 6)
+
+    def test_missing_source(self):
+        os.remove(self.get_source_path(3))
+        stats = transfer_utils.run_transfers(self.get_transfers())
+        self.assertEqual(stats[transfer_utils.MISSING], 1)
+        self.assertEqual(stats[transfer_utils.TRANSFERRED], 9)
+
+    def test_retry(self):
+        failures = {}
+
+        def copy_with_failures(index):
+            if failures.get(index, 0) < index % 3:
+                failures[index] = failures.get(index, 0) + 1
+                raise IOError("Connection reset")
+            self.copy(index)
+
+        stats = transfer_utils.run_transfers(
+            self.get_transfers(run=copy_with_failures),
+            retries=1,
+            retry_delay=0,
+        )
+        self.assertEqual(stats[transfer_utils.TRANSFERRED], 7)
+        self.assertEqual(stats[transfer_utils.FAILED], 3)
+        self.assertFalse(os.path.exists(self.get_destination_path(2)))
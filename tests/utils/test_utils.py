@@ -1,12 +1,16 @@
 import os
 import datetime
+import fcntl
+import threading
+import time
 import unittest
 import uuid
 
 from babel import Locale
 from pytz import timezone
 
-from zou.app.utils import colors, fields, query, fs
+from zou.app import app
+from zou.app.utils import colors, fields, query, fs, streaming
 from zou.app.models.person import Person
 from zou.app.models.task import Task
 
@@ -104,3 +108,119 @@ class UtilsTestCase(unittest.TestCase):
         self.assertTrue(os.path.exists(folder))
         fs.rm_rf("one")
         self.assertTrue(not os.path.exists(folder))
+
+    def test_get_cached_file_path(self):
+        config = type("config", (object,), {})()
+        config.FS_CACHE_FOLDER = os.path.join("tests", "tmp-cache")
+        config.FS_CACHE_MAX_SIZE = 25
+        config.FS_CACHE_LOCK_TIMEOUT = 5
+        downloads = []
+
+        def open_file(content):
+            downloads.append(content)
+            return iter([content[:5], content[5:]])
+
+        for (name, content) in [
+            ("one", b"0123456789"),
+            ("two", b"abcdefghij"),
+        ]:
+            file_path = fs.get_cached_file_path(
+                config, name, lambda: open_file(content)
+            )
+            with open(file_path, "rb") as cached_file:
+                self.assertEqual(cached_file.read(), content)
+        fs.get_cached_file_path(config, "one", lambda: open_file(b"none"))
+        self.assertEqual(len(downloads), 2)
+
+        os.utime(
+            os.path.join(config.FS_CACHE_FOLDER, "one"),
+            (1000000000, 1000000000),
+        )
+        fs.get_cached_file_path(
+            config, "three", lambda: open_file(b"ABCDEFGHIJ")
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(config.FS_CACHE_FOLDER, "one"))
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(config.FS_CACHE_FOLDER, "two"))
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(config.FS_CACHE_FOLDER, "three"))
+        )
+        fs.rm_rf(config.FS_CACHE_FOLDER)
+
+    def test_get_cached_file_path_concurrent(self):
+        config = type("config", (object,), {})()
+        config.FS_CACHE_FOLDER = os.path.join("tests", "tmp-cache")
+        config.FS_CACHE_MAX_SIZE = 25
+        config.FS_CACHE_LOCK_TIMEOUT = 5
+        download_started = threading.Event()
+        downloads = []
+        results = []
+
+        def open_file():
+            downloads.append(threading.current_thread().name)
+            download_started.set()
+            time.sleep(0.3)
+            return iter([b"0123456789"])
+
+        def get_file():
+            results.append(
+                fs.get_cached_file_path(config, "one", open_file)
+            )
+
+        first = threading.Thread(target=get_file)
+        second = threading.Thread(target=get_file)
+        first.start()
+        download_started.wait(5)
+        second.start()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(len(downloads), 1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0], results[1])
+        with open(results[0], "rb") as cached_file:
+            self.assertEqual(cached_file.read(), b"0123456789")
+
+        config.FS_CACHE_LOCK_TIMEOUT = 0.2
+        lock_file_path = os.path.join(config.FS_CACHE_FOLDER, "two.lock")
+        with open(lock_file_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with self.assertRaises(TimeoutError):
+                fs.get_cached_file_path(config, "two", open_file)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self.assertEqual(len(downloads), 1)
+        fs.rm_rf(config.FS_CACHE_FOLDER)
+
+    def test_rm_unused_lock_file(self):
+        folder = os.path.join("tests", "tmp-cache")
+        fs.mkdir_p(folder)
+        lock_file_path = os.path.join(folder, "one.lock")
+        with open(lock_file_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            fs.rm_unused_lock_file(lock_file_path)
+            self.assertTrue(os.path.exists(lock_file_path))
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        fs.rm_unused_lock_file(lock_file_path)
+        self.assertFalse(os.path.exists(lock_file_path))
+        fs.rm_rf(folder)
+
+    def test_build_range_response(self):
+        def open_range(start, end):
+            yield b"0123456789"[start:end + 1]
+
+        with app.test_request_context(headers={"Range": "bytes=2-5"}):
+            response = streaming.build_range_response(
+                open_range, 10, "video/mp4"
+            )
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.headers["Content-Range"], "bytes 2-5/10")
+            self.assertEqual(b"".join(response.response), b"2345")
+
+        with app.test_request_context(headers={"Range": "bytes=20-30"}):
+            response = streaming.build_range_response(
+                open_range, 10, "video/mp4"
+            )
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response.headers["Content-Range"], "bytes */10")
@@ -0,0 +1,45 @@
+import io
+import unittest
+import zipfile
+
+from zou.app.utils import zip_utils
+
+
+class ZipUtilsTestCase(unittest.TestCase):
+
+    def read_zip(self, entries):
+        data = b"".join(zip_utils.generate_zip(entries))
+        zip_file = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(zip_file.testzip())
+        return zip_file
+
+    def test_generate_zip(self):
+        zip_file = self.read_zip(
+            [
+                ("shot_01.mp4", [b"first ", b"movie"], 11),
+                ("séquence/shot_02.mp4", iter([b"x" * 100000]), 100000),
+                ("empty.txt", [], 0),
+            ]
+        )
+        self.assertEqual(
+            [info.filename for info in zip_file.infolist()],
+            ["shot_01.mp4", "séquence/shot_02.mp4", "empty.txt"],
+        )
+        self.assertEqual(zip_file.read("shot_01.mp4"), b"first movie")
+        self.assertEqual(
+            zip_file.read("séquence/shot_02.mp4"), b"x" * 100000
+        )
+        for info in zip_file.infolist():
+            self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+
+    def test_generate_zip64(self):
+        zip_file = self.read_zip(
+            [("unknown_size.csv", [b"a;b\n", b"1;2\n"], None)]
+        )
+        self.assertEqual(zip_file.read("unknown_size.csv"), b"a;b\n1;2\n")
+
+        zip_file = self.read_zip(
+            ("file_%s" % index, [b"ab"], 2) for index in range(70000)
+        )
+        self.assertEqual(len(zip_file.infolist()), 70000)
+        self.assertEqual(zip_file.read("file_69999"), b"ab")
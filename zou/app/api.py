@@ -1,7 +1,7 @@
 import os
 import sys
 
-from zou.app.utils import events, api as api_utils
+from zou.app.utils import cache, events, api as api_utils
 
 from flask import Blueprint
 
@@ -31,7 +31,10 @@ def configure(app):
     """
     app.url_map.strict_slashes = False
     configure_api_routes(app)
+    register_cache_invalidations(app)
+    register_event_listeners(app)
     register_event_handlers(app)
+    register_event_persistence(app)
     load_plugins(app)
     return app
 
@@ -61,6 +64,36 @@ def configure_api_routes(app):
     return app
 
 
+def register_cache_invalidations(app):
+    """
+    Link event names to the memoized functions they make outdated. That way,
+    cache entries are removed each time an event is emitted.
+    """
+    from zou.app.services import cache_service
+
+    cache.register_invalidations(cache_service.build_invalidation_map())
+    return app
+
+
+def register_event_listeners(app):
+    """
+    Register functions that keep derived data (like task statistics) in sync
+    with the events emitted by the API.
+    """
+    from zou.app.services import stats_service
+
+    events.register_listeners(stats_service.event_map)
+    return app
+
+
+def register_event_persistence(app):
+    """
+    Store events emitted during a request at once when the request ends.
+    """
+    app.teardown_request(events.flush_events)
+    return app
+
+
 def register_event_handlers(app):
     """
     Load code from event handlers folder. Then it registers in the event manager
@@ -20,6 +20,7 @@ from .resources import (
     ProjectAssetsResource,
     ProjectAssetTypeAssetsResource,
     ProjectAssetTypesResource,
+    ProjectAssetTypeStatsResource,
     ShotAssetTypesResource,
 )
 
@@ -57,6 +58,10 @@ routes = [
         NewAssetResource,
     ),
     ("/data/projects/<project_id>/asset-types", ProjectAssetTypesResource),
+    (
+        "/data/projects/<project_id>/asset-types/stats",
+        ProjectAssetTypeStatsResource,
+    ),
     ("/data/shots/<shot_id>/asset-types", ShotAssetTypesResource),
     ("/data/projects/<project_id>/assets", ProjectAssetsResource),
 ]
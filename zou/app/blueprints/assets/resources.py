@@ -1,13 +1,16 @@
+import itertools
+
 from flask import request
 from flask_restful import Resource, reqparse
 from flask_jwt_extended import jwt_required
 
-from zou.app.utils import query
+from zou.app.utils import query, streaming
 from zou.app.mixin import ArgsMixin
 from zou.app.services import (
     assets_service,
     shots_service,
     breakdown_service,
+    projects_service,
     tasks_service,
     user_service,
 )
@@ -71,14 +74,16 @@ class AssetsAndTasksResource(Resource):
         to an episode and assets linked to given episode.
         """
         criterions = query.get_query_criterions_from_request(request)
-        page = query.get_page_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
-        assets = assets_service.get_assets_and_tasks(criterions, page)
+        assets = assets_service.get_assets_and_tasks_iterator(criterions)
         if "episode_id" in criterions:
-            criterions["episode_id"] = None
-            assets += assets_service.get_assets_and_tasks(criterions, page)
+            criterions = dict(criterions, episode_id=None)
+            assets = itertools.chain(
+                assets,
+                assets_service.get_assets_and_tasks_iterator(criterions),
+            )
 
-        return assets
+        return streaming.build_json_list_response(assets)
 
 
 class AssetTypeResource(Resource):
@@ -111,6 +116,18 @@ class ProjectAssetTypesResource(Resource):
         return assets_service.get_asset_types_for_project(project_id)
 
 
+class ProjectAssetTypeStatsResource(Resource):
+    @jwt_required
+    def get(self, project_id):
+        """
+        Retrieve number of tasks by status, task_types and asset types
+        for given project.
+        """
+        projects_service.get_project(project_id)
+        user_service.check_project_access(project_id)
+        return assets_service.get_asset_type_stats_for_project(project_id)
+
+
 class ShotAssetTypesResource(Resource):
     @jwt_required
     def get(self, shot_id):
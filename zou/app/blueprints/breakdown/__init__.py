@@ -8,6 +8,7 @@ from .resources import (
     SceneAssetInstancesResource,
     SceneCameraInstancesResource,
     CastingResource,
+    ProjectCastingResource,
     AssetTypeCastingResource,
     SequenceCastingResource,
 )
@@ -18,6 +19,7 @@ routes = [
         "/data/projects/<project_id>/entities/<entity_id>/casting",
         CastingResource,
     ),
+    ("/data/projects/<project_id>/casting", ProjectCastingResource),
     (
         "/data/projects/<project_id>/asset-types/<asset_type_id>/casting",
         AssetTypeCastingResource,
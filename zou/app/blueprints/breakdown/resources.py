@@ -12,7 +12,7 @@ from zou.app.services import (
 )
 
 from zou.app.mixin import ArgsMixin
-from zou.app.utils import permissions
+from zou.app.utils import permissions, streaming
 
 
 class CastingResource(Resource):
@@ -34,6 +34,29 @@ class CastingResource(Resource):
         return breakdown_service.update_casting(entity_id, casting)
 
 
+class ProjectCastingResource(Resource):
+    @jwt_required
+    def get(self, project_id):
+        """
+        Resource to retrieve the casting of all shots of given project (or of
+        given episode) with a single request. With the stream parameter, the
+        casting is sent progressively as a list of shot castings.
+        """
+        user_service.check_project_access(project_id)
+        projects_service.get_project(project_id)
+        episode_id = request.args.get("episode_id", None)
+        if request.args.get("stream", "false") == "true":
+            return streaming.build_json_list_response(
+                breakdown_service.get_project_casting_iterator(
+                    project_id, episode_id=episode_id
+                )
+            )
+        else:
+            return breakdown_service.get_project_casting(
+                project_id, episode_id=episode_id
+            )
+
+
 class SequenceCastingResource(Resource):
     @jwt_required
     def get(self, project_id, sequence_id):
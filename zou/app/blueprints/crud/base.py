@@ -8,8 +8,11 @@ from flask_jwt_extended import jwt_required
 
 from sqlalchemy.exc import IntegrityError, StatementError
 
-from zou.app.utils import permissions, events
-from zou.app.services.exception import ArgumentsException
+from zou.app.utils import permissions, events, query as query_utils
+from zou.app.services.exception import (
+    ArgumentsException,
+    WrongParameterException,
+)
 
 
 class BaseModelsResource(Resource):
@@ -54,6 +57,26 @@ class BaseModelsResource(Resource):
             }
         return result
 
+    def cursor_paginated_entries(self, query, cursor, relations=False):
+        """
+        Return entries following given cursor (keyset pagination). It's the
+        way to go to walk through big tables like events or notifications.
+        """
+        try:
+            limit = int(
+                request.args.get(
+                    "limit", current_app.config["NB_RECORDS_PER_PAGE"]
+                )
+            )
+        except ValueError:
+            raise WrongParameterException("Limit must be an integer.")
+        if limit < 1:
+            raise WrongParameterException("Limit must be positive.")
+        limit = min(limit, current_app.config["MAX_RECORDS_PER_PAGE"])
+        return query_utils.get_cursor_paginated_results(
+            query, cursor, limit=limit, relations=relations
+        )
+
     def build_filters(self, options):
         many_join_filter = []
         in_filter = []
@@ -62,7 +85,8 @@ class BaseModelsResource(Resource):
 
         column_names = [column.name for column in self.model.__table__.columns]
         for key, value in options.items():
-            if key not in ["page", "relations"] and key in column_names:
+            is_option = key in ["page", "relations", "cursor", "limit"]
+            if not is_option and key in column_names:
                 field_key = getattr(self.model, key)
                 expr = field_key.property
 
@@ -139,9 +163,14 @@ class BaseModelsResource(Resource):
                 query = self.apply_filters(options)
                 page = int(options.get("page", "-1"))
                 relations = options.get("relations", "false") == "true"
+                cursor = options.get("cursor", None)
                 is_paginated = page > -1
 
-                if is_paginated:
+                if cursor is not None:
+                    return self.cursor_paginated_entries(
+                        query, cursor, relations=relations
+                    )
+                elif is_paginated:
                     return self.paginated_entries(
                         query, page, relations=relations
                     )
@@ -198,6 +227,7 @@ class BaseModelsResource(Resource):
         return events.emit(
             "%s:new" % self.model.__tablename__.replace("_", "-"),
             {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+            project_id=instance_dict.get("project_id", None),
         )
 
 
@@ -330,10 +360,12 @@ class BaseModelResource(Resource):
         return events.emit(
             "%s:update" % self.model.__tablename__.replace("_", "-"),
             {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+            project_id=instance_dict.get("project_id", None),
         )
 
     def emit_delete_event(self, instance_dict):
         return events.emit(
             "%s:delete" % self.model.__tablename__.replace("_", "-"),
             {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+            project_id=instance_dict.get("project_id", None),
         )
@@ -7,7 +7,12 @@ from sqlalchemy.exc import IntegrityError, StatementError
 
 from zou.app.models.entity import Entity, EntityVersion
 from zou.app.models.subscription import Subscription
-from zou.app.services import assets_service, shots_service, user_service
+from zou.app.services import (
+    assets_service,
+    entities_service,
+    shots_service,
+    user_service,
+)
 from zou.app.utils import events
 
 from werkzeug.exceptions import NotFound
@@ -26,7 +31,7 @@ class EntityEventMixin(object):
             type_name = "episode"
         return type_name
 
-    def emit_event(self, event_name, entity_dict):
+    def emit_event(self, event_name, entity_dict, extra_data={}):
         instance_id = entity_dict["id"]
         type_name = self.get_type_name(entity_dict)
         if event_name in ["update", "delete"]:
@@ -34,12 +39,12 @@ class EntityEventMixin(object):
                 shots_service.clear_shot_cache(instance_id)
             if type_name == "asset":
                 assets_service.clear_asset_cache(instance_id)
+        data = {"%s_id" % type_name: instance_id}
+        data.update(extra_data)
         events.emit(
             "%s:%s" % (type_name, event_name),
-            {
-                "%s_id" % type_name: instance_id,
-                "project_id": entity_dict["project_id"],
-            },
+            data,
+            project_id=entity_dict["project_id"],
         )
 
 
@@ -108,7 +113,15 @@ class EntityResource(BaseModelResource, EntityEventMixin):
 
             if shots_service.is_shot(entity_dict):
                 self.save_version_if_needed(entity_dict, previous_version)
-            self.emit_update_event(entity_dict)
+            self.emit_event(
+                "update",
+                entity_dict,
+                entities_service.get_move_data(
+                    entity,
+                    previous_version["parent_id"],
+                    previous_version["entity_type_id"],
+                ),
+            )
             return entity_dict, 200
 
         except StatementError as exception:
@@ -1,6 +1,7 @@
 from flask_jwt_extended import jwt_required
 from flask_restful import reqparse
 
+from zou.app import config
 from zou.app.models.project import Project
 from zou.app.models.project_status import ProjectStatus
 from zou.app.services import (
@@ -9,6 +10,7 @@ from zou.app.services import (
     shots_service,
     user_service,
 )
+from zou.app.stores import queue_store
 from zou.app.utils import permissions, fields
 
 from .base import BaseModelResource, BaseModelsResource
@@ -87,6 +89,13 @@ class ProjectResource(BaseModelResource):
         else:
             if args["force"] == True:
                 self.check_delete_permissions(project_dict)
+                if config.ENABLE_JOB_QUEUE:
+                    queue_store.job_queue.enqueue(
+                        deletion_service.remove_project_job,
+                        args=(instance_id,),
+                        job_timeout=7200,
+                    )
+                    return {"job": "running"}, 202
                 deletion_service.remove_project(instance_id)
             else:
                 project.delete()
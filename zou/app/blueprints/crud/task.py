@@ -37,6 +37,11 @@ class TasksResource(BaseModelsResource):
             if assignees is not None:
                 instance.assignees = persons
             instance.save()
+            events.emit(
+                "task:new",
+                {"task_id": instance.id},
+                project_id=instance.project_id,
+            )
 
             return instance.serialize(relations=True), 201
 
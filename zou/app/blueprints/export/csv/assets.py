@@ -20,21 +20,24 @@ class AssetsCsvExport(Resource):
         project = projects_service.get_project(project_id)
         self.check_permissions(project["id"])
 
-        csv_content = []
         results = self.get_assets_data(project_id)
         metadata_infos = self.get_metadata_infos(project_id)
         validation_columns = self.get_validation_columns(results)
-        headers = self.build_headers(metadata_infos, validation_columns)
-        csv_content.append(headers)
+        file_name = "%s assets" % project["name"]
+        return csv_utils.build_csv_stream_response(
+            self.generate_rows(
+                project, results, metadata_infos, validation_columns
+            ),
+            slugify(file_name),
+        )
 
+    def generate_rows(
+        self, project, results, metadata_infos, validation_columns
+    ):
+        yield self.build_headers(metadata_infos, validation_columns)
         for result in results:
             result["project_name"] = project["name"]
-            csv_content.append(
-                self.build_row(result, metadata_infos, validation_columns)
-            )
-
-        file_name = "%s assets" % project["name"]
-        return csv_utils.build_csv_response(csv_content, slugify(file_name))
+            yield self.build_row(result, metadata_infos, validation_columns)
 
     def check_permissions(self, project_id):
         user_service.check_project_access(project_id)
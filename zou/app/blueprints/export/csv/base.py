@@ -6,6 +6,14 @@ from zou.app.utils import csv_utils, permissions
 
 
 class BaseCsvExport(BaseModelResource):
+    """
+    Export the results of a query as a CSV file. Results are read with a
+    server side cursor, by batches, and rows are sent to the client while
+    they are built. So memory usage does not depend on the export size.
+    """
+
+    batch_size = 1000
+
     def __init__(self, model):
         BaseModelResource.__init__(self, model)
         self.file_name = "export"
@@ -17,14 +25,14 @@ class BaseCsvExport(BaseModelResource):
     def get(self):
         try:
             self.check_permissions()
-            csv_content = []
-            csv_content.append(self.build_headers())
-            results = self.build_query().all()
-            for result in results:
-                csv_content.append(self.build_row(result))
         except permissions.PermissionDenied:
             abort(403)
 
-        return csv_utils.build_csv_response(
-            csv_content, file_name=self.file_name
+        return csv_utils.build_csv_stream_response(
+            self.generate_rows(), file_name=self.file_name
         )
+
+    def generate_rows(self):
+        yield self.build_headers()
+        for result in self.build_query().yield_per(self.batch_size):
+            yield self.build_row(result)
@@ -16,15 +16,15 @@ class CastingCsvExport(Resource):
         project = projects_service.get_project(project_id)  # Check existence
         self.check_permissions(project_id)
 
-        results = self.build_results(project_id)
-        headers = self.build_headers()
-
-        csv_content = [headers]
-        for result in results:
-            csv_content.append(self.build_row(result))
-
         file_name = "%s casting" % project["name"]
-        return csv_utils.build_csv_response(csv_content, slugify(file_name))
+        return csv_utils.build_csv_stream_response(
+            self.generate_rows(project_id), slugify(file_name)
+        )
+
+    def generate_rows(self, project_id):
+        yield self.build_headers()
+        for result in self.build_results(project_id):
+            yield self.build_row(result)
 
     def check_permissions(self, project_id):
         user_service.check_project_access(project_id)
@@ -63,8 +63,6 @@ class CastingCsvExport(Resource):
         return row
 
     def build_results(self, project_id):
-        results = []
-
         Target = aliased(Entity, name="target")
         Asset = aliased(Entity, name="asset")
         Parent = aliased(Entity, name="parent")
@@ -103,17 +101,14 @@ class CastingCsvExport(Resource):
             target_name,
             asset_type_name,
             asset_name,
-        ) in query.all():
-            results.append(
-                (
-                    episode_name,
-                    target_parent_name,
-                    target_entity_type_name,
-                    target_name,
-                    asset_type_name,
-                    asset_name,
-                    entity_link.nb_occurences,
-                    entity_link.label,
-                )
+        ) in query.yield_per(1000):
+            yield (
+                episode_name,
+                target_parent_name,
+                target_entity_type_name,
+                target_name,
+                asset_type_name,
+                asset_name,
+                entity_link.nb_occurences,
+                entity_link.label,
             )
-        return results
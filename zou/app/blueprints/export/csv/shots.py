@@ -22,21 +22,24 @@ class ShotsCsvExport(Resource):
         self.task_status_map = tasks_service.get_task_status_map()
         self.task_type_map = tasks_service.get_task_type_map()
 
-        csv_content = []
         results = self.get_shots_data(project_id)
         metadata_infos = self.get_metadata_infos(project_id)
         validation_columns = self.get_validation_columns(results)
-        headers = self.build_headers(metadata_infos, validation_columns)
-        csv_content.append(headers)
+        file_name = "%s shots" % project["name"]
+        return csv_utils.build_csv_stream_response(
+            self.generate_rows(
+                project, results, metadata_infos, validation_columns
+            ),
+            slugify(file_name),
+        )
 
+    def generate_rows(
+        self, project, results, metadata_infos, validation_columns
+    ):
+        yield self.build_headers(metadata_infos, validation_columns)
         for result in results:
             result["project_name"] = project["name"]
-            csv_content.append(
-                self.build_row(result, metadata_infos, validation_columns)
-            )
-
-        file_name = "%s shots" % project["name"]
-        return csv_utils.build_csv_response(csv_content, slugify(file_name))
+            yield self.build_row(result, metadata_infos, validation_columns)
 
     def check_permissions(self, project_id):
         user_service.check_project_access(project_id)
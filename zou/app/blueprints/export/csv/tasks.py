@@ -1,8 +1,11 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
 from zou.app.blueprints.export.csv.base import BaseCsvExport
 
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.task_type import TaskType
-from zou.app.models.task import Task
+from zou.app.models.task import Task, assignees_table
 from zou.app.models.person import Person
 from zou.app.models.project import Project
 from zou.app.models.department import Department
@@ -33,7 +36,28 @@ class TasksCsvExport(BaseCsvExport):
             "Task Status",
         ]
 
+    def build_assignees_query(self):
+        """
+        Build a subquery that returns the names of task assignees as a single
+        string per task, to avoid loading assignees task by task.
+        """
+        full_name = func.concat(Person.first_name, " ", Person.last_name)
+        return (
+            Person.query.join(
+                assignees_table, assignees_table.c.person == Person.id
+            )
+            .with_entities(
+                assignees_table.c.task.label("task_id"),
+                func.string_agg(
+                    full_name, aggregate_order_by(", ", full_name)
+                ).label("names"),
+            )
+            .group_by(assignees_table.c.task)
+            .subquery()
+        )
+
     def build_query(self):
+        assignees = self.build_assignees_query()
         query = self.model.query.order_by(
             Project.name, TaskType.name, Task.name
         )
@@ -43,7 +67,8 @@ class TasksCsvExport(BaseCsvExport):
         query = query.join(TaskStatus)
         query = query.join(Entity, Task.entity_id == Entity.id)
         query = query.join(EntityType)
-        query = query.join(Person)
+        query = query.join(Person, Task.assigner_id == Person.id)
+        query = query.outerjoin(assignees, assignees.c.task_id == Task.id)
         query = query.add_columns(Project.name)
         query = query.add_columns(Department.name)
         query = query.add_columns(TaskType.name)
@@ -52,6 +77,7 @@ class TasksCsvExport(BaseCsvExport):
         query = query.add_columns(Entity.name)
         query = query.add_columns(Person.first_name)
         query = query.add_columns(Person.last_name)
+        query = query.add_columns(assignees.c.names)
         query = query.order_by(
             Project.name,
             Department.name,
@@ -73,8 +99,9 @@ class TasksCsvExport(BaseCsvExport):
             entity_name,
             assigner_first_name,
             assigner_last_name,
+            assignee_names,
         ) = task_data
-        persons = task.assignees_as_string()
+        persons = assignee_names or ""
 
         start_date = ""
         if task.start_date is not None:
@@ -6,6 +6,7 @@ from flask import Blueprint
 from zou.app.utils.api import configure_api_from_blueprint
 
 from .resources import (
+    CacheStatsResource,
     IndexResource,
     InfluxStatusResource,
     StatusResource,
@@ -17,6 +18,7 @@ routes = [
     ("/status", StatusResource),
     ("/status/influx", InfluxStatusResource),
     ("/status.txt", TxtStatusResource),
+    ("/status/cache", CacheStatsResource),
 ]
 
 blueprint = Blueprint("index", "index")
@@ -5,10 +5,12 @@ from datetime import datetime
 
 from flask import Response
 from flask_restful import Resource
+from flask_jwt_extended import jwt_required
 from zou import __version__
 
 from zou.app import app, config
 from zou.app.services import projects_service
+from zou.app.utils import cache, permissions
 
 
 class IndexResource(Resource):
@@ -95,3 +97,18 @@ class InfluxStatusResource(BaseStatusResource):
             "event-stream-up": int(is_es_up),
             "time": datetime.timestamp(datetime.now()),
         }
+
+
+class CacheStatsResource(Resource):
+    """
+    Return hit and miss counters of memoized functions for the worker that
+    handles the request.
+    """
+
+    @jwt_required
+    def get(self):
+        permissions.check_admin_permissions()
+        return {
+            "local-cache-enabled": cache.local_cache is not None,
+            "functions": cache.get_stats(),
+        }
@@ -4,6 +4,7 @@ from flask import abort
 from flask_restful import Resource, reqparse
 from flask_jwt_extended import jwt_required
 
+from zou.app.mixin import ArgsMixin
 from zou.app.services import persons_service, time_spents_service
 from zou.app.utils import auth, permissions, csv_utils
 from zou.app.services.exception import WrongDateFormatException
@@ -178,60 +179,69 @@ class PersonDayTimeSpentsResource(Resource):
             abort(404)
 
 
-class TimeSpentYearResource(Resource):
+class TimeSpentTableResource(Resource, ArgsMixin):
     """
-    Return a table giving time spent by user and by month for given year.
+    Base resource for time spent tables. Durations can be split by project
+    or department through the breakdown parameter.
     """
 
     @jwt_required
-    def get(self):
+    def get(self, **kwargs):
         permissions.check_admin_permissions()
-        return time_spents_service.get_year_table()
+        args = self.get_args([("breakdown", None, False)])
+        try:
+            return self.get_table(breakdown=args["breakdown"], **kwargs)
+        except WrongDateFormatException:
+            abort(404)
+
+    def get_table(self, breakdown=None, **kwargs):
+        pass
+
+
+class TimeSpentYearResource(TimeSpentTableResource):
+    """
+    Return a table giving time spent by user and by year.
+    """
+
+    def get_table(self, breakdown=None):
+        return time_spents_service.get_year_table(breakdown)
 
 
-class TimeSpentMonthResource(Resource):
+class TimeSpentMonthResource(TimeSpentTableResource):
     """
     Return a table giving time spent by user and by day for given year and
     month.
     """
 
-    @jwt_required
-    def get(self, year, month):
-        permissions.check_admin_permissions()
-        return time_spents_service.get_day_table(year, month)
+    def get_table(self, year, month, breakdown=None):
+        return time_spents_service.get_day_table(year, month, breakdown)
 
 
-class TimeSpentYearsResource(Resource):
+class TimeSpentYearsResource(TimeSpentTableResource):
     """
-    Return a table giving time spent by user and by month for given year.
+    Return a table giving time spent by user and by year.
     """
 
-    @jwt_required
-    def get(self):
-        permissions.check_admin_permissions()
-        return time_spents_service.get_year_table()
+    def get_table(self, breakdown=None):
+        return time_spents_service.get_year_table(breakdown)
 
 
-class TimeSpentMonthsResource(Resource):
+class TimeSpentMonthsResource(TimeSpentTableResource):
     """
     Return a table giving time spent by user and by month for given year.
     """
 
-    @jwt_required
-    def get(self, year):
-        permissions.check_admin_permissions()
-        return time_spents_service.get_month_table(year)
+    def get_table(self, year, breakdown=None):
+        return time_spents_service.get_month_table(year, breakdown)
 
 
-class TimeSpentWeekResource(Resource):
+class TimeSpentWeekResource(TimeSpentTableResource):
     """
     Return a table giving time spent by user and by week for given year.
     """
 
-    @jwt_required
-    def get(self, year):
-        permissions.check_admin_permissions()
-        return time_spents_service.get_week_table(year)
+    def get_table(self, year, breakdown=None):
+        return time_spents_service.get_week_table(year, breakdown)
 
 
 class InvitePersonResource(Resource):
@@ -17,7 +17,7 @@ from zou.app.services import (
     user_service,
 )
 from zou.app.stores import file_store, queue_store
-from zou.app.utils import fs
+from zou.app.utils import fs, streaming
 
 
 class ProjectPlaylistsResource(Resource):
@@ -127,7 +127,6 @@ class PlaylistZipDownloadResource(Resource):
         playlist = playlists_service.get_playlist(playlist_id)
         project = projects_service.get_project(playlist["project_id"])
         user_service.check_playlist_access(playlist)
-        zip_file_path = playlists_service.build_playlist_zip_file(playlist)
 
         context_name = slugify.slugify(project["name"], separator="_")
         if project["production_type"] == "tvshow":
@@ -140,12 +139,9 @@ class PlaylistZipDownloadResource(Resource):
             slugify.slugify(playlist["name"], separator="_"),
         )
 
-        return flask_send_file(
-            zip_file_path,
-            conditional=True,
-            mimetype="application/zip",
-            as_attachment=True,
-            attachment_filename=attachment_filename,
+        return streaming.build_zip_response(
+            playlists_service.get_playlist_zip_entries(playlist),
+            attachment_filename,
         )
 
 
@@ -188,4 +184,6 @@ class ProjectAllPlaylistsResource(Resource, ArgsMixin):
         permissions.check_admin_permissions()
         projects_service.get_project(project_id)
         page = self.get_page()
-        return playlists_service.get_playlists_for_project(project_id, page)
+        return playlists_service.get_playlists_for_project(
+            project_id, page, cursor=self.get_cursor(), limit=self.get_limit()
+        )
@@ -18,6 +18,7 @@ from .resources import (
     CreatePersonThumbnailResource,
     PersonThumbnailResource,
     SetMainPreviewResource,
+    PreviewFileNamesResource,
 )
 
 routes = [
@@ -79,6 +80,7 @@ routes = [
         "/actions/entities/<entity_id>/set-main-preview/<preview_file_id>",
         SetMainPreviewResource,
     ),
+    ("/actions/preview-files/names", PreviewFileNamesResource),
 ]
 blueprint = Blueprint("thumbnails", "thumbnails")
 api = configure_api_from_blueprint(blueprint, routes)
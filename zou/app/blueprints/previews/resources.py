@@ -7,6 +7,7 @@ from flask_jwt_extended import jwt_required
 from flask_fs.errors import FileNotFound
 
 from zou.app import config
+from zou.app.mixin import ArgsMixin
 from zou.app.stores import file_store
 from zou.app.services import (
     deletion_service,
@@ -14,8 +15,8 @@ from zou.app.services import (
     files_service,
     names_service,
     persons_service,
+    preview_files_service,
     projects_service,
-    shots_service,
     tasks_service,
     user_service,
 )
@@ -24,6 +25,7 @@ from zou.app.utils import (
     events,
     movie_utils,
     permissions,
+    streaming,
     thumbnail as thumbnail_utils,
 )
 
@@ -76,6 +78,7 @@ def send_standard_file(
     return send_storage_file(
         file_store.get_local_file_path,
         file_store.open_file,
+        file_store.get_file_size,
         "previews",
         preview_file_id,
         extension,
@@ -88,6 +91,7 @@ def send_movie_file(preview_file_id, as_attachment=False):
     return send_storage_file(
         file_store.get_local_movie_path,
         file_store.open_movie,
+        file_store.get_movie_file_size,
         "previews",
         preview_file_id,
         "mp4",
@@ -96,14 +100,17 @@ def send_movie_file(preview_file_id, as_attachment=False):
     )
 
 
-def send_picture_file(prefix, preview_file_id, as_attachment=False):
+def send_picture_file(
+    prefix, preview_file_id, as_attachment=False, extension="png"
+):
     return send_storage_file(
         file_store.get_local_picture_path,
         file_store.open_picture,
+        file_store.get_picture_file_size,
         prefix,
         preview_file_id,
-        "png",
-        mimetype="image/png",
+        extension,
+        mimetype=thumbnail_utils.get_mimetype(extension),
         as_attachment=as_attachment,
     )
 
@@ -111,6 +118,7 @@ def send_picture_file(prefix, preview_file_id, as_attachment=False):
 def send_storage_file(
     get_local_path,
     open_file,
+    get_file_size,
     prefix,
     preview_file_id,
     extension,
@@ -120,7 +128,34 @@ def send_storage_file(
     """
     Send file from storage. If it's not a local storage, cache the file in
     a temporary folder before sending it. It accepts conditional headers.
+    When a range of a file that is not cached is asked (it's what video
+    players do), only that range is read from the storage and sent.
     """
+    if (
+        config.FS_BACKEND != "local"
+        and request.range is not None
+        and not as_attachment
+        and not fs.is_cached(config, prefix, preview_file_id, extension)
+    ):
+        try:
+            return streaming.build_range_response(
+                lambda start, end: open_file(
+                    prefix, preview_file_id, start, end
+                ),
+                get_file_size(prefix, preview_file_id),
+                mimetype,
+            )
+        except Exception as e:
+            current_app.logger.error(e)
+            return (
+                {
+                    "error": True,
+                    "message": "File not found for: %s %s"
+                    % (prefix, preview_file_id),
+                },
+                404,
+            )
+
     file_path = fs.get_file_path(
         config, get_local_path, open_file, prefix, preview_file_id, extension
     )
@@ -185,24 +220,19 @@ class CreatePreviewFilePictureResource(Resource):
             self.save_picture_preview(instance_id, uploaded_file)
             preview_file = files_service.update_preview_file(
                 instance_id,
-                {"extension": "png", "original_name": original_file_name},
+                {
+                    "extension": "png",
+                    "original_name": original_file_name,
+                    "thumbnail_format": config.THUMBNAIL_FORMAT,
+                },
             )
             self.emit_app_preview_event(instance_id)
             return preview_file, 201
 
         elif extension in ALLOWED_MOVIE_EXTENSION:
-            try:
-                self.save_movie_preview(instance_id, uploaded_file)
-            except Exception as e:
-                current_app.logger.error(e, exc_info=1)
-                current_app.logger.error("Normalization failed.")
-                deletion_service.remove_preview_file_by_id(instance_id)
-                abort(400, "Normalization failed.")
-            preview_file = files_service.update_preview_file(
-                instance_id,
-                {"extension": "mp4", "original_name": original_file_name},
+            preview_file = self.save_movie_preview(
+                instance_id, uploaded_file, original_file_name
             )
-            self.emit_app_preview_event(instance_id)
             return preview_file, 201
 
         elif extension in ALLOWED_FILE_EXTENSION:
@@ -235,31 +265,20 @@ class CreatePreviewFilePictureResource(Resource):
         )
         return self.save_variants(original_tmp_path, instance_id)
 
-    def save_movie_preview(self, instance_id, uploaded_file):
+    def save_movie_preview(self, instance_id, uploaded_file, original_name):
         """
-        Get uploaded movie, normalize it then build thumbnails then save
-        everything in the file storage.
+        Get uploaded movie and store it as it is. Normalization and thumbnails
+        are done by a background worker, the preview file status tells when
+        they are ready.
         """
         tmp_folder = current_app.config["TMP_DIR"]
         uploaded_movie_path = movie_utils.save_file(
             tmp_folder, instance_id, uploaded_file
         )
-
-        project = files_service.get_project_from_preview_file(instance_id)
-        fps = shots_service.get_preview_fps(project)
-        (width, height) = shots_service.get_preview_dimensions(project)
-        normalized_movie_path = movie_utils.normalize_movie(
-            uploaded_movie_path, fps=fps, width=width, height=height
-        )
-        file_store.add_movie("previews", instance_id, normalized_movie_path)
-        original_tmp_path = movie_utils.generate_thumbnail(
-            normalized_movie_path
+        return preview_files_service.start_movie_processing(
+            instance_id, uploaded_movie_path, original_name
         )
 
-        os.remove(uploaded_movie_path)
-        os.remove(normalized_movie_path)
-        return self.save_variants(original_tmp_path, instance_id)
-
     def save_file_preview(self, instance_id, uploaded_file, extension):
         """
         Get uploaded file then save it in the file storage.
@@ -276,40 +295,15 @@ class CreatePreviewFilePictureResource(Resource):
         """
         Build variants of a picture file and save them in the main storage.
         """
-        variants = thumbnail_utils.generate_preview_variants(
+        return preview_files_service.save_variants(
             original_tmp_path, instance_id
         )
-        variants.append(("original", original_tmp_path))
-        for (name, path) in variants:
-            file_store.add_picture(name, instance_id, path)
-            os.remove(path)
-
-        return variants
 
     def emit_app_preview_event(self, preview_file_id):
         """
         Emit an event, each time a preview is added.
         """
-        preview_file = files_service.get_preview_file(preview_file_id)
-        comment = tasks_service.get_comment_by_preview_file_id(preview_file_id)
-        comment_id = None
-        events.emit(
-            "preview-file:update", {"preview_file_id": preview_file["id"]}
-        )
-
-        if comment is not None:
-            comment_id = comment["id"]
-            events.emit("comment:update", {"comment_id": comment_id})
-            events.emit(
-                "preview-file:add-file",
-                {
-                    "comment_id": comment_id,
-                    "task_id": preview_file["task_id"],
-                    "preview_file_id": preview_file["id"],
-                    "revision": preview_file["revision"],
-                    "extension": preview_file["extension"],
-                },
-            )
+        preview_files_service.emit_app_preview_event(preview_file_id)
 
     def is_allowed(self, preview_file_id):
         """
@@ -467,9 +461,10 @@ class BasePreviewPictureResource(Resource):
     Base class to download a thumbnail.
     """
 
-    def __init__(self, picture_type):
+    def __init__(self, picture_type, use_thumbnail_format=False):
         Resource.__init__(self)
         self.picture_type = picture_type
+        self.use_thumbnail_format = use_thumbnail_format
 
     def is_exist(self, preview_file_id):
         return files_service.get_preview_file(preview_file_id) is not None
@@ -486,6 +481,17 @@ class BasePreviewPictureResource(Resource):
             except permissions.PermissionDenied:
                 return False
 
+    def get_extension(self, preview_file_id):
+        """
+        Thumbnails are stored in the format set when they were generated.
+        Older ones have no format set, they are png files.
+        """
+        if self.use_thumbnail_format:
+            preview_file = files_service.get_preview_file(preview_file_id)
+            return preview_file.get("thumbnail_format") or "png"
+        else:
+            return "png"
+
     @jwt_required
     def get(self, instance_id):
         if not self.is_exist(instance_id):
@@ -495,7 +501,11 @@ class BasePreviewPictureResource(Resource):
             abort(403)
 
         try:
-            return send_picture_file(self.picture_type, instance_id)
+            return send_picture_file(
+                self.picture_type,
+                instance_id,
+                extension=self.get_extension(instance_id),
+            )
         except FileNotFound:
             current_app.logger.error("File was not found for: %s" % instance_id)
             abort(404)
@@ -503,7 +513,9 @@ class BasePreviewPictureResource(Resource):
 
 class PreviewFileThumbnailResource(BasePreviewPictureResource):
     def __init__(self):
-        BasePreviewPictureResource.__init__(self, "thumbnails")
+        BasePreviewPictureResource.__init__(
+            self, "thumbnails", use_thumbnail_format=True
+        )
 
 
 class PreviewFilePreviewResource(BasePreviewPictureResource):
@@ -517,7 +529,9 @@ class PreviewFilePreviewResource(BasePreviewPictureResource):
 
 class PreviewFileThumbnailSquareResource(BasePreviewPictureResource):
     def __init__(self):
-        BasePreviewPictureResource.__init__(self, "thumbnails-square")
+        BasePreviewPictureResource.__init__(
+            self, "thumbnails-square", use_thumbnail_format=True
+        )
 
 
 class PreviewFileOriginalResource(BasePreviewPictureResource):
@@ -544,8 +558,8 @@ class BaseCreatePictureResource(Resource):
     def clear_cache_file(self, preview_file_id):
         if config.FS_BACKEND != "local":
             file_path = os.path.join(
-                config.TMP_DIR,
-                "cache-%s-%s.%s" % ("thumbnails", preview_file_id, "png"),
+                config.FS_CACHE_FOLDER,
+                fs.get_cache_file_name("thumbnails", preview_file_id, "png"),
             )
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -710,3 +724,20 @@ class SetMainPreviewResource(Resource):
         return entities_service.update_entity_preview(
             entity_id, preview_file_id
         )
+
+
+class PreviewFileNamesResource(Resource, ArgsMixin):
+    @jwt_required
+    def post(self):
+        """
+        Return download file names of given preview files. Result is a dict
+        where keys are preview file ids and values are file names.
+        """
+        args = self.get_args([("preview_file_ids", [], True, "append")])
+        preview_file_ids = args["preview_file_ids"]
+        project_ids = files_service.get_project_ids_for_preview_files(
+            preview_file_ids
+        )
+        for project_id in project_ids:
+            user_service.check_project_access(project_id)
+        return names_service.get_preview_file_names(preview_file_ids)
@@ -154,7 +154,7 @@ class ProductionMetadataDescriptorResource(Resource, ArgsMixin):
         return "", 204
 
 
-class ProductionTimeSpentsResource(Resource):
+class ProductionTimeSpentsResource(Resource, ArgsMixin):
     """
     Resource to retrieve time spents for given production.
     """
@@ -162,7 +162,9 @@ class ProductionTimeSpentsResource(Resource):
     @jwt_required
     def get(self, project_id):
         user_service.check_project_access(project_id)
-        return tasks_service.get_time_spents_for_project(project_id)
+        return tasks_service.get_time_spents_for_project(
+            project_id, cursor=self.get_cursor(), limit=self.get_limit()
+        )
 
 
 class ProductionMilestonesResource(Resource):
@@ -14,7 +14,7 @@ from zou.app.services import (
 )
 
 from zou.app.mixin import ArgsMixin
-from zou.app.utils import query
+from zou.app.utils import query, streaming
 
 from zou.app.services.exception import ModelWithRelationsDeletionException
 
@@ -186,7 +186,9 @@ class ShotsAndTasksResource(Resource):
         """
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
-        return shots_service.get_shots_and_tasks(criterions)
+        return streaming.build_json_list_response(
+            shots_service.get_shots_and_tasks_iterator(criterions)
+        )
 
 
 class SceneAndTasksResource(Resource):
@@ -329,6 +331,18 @@ class ProjectEpisodeStatsResource(Resource):
         return shots_service.get_episode_stats_for_project(project_id)
 
 
+class ProjectSequenceStatsResource(Resource):
+    @jwt_required
+    def get(self, project_id):
+        """
+        Retrieve number of tasks by status, task_types and sequences
+        for given project.
+        """
+        projects_service.get_project(project_id)
+        user_service.check_project_access(project_id)
+        return shots_service.get_sequence_stats_for_project(project_id)
+
+
 class EpisodeResource(Resource, ArgsMixin):
     @jwt_required
     def get(self, episode_id):
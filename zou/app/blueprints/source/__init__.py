@@ -62,6 +62,7 @@ from .shotgun.team import (
     ImportRemoveShotgunProjectConnectionResource,
 )
 
+from .csv.base import CsvImportJobResource
 from .csv.persons import PersonsCsvImportResource
 from .csv.assets import AssetsCsvImportResource
 from .csv.shots import ShotsCsvImportResource
@@ -106,6 +107,7 @@ routes = [
     ("/import/csv/projects/<project_id>/assets", AssetsCsvImportResource),
     ("/import/csv/projects/<project_id>/shots", ShotsCsvImportResource),
     ("/import/csv/projects/<project_id>/casting", CastingCsvImportResource),
+    ("/import/csv/jobs/<job_id>", CsvImportJobResource),
 ]
 
 blueprint = Blueprint("/import", "import")
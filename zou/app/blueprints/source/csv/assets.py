@@ -2,53 +2,67 @@ from zou.app.blueprints.source.csv.base import BaseCsvProjectImportResource
 
 from zou.app.services import assets_service
 from zou.app.models.entity import Entity
-
-from sqlalchemy.exc import IntegrityError
+from zou.app.utils import fields
 
 
 class AssetsCsvImportResource(BaseCsvProjectImportResource):
+    required_columns = ["Type", "Name"]
+
     def prepare_import(self, project_id):
-        self.entity_types = {}
         self.descriptor_fields = self.get_descriptor_field_map(
             project_id, "Asset"
         )
 
-    def import_row(self, row, project_id):
-        asset_name = row["Name"]
-        entity_type_name = row["Type"]
-        description = row["Description"]
+    def validate_row(self, row):
+        self.check_not_empty(row, "Type")
+        self.check_not_empty(row, "Name")
 
-        self.add_to_cache_if_absent(
-            self.entity_types,
-            assets_service.get_or_create_asset_type,
-            entity_type_name,
-        )
-        entity_type_id = self.get_id_from_cache(
-            self.entity_types, entity_type_name
-        )
+    def import_rows(self, rows, project_id):
+        entity_types = {}
+        for entity_type_name in set(row["Type"] for row in rows):
+            entity_types[
+                entity_type_name
+            ] = assets_service.get_or_create_asset_type(entity_type_name)[
+                "id"
+            ]
+
+        assets = {}
+        for asset in Entity.query.filter_by(project_id=project_id).filter(
+            Entity.entity_type_id.in_(entity_types.values())
+        ):
+            assets[(str(asset.entity_type_id), asset.name)] = asset
+
+        asset_ids = []
+        for row in rows:
+            entity_type_id = entity_types[row["Type"]]
+            asset_name = row["Name"]
+            description = row.get("Description") or ""
+            data = {}
+            for name, field_name in self.descriptor_fields.items():
+                if name in row:
+                    data[field_name] = row[name]
 
-        data = {}
-        for name, field_name in self.descriptor_fields.items():
-            if name in row:
-                data[field_name] = row[name]
-
-        try:
-            entity = Entity.get_by(
-                name=asset_name,
-                project_id=project_id,
-                entity_type_id=entity_type_id,
-            )
-            if entity is None:
-                entity = Entity.create(
+            key = (entity_type_id, asset_name)
+            asset = assets.get(key, None)
+            if asset is None:
+                asset = Entity.create_no_commit(
+                    id=fields.gen_uuid(),
                     name=asset_name,
                     description=description,
                     project_id=project_id,
                     entity_type_id=entity_type_id,
                     data=data,
                 )
+                assets[key] = asset
             else:
-                entity.update({"description": description, "data": data})
-        except IntegrityError:
-            pass
+                asset.description = description
+                asset.data = data
+            if asset.id not in asset_ids:
+                asset_ids.append(asset.id)
+        return asset_ids
 
-        return entity.serialize()
+    def serialize_result(self, asset_ids):
+        return [
+            asset.serialize()
+            for asset in Entity.query.filter(Entity.id.in_(asset_ids))
+        ]
@@ -1,114 +1,186 @@
+import importlib
 import uuid
 import os
-import csv
 
-from flask import request, current_app
+from flask import abort, request, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
-
-from zou.app import app
-from zou.app.utils import permissions
-from zou.app.services import user_service, projects_service
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+from zou.app import app, config
+from zou.app.models.base import BaseMixin
+from zou.app.stores import file_store, queue_store
+from zou.app.utils import csv_utils, fs, permissions
+from zou.app.services import persons_service, projects_service, user_service
+
+
+class RowError(Exception):
+    """
+    Raised while validating a row when one of its values is wrong.
+    """
+
+
+def run_import_job(module_name, class_name, file_id, project_id=None):
+    """
+    Run a CSV import. This function is aimed at being runned as a job in a
+    job queue: importers are given by module and class names. The uploaded
+    file is read from the file store, because the job may run on another
+    host than the API. It is removed from the store once imported.
+    """
+    with app.app_context():
+        importer = getattr(importlib.import_module(module_name), class_name)()
+        file_path = os.path.join(app.config["TMP_DIR"], "%s.csv" % file_id)
+        try:
+            with open(file_path, "wb") as csv_file:
+                csv_file.write(file_store.read_file("csv-imports", file_id))
+            (result, status_code) = importer.import_file(
+                file_path, project_id
+            )
+        finally:
+            fs.rm_file(file_path)
+            file_store.remove_file("csv-imports", file_id)
+        return {"status_code": status_code, "result": result}
 
 
 class BaseCsvImportResource(Resource):
+    """
+    Import rows of an uploaded CSV file. The dialect of the file is guessed
+    once, then all rows are validated before anything is written. If some
+    rows are wrong, errors are returned with their line numbers. Otherwise,
+    rows are written in a single transaction: importers resolve existing
+    entries with a few set queries, then create or update them without
+    intermediate commits.
+
+    With the async=true query parameter and the job queue enabled, the import
+    runs in a job and the job id is returned.
+    """
+
+    required_columns = []
+
     def __init__(self):
         Resource.__init__(self)
 
     @jwt_required
     def post(self):
+        self.check_permissions()
+        return self.start_import(self.save_uploaded_file())
+
+    def save_uploaded_file(self):
         uploaded_file = request.files["file"]
         file_name = "%s.csv" % uuid.uuid4()
-
         file_path = os.path.join(app.config["TMP_DIR"], file_name)
         uploaded_file.save(file_path)
+        return file_path
+
+    def start_import(self, file_path, project_id=None):
+        if config.ENABLE_JOB_QUEUE and request.args.get("async") == "true":
+            file_id = str(uuid.uuid4())
+            try:
+                file_store.add_file("csv-imports", file_id, file_path)
+            finally:
+                os.remove(file_path)
+            job = queue_store.job_queue.enqueue(
+                run_import_job,
+                args=(
+                    type(self).__module__,
+                    type(self).__name__,
+                    file_id,
+                    project_id,
+                ),
+                job_timeout=3600,
+                meta={
+                    "person_id": persons_service.get_current_user()["id"],
+                    "project_id": project_id,
+                },
+            )
+            return {"job_id": job.id}, 202
 
         try:
-            result = self.run_import(file_path, ",")
-            return result, 201
-        except KeyError as e:
+            return self.import_file(file_path, project_id)
+        finally:
+            os.remove(file_path)
+
+    def import_file(self, file_path, project_id=None):
+        (columns, rows) = csv_utils.read_csv_file(file_path)
+        missing_columns = [
+            column for column in self.required_columns if column not in columns
+        ]
+        if len(missing_columns) > 0:
+            message = "A column is missing: %s" % ", ".join(missing_columns)
+            current_app.logger.error(message)
+            return {"error": True, "message": message}, 400
+
+        self.prepare_import(project_id)
+        errors = []
+        for (index, row) in enumerate(rows):
             try:
-                result = self.run_import(file_path, ";")
-                return result, 201
-            except KeyError as e:
-                current_app.logger.error("A column is missing: %s" % e)
-                return (
-                    {"error": True, "message": "A column is missing: %s" % e},
-                    400,
-                )
-
-    def run_import(self, file_path, delimiter):
-        result = []
-        self.check_permissions()
-        self.prepare_import()
-        with open(file_path) as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-            for row in reader:
-                row = self.import_row(row)
-                result.append(row)
-        return result
-
-    def prepare_import(self):
+                self.validate_row(row)
+            except RowError as e:
+                # Line 1 is the header.
+                errors.append({"line": index + 2, "message": str(e)})
+        if len(errors) > 0:
+            return (
+                {
+                    "error": True,
+                    "message": "%s rows are wrong" % len(errors),
+                    "errors": errors,
+                },
+                400,
+            )
+
+        try:
+            result = self.import_rows(rows, project_id)
+            BaseMixin.commit()
+        except Exception:
+            BaseMixin.rollback()
+            raise
+        return self.serialize_result(result), 201
+
+    def prepare_import(self, project_id=None):
         pass
 
     def check_permissions(self):
         return permissions.check_manager_permissions()
 
-    def import_row(self):
+    def validate_row(self, row):
+        """
+        Raise a RowError if a value of given row is wrong.
+        """
         pass
 
-    def add_to_cache_if_absent(self, cache, retrieve_function, name):
-        if name not in cache:
-            cache[name] = retrieve_function(name)
-        return cache[name]
+    def import_rows(self, rows, project_id=None):
+        """
+        Create or update the entries described by given rows, without
+        committing. It returns the created or updated entries.
+        """
+        return []
 
-    def get_id_from_cache(self, cache, name):
-        cached_object = cache[name]
-        if type(cached_object) is dict:
-            return cached_object["id"]
-        else:
-            return cached_object.id
+    def serialize_result(self, result):
+        return [entry.serialize() for entry in result]
+
+    def check_not_empty(self, row, column):
+        if len(row.get(column) or "") == 0:
+            raise RowError("%s is empty" % column)
+
+    def check_integer(self, row, column):
+        value = row.get(column) or ""
+        if len(value) > 0:
+            try:
+                int(value)
+            except ValueError:
+                raise RowError("%s is not an integer: %s" % (column, value))
 
 
 class BaseCsvProjectImportResource(BaseCsvImportResource):
     @jwt_required
     def post(self, project_id):
-        uploaded_file = request.files["file"]
-        file_name = "%s.csv" % uuid.uuid4()
-        file_path = os.path.join(app.config["TMP_DIR"], file_name)
-        uploaded_file.save(file_path)
-
-        try:
-            result = self.run_import(project_id, file_path, ",")
-            return result, 201
-        except KeyError as e:
-            try:
-                result = self.run_import(project_id, file_path, ";")
-                return result, 201
-            except KeyError as e:
-                current_app.logger.error("A column is missing: %s" % e)
-                return (
-                    {"error": True, "message": "A column is missing: %s" % e},
-                    400,
-                )
-
-    def run_import(self, project_id, file_path, delimiter):
-        result = []
         self.check_project_permissions(project_id)
-        self.prepare_import(project_id)
-        with open(file_path) as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-            for row in reader:
-                row = self.import_row(row, project_id)
-                result.append(row)
-        return result
+        return self.start_import(self.save_uploaded_file(), project_id)
 
     def check_project_permissions(self, project_id):
         return user_service.check_manager_project_access(project_id)
 
-    def import_row(self, project_id):
-        pass
-
     def get_descriptor_field_map(self, project_id, entity_type):
         descriptor_map = {}
         descriptors = projects_service.get_metadata_descriptors(project_id)
@@ -116,3 +188,37 @@ class BaseCsvProjectImportResource(BaseCsvImportResource):
             if descriptor["entity_type"] == entity_type:
                 descriptor_map[descriptor["name"]] = descriptor["field_name"]
         return descriptor_map
+
+
+class CsvImportJobResource(Resource):
+    """
+    Return status of an import running in the job queue and its result once
+    it's finished. Only the person who started the import (or an admin) can
+    read it.
+    """
+
+    @jwt_required
+    def get(self, job_id):
+        permissions.check_manager_permissions()
+        if not config.ENABLE_JOB_QUEUE:
+            abort(404)
+        try:
+            job = Job.fetch(job_id, connection=queue_store.queue_store)
+        except NoSuchJobError:
+            abort(404)
+        self.check_job_permissions(job)
+
+        response = {"job_id": job.id, "status": job.get_status()}
+        if job.is_finished:
+            response.update(job.result)
+        return response
+
+    def check_job_permissions(self, job):
+        if permissions.has_admin_permissions():
+            return True
+        person_id = persons_service.get_current_user()["id"]
+        if job.meta.get("person_id") != person_id:
+            raise permissions.PermissionDenied
+        if job.meta.get("project_id") is not None:
+            user_service.check_manager_project_access(job.meta["project_id"])
+        return True
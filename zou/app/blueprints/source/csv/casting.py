@@ -1,10 +1,16 @@
 from slugify import slugify
-from zou.app.blueprints.source.csv.base import BaseCsvProjectImportResource
+from zou.app.blueprints.source.csv.base import (
+    BaseCsvProjectImportResource,
+    RowError,
+)
 
-from zou.app.services import assets_service, shots_service, breakdown_service
+from zou.app.models.entity import Entity, EntityLink
+from zou.app.services import assets_service, shots_service
 
 
 class CastingCsvImportResource(BaseCsvProjectImportResource):
+    required_columns = ["Parent", "Name", "Asset Type", "Asset"]
+
     def prepare_import(self, project_id):
         self.asset_type_map = {}
         self.asset_map = {}
@@ -49,22 +55,78 @@ class CastingCsvImportResource(BaseCsvProjectImportResource):
         sequence_key = self.sequence_map[shot["parent_id"]]
         return "%s%s" % (sequence_key, slugify(shot["name"]))
 
-    def import_row(self, row, project_id):
+    def get_link_ids(self, row):
+        """
+        Return the id of the asset described by given row and the id of the
+        shot or of the asset it is cast in (None when they are not found).
+        """
         asset_key = slugify("%s%s" % (row["Asset Type"], row["Asset"]))
+        episode_name = row.get("Episode") or ""
         target_key = slugify(
-            "%s%s%s" % (row["Episode"], row["Parent"], row["Name"])
+            "%s%s%s" % (episode_name, row["Parent"], row["Name"])
         )
-        occurences = 1
-        if len(row["Occurences"]) > 0:
-            occurences = int(row["Occurences"])
-        label = slugify(row["Label"])
-
         asset_id = self.asset_map.get(asset_key, None)
         target_id = self.shot_map.get(target_key, None)
         if target_id is None:
             target_id = self.asset_map.get(target_key, None)
+        return (asset_id, target_id)
 
-        if asset_id is not None and target_id is not None:
-            breakdown_service.create_casting_link(
-                target_id, asset_id, occurences, label
+    def validate_row(self, row):
+        self.check_integer(row, "Occurences")
+        (asset_id, target_id) = self.get_link_ids(row)
+        if asset_id is None:
+            raise RowError(
+                "Asset not found: %s / %s" % (row["Asset Type"], row["Asset"])
+            )
+        if target_id is None:
+            raise RowError(
+                "Shot or asset not found: %s"
+                % " / ".join(
+                    value
+                    for value in [
+                        row.get("Episode") or "",
+                        row["Parent"],
+                        row["Name"],
+                    ]
+                    if len(value) > 0
+                )
             )
+
+    def import_rows(self, rows, project_id):
+        links = {}
+        for link in (
+            EntityLink.query.join(Entity, Entity.id == EntityLink.entity_in_id)
+            .filter(Entity.project_id == project_id)
+        ):
+            links[(str(link.entity_in_id), str(link.entity_out_id))] = link
+
+        result = {}
+        for row in rows:
+            (asset_id, target_id) = self.get_link_ids(row)
+            occurences = 1
+            if len(row.get("Occurences") or "") > 0:
+                occurences = int(row["Occurences"])
+            label = slugify(row.get("Label") or "")
+
+            key = (target_id, asset_id)
+            link = links.get(key, None)
+            if link is None:
+                links[key] = EntityLink.create_no_commit(
+                    entity_in_id=target_id,
+                    entity_out_id=asset_id,
+                    nb_occurences=occurences,
+                    label=label,
+                )
+            else:
+                link.nb_occurences = occurences
+                link.label = label
+            result[key] = {
+                "entity_in_id": target_id,
+                "entity_out_id": asset_id,
+                "nb_occurences": occurences,
+                "label": label,
+            }
+        return list(result.values())
+
+    def serialize_result(self, links):
+        return links
@@ -3,20 +3,18 @@ from zou.app.blueprints.source.csv.base import BaseCsvImportResource
 from zou.app.models.person import Person
 from zou.app.utils import auth, permissions
 
-from sqlalchemy.exc import IntegrityError
-
 
 class PersonsCsvImportResource(BaseCsvImportResource):
+    required_columns = ["First Name", "Last Name", "Email"]
+
     def check_permissions(self):
         return permissions.check_admin_permissions()
 
-    def import_row(self, row):
-        first_name = row["First Name"]
-        last_name = row["Last Name"]
-        email = row["Email"]
-        phone = row["Phone"]
-        role = row.get("Role", None)
+    def validate_row(self, row):
+        self.check_not_empty(row, "Email")
 
+    def get_role(self, row):
+        role = row.get("Role", None)
         if role == "Studio Manager":
             role = "admin"
         elif role == "Supervisor":
@@ -30,30 +28,40 @@ class PersonsCsvImportResource(BaseCsvImportResource):
             and role not in ["admin", "manager"]
         ):
             role = "user"
+        return role
+
+    def import_rows(self, rows, project_id=None):
+        # Emails are stored lower cased.
+        emails = list(set(row["Email"].lower() for row in rows))
+        persons = {
+            person.email: person
+            for person in Person.query.filter(Person.email.in_(emails))
+        }
+        password = auth.encrypt_password("default")
 
-        try:
-            password = auth.encrypt_password("default")
-            person = Person.get_by(email=email)
+        for row in rows:
+            email = row["Email"].lower()
+            role = self.get_role(row)
+            data = {
+                "first_name": row["First Name"],
+                "last_name": row["Last Name"],
+                "phone": row.get("Phone", None),
+            }
+            if role is not None and len(role) > 0:
+                data["role"] = role
 
+            person = persons.get(email, None)
             if person is None:
-                person = Person.create(
-                    email=email,
-                    password=password,
-                    first_name=first_name,
-                    last_name=last_name,
-                    phone=phone,
-                    role=role,
+                persons[email] = Person.create_no_commit(
+                    email=email, password=password, **data
                 )
             else:
-                data = {
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "phone": phone,
-                }
-                if role is not None and len(role) > 0:
-                    data["role"] = role
-                person.update(data)
-        except IntegrityError:
-            person = Person.get_by(email=email)
-
-        return person.serialize_safe()
+                for (key, value) in data.items():
+                    setattr(person, key, value)
+        return emails
+
+    def serialize_result(self, emails):
+        return [
+            person.serialize_safe()
+            for person in Person.query.filter(Person.email.in_(emails))
+        ]
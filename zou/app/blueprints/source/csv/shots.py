@@ -2,27 +2,97 @@ from zou.app.blueprints.source.csv.base import BaseCsvProjectImportResource
 
 from zou.app.services import shots_service, projects_service
 from zou.app.models.entity import Entity
-
-from sqlalchemy.exc import IntegrityError
+from zou.app.utils import fields
 
 
 class ShotsCsvImportResource(BaseCsvProjectImportResource):
+    required_columns = ["Sequence", "Name"]
+
     def prepare_import(self, project_id):
-        self.episodes = {}
-        self.sequences = {}
         self.descriptor_fields = self.get_descriptor_field_map(
             project_id, "Shot"
         )
         project = projects_service.get_project(project_id)
         self.is_tv_show = projects_service.is_tv_show(project)
+        self.episode_type_id = shots_service.get_episode_type()["id"]
+        self.sequence_type_id = shots_service.get_sequence_type()["id"]
+        self.shot_type_id = shots_service.get_shot_type()["id"]
+
+        self.episodes = {}
+        self.sequences = {}
+        self.shots = {}
+        for entity in Entity.query.filter_by(project_id=project_id).filter(
+            Entity.entity_type_id.in_(
+                [
+                    self.episode_type_id,
+                    self.sequence_type_id,
+                    self.shot_type_id,
+                ]
+            )
+        ):
+            entity_type_id = str(entity.entity_type_id)
+            if entity_type_id == self.episode_type_id:
+                self.episodes[entity.name] = entity
+            elif entity_type_id == self.sequence_type_id:
+                key = (self.get_key_id(entity.parent_id), entity.name)
+                self.sequences[key] = entity
+            else:
+                key = (self.get_key_id(entity.parent_id), entity.name)
+                self.shots[key] = entity
+
+    def get_key_id(self, entity_id):
+        return str(entity_id) if entity_id is not None else None
 
-    def import_row(self, row, project_id):
+    def validate_row(self, row):
         if self.is_tv_show:
-            episode_name = row["Episode"]
-        sequence_name = row["Sequence"]
+            self.check_not_empty(row, "Episode")
+        self.check_not_empty(row, "Sequence")
+        self.check_not_empty(row, "Name")
+        for column in ["Nb Frames", "Frame In", "Frame Out"]:
+            self.check_integer(row, column)
+
+    def import_rows(self, rows, project_id):
+        shot_ids = []
+        for row in rows:
+            episode_id = None
+            if self.is_tv_show:
+                episode_id = self.get_or_create_episode(
+                    project_id, row["Episode"]
+                ).id
+            sequence = self.get_or_create_sequence(
+                project_id, episode_id, row["Sequence"]
+            )
+            shot = self.create_or_update_shot(project_id, sequence.id, row)
+            if shot.id not in shot_ids:
+                shot_ids.append(shot.id)
+        return shot_ids
+
+    def get_or_create_episode(self, project_id, name):
+        if name not in self.episodes:
+            self.episodes[name] = Entity.create_no_commit(
+                id=fields.gen_uuid(),
+                name=name,
+                project_id=project_id,
+                entity_type_id=self.episode_type_id,
+            )
+        return self.episodes[name]
+
+    def get_or_create_sequence(self, project_id, episode_id, name):
+        key = (self.get_key_id(episode_id), name)
+        if key not in self.sequences:
+            self.sequences[key] = Entity.create_no_commit(
+                id=fields.gen_uuid(),
+                name=name,
+                project_id=project_id,
+                parent_id=episode_id,
+                entity_type_id=self.sequence_type_id,
+            )
+        return self.sequences[key]
+
+    def create_or_update_shot(self, project_id, sequence_id, row):
         shot_name = row["Name"]
-        description = row["Description"]
-        nb_frames = row.get("Nb Frames", None)
+        description = row.get("Description") or ""
+        nb_frames = row.get("Nb Frames") or ""
         data = {
             "frame_in": row.get("Frame In"),
             "frame_out": row.get("Frame Out"),
@@ -32,67 +102,28 @@ class ShotsCsvImportResource(BaseCsvProjectImportResource):
             if name in row:
                 data[field_name] = row[name]
 
-        if self.is_tv_show:
-            episode_key = "%s-%s" % (project_id, episode_name)
-            if episode_key not in self.episodes:
-                self.episodes[
-                    episode_key
-                ] = shots_service.get_or_create_episode(
-                    project_id, episode_name
-                )
-
-            sequence_key = "%s-%s-%s" % (
-                project_id,
-                episode_name,
-                sequence_name,
-            )
-        else:
-            sequence_key = "%s-%s" % (project_id, sequence_name)
-
-        if sequence_key not in self.sequences:
-            if self.is_tv_show:
-                episode = self.episodes[episode_key]
-                self.sequences[
-                    sequence_key
-                ] = shots_service.get_or_create_sequence(
-                    project_id, episode["id"], sequence_name
-                )
-            else:
-                self.sequences[
-                    sequence_key
-                ] = shots_service.get_or_create_sequence(
-                    project_id, None, sequence_name
-                )
-        sequence_id = self.get_id_from_cache(self.sequences, sequence_key)
-
-        shot_type = shots_service.get_shot_type()
-        try:
-            if nb_frames is None or len(nb_frames) == 0:
-                entity = Entity.create(
-                    name=shot_name,
-                    description=description,
-                    project_id=project_id,
-                    parent_id=sequence_id,
-                    entity_type_id=shot_type["id"],
-                    data=data,
-                )
-            else:
-                entity = Entity.create(
-                    name=shot_name,
-                    description=description,
-                    project_id=project_id,
-                    parent_id=sequence_id,
-                    entity_type_id=shot_type["id"],
-                    nb_frames=nb_frames,
-                    data=data,
-                )
-
-        except IntegrityError:
-            entity = Entity.get_by(
+        key = (self.get_key_id(sequence_id), shot_name)
+        shot = self.shots.get(key, None)
+        if shot is None:
+            shot = Entity.create_no_commit(
+                id=fields.gen_uuid(),
                 name=shot_name,
                 project_id=project_id,
                 parent_id=sequence_id,
-                entity_type_id=shot_type["id"],
+                entity_type_id=self.shot_type_id,
+                description=description,
+                data=data,
             )
+            self.shots[key] = shot
+        else:
+            shot.description = description
+            shot.data = dict(shot.data or {}, **data)
+        if len(nb_frames) > 0:
+            shot.nb_frames = int(nb_frames)
+        return shot
 
-        return entity.serialize()
+    def serialize_result(self, shot_ids):
+        return [
+            shot.serialize()
+            for shot in Entity.query.filter(Entity.id.in_(shot_ids))
+        ]
@@ -25,6 +25,7 @@ from .resources import (
     ProjectTasksResource,
     CreateShotTasksResource,
     CreateAssetTasksResource,
+    CreateTasksResource,
     GetTimeSpentResource,
     SetTimeSpentResource,
     AddTimeSpentResource,
@@ -83,6 +84,11 @@ routes = [
         "/actions/task-types/<task_type_id>/assets/create-tasks",
         CreateAssetTasksResource,
     ),
+    (
+        "/actions/projects/<project_id>/task-types/<task_type_id>/"
+        "create-tasks",
+        CreateTasksResource,
+    ),
 ]
 
 blueprint = Blueprint("tasks", "tasks")
@@ -24,8 +24,10 @@ from zou.app.services import (
     tasks_service,
     user_service,
 )
+from zou.app import config
 from zou.app.utils import query, permissions
 from zou.app.mixin import ArgsMixin
+from zou.app.stores import queue_store
 
 
 class CommentTaskResource(Resource):
@@ -33,7 +35,8 @@ class CommentTaskResource(Resource):
     Creates a new comment for given task. It requires a text, a task_status
     and a person as arguments. This way, comments keep history of status
     changes. When the comment is created, it updates the task status with
-    given task status.
+    given task status. Notifications are created by the job queue when it is
+    activated.
     """
 
     @jwt_required
@@ -83,9 +86,15 @@ class CommentTaskResource(Resource):
         tasks_service.update_task(task_id, new_data)
         task = tasks_service.get_task_with_relations(task_id)
 
-        notifications_service.create_notifications_for_task_and_comment(
-            task, comment, change=status_changed
-        )
+        if config.ENABLE_JOB_QUEUE:
+            queue_store.job_queue.enqueue(
+                notifications_service.create_notifications_for_task_and_comment_job,
+                args=(task, comment, status_changed),
+            )
+        else:
+            notifications_service.create_notifications_for_task_and_comment(
+                task, comment, change=status_changed
+            )
         news_service.create_news_for_task_and_comment(
             task, comment, change=status_changed
         )
@@ -238,8 +247,12 @@ class CreateShotTasksResource(Resource):
         user_service.check_manager_project_access(criterions["project_id"])
         shots = shots_service.get_shots(criterions)
         task_type = tasks_service.get_task_type(task_type_id)
-        tasks = [tasks_service.create_task(task_type, shot) for shot in shots]
-        return tasks, 201
+        task_ids = tasks_service.create_tasks(
+            task_type,
+            shots,
+            emit_task_events=request.args.get("emit_task_events") == "true",
+        )
+        return tasks_service.get_created_tasks(task_type, task_ids), 201
 
 
 class CreateAssetTasksResource(Resource):
@@ -256,10 +269,43 @@ class CreateAssetTasksResource(Resource):
         user_service.check_manager_project_access(criterions["project_id"])
         assets = assets_service.get_assets(criterions)
         task_type = tasks_service.get_task_type(task_type_id)
-        tasks = [
-            tasks_service.create_task(task_type, asset) for asset in assets
-        ]
-        return tasks, 201
+        task_ids = tasks_service.create_tasks(
+            task_type,
+            assets,
+            emit_task_events=request.args.get("emit_task_events") == "true",
+        )
+        return tasks_service.get_created_tasks(task_type, task_ids), 201
+
+
+class CreateTasksResource(Resource, ArgsMixin):
+    """
+    Create tasks of given task type for all given entities of given project,
+    in bulk. Entities that already have a task of this type are skipped.
+    Only one task:new-batch event is emitted, unless task events are asked.
+    It returns ids of created tasks.
+    """
+
+    @jwt_required
+    def post(self, project_id, task_type_id):
+        args = self.get_args(
+            [
+                ("entity_ids", [], True, "append"),
+                ("name", "main", False),
+                ("emit_task_events", False, False),
+            ]
+        )
+        user_service.check_manager_project_access(project_id)
+        task_type = tasks_service.get_task_type(task_type_id)
+        entities = entities_service.get_entity_ids_for_project(
+            project_id, args["entity_ids"]
+        )
+        task_ids = tasks_service.create_tasks(
+            task_type,
+            entities,
+            name=args["name"],
+            emit_task_events=args["emit_task_events"] in [True, "true"],
+        )
+        return {"task_ids": task_ids}, 201
 
 
 class ToReviewResource(Resource):
@@ -565,12 +611,20 @@ class DeleteAllTasksForTaskTypeResource(Resource):
     """
     Delete all tasks for a given task type and project. It's mainly used
     when tasks are created by mistake at the beginning of the project.
+    Tasks are deleted by a job when the job queue is activated.
     """
 
     @jwt_required
     def delete(self, project_id, task_type_id):
         permissions.check_admin_permissions()
         projects_service.get_project(project_id)
+        if config.ENABLE_JOB_QUEUE:
+            queue_store.job_queue.enqueue(
+                deletion_service.remove_tasks_for_project_and_task_type_job,
+                args=(project_id, task_type_id),
+                job_timeout=7200,
+            )
+            return {"job": "running"}, 202
         task_ids = deletion_service.remove_tasks_for_project_and_task_type(
             project_id, task_type_id
         )
@@ -604,7 +658,7 @@ class ProjectNotificationsResource(Resource, ArgsMixin):
         projects_service.get_project(project_id)
         page = self.get_page()
         return notifications_service.get_notifications_for_project(
-            project_id, page
+            project_id, page, cursor=self.get_cursor(), limit=self.get_limit()
         )
 
 
@@ -619,7 +673,9 @@ class ProjectTasksResource(Resource, ArgsMixin):
         permissions.check_admin_permissions()
         projects_service.get_project(project_id)
         page = self.get_page()
-        return tasks_service.get_tasks_for_project(project_id, page)
+        return tasks_service.get_tasks_for_project(
+            project_id, page, cursor=self.get_cursor(), limit=self.get_limit()
+        )
 
 
 class ProjectCommentsResource(Resource, ArgsMixin):
@@ -633,7 +689,9 @@ class ProjectCommentsResource(Resource, ArgsMixin):
         permissions.check_admin_permissions()
         projects_service.get_project(project_id)
         page = self.get_page()
-        return tasks_service.get_comments_for_project(project_id, page)
+        return tasks_service.get_comments_for_project(
+            project_id, page, cursor=self.get_cursor(), limit=self.get_limit()
+        )
 
 
 class ProjectPreviewFilesResource(Resource, ArgsMixin):
@@ -647,4 +705,6 @@ class ProjectPreviewFilesResource(Resource, ArgsMixin):
         permissions.check_admin_permissions()
         projects_service.get_project(project_id)
         page = self.get_page()
-        return files_service.get_preview_files_for_project(project_id, page)
+        return files_service.get_preview_files_for_project(
+            project_id, page, cursor=self.get_cursor(), limit=self.get_limit()
+        )
@@ -22,6 +22,17 @@ KV_EVENTS_DB_INDEX = 2
 KV_JOB_DB_INDEX = 3
 
 ENABLE_JOB_QUEUE = os.getenv("ENABLE_JOB_QUEUE", "False").lower() == "true"
+PREVIEW_PROCESSING_WORKERS = int(os.getenv("PREVIEW_PROCESSING_WORKERS", 2))
+PLAYLIST_BUILD_WORKERS = int(os.getenv("PLAYLIST_BUILD_WORKERS", 4))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "png").lower()
+
+LOCAL_CACHE_ENABLED = (
+    os.getenv("LOCAL_CACHE_ENABLED", "False").lower() == "true"
+)
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", 10000))
+LOCAL_CACHE_MAX_SIZE = int(
+    os.getenv("LOCAL_CACHE_MAX_SIZE", 64 * 1024 * 1024)
+)
 
 JWT_BLACKLIST_ENABLED = True
 JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
@@ -49,6 +60,7 @@ SQLALCHEMY_ENGINE_OPTIONS = {
 }
 
 NB_RECORDS_PER_PAGE = 100
+MAX_RECORDS_PER_PAGE = 5000
 
 DONE_TASK_STATUS = "Done"
 WIP_TASK_STATUS = "WIP"
@@ -89,6 +101,13 @@ FS_SWIFT_USER = os.getenv("FS_SWIFT_USER")
 FS_SWIFT_TENANT_NAME = os.getenv("FS_SWIFT_TENANT_NAME")
 FS_SWIFT_KEY = os.getenv("FS_SWIFT_KEY")
 FS_SWIFT_REGION_NAME = os.getenv("FS_SWIFT_REGION_NAME")
+FS_CACHE_FOLDER = os.getenv(
+    "FS_CACHE_FOLDER", os.path.join(TMP_DIR, "cache")
+)
+FS_CACHE_MAX_SIZE = int(
+    os.getenv("FS_CACHE_MAX_SIZE", 10 * 1024 * 1024 * 1024)
+)
+FS_CACHE_LOCK_TIMEOUT = int(os.getenv("FS_CACHE_LOCK_TIMEOUT", 600))
 
 LDAP_HOST = os.getenv("LDAP_HOST", "127.0.0.1")
 LDAP_PORT = os.getenv("LDAP_PORT", "389")
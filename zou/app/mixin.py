@@ -1,5 +1,7 @@
 from flask_restful import reqparse
-from flask import request
+from flask import current_app, request
+
+from zou.app.services.exception import WrongParameterException
 
 
 class ArgsMixin(object):
@@ -30,6 +32,29 @@ class ArgsMixin(object):
         options = request.args
         return int(options.get("page", "-1"))
 
+    def get_cursor(self):
+        """
+        Returns cursor requested by the user (None if pagination by cursor is
+        not asked).
+        """
+        return request.args.get("cursor", None)
+
+    def get_limit(self):
+        """
+        Returns the maximum number of entries requested by the user. It must
+        be a positive integer, it is capped to the maximum page size.
+        """
+        options = request.args
+        if "limit" not in options:
+            return None
+        try:
+            limit = int(options["limit"])
+        except ValueError:
+            raise WrongParameterException("Limit must be an integer.")
+        if limit < 1:
+            raise WrongParameterException("Limit must be positive.")
+        return min(limit, current_app.config["MAX_RECORDS_PER_PAGE"])
+
     def get_force(self):
         """
         Returns force parameter.
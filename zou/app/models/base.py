@@ -1,5 +1,7 @@
 import datetime
 
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy_utils import UUIDType
 from zou.app import db
 from zou.app.utils import fields
@@ -86,6 +88,31 @@ class BaseMixin(object):
         db.session.add(instance)
         return instance
 
+    @classmethod
+    def create_all_ignore_conflicts(cls, rows, batch_size=1000):
+        """
+        Shorthand to insert many entries with one multi-row INSERT request per
+        batch of rows, in a single transaction. Rows conflicting with existing
+        entries (unique constraints) are skipped. It returns ids of inserted
+        entries.
+        """
+        ids = []
+        try:
+            for index in range(0, len(rows), batch_size):
+                statement = (
+                    insert(cls.__table__)
+                    .values(rows[index : index + batch_size])
+                    .on_conflict_do_nothing()
+                    .returning(cls.__table__.c.id)
+                )
+                ids += [row[0] for row in db.session.execute(statement)]
+            db.session.commit()
+        except:
+            db.session.rollback()
+            db.session.remove()
+            raise
+        return ids
+
     @classmethod
     def delete_all_by(cls, **kw):
         """
@@ -126,10 +153,147 @@ class BaseMixin(object):
     def create_from_import_list(cls, data_list):
         """
         Create a list of instances of the model based on data that comes from
-        the Zou API.
+        the Zou API. Entries are written with one INSERT ... ON CONFLICT DO
+        UPDATE request per batch, then their relations are set. Everything is
+        committed at once.
         """
-        for data in data_list:
-            cls.create_from_import(data)
+        rows = cls.build_import_rows(data_list)
+        try:
+            cls.upsert_all_no_commit(rows)
+            cls.import_relations(data_list)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            db.session.remove()
+            raise
+
+    @classmethod
+    def build_import_rows(cls, data_list):
+        """
+        Build the rows to write for given data that comes from the Zou API.
+        Models needing extra data to build their rows override it to fetch
+        that data once for all entries.
+        """
+        return [cls.build_import_row(data) for data in data_list]
+
+    @classmethod
+    def build_import_row(cls, data):
+        """
+        Keep from data that comes from the Zou API the values of the model
+        columns.
+        """
+        columns = cls.__table__.columns.keys()
+        return {
+            key: value for (key, value) in data.items() if key in columns
+        }
+
+    @classmethod
+    def import_relations(cls, data_list):
+        """
+        Set relations of entries imported from the Zou API. Models with many
+        to many relations override it.
+        """
+        pass
+
+    @classmethod
+    def upsert_all_no_commit(cls, rows, batch_size=1000):
+        """
+        Insert given rows or update the entries that have the same primary
+        key, with one INSERT ... ON CONFLICT DO UPDATE request per batch of
+        rows. Rows are batched by set of columns: only the given columns are
+        updated.
+        """
+        table = cls.__table__
+        primary_keys = table.primary_key.columns.keys()
+        # An entry can't be updated twice by the same request, the last row
+        # given for an entry is kept.
+        rows_by_key = {}
+        for row in rows:
+            key = tuple(str(row.get(name)) for name in primary_keys)
+            rows_by_key[key] = row
+        groups = {}
+        for row in rows_by_key.values():
+            groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+
+        for (columns, group) in groups.items():
+            for index in range(0, len(group), batch_size):
+                statement = insert(table).values(
+                    group[index : index + batch_size]
+                )
+                updated_values = {
+                    name: statement.excluded[name]
+                    for name in columns
+                    if name not in primary_keys
+                }
+                if len(updated_values) > 0:
+                    statement = statement.on_conflict_do_update(
+                        index_elements=primary_keys, set_=updated_values
+                    )
+                else:
+                    statement = statement.on_conflict_do_nothing()
+                db.session.execute(statement)
+
+    @classmethod
+    def update_links_no_commit(
+        cls, table, column_name, linked_column_name, linked_model, links
+    ):
+        """
+        Make rows of given link table match given map of linked ids by
+        instance id. Current links are read with one query, then outdated
+        links are removed and missing ones are added with one request each.
+        Linked ids that don't exist are ignored.
+        """
+        if len(links) == 0:
+            return
+        column = table.c[column_name]
+        linked_column = table.c[linked_column_name]
+
+        linked_ids = set(
+            str(linked_id) for ids in links.values() for linked_id in ids
+        )
+        existing_ids = set()
+        if len(linked_ids) > 0:
+            existing_ids = set(
+                str(linked_id)
+                for (linked_id,) in linked_model.query.with_entities(
+                    linked_model.id
+                ).filter(linked_model.id.in_(linked_ids))
+            )
+        wanted = set(
+            (str(instance_id), str(linked_id))
+            for (instance_id, ids) in links.items()
+            for linked_id in ids
+            if str(linked_id) in existing_ids
+        )
+        current = set(
+            (str(instance_id), str(linked_id))
+            for (instance_id, linked_id) in db.session.query(
+                column, linked_column
+            ).filter(column.in_(list(links.keys())))
+        )
+
+        outdated = current - wanted
+        if len(outdated) > 0:
+            db.session.execute(
+                table.delete().where(
+                    tuple_(column, linked_column).in_(list(outdated))
+                )
+            )
+        missing = wanted - current
+        if len(missing) > 0:
+            db.session.execute(
+                insert(table)
+                .values(
+                    [
+                        {
+                            column_name: instance_id,
+                            linked_column_name: linked_id,
+                        }
+                        for (instance_id, linked_id) in missing
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
 
     @classmethod
     def delete_from_import(cls, instance_id):
@@ -145,6 +309,10 @@ class BaseMixin(object):
     def commit(cls):
         db.session.commit()
 
+    @classmethod
+    def rollback(cls):
+        db.session.rollback()
+
     def save(self):
         """
         Shorthand to create an entry via the database session based on current
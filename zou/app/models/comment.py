@@ -72,6 +72,14 @@ class Comment(db.Model, BaseMixin, SerializerMixin):
     )
     mentions = db.relationship("Person", secondary=mentions_table)
 
+    __table_args__ = (
+        db.Index(
+            "ix_comment_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
+    )
+
     def __repr__(self):
         return "<Comment of %s>" % self.object_id
 
@@ -118,3 +126,31 @@ class Comment(db.Model, BaseMixin, SerializerMixin):
             previous_comment.set_mentions(mention_ids)
 
         return previous_comment
+
+    @classmethod
+    def import_relations(cls, data_list):
+        from zou.app.models.person import Person
+        from zou.app.models.preview_file import PreviewFile
+
+        cls.update_links_no_commit(
+            preview_link_table,
+            "comment",
+            "preview_file",
+            PreviewFile,
+            {
+                data["id"]: data["previews"]
+                for data in data_list
+                if data.get("previews", None) is not None
+            },
+        )
+        cls.update_links_no_commit(
+            mentions_table,
+            "comment",
+            "person",
+            Person,
+            {
+                data["id"]: data["mentions"]
+                for data in data_list
+                if data.get("mentions", None) is not None
+            },
+        )
@@ -46,6 +46,35 @@ class EntityLink(db.Model, BaseMixin, SerializerMixin):
             entity_link.update(data)
             return entity_link
 
+    @classmethod
+    def create_from_import_list(cls, data_list):
+        """
+        Links are identified by their entities, not by their id: existing
+        links of imported entities are retrieved with one query, then links
+        are created or updated in a single transaction.
+        """
+        entity_in_ids = list(set(data["entity_in_id"] for data in data_list))
+        links = {}
+        if len(entity_in_ids) > 0:
+            for link in cls.query.filter(cls.entity_in_id.in_(entity_in_ids)):
+                links[(str(link.entity_in_id), str(link.entity_out_id))] = link
+
+        try:
+            for data in data_list:
+                row = cls.build_import_row(data)
+                key = (str(row["entity_in_id"]), str(row["entity_out_id"]))
+                if key in links:
+                    for (name, value) in row.items():
+                        if name != "id":
+                            setattr(links[key], name, value)
+                else:
+                    links[key] = cls.create_no_commit(**row)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            db.session.remove()
+            raise
+
 
 class Entity(db.Model, BaseMixin, SerializerMixin):
     """
@@ -144,7 +173,68 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
         return previous_entity
 
     @classmethod
-    def sanitize_import_data(self, data):
+    def build_import_rows(cls, data_list):
+        """
+        Existing preview files and entity types referenced by imported
+        entities are retrieved with one query each, instead of two queries
+        per entity.
+        """
+        from zou.app.models.preview_file import PreviewFile
+        from zou.app.models.entity_type import EntityType
+
+        preview_file_ids = list(
+            set(
+                data["preview_file_id"]
+                for data in data_list
+                if data.get("preview_file_id", None)
+            )
+        )
+        existing_preview_file_ids = set()
+        if len(preview_file_ids) > 0:
+            existing_preview_file_ids = set(
+                str(preview_file.id)
+                for preview_file in PreviewFile.query.with_entities(
+                    PreviewFile.id
+                ).filter(PreviewFile.id.in_(preview_file_ids))
+            )
+        entity_type_ids = {
+            entity_type.name: entity_type.id
+            for entity_type in EntityType.query.filter(
+                EntityType.name.in_(["Shot", "Sequence", "Episode"])
+            )
+        }
+
+        rows = []
+        for data in data_list:
+            (data, _) = cls.sanitize_import_data(
+                dict(data), existing_preview_file_ids, entity_type_ids
+            )
+            rows.append(super(Entity, cls).build_import_row(data))
+        return rows
+
+    @classmethod
+    def import_relations(cls, data_list):
+        cls.update_links_no_commit(
+            EntityLink.__table__,
+            "entity_in_id",
+            "entity_out_id",
+            Entity,
+            {
+                data["id"]: data["entities_out"]
+                for data in data_list
+                if data.get("entities_out", None) is not None
+            },
+        )
+
+    @classmethod
+    def sanitize_import_data(
+        self, data, preview_file_ids=None, entity_type_ids=None
+    ):
+        """
+        Turn data that comes from the Zou API into entity fields. Ids of
+        existing preview files and entity type ids by name can be given to
+        avoid querying them.
+        """
         from zou.app.models.preview_file import PreviewFile
         from zou.app.models.entity_type import EntityType
 
@@ -169,8 +259,11 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
             and data["preview_file_id"] is not None
             and len(data["preview_file_id"]) > 0
         ):
-            preview_file = PreviewFile.get(data["preview_file_id"])
-            if preview_file is None:
+            if preview_file_ids is None:
+                is_found = PreviewFile.get(data["preview_file_id"]) is not None
+            else:
+                is_found = str(data["preview_file_id"]) in preview_file_ids
+            if not is_found:
                 del data["preview_file_id"]
         elif "preview_file_id" in data:
             del data["preview_file_id"]
@@ -200,8 +293,11 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
                 del data[field]
 
         if model_type in ["Shot", "Sequence", "Episode"]:
-            entity_type = EntityType.get_by(name=model_type)
-            data["entity_type_id"] = entity_type.id
+            if entity_type_ids is None:
+                entity_type = EntityType.get_by(name=model_type)
+                data["entity_type_id"] = entity_type.id
+            else:
+                data["entity_type_id"] = entity_type_ids[model_type]
 
         return (data, entity_ids)
 
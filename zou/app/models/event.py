@@ -1,8 +1,11 @@
+import datetime
+
 from sqlalchemy_utils import UUIDType
 
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
 from zou.app.models.base import BaseMixin
+from zou.app.utils import fields
 
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -11,10 +14,32 @@ class ApiEvent(db.Model, BaseMixin, SerializerMixin):
     """
     Represent notable events occuring on database (asset creation,
     task assignation, etc.).
+
+    The table is partitioned by month on the creation date (see the
+    clean_events command), so the creation date is part of the primary key.
+    Entries are still identified by their id only.
     """
 
+    id = db.Column(
+        UUIDType(binary=False), primary_key=True, default=fields.gen_uuid
+    )
+    created_at = db.Column(
+        db.DateTime,
+        primary_key=True,
+        default=datetime.datetime.utcnow,
+        index=True,
+    )
     name = db.Column(db.String(80), nullable=False, index=True)
     user_id = db.Column(
         UUIDType(binary=False), db.ForeignKey("person.id"), index=True
     )
     data = db.Column(JSONB)
+
+    __table_args__ = (
+        db.Index(
+            "ix_api_event_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
+    )
+    __mapper_args__ = {"primary_key": [id]}
@@ -54,3 +54,9 @@ class News(db.Model, BaseMixin, SerializerMixin):
         else:
             previous_data.update(data)
             return previous_data
+
+    @classmethod
+    def build_import_row(cls, data):
+        row = super(News, cls).build_import_row(data)
+        row["updated_at"] = data["created_at"]
+        return row
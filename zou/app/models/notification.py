@@ -54,6 +54,11 @@ class Notification(db.Model, BaseMixin, SerializerMixin):
             "type",
             name="notification_uc",
         ),
+        db.Index(
+            "ix_notification_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
     )
 
     def serialize(self, obj_type=None, relations=False):
@@ -78,3 +83,9 @@ class Notification(db.Model, BaseMixin, SerializerMixin):
         else:
             previous_data.update(data)
             return previous_data
+
+    @classmethod
+    def build_import_row(cls, data):
+        row = super(Notification, cls).build_import_row(data)
+        row["type"] = data.get("notification_type", "")
+        return row
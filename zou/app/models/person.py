@@ -48,6 +48,8 @@ class Person(db.Model, BaseMixin, SerializerMixin):
     notifications_enabled = db.Column(db.Boolean(), default=False)
     notifications_slack_enabled = db.Column(db.Boolean(), default=False)
     notifications_slack_userid = db.Column(db.String(60), default="")
+    notifications_digest_enabled = db.Column(db.Boolean(), default=False)
+    notifications_digest_sent_at = db.Column(db.DateTime())
 
     skills = db.relationship("Department", secondary=department_link)
 
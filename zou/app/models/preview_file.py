@@ -1,4 +1,4 @@
-from sqlalchemy_utils import UUIDType
+from sqlalchemy_utils import UUIDType, ChoiceType
 
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
@@ -6,6 +6,12 @@ from zou.app.models.base import BaseMixin
 
 from sqlalchemy.dialects.postgresql import JSONB
 
+STATUSES = [
+    ("processing", "Processing"),
+    ("ready", "Ready"),
+    ("broken", "Broken"),
+]
+
 
 class PreviewFile(db.Model, BaseMixin, SerializerMixin):
     """
@@ -21,6 +27,8 @@ class PreviewFile(db.Model, BaseMixin, SerializerMixin):
 
     source = db.Column(db.String(40))
     extension = db.Column(db.String(6))
+    thumbnail_format = db.Column(db.String(6))
+    status = db.Column(ChoiceType(STATUSES), default="ready")
     shotgun_id = db.Column(db.Integer, unique=True)
 
     is_movie = db.Column(db.Boolean, default=False)  # deprecated
@@ -42,6 +50,11 @@ class PreviewFile(db.Model, BaseMixin, SerializerMixin):
 
     __table_args__ = (
         db.UniqueConstraint("name", "task_id", "revision", name="preview_uc"),
+        db.Index(
+            "ix_preview_file_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
     )
 
     def __repr__(self):
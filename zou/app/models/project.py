@@ -4,6 +4,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
 from zou.app.models.base import BaseMixin
+from zou.app.models.person import Person
 
 
 class ProjectPersonLink(db.Model):
@@ -76,3 +77,17 @@ class Project(db.Model, BaseMixin, SerializerMixin):
             previous_project.set_team(person_ids)
 
         return previous_project
+
+    @classmethod
+    def import_relations(cls, data_list):
+        cls.update_links_no_commit(
+            ProjectPersonLink.__table__,
+            "project_id",
+            "person_id",
+            Person,
+            {
+                data["id"]: data["team"]
+                for data in data_list
+                if data.get("team", None) is not None
+            },
+        )
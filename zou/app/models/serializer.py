@@ -1,7 +1,90 @@
+import datetime
+import uuid
+
 import sqlalchemy.orm as orm
 
+from sqlalchemy import types
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.inspection import inspect
-from zou.app.utils.fields import serialize_value
+from sqlalchemy_utils import UUIDType
+from zou.app.utils.fields import serialize_orm_arrays, serialize_value
+
+
+serializers = {}
+
+
+def serialize_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return serialize_value(value)
+
+
+def serialize_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value.replace(microsecond=0).isoformat()
+    return serialize_value(value)
+
+
+def serialize_string(value):
+    if isinstance(value, str):
+        return value
+    return serialize_value(value)
+
+
+def serialize_number(value):
+    if isinstance(value, (int, float)):
+        return value
+    return serialize_value(value)
+
+
+def get_column_converter(column_type):
+    """
+    Choose the function that makes a value of given column type JSON
+    serializable. The generic `serialize_value` is used for types without a
+    dedicated function. Dedicated functions fall back on it when the value is
+    not of the expected type (it happens when an attribute was set but not
+    flushed yet).
+    """
+    if isinstance(column_type, UUIDType):
+        return serialize_uuid
+    elif isinstance(column_type, types.DateTime):
+        return serialize_datetime
+    elif isinstance(column_type, JSONB):
+        return serialize_value
+    elif isinstance(column_type, (types.String, types.Text)):
+        return serialize_string
+    elif isinstance(column_type, (types.Integer, types.Boolean, types.Float)):
+        return serialize_number
+    else:
+        return serialize_value
+
+
+def build_serializer(model):
+    """
+    Read model mapping once and build the list of fields to serialize:
+    columns with their converter, scalar relationships and list relationships.
+    List relationships are only read when relations are required, so they are
+    not loaded for nothing.
+    """
+    mapper = inspect(model)
+    fields = []
+    list_relations = []
+    for attr in mapper.attrs:
+        if isinstance(attr, orm.ColumnProperty):
+            fields.append((attr.key, get_column_converter(attr.columns[0].type)))
+        elif isinstance(attr, orm.RelationshipProperty) and attr.uselist:
+            list_relations.append(attr.key)
+        else:
+            fields.append((attr.key, serialize_value))
+    return (fields, list_relations)
+
+
+def get_serializer(model):
+    serializer = serializers.get(model, None)
+    if serializer is None:
+        serializer = build_serializer(model)
+        serializers[model] = serializer
+    return serializer
 
 
 class SerializerMixin(object):
@@ -13,17 +96,14 @@ class SerializerMixin(object):
         return isinstance(getattr(self, attr), orm.collections.InstrumentedList)
 
     def serialize(self, obj_type=None, relations=False):
-        attrs = inspect(self).attrs.keys()
+        (fields, list_relations) = get_serializer(type(self))
+        obj_dict = {}
+        for (attr, converter) in fields:
+            value = getattr(self, attr)
+            obj_dict[attr] = None if value is None else converter(value)
         if relations:
-            obj_dict = {
-                attr: serialize_value(getattr(self, attr)) for attr in attrs
-            }
-        else:
-            obj_dict = {
-                attr: serialize_value(getattr(self, attr))
-                for attr in attrs
-                if not self.is_join(attr)
-            }
+            for attr in list_relations:
+                obj_dict[attr] = serialize_orm_arrays(getattr(self, attr))
         obj_dict["type"] = obj_type or type(self).__name__
         return obj_dict
 
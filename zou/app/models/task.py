@@ -67,6 +67,11 @@ class Task(db.Model, BaseMixin, SerializerMixin):
         db.UniqueConstraint(
             "name", "project_id", "task_type_id", "entity_id", name="task_uc"
         ),
+        db.Index(
+            "ix_task_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
     )
 
     def assignees_as_string(self):
@@ -100,3 +105,19 @@ class Task(db.Model, BaseMixin, SerializerMixin):
             previous_task.set_assignees(person_ids)
 
         return previous_task
+
+    @classmethod
+    def import_relations(cls, data_list):
+        from zou.app.models.person import Person
+
+        cls.update_links_no_commit(
+            assignees_table,
+            "task",
+            "person",
+            Person,
+            {
+                data["id"]: data["assignees"]
+                for data in data_list
+                if data.get("assignees", None) is not None
+            },
+        )
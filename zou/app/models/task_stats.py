@@ -0,0 +1,26 @@
+from sqlalchemy_utils import UUIDType
+from zou.app import db
+from zou.app.models.serializer import SerializerMixin
+from zou.app.models.base import BaseMixin
+
+
+class TaskStats(db.Model, BaseMixin, SerializerMixin):
+    """
+    Number of tasks (and related frames) for a given task type and a given
+    task status inside a sequence (shot tasks) or inside an asset type
+    (asset tasks) of a project. Rows are computed from the task table and
+    refreshed when tasks change, so there is no foreign key: removing a
+    referenced entry must not be blocked by statistics.
+    """
+
+    project_id = db.Column(UUIDType(binary=False), index=True)
+    episode_id = db.Column(UUIDType(binary=False), index=True)
+    sequence_id = db.Column(UUIDType(binary=False), index=True)
+    asset_type_id = db.Column(UUIDType(binary=False), index=True)
+    task_type_id = db.Column(UUIDType(binary=False))
+    task_status_id = db.Column(UUIDType(binary=False))
+    count = db.Column(db.Integer, default=0)
+    frames = db.Column(db.Integer, default=0)
+
+    def __repr__(self):
+        return "<TaskStats %s>" % self.id
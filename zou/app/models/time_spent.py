@@ -23,4 +23,9 @@ class TimeSpent(db.Model, BaseMixin, SerializerMixin):
         db.UniqueConstraint(
             "person_id", "task_id", "date", name="time_spent_uc"
         ),
+        db.Index(
+            "ix_time_spent_updated_at_id",
+            db.text("coalesce(updated_at, created_at)"),
+            "id",
+        ),
     )
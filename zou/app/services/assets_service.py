@@ -1,3 +1,4 @@
+from sqlalchemy import func, select
 from sqlalchemy.exc import StatementError
 
 from zou.app.utils import events, fields, cache
@@ -9,10 +10,12 @@ from zou.app.models.project import Project
 from zou.app.models.task import Task
 from zou.app.models.asset_instance import AssetInstance
 from zou.app.models.task import assignees_table
+from zou.app.models.task_stats import TaskStats
 
 from zou.app.services import (
     base_service,
     deletion_service,
+    entities_service,
     projects_service,
     shots_service,
 )
@@ -117,15 +120,43 @@ def get_assets_and_tasks(criterions={}, page=1):
     """
     Get all assets for given criterions with related tasks for each asset.
     """
-    asset_map = {}
-    task_map = {}
+    return list(get_assets_and_tasks_iterator(criterions))
+
+
+def get_assets_and_tasks_iterator(criterions={}):
+    """
+    Yield, one by one, all assets for given criterions with related tasks for
+    each asset. Only needed columns are selected and assignees are aggregated
+    by the database, so there is one row per task and no model is built.
+    Rows are read progressively, which allows to stream the result.
+    """
+    assignees = (
+        select(
+            [
+                assignees_table.columns.task,
+                func.array_agg(assignees_table.columns.person).label(
+                    "persons"
+                ),
+            ]
+        )
+        .group_by(assignees_table.columns.task)
+        .alias("task_assignees")
+    )
 
     query = (
         Entity.query.filter(build_asset_type_filter())
         .join(EntityType)
         .outerjoin(Task)
-        .outerjoin(assignees_table)
-        .add_columns(
+        .outerjoin(assignees, assignees.columns.task == Task.id)
+        .with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.description,
+            Entity.canceled,
+            Entity.data,
+            Entity.entity_type_id,
+            Entity.preview_file_id,
+            Entity.source_id,
             EntityType.name,
             Task.id,
             Task.task_type_id,
@@ -139,9 +170,8 @@ def get_assets_and_tasks(criterions={}, page=1):
             Task.start_date,
             Task.due_date,
             Task.last_comment_date,
-            assignees_table.columns.person,
+            assignees.columns.persons,
         )
-        .order_by(EntityType.name, Entity.name)
     )
 
     if "id" in criterions:
@@ -153,8 +183,20 @@ def get_assets_and_tasks(criterions={}, page=1):
     if "episode_id" in criterions:
         query = query.filter(Entity.source_id == criterions["episode_id"])
 
+    # Entity.id makes sure that rows of a same asset are contiguous.
+    query = query.order_by(EntityType.name, Entity.name, Entity.id)
+    query = query.yield_per(1000)
+
+    asset_dict = None
     for (
-        asset,
+        asset_id,
+        asset_name,
+        asset_description,
+        asset_canceled,
+        asset_data,
+        asset_entity_type_id,
+        asset_preview_file_id,
+        asset_source_id,
         entity_type_name,
         task_id,
         task_type_id,
@@ -168,33 +210,37 @@ def get_assets_and_tasks(criterions={}, page=1):
         task_start_date,
         task_due_date,
         task_last_comment_date,
-        person_id,
-    ) in query.all():
-
-        if asset.source_id is None:
-            source_id = ""
-        else:
-            source_id = str(asset.source_id)
-
-        if asset.id not in asset_map:
-            asset_map[asset.id] = {
-                "id": str(asset.id),
-                "name": asset.name,
-                "preview_file_id": str(asset.preview_file_id or ""),
-                "description": asset.description,
+        person_ids,
+    ) in query:
+        asset_id = str(asset_id)
+
+        if asset_dict is None or asset_dict["id"] != asset_id:
+            if asset_dict is not None:
+                yield asset_dict
+
+            if asset_source_id is None:
+                source_id = ""
+            else:
+                source_id = str(asset_source_id)
+
+            asset_dict = {
+                "id": asset_id,
+                "name": asset_name,
+                "preview_file_id": str(asset_preview_file_id or ""),
+                "description": asset_description,
                 "asset_type_name": entity_type_name,
-                "asset_type_id": str(asset.entity_type_id),
-                "canceled": asset.canceled,
+                "asset_type_id": str(asset_entity_type_id),
+                "canceled": asset_canceled,
                 "episode_id": source_id,
-                "data": fields.serialize_value(asset.data),
+                "data": fields.serialize_value(asset_data),
                 "tasks": [],
             }
 
         if task_id is not None:
-            if task_id not in task_map:
-                task_dict = {
+            asset_dict["tasks"].append(
+                {
                     "id": str(task_id),
-                    "entity_id": str(asset.id),
+                    "entity_id": asset_id,
                     "task_status_id": str(task_status_id),
                     "task_type_id": str(task_type_id),
                     "priority": task_priority or 0,
@@ -210,16 +256,14 @@ def get_assets_and_tasks(criterions={}, page=1):
                     "last_comment_date": fields.serialize_value(
                         task_last_comment_date
                     ),
-                    "assignees": [],
+                    "assignees": [
+                        str(person_id) for person_id in person_ids or []
+                    ],
                 }
-                task_map[task_id] = task_dict
-                asset_dict = asset_map[asset.id]
-                asset_dict["tasks"].append(task_dict)
-
-            if person_id:
-                task_map[task_id]["assignees"].append(str(person_id))
+            )
 
-    return list(asset_map.values())
+    if asset_dict is not None:
+        yield asset_dict
 
 
 @cache.memoize_function(240)
@@ -249,6 +293,16 @@ def get_asset_types_for_project(project_id):
     return EntityType.serialize_list(result, obj_type="AssetType")
 
 
+def get_asset_type_stats_for_project(project_id):
+    """
+    Retrieve number of tasks by status, task_types and asset types
+    for given project.
+    """
+    return shots_service.get_task_stats_for_project(
+        project_id, TaskStats.asset_type_id
+    )
+
+
 def get_asset_types_for_shot(shot_id):
     """
     Retrieve all asset types related to asset casted in a given shot.
@@ -315,7 +369,7 @@ def get_raw_asset_by_shotgun_id(shotgun_id):
     return get_asset_raw(asset["id"])
 
 
-@cache.memoize_function(3)
+@cache.memoize_function(3600)
 def get_full_asset(asset_id):
     """
     Return asset matching given id with additional information (project name,
@@ -470,19 +524,21 @@ def create_asset(
     asset_dict = asset.serialize(obj_type="Asset")
     events.emit(
         "asset:new",
-        {
-            "asset_id": asset.id,
-            "asset_type": asset_type.id,
-            "project_id": project.id,
-        },
+        {"asset_id": asset.id, "asset_type": asset_type.id},
+        project_id=project.id,
     )
     return asset_dict
 
 
 def update_asset(asset_id, data):
     asset = get_asset_raw(asset_id)
+    (parent_id, entity_type_id) = (asset.parent_id, asset.entity_type_id)
     asset.update(data)
-    events.emit("asset:update", {"asset_id": asset_id, "data": data})
+    event_data = {"asset_id": asset_id, "data": data}
+    event_data.update(
+        entities_service.get_move_data(asset, parent_id, entity_type_id)
+    )
+    events.emit("asset:update", event_data, project_id=asset.project_id)
     return asset.serialize(obj_type="Asset")
 
 
@@ -493,7 +549,9 @@ def remove_asset(asset_id, force=False):
     if is_tasks_related and not force:
         asset.update({"canceled": True})
         clear_asset_cache(str(asset_id))
-        events.emit("asset:update", {"asset_id": asset_id})
+        events.emit(
+            "asset:update", {"asset_id": asset_id}, project_id=asset.project_id
+        )
     else:
         from zou.app.services import tasks_service
 
@@ -503,7 +561,9 @@ def remove_asset(asset_id, force=False):
             tasks_service.clear_task_cache(str(task.id))
         asset.delete()
         clear_asset_cache(str(asset_id))
-        events.emit("asset:delete", {"asset_id": asset_id})
+        events.emit(
+            "asset:delete", {"asset_id": asset_id}, project_id=asset.project_id
+        )
     deleted_asset = asset.serialize(obj_type="Asset")
     return deleted_asset
 
@@ -552,5 +612,7 @@ def cancel_asset(asset_id, force=True):
 
     asset.update({"canceled": True})
     asset_dict = asset.serialize(obj_type="Asset")
-    events.emit("asset:delete", {"asset_id": asset_id})
+    events.emit(
+        "asset:delete", {"asset_id": asset_id}, project_id=asset.project_id
+    )
     return asset_dict
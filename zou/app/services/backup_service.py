@@ -1,5 +1,7 @@
 import datetime
+import functools
 import gzip
+import itertools
 import os
 
 from sh import pg_dump
@@ -10,7 +12,7 @@ from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project import Project
 
 from zou.app.stores import file_store
-from zou.app.utils import date_helpers
+from zou.app.utils import date_helpers, transfer_utils
 
 from flask_fs.backends.local import LocalBackend
 
@@ -26,6 +28,24 @@ local_file = LocalBackend(
     "local", {"root": os.path.join(preview_folder, "files")}
 )
 
+storage_functions = {
+    "picture": (
+        file_store.add_picture,
+        file_store.open_picture,
+        file_store.get_picture_file_size,
+    ),
+    "movie": (
+        file_store.add_movie,
+        file_store.open_movie,
+        file_store.get_movie_file_size,
+    ),
+    "file": (
+        file_store.add_file,
+        file_store.open_file,
+        file_store.get_file_size,
+    ),
+}
+
 
 def generate_db_backup(host, port, user, password, database):
     """
@@ -59,101 +79,125 @@ def store_db_backup(filename):
         file_store.add_file("dbbackup", filename, filename)
 
 
-def upload_preview_files_to_storage(days=None):
+def upload_preview_files_to_storage(
+    days=None, max_workers=4, manifest_path=None
+):
     """
     Upload all thumbnail and original files for preview entries to object
-    storage.
+    storage. Files already stored with the same size are skipped.
     """
     query = PreviewFile.query
     if days is not None:
         limit_date = date_helpers.get_date_from_now(int(days))
         query = query.filter(PreviewFile.updated_at >= limit_date)
 
-    for preview_file in query.all():
-        upload_preview(preview_file)
-
-
-def upload_entity_thumbnail(entity):
-    """
-    Upload thumbnail file for given entity to object storage.
-    """
-    preview_folder = os.getenv("PREVIEW_FOLDER", "/opt/zou/previews")
-    local = LocalBackend(
-        "local", {"root": os.path.join(preview_folder, "pictures")}
+    transfers = itertools.chain.from_iterable(
+        get_preview_upload_transfers(preview_file)
+        for preview_file in query.all()
+    )
+    return transfer_utils.run_transfers(
+        transfers, max_workers=max_workers, manifest_path=manifest_path
     )
-
-    file_path = local.path("thumbnails-" + str(entity.id))
-    if entity.has_avatar:
-        file_store.add_picture("thumbnails", str(entity.id), file_path)
-        print("%s uploaded" % file_path)
 
 
-def upload_preview(preview_file):
+def get_local_preview_files(preview_file):
     """
-    Upload all files link to preview file entry: orginal file and variants.
+    Return files linked to given preview file entry, as tuples (prefix,
+    storage kind, local path): the preview itself and its variants.
     """
-    print("upload preview %s (%s)" % (preview_file.id, preview_file.extension))
-
-    preview_folder = os.getenv("PREVIEW_FOLDER", "/opt/zou/previews")
-    local_picture = LocalBackend(
-        "local", {"root": os.path.join(preview_folder, "pictures")}
-    )
-    local_movie = LocalBackend(
-        "local", {"root": os.path.join(preview_folder, "movies")}
-    )
-    local_file = LocalBackend(
-        "local", {"root": os.path.join(preview_folder, "files")}
-    )
-
+    preview_file_id = str(preview_file.id)
     is_movie = preview_file.extension == "mp4"
     is_picture = preview_file.extension == "png"
-    is_file = not is_movie and not is_picture
 
-    preview_file_id = str(preview_file.id)
+    files = []
+    if is_movie or is_picture:
+        for prefix in ["thumbnails", "thumbnails-square", "original"]:
+            files.append(
+                (
+                    prefix,
+                    "picture",
+                    local_picture.path("%s-%s" % (prefix, preview_file_id)),
+                )
+            )
+
     file_key = "previews-%s" % preview_file_id
     if is_picture:
-        file_path = local_picture.path(file_key)
-        ul_func = file_store.add_picture
-        exists_func = file_store.exists_picture
+        files.append(("previews", "picture", local_picture.path(file_key)))
     elif is_movie:
-        file_path = local_movie.path(file_key)
-        ul_func = file_store.add_movie
-        exists_func = file_store.exists_movie
-    elif is_file:
-        file_path = local_file.path(file_key)
-        ul_func = file_store.add_file
-        exists_func = file_store.exists_file
+        files.append(("previews", "movie", local_movie.path(file_key)))
+    else:
+        files.append(("previews", "file", local_file.path(file_key)))
+    return files
 
-    if is_movie or is_picture:
-        for prefix in ["thumbnails", "thumbnails-square", "original"]:
-            pic_file_path = local_picture.path(
-                "%s-%s" % (prefix, str(preview_file.id))
-            )
-            if os.path.exists(pic_file_path) and not file_store.exists_picture(
-                prefix, preview_file_id
-            ):
-                file_store.add_picture(prefix, preview_file_id, pic_file_path)
 
-    prefix = "previews"
-    if os.path.exists(file_path) and not exists_func(prefix, preview_file_id):
-        ul_func(prefix, preview_file_id, file_path)
-    print("%s uploaded" % file_path)
+def get_preview_upload_transfers(preview_file):
+    return [
+        build_upload_transfer(kind, prefix, str(preview_file.id), file_path)
+        for (prefix, kind, file_path) in get_local_preview_files(preview_file)
+    ]
+
+
+def build_upload_transfer(kind, prefix, instance_id, file_path):
+    """
+    Build the transfer of given local file to the object storage.
+    """
+    (add_func, _, get_size_func) = storage_functions[kind]
+    return transfer_utils.Transfer(
+        key="upload:%s:%s-%s" % (kind, prefix, instance_id),
+        run=functools.partial(
+            run_in_app_context, add_func, prefix, instance_id, file_path
+        ),
+        get_source_size=functools.partial(
+            transfer_utils.get_local_file_size, file_path
+        ),
+        get_destination_size=functools.partial(
+            run_in_app_context,
+            transfer_utils.get_size_or_none,
+            get_size_func,
+            prefix,
+            instance_id,
+        ),
+    )
+
 
+def run_in_app_context(func, *args):
+    """
+    Run given storage function from a worker thread.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        return func(*args)
 
-def upload_entity_thumbnails_to_storage(days=None):
+
+def upload_entity_thumbnails_to_storage(
+    days=None, max_workers=4, manifest_path=None
+):
     """
     Upload all thumbnail files for non preview entries to object storage.
     """
-    upload_entity_thumbnails(Project, days)
-    upload_entity_thumbnails(Organisation, days)
-    upload_entity_thumbnails(Person, days)
+    transfers = itertools.chain(
+        get_entity_thumbnail_upload_transfers(Project, days),
+        get_entity_thumbnail_upload_transfers(Organisation, days),
+        get_entity_thumbnail_upload_transfers(Person, days),
+    )
+    return transfer_utils.run_transfers(
+        transfers, max_workers=max_workers, manifest_path=manifest_path
+    )
 
 
-def upload_entity_thumbnails(model, days=None):
-    query = model.query
+def get_entity_thumbnail_upload_transfers(model, days=None):
+    query = model.query.filter(model.has_avatar == True)
     if days is not None:
         limit_date = date_helpers.get_date_from_now(int(days))
         query = query.filter(model.updated_at >= limit_date)
 
-    for entity in query.all():
-        upload_entity_thumbnail(entity)
+    return [
+        build_upload_transfer(
+            "picture",
+            "thumbnails",
+            str(entity.id),
+            local_picture.path("thumbnails-%s" % entity.id),
+        )
+        for entity in query.all()
+    ]
@@ -2,6 +2,7 @@ from slugify import slugify
 from sqlalchemy import desc
 from sqlalchemy.orm import aliased
 
+from zou.app import db
 from zou.app.models.asset_instance import AssetInstance
 from zou.app.models.entity import Entity, EntityLink
 from zou.app.models.entity_type import EntityType
@@ -90,6 +91,74 @@ def get_sequence_casting(sequence_id):
     return castings
 
 
+def get_project_casting_iterator(project_id, episode_id=None):
+    """
+    Yield, shot by shot, the casting of all shots of given project (or of
+    given episode) as dictionaries with a `shot_id` and a `casting` field.
+    The casting of all shots is read with a single query, progressively,
+    which allows to stream the result.
+    """
+    shot_type = shots_service.get_shot_type()
+    Shot = aliased(Entity, name="shot")
+    query = (
+        EntityLink.query.join(Shot, EntityLink.entity_in_id == Shot.id)
+        .join(Entity, EntityLink.entity_out_id == Entity.id)
+        .join(EntityType, Entity.entity_type_id == EntityType.id)
+        .filter(Shot.project_id == project_id)
+        .filter(Shot.entity_type_id == shot_type["id"])
+        .filter(Entity.canceled != True)
+        .add_columns(Entity.name, EntityType.name, Entity.preview_file_id)
+    )
+    if episode_id is not None:
+        Sequence = aliased(Entity, name="sequence")
+        query = query.join(Sequence, Shot.parent_id == Sequence.id).filter(
+            Sequence.parent_id == episode_id
+        )
+
+    # Links of a same shot must be contiguous to yield each shot as soon as
+    # its casting is read.
+    query = query.order_by(Shot.id, EntityType.name, Entity.name).yield_per(
+        1000
+    )
+
+    shot_casting = None
+    for (link, entity_name, entity_type_name, entity_preview_file_id) in query:
+        shot_id = str(link.entity_in_id)
+        if shot_casting is None or shot_casting["shot_id"] != shot_id:
+            if shot_casting is not None:
+                yield shot_casting
+            shot_casting = {"shot_id": shot_id, "casting": []}
+        shot_casting["casting"].append(
+            {
+                "asset_id": fields.serialize_value(link.entity_out_id),
+                "name": entity_name,
+                "asset_name": entity_name,
+                "asset_type_name": entity_type_name,
+                "preview_file_id": fields.serialize_value(
+                    entity_preview_file_id
+                ),
+                "nb_occurences": link.nb_occurences,
+                "label": link.label,
+            }
+        )
+    if shot_casting is not None:
+        yield shot_casting
+
+
+def get_project_casting(project_id, episode_id=None):
+    """
+    Return the casting of all shots of given project (or of given episode).
+    Result is returned as a map where keys are shot IDs and values are
+    casting for given shot, like for sequence casting.
+    """
+    castings = {}
+    for shot_casting in get_project_casting_iterator(
+        project_id, episode_id=episode_id
+    ):
+        castings[shot_casting["shot_id"]] = shot_casting["casting"]
+    return castings
+
+
 def get_asset_type_casting(project_id, asset_type_id):
     """
     Return all assets and their number of occurences listed in asset of given
@@ -132,32 +201,105 @@ def update_casting(entity_id, casting):
     """
     Update casting for given entity. Casting is an array of dictionaries made of
     two fields: `asset_id` and `nb_occurences`.
+
+    The new casting is compared with existing links: only missing links are
+    inserted, changed ones updated and removed ones deleted, in a single
+    transaction.
     """
     entity = entities_service.get_entity_raw(entity_id)
-    entity.update({"entities_out": []})
-    casting_ids = []
+    new_links = {}
     for cast in casting:
         if "asset_id" in cast and "nb_occurences" in cast:
-            create_casting_link(
-                entity.id,
-                cast["asset_id"],
-                nb_occurences=cast["nb_occurences"],
-                label=cast.get("label", ""),
-            )
+            new_links[str(cast["asset_id"])] = {
+                "nb_occurences": cast["nb_occurences"],
+                "label": cast.get("label", "") or "",
+            }
+    casting_ids = list(new_links.keys())
+
+    existing_links = {}
+    for link in EntityLink.query.filter_by(entity_in_id=entity.id):
+        existing_links[str(link.entity_out_id)] = link
+    (links_to_create, links_to_update, asset_ids_to_delete) = diff_casting(
+        entity.id, existing_links, new_links
+    )
+    apply_casting_diff(
+        entity.id, links_to_create, links_to_update, asset_ids_to_delete
+    )
+
     entity_id = str(entity.id)
+    project_id = entity.project_id
     if shots_service.is_shot(entity.serialize()):
         events.emit(
-            "shot:casting-update", {"shot": entity_id, "casting": casting_ids}
+            "shot:casting-update",
+            {"shot": entity_id, "casting": casting_ids},
+            project_id=project_id,
+        )
+        events.emit(
+            "shot:update", {"shot_id": entity_id}, project_id=project_id
         )
-        events.emit("shot:update", {"shot_id": entity_id})
     else:
         events.emit(
-            "asset:casting-update", {"asset": entity_id, "casting": casting_ids}
+            "asset:casting-update",
+            {"asset": entity_id, "casting": casting_ids},
+            project_id=project_id,
+        )
+        events.emit(
+            "asset:update", {"asset_id": entity_id}, project_id=project_id
         )
-        events.emit("asset:update", {"asset_id": entity_id})
     return casting
 
 
+def diff_casting(entity_in_id, existing_links, new_links):
+    """
+    Compare existing links (a map of links by asset id) with the new casting
+    (a map of occurences and label by asset id). It returns rows of links to
+    create, rows of links to update and asset ids of links to delete.
+    """
+    links_to_create = []
+    links_to_update = []
+    for (asset_id, values) in new_links.items():
+        row = dict(values, entity_in_id=entity_in_id, entity_out_id=asset_id)
+        link = existing_links.get(asset_id, None)
+        if link is None:
+            links_to_create.append(row)
+        elif (
+            link.nb_occurences != values["nb_occurences"]
+            or (link.label or "") != values["label"]
+        ):
+            # The id is part of the mapped primary key of links.
+            links_to_update.append(dict(row, id=link.id))
+    asset_ids_to_delete = [
+        asset_id for asset_id in existing_links if asset_id not in new_links
+    ]
+    return (links_to_create, links_to_update, asset_ids_to_delete)
+
+
+def apply_casting_diff(
+    entity_in_id, links_to_create, links_to_update, asset_ids_to_delete
+):
+    """
+    Apply a casting diff with one request per kind of change.
+    """
+    try:
+        if len(asset_ids_to_delete) > 0:
+            EntityLink.query.filter(
+                EntityLink.entity_in_id == entity_in_id
+            ).filter(EntityLink.entity_out_id.in_(asset_ids_to_delete)).delete(
+                synchronize_session=False
+            )
+        if len(links_to_update) > 0:
+            db.session.bulk_update_mappings(EntityLink, links_to_update)
+        if len(links_to_create) > 0:
+            db.session.execute(
+                EntityLink.__table__.insert().values(links_to_create)
+            )
+        db.session.commit()
+    except:
+        db.session.rollback()
+        db.session.remove()
+        raise
+
+
 def create_casting_link(entity_in_id, asset_id, nb_occurences=1, label=""):
     """
     Add a link between given entity and given asset.
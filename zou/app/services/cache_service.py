@@ -0,0 +1,354 @@
+"""
+Declare which memoized results become outdated when an event is emitted.
+The invalidation map is registered at startup and applied by `events.emit`,
+so every mutation that emits an event clears the related cache entries.
+
+Each event name is linked to a list of (memoized function, key) pairs. The
+key describes which entry to remove:
+
+* None: all entries of the function are removed.
+* a string: the name of the event data field that contains the function
+  argument.
+* a function: it receives event data and returns the list of arguments for
+  which the entries must be removed (or None to remove all entries). For
+  functions taking several parameters, each item is a tuple of arguments.
+"""
+from zou.app.models.task import Task
+
+from zou.app.services import (
+    assets_service,
+    custom_actions_service,
+    entities_service,
+    files_service,
+    news_service,
+    persons_service,
+    projects_service,
+    shots_service,
+    tasks_service,
+    time_spents_service,
+    user_service,
+)
+
+
+def get_task_entity_ids(data):
+    """
+    Return the id of the entity related to the task given in event data. If
+    the task is not found (it was deleted), it returns None, which leads to
+    the removal of all entries.
+    """
+    task_id = data.get("task_id", None)
+    if task_id is None:
+        return None
+    task = Task.query.with_entities(Task.entity_id).filter_by(id=task_id)
+    task = task.first()
+    if task is None:
+        return None
+    return [str(task.entity_id)]
+
+
+def get_team_member_ids(data):
+    """
+    Return the id of the person added to or removed from a project team. For
+    other project changes, it returns None, which leads to the removal of all
+    entries.
+    """
+    person_id = data.get("person_id", None)
+    if person_id is None:
+        return None
+    return [person_id]
+
+
+def get_batch_entity_ids(data):
+    """
+    Return ids of the entities related to tasks created or removed in bulk.
+    """
+    return data.get("entity_ids", None)
+
+
+def get_batch_task_ids(data):
+    """
+    Return ids of the tasks removed in bulk.
+    """
+    return data.get("task_ids", None)
+
+
+task_events = [
+    "task:new",
+    "task:update",
+    "task:delete",
+    "task:assign",
+    "task:unassign",
+    "task:start",
+    "task:to-review",
+]
+shot_events = ["shot:update", "shot:delete"]
+asset_events = ["asset:update", "asset:delete"]
+sequence_events = ["sequence:update", "sequence:delete"]
+episode_events = ["episode:update", "episode:delete"]
+scene_events = ["scene:update", "scene:delete"]
+person_events = ["person:new", "person:update", "person:delete"]
+project_events = ["project:new", "project:update", "project:delete"]
+project_status_events = [
+    "project-status:new",
+    "project-status:update",
+    "project-status:delete",
+]
+metadata_descriptor_events = [
+    "metadata-descriptor:new",
+    "metadata-descriptor:update",
+    "metadata-descriptor:delete",
+]
+entity_type_events = [
+    "asset-type:new",
+    "asset-type:update",
+    "asset-type:delete",
+]
+task_type_events = [
+    "task-type:new",
+    "task-type:update",
+    "task-type:delete",
+    "task_type:new",
+    "task_type:update",
+]
+task_status_events = [
+    "task-status:new",
+    "task-status:update",
+    "task-status:delete",
+    "task_status:new",
+    "task_status:update",
+]
+comment_events = ["comment:update", "comment:delete"]
+preview_file_events = [
+    "preview-file:update",
+    "preview-file:delete",
+    "preview-file:add-file",
+    "preview-file:processing",
+    "preview-file:ready",
+    "preview_file:delete",
+]
+custom_action_events = [
+    "custom-action:new",
+    "custom-action:update",
+    "custom-action:delete",
+]
+search_filter_events = [
+    "search-filter:new",
+    "search-filter:update",
+    "search-filter:delete",
+]
+news_events = ["news:new", "news:update", "news:delete"]
+time_spent_events = [
+    "time-spent:new",
+    "time-spent:update",
+    "time-spent:delete",
+]
+
+
+def build_invalidation_map():
+    """
+    Build the map linking event names to the memoized functions they make
+    outdated.
+    """
+    invalidation_map = {}
+
+    def add(event_names, targets):
+        for event_name in event_names:
+            invalidation_map.setdefault(event_name, []).extend(targets)
+
+    add(
+        task_events,
+        [
+            (tasks_service.get_task, "task_id"),
+            (tasks_service.get_task_with_relations, "task_id"),
+            (tasks_service.get_full_task, "task_id"),
+            (shots_service.get_full_shot, get_task_entity_ids),
+            (assets_service.get_full_asset, get_task_entity_ids),
+        ],
+    )
+    add(
+        ["task:new-batch", "task:delete-batch"],
+        [
+            (shots_service.get_full_shot, get_batch_entity_ids),
+            (assets_service.get_full_asset, get_batch_entity_ids),
+        ],
+    )
+    add(
+        ["task:delete-batch"],
+        [
+            (tasks_service.get_task, get_batch_task_ids),
+            (tasks_service.get_task_with_relations, get_batch_task_ids),
+            (tasks_service.get_full_task, get_batch_task_ids),
+        ],
+    )
+    add(
+        shot_events,
+        [
+            (shots_service.get_shot, "shot_id"),
+            (shots_service.get_shot_with_relations, "shot_id"),
+            (shots_service.get_full_shot, "shot_id"),
+            (entities_service.get_entity, "shot_id"),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(
+        ["shot:casting-update"],
+        [
+            (shots_service.get_shot_with_relations, "shot"),
+            (entities_service.get_entity, "shot"),
+            (assets_service.get_asset_with_relations, None),
+        ],
+    )
+    add(
+        asset_events,
+        [
+            (assets_service.get_asset, "asset_id"),
+            (assets_service.get_asset_with_relations, "asset_id"),
+            (assets_service.get_full_asset, "asset_id"),
+            (entities_service.get_entity, "asset_id"),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(
+        ["asset:casting-update"],
+        [
+            (assets_service.get_asset_with_relations, "asset"),
+            (assets_service.get_full_asset, "asset"),
+            (entities_service.get_entity, "asset"),
+        ],
+    )
+    add(
+        sequence_events + episode_events,
+        [
+            (shots_service.get_full_shot, None),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(sequence_events, [(entities_service.get_entity, "sequence_id")])
+    add(episode_events, [(entities_service.get_entity, "episode_id")])
+    add(scene_events, [(entities_service.get_entity, "scene_id")])
+    add(
+        entity_type_events,
+        [
+            (entities_service.get_entity_type, "asset_type_id"),
+            (entities_service.get_entity_type_by_name, None),
+            (assets_service.get_asset_type, "asset_type_id"),
+            (assets_service.get_asset_types, None),
+            (assets_service.get_full_asset, None),
+            (shots_service.get_episode_type, None),
+            (shots_service.get_sequence_type, None),
+            (shots_service.get_shot_type, None),
+            (shots_service.get_scene_type, None),
+            (shots_service.get_camera_type, None),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(
+        person_events,
+        [
+            (persons_service.get_person, "person_id"),
+            (persons_service.get_person_by_email, None),
+            (persons_service.get_person_by_email_username, None),
+            (persons_service.get_person_by_desktop_login, None),
+            (persons_service.get_active_persons, None),
+            (persons_service.get_persons, None),
+            (tasks_service.get_full_task, None),
+            (user_service.get_project_access, "person_id"),
+        ],
+    )
+    add(
+        ["person:delete"],
+        [
+            (projects_service.get_project_with_relations, None),
+            (projects_service.open_projects, None),
+        ],
+    )
+    add(
+        project_events,
+        [
+            (projects_service.get_project, "project_id"),
+            (projects_service.get_project_with_relations, "project_id"),
+            (projects_service.get_project_by_name, None),
+            (projects_service.open_projects, None),
+            (shots_service.get_full_shot, None),
+            (assets_service.get_full_asset, None),
+            (tasks_service.get_full_task, None),
+            (user_service.get_project_access, get_team_member_ids),
+        ],
+    )
+    add(
+        metadata_descriptor_events,
+        [
+            (projects_service.get_project, None),
+            (projects_service.get_project_with_relations, None),
+            (projects_service.get_project_by_name, None),
+            (projects_service.open_projects, None),
+        ],
+    )
+    add(
+        project_status_events,
+        [
+            (projects_service.get_project_statuses, None),
+            (projects_service.get_open_status, None),
+            (projects_service.get_closed_status, None),
+            (projects_service.open_projects, None),
+            (user_service.get_project_access, None),
+        ],
+    )
+    add(
+        task_type_events,
+        [
+            (tasks_service.get_task_type, "task_type_id"),
+            (tasks_service.get_task_types, None),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(
+        task_status_events,
+        [
+            (tasks_service.get_task_status, "task_status_id"),
+            (tasks_service.get_task_statuses, None),
+            (tasks_service.get_done_status, None),
+            (tasks_service.get_wip_status, None),
+            (tasks_service.get_to_review_status, None),
+            (tasks_service.get_todo_status, None),
+            (tasks_service.get_full_task, None),
+        ],
+    )
+    add(comment_events, [(tasks_service.get_comment, "comment_id")])
+    add(
+        preview_file_events,
+        [(files_service.get_preview_file, "preview_file_id")],
+    )
+    add(
+        ["preview-file:set-main"],
+        [
+            (entities_service.get_entity, "entity_id"),
+            (shots_service.get_shot, "entity_id"),
+            (shots_service.get_shot_with_relations, "entity_id"),
+            (shots_service.get_full_shot, "entity_id"),
+            (assets_service.get_asset, "entity_id"),
+            (assets_service.get_asset_with_relations, "entity_id"),
+            (assets_service.get_full_asset, "entity_id"),
+        ],
+    )
+    add(
+        custom_action_events,
+        [(custom_actions_service.get_custom_actions, None)],
+    )
+    add(search_filter_events, [(user_service.get_filters, None)])
+    add(news_events, [(news_service.get_news, None)])
+    add(
+        time_spent_events,
+        [
+            (
+                time_spents_service.get_table,
+                time_spents_service.get_table_arguments,
+            )
+        ],
+    )
+    # Time spents are removed along with their task or person.
+    add(
+        ["task:delete", "task:delete-batch", "person:delete"],
+        [(time_spents_service.get_table, None)],
+    )
+    return invalidation_map
@@ -1,8 +1,18 @@
+from flask import current_app
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 
-from zou.app.models.comment import Comment
+from zou.app import config, db
+from zou.app.models.asset_instance import AssetInstance
+from zou.app.models.build_job import BuildJob
+from zou.app.models.comment import Comment, mentions_table, preview_link_table
 from zou.app.models.desktop_login_log import DesktopLoginLog
-from zou.app.models.entity import Entity, EntityLink
+from zou.app.models.entity import (
+    AssetInstanceLink,
+    Entity,
+    EntityLink,
+    EntityVersion,
+)
 from zou.app.models.metadata_descriptor import MetadataDescriptor
 from zou.app.models.login_log import LoginLog
 from zou.app.models.notification import Notification
@@ -12,23 +22,31 @@ from zou.app.models.output_file import OutputFile
 from zou.app.models.person import Person
 from zou.app.models.playlist import Playlist
 from zou.app.models.preview_file import PreviewFile
-from zou.app.models.project import Project
+from zou.app.models.project import Project, ProjectPersonLink
 from zou.app.models.schedule_item import ScheduleItem
 from zou.app.models.search_filter import SearchFilter
 from zou.app.models.subscription import Subscription
-from zou.app.models.task import Task
+from zou.app.models.task import Task, assignees_table
+from zou.app.models.task_stats import TaskStats
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.time_spent import TimeSpent
 from zou.app.models.working_file import WorkingFile
 
 from zou.app.utils import events
-from zou.app.stores import file_store
+from zou.app.stores import file_store, queue_store
 
 from zou.app.services.exception import (
     CommentNotFoundException,
     ModelWithRelationsDeletionException,
 )
 
+# Number of tasks removed in a single transaction.
+DELETION_CHUNK_SIZE = 500
+# Number of preview files handled by a single storage removal job.
+FILE_REMOVAL_BATCH_SIZE = 1000
+# Pictures stored for each preview file of type picture or movie.
+PICTURE_TYPES = ["original", "thumbnails", "thumbnails-square", "previews"]
+
 
 def remove_comment(comment_id):
     comment = Comment.get(comment_id)
@@ -129,49 +147,18 @@ def remove_task(task_id, force=False):
     related. This will lead to the deletion of all of them.
     """
     task = Task.get(task_id)
+    task_dict = task.serialize()
     if force:
-        working_files = WorkingFile.query.filter_by(task_id=task_id)
-        for working_file in working_files:
-            output_files = OutputFile.query.filter_by(
-                source_file_id=working_file.id
-            )
-            for output_file in output_files:
-                output_file.delete()
-            working_file.delete()
-
-        comments = Comment.query.filter_by(object_id=task_id)
-        for comment in comments:
-            notifications = Notification.query.filter_by(comment_id=comment.id)
-            for notification in notifications:
-                notification.delete()
-            news_list = News.query.filter_by(comment_id=comment.id)
-            for news in news_list:
-                news.delete()
-            comment.delete()
-
-        subscriptions = Subscription.query.filter_by(task_id=task_id)
-        for subscription in subscriptions:
-            subscription.delete()
-
-        preview_files = PreviewFile.query.filter_by(task_id=task_id)
-        for preview_file in preview_files:
-            remove_preview_file(preview_file)
-
-        time_spents = TimeSpent.query.filter_by(task_id=task_id)
-        for time_spent in time_spents:
-            time_spent.delete()
-
-        notifications = Notification.query.filter_by(task_id=task_id)
-        for notification in notifications:
-            notification.delete()
-
-        news_list = News.query.filter_by(task_id=task.id)
-        for news in news_list:
-            news.delete()
-
-    task.delete()
-    events.emit("task:delete", {"task_id": task_id})
-    return task.serialize()
+        preview_files = run_in_transaction(remove_task_chunk, [task_id])
+        schedule_files_removal(preview_files)
+    else:
+        task.delete()
+    events.emit(
+        "task:delete",
+        {"task_id": task_id, "entity_id": task_dict["entity_id"]},
+        project_id=task_dict["project_id"],
+    )
+    return task_dict
 
 
 def remove_preview_file_by_id(preview_file_id):
@@ -194,34 +181,36 @@ def remove_preview_file(preview_file):
     if news is not None:
         news.update({"preview_file_id": None})
 
-    if preview_file.extension == "png":
-        clear_picture_files(preview_file.id)
-    elif preview_file.extension == "mp4":
-        clear_movie_files(preview_file.id)
-    else:
-        clear_generic_files(preview_file.id)
-
     preview_file.comments = []
     preview_file.save()
     preview_file.delete()
+    schedule_files_removal(
+        [{"id": str(preview_file.id), "extension": preview_file.extension}]
+    )
     return preview_file.serialize()
 
 
+def clear_preview_files(preview_file_id, extension):
+    """
+    Remove all files related to given preview file from the storage.
+    """
+    if extension == "png":
+        clear_picture_files(preview_file_id)
+    elif extension == "mp4":
+        clear_movie_files(preview_file_id)
+    else:
+        clear_generic_files(preview_file_id)
+
+
 def clear_picture_files(preview_file_id):
     """
     Remove all files related to given preview file, supposing the original file
     was a picture.
     """
-    for image_type in [
-        "originals",
-        "thumbnails",
-        "thumbnails-square",
-        "previews",
-    ]:
-        try:
-            file_store.remove_picture(image_type, preview_file_id)
-        except:
-            pass
+    for image_type in PICTURE_TYPES:
+        remove_stored_file(
+            file_store.remove_picture, image_type, preview_file_id
+        )
 
 
 def clear_movie_files(preview_file_id):
@@ -229,15 +218,14 @@ def clear_movie_files(preview_file_id):
     Remove all files related to given preview file, supposing the original file
     was a movie.
     """
-    try:
-        file_store.remove_movie("previews", preview_file_id)
-    except:
-        pass
-    for image_type in ["thumbnails", "thumbnails-square", "previews"]:
-        try:
-            file_store.remove_picture(image_type, preview_file_id)
-        except:
-            pass
+    for movie_type in ["previews", "source"]:
+        remove_stored_file(
+            file_store.remove_movie, movie_type, preview_file_id
+        )
+    for image_type in PICTURE_TYPES:
+        remove_stored_file(
+            file_store.remove_picture, image_type, preview_file_id
+        )
 
 
 def clear_generic_files(preview_file_id):
@@ -245,96 +233,500 @@ def clear_generic_files(preview_file_id):
     Remove all files related to given preview file, supposing the original file
     was a generic file.
     """
+    remove_stored_file(file_store.remove_file, "previews", preview_file_id)
+
+
+def remove_stored_file(remove_function, prefix, file_id):
+    """
+    Remove a file from the storage with given function. Failures are logged:
+    files left behind are removed later by the clean_storage command.
+    """
     try:
-        file_store.remove_file("previews", preview_file_id)
+        remove_function(prefix, file_id)
+    except Exception as e:
+        current_app.logger.warning(
+            "%s-%s can't be removed from the storage: %s"
+            % (prefix, file_id, e)
+        )
+
+
+def run_in_transaction(function, *args):
+    """
+    Run given function, which sends deletion requests through the session,
+    then commit. Everything is rolled back if one request fails.
+    """
+    try:
+        result = function(*args)
+        db.session.commit()
     except:
-        pass
+        db.session.rollback()
+        db.session.remove()
+        raise
+    return result
+
+
+def get_preview_files(query):
+    """
+    Return id and extension of the preview files matching given query. They
+    are needed to remove preview files from the storage once they are removed
+    from the database.
+    """
+    return [
+        {"id": str(preview_file_id), "extension": extension}
+        for (preview_file_id, extension) in query.with_entities(
+            PreviewFile.id, PreviewFile.extension
+        )
+    ]
+
+
+def remove_comments_and_preview_files(comment_ids, preview_file_ids):
+    """
+    Remove given comments, given preview files and everything that depends
+    on them with set-based requests. Comment ids are given as a subquery,
+    preview file ids as a list.
+    """
+    Notification.query.filter(Notification.comment_id.in_(comment_ids)).delete(
+        synchronize_session=False
+    )
+    News.query.filter(News.comment_id.in_(comment_ids)).delete(
+        synchronize_session=False
+    )
+    db.session.execute(
+        mentions_table.delete().where(
+            mentions_table.c.comment.in_(comment_ids)
+        )
+    )
+    if len(preview_file_ids) > 0:
+        db.session.execute(
+            preview_link_table.delete().where(
+                or_(
+                    preview_link_table.c.comment.in_(comment_ids),
+                    preview_link_table.c.preview_file.in_(preview_file_ids),
+                )
+            )
+        )
+        for model in [News, Entity, Comment]:
+            model.query.filter(
+                model.preview_file_id.in_(preview_file_ids)
+            ).update({"preview_file_id": None}, synchronize_session=False)
+    else:
+        db.session.execute(
+            preview_link_table.delete().where(
+                preview_link_table.c.comment.in_(comment_ids)
+            )
+        )
+    Comment.query.filter(Comment.id.in_(comment_ids)).delete(
+        synchronize_session=False
+    )
+    if len(preview_file_ids) > 0:
+        PreviewFile.query.filter(PreviewFile.id.in_(preview_file_ids)).delete(
+            synchronize_session=False
+        )
+
+
+def remove_working_files(working_file_ids):
+    """
+    Remove given working files (subquery) and the output files generated
+    from them.
+    """
+    output_file_ids = select([OutputFile.id]).where(
+        OutputFile.source_file_id.in_(working_file_ids)
+    )
+    PreviewFile.query.filter(
+        PreviewFile.source_file_id.in_(output_file_ids)
+    ).update({"source_file_id": None}, synchronize_session=False)
+    OutputFile.query.filter(
+        OutputFile.source_file_id.in_(working_file_ids)
+    ).delete(synchronize_session=False)
+    WorkingFile.query.filter(WorkingFile.id.in_(working_file_ids)).delete(
+        synchronize_session=False
+    )
+
+
+def remove_task_chunk(task_ids):
+    """
+    Remove given tasks and everything that depends on them (comments,
+    previews, files, time spents, notifications, news...) with one set-based
+    request per table, in dependency order. Nothing is committed. It returns
+    the removed preview files, of which the files must be removed from the
+    storage.
+    """
+    comment_ids = select([Comment.id]).where(Comment.object_id.in_(task_ids))
+    preview_files = get_preview_files(
+        PreviewFile.query.filter(PreviewFile.task_id.in_(task_ids))
+    )
+    remove_comments_and_preview_files(
+        comment_ids, [preview_file["id"] for preview_file in preview_files]
+    )
+    remove_working_files(
+        select([WorkingFile.id]).where(WorkingFile.task_id.in_(task_ids))
+    )
+    for model in [Subscription, TimeSpent, Notification, News]:
+        model.query.filter(model.task_id.in_(task_ids)).delete(
+            synchronize_session=False
+        )
+    db.session.execute(
+        assignees_table.delete().where(assignees_table.c.task.in_(task_ids))
+    )
+    Task.query.filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
+    return preview_files
+
+
+def remove_tasks(task_query, progress=None):
+    """
+    Remove tasks matching given query and everything that depends on them.
+    Tasks are removed by chunks, each chunk in its own transaction, so locks
+    are held for a short time. A task:delete-batch event is emitted for each
+    chunk and given progress function is called with the number of removed
+    tasks and the total. Storage files of removed previews are scheduled for
+    removal. It returns ids of removed tasks.
+    """
+    tasks = task_query.with_entities(
+        Task.id, Task.entity_id, Task.project_id
+    ).all()
+    task_ids = []
+    for index in range(0, len(tasks), DELETION_CHUNK_SIZE):
+        chunk = tasks[index : index + DELETION_CHUNK_SIZE]
+        chunk_ids = [str(task_id) for (task_id, _, _) in chunk]
+        preview_files = run_in_transaction(remove_task_chunk, chunk_ids)
+        schedule_files_removal(preview_files)
+        task_ids += chunk_ids
+        events.emit(
+            "task:delete-batch",
+            {
+                "task_ids": chunk_ids,
+                "entity_ids": list(
+                    set(str(entity_id) for (_, entity_id, _) in chunk)
+                ),
+            },
+            project_id=chunk[0][2],
+        )
+        if progress is not None:
+            progress(len(task_ids), len(tasks))
+    return task_ids
+
+
+def schedule_files_removal(preview_files, build_job_ids=None):
+    """
+    Remove files of given preview files and build jobs from the storage. It
+    is done by jobs when the job queue is activated, so deletions don't wait
+    for the storage.
+    """
+    if build_job_ids is None:
+        build_job_ids = []
+    if config.ENABLE_JOB_QUEUE:
+        for index in range(0, len(preview_files), FILE_REMOVAL_BATCH_SIZE):
+            queue_store.job_queue.enqueue(
+                remove_files_job,
+                args=(preview_files[index : index + FILE_REMOVAL_BATCH_SIZE],),
+            )
+        if len(build_job_ids) > 0:
+            queue_store.job_queue.enqueue(
+                remove_files_job, args=([], build_job_ids)
+            )
+    else:
+        remove_files(preview_files, build_job_ids)
+
+
+def remove_files(preview_files, build_job_ids=None):
+    """
+    Remove files of given preview files and build jobs from the storage.
+    """
+    if build_job_ids is None:
+        build_job_ids = []
+    for preview_file in preview_files:
+        clear_preview_files(preview_file["id"], preview_file["extension"])
+    for build_job_id in build_job_ids:
+        remove_stored_file(file_store.remove_movie, "playlists", build_job_id)
+
+
+def remove_files_job(preview_files, build_job_ids=None):
+    """
+    Remove files of given preview files and build jobs from the storage. This
+    function is aimed at being runned as a job in a job queue.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        remove_files(preview_files, build_job_ids)
+
+
+def emit_deletion_progress(object_type, object_id, project_id, done, total):
+    """
+    Tell clients how far the deletion of given object went.
+    """
+    events.emit(
+        "deletion:progress",
+        {
+            "object_type": object_type,
+            "object_id": object_id,
+            "done": done,
+            "total": total,
+        },
+        persist=False,
+        project_id=project_id,
+    )
 
 
 def remove_tasks_for_project_and_task_type(project_id, task_type_id):
     """
     Remove fully all tasks and related for given project and task type.
     """
-    tasks = Task.query.filter_by(
-        project_id=project_id, task_type_id=task_type_id
+    from zou.app.services import stats_service
+
+    task_ids = remove_tasks(
+        Task.query.filter_by(project_id=project_id, task_type_id=task_type_id),
+        progress=lambda done, total: emit_deletion_progress(
+            "task-type", str(task_type_id), project_id, done, total
+        ),
     )
-    task_ids = []
-    for task in tasks:
-        remove_task(task.id, force=True)
-        task_ids.append(str(task.id))
+    stats_service.rebuild_project_stats(project_id)
     return task_ids
 
 
+def remove_tasks_for_project_and_task_type_job(project_id, task_type_id):
+    """
+    Remove all tasks of given project and task type. This function is aimed
+    at being runned as a job in a job queue.
+    """
+    from zou.app import app
+    from zou.app.services import tasks_service
+
+    with app.app_context():
+        task_ids = remove_tasks_for_project_and_task_type(
+            project_id, task_type_id
+        )
+        for task_id in task_ids:
+            tasks_service.clear_task_cache(task_id)
+
+
+def remove_entities_for_project(project_id):
+    """
+    Remove all entities of given project and everything that depends on them
+    (links, asset instances, files, versions, subscriptions).
+    """
+    entity_ids = select([Entity.id]).where(Entity.project_id == project_id)
+    asset_instance_ids = select([AssetInstance.id]).where(
+        or_(
+            AssetInstance.asset_id.in_(entity_ids),
+            AssetInstance.scene_id.in_(entity_ids),
+            AssetInstance.target_asset_id.in_(entity_ids),
+            AssetInstance.entity_id.in_(entity_ids),
+        )
+    )
+    EntityLink.query.filter(
+        or_(
+            EntityLink.entity_in_id.in_(entity_ids),
+            EntityLink.entity_out_id.in_(entity_ids),
+        )
+    ).delete(synchronize_session=False)
+    AssetInstanceLink.query.filter(
+        or_(
+            AssetInstanceLink.entity_id.in_(entity_ids),
+            AssetInstanceLink.asset_instance_id.in_(asset_instance_ids),
+        )
+    ).delete(synchronize_session=False)
+
+    output_file_query = OutputFile.query.filter(
+        or_(
+            OutputFile.entity_id.in_(entity_ids),
+            OutputFile.temporal_entity_id.in_(entity_ids),
+            OutputFile.asset_instance_id.in_(asset_instance_ids),
+        )
+    )
+    PreviewFile.query.filter(
+        PreviewFile.source_file_id.in_(
+            output_file_query.with_entities(OutputFile.id).subquery()
+        )
+    ).update({"source_file_id": None}, synchronize_session=False)
+    output_file_query.delete(synchronize_session=False)
+    remove_working_files(
+        select([WorkingFile.id]).where(WorkingFile.entity_id.in_(entity_ids))
+    )
+
+    AssetInstance.query.filter(
+        AssetInstance.id.in_(asset_instance_ids)
+    ).delete(synchronize_session=False)
+    for model in [EntityVersion, Subscription]:
+        model.query.filter(model.entity_id.in_(entity_ids)).delete(
+            synchronize_session=False
+        )
+    Entity.query.filter(Entity.project_id == project_id).delete(
+        synchronize_session=False
+    )
+
+
+def remove_playlists_for_project(project_id):
+    """
+    Remove playlists of given project and their build jobs. It returns ids of
+    removed build jobs, of which the movies must be removed from the storage.
+    """
+    playlist_ids = select([Playlist.id]).where(
+        Playlist.project_id == project_id
+    )
+    build_job_ids = [
+        str(build_job_id)
+        for (build_job_id,) in BuildJob.query.filter(
+            BuildJob.playlist_id.in_(playlist_ids)
+        ).with_entities(BuildJob.id)
+    ]
+    BuildJob.query.filter(BuildJob.playlist_id.in_(playlist_ids)).delete(
+        synchronize_session=False
+    )
+    Playlist.query.filter(Playlist.project_id == project_id).delete(
+        synchronize_session=False
+    )
+    return build_job_ids
+
+
+def remove_project_data(project_id):
+    """
+    Remove everything related to given project but its tasks, then the
+    project itself. It returns ids of removed build jobs.
+    """
+    build_job_ids = remove_playlists_for_project(project_id)
+    remove_entities_for_project(project_id)
+    for model in [
+        MetadataDescriptor,
+        Milestone,
+        ScheduleItem,
+        SearchFilter,
+        TaskStats,
+    ]:
+        model.query.filter(model.project_id == project_id).delete(
+            synchronize_session=False
+        )
+    ProjectPersonLink.query.filter(
+        ProjectPersonLink.project_id == project_id
+    ).delete(synchronize_session=False)
+    Project.query.filter(Project.id == project_id).delete(
+        synchronize_session=False
+    )
+    return build_job_ids
+
+
 def remove_project(project_id):
-    from zou.app.services import playlists_service
-
-    tasks = Task.query.filter_by(project_id=project_id)
-    for task in tasks:
-        remove_task(task.id, force=True)
-
-    query = EntityLink.query.join(
-        Entity, EntityLink.entity_in_id == Entity.id
-    ).filter(Entity.project_id == project_id)
-    for link in query:
-        link.delete_no_commit()
-    EntityLink.commit()
-
-    Entity.delete_all_by(project_id=project_id)
-    MetadataDescriptor.delete_all_by(project_id=project_id)
-    Milestone.delete_all_by(project_id=project_id)
-    ScheduleItem.delete_all_by(project_id=project_id)
-    SearchFilter.delete_all_by(project_id=project_id)
-
-    for news in News.query.join(Task).filter_by(project_id=project_id).all():
-        news.delete_no_commit()
-    News.commit()
-
-    playlists = Playlist.query.filter_by(project_id=project_id)
-    for playlist in playlists:
-        playlists_service.remove_playlist(playlist.id)
-
-    project = Project.get(project_id)
-    project.delete()
+    """
+    Remove given project and all related data. Tasks are removed first by
+    chunks, then everything else in a single transaction. Progress events
+    are emitted along the way.
+    """
+    project_id = str(project_id)
+
+    def progress(done, total):
+        # Removing project data once tasks are removed is the last step.
+        emit_deletion_progress(
+            "project", project_id, project_id, done, total + 1
+        )
+
+    task_ids = remove_tasks(
+        Task.query.filter_by(project_id=project_id), progress=progress
+    )
+    build_job_ids = run_in_transaction(remove_project_data, project_id)
+    schedule_files_removal([], build_job_ids)
+    emit_deletion_progress(
+        "project", project_id, project_id, len(task_ids) + 1, len(task_ids) + 1
+    )
     return project_id
 
 
+def remove_project_job(project_id):
+    """
+    Remove given project and all related data. This function is aimed at
+    being runned as a job in a job queue.
+    """
+    from zou.app import app
+    from zou.app.services import projects_service
+
+    with app.app_context():
+        remove_project(project_id)
+        projects_service.clear_project_cache(project_id)
+
+
 def remove_person(person_id, force=True):
     person = Person.get(person_id)
     if force:
-        for comment in Comment.get_all_by(person_id=person_id):
-            remove_comment(comment.id)
-        Notification.delete_all_by(person_id=person_id)
-        SearchFilter.delete_all_by(person_id=person_id)
-        DesktopLoginLog.delete_all_by(person_id=person_id)
-        LoginLog.delete_all_by(person_id=person_id)
-        Subscription.delete_all_by(person_id=person_id)
-        TimeSpent.delete_all_by(person_id=person_id)
-        for project in Project.query.filter(Project.team.contains(person)):
-            project.team = [
-                member for member in project.team if str(member.id) != person_id
-            ]
-            project.save()
-        for task in Task.query.filter(Task.assignees.contains(person)):
-            task.assignees = [
-                assignee
-                for assignee in task.assignees
-                if str(assignee.id) != person_id
-            ]
-            task.save()
-        for task in Task.get_all_by(assigner_id=person_id):
-            task.update({"assigner_id": None})
-        for output_file in OutputFile.get_all_by(person_id=person_id):
-            output_file.update({"person_id": None})
-        for working_file in WorkingFile.get_all_by(person_id=person_id):
-            output_file.update({"person_id": None})
-        for task in WorkingFile.get_all_by(person_id=person_id):
-            output_file.update({"person_id": None})
+        comment_query = Comment.query.filter(Comment.person_id == person_id)
+        task_ids = [
+            str(task_id)
+            for (task_id,) in comment_query.with_entities(
+                Comment.object_id
+            ).distinct()
+        ]
+        preview_files = run_in_transaction(remove_person_data, person_id)
+        schedule_files_removal(preview_files)
+        for task_id in task_ids:
+            if Task.get(task_id) is not None:
+                reset_task_data(task_id)
 
     try:
         person.delete()
     except IntegrityError:
         raise ModelWithRelationsDeletionException(
-            "Some data are still linked to given person.ttt"
+            "Some data are still linked to given person."
         )
 
     return person.serialize_safe()
+
+
+def remove_person_data(person_id):
+    """
+    Remove comments of given person with their previews, and every data
+    linked to given person, with set-based requests. References to the person
+    that must be kept (task assigner, file authors) are set to null. It
+    returns the removed preview files.
+    """
+    comment_ids = select([Comment.id]).where(Comment.person_id == person_id)
+    preview_files = get_preview_files(
+        PreviewFile.query.filter(
+            or_(
+                PreviewFile.id.in_(
+                    select([Comment.preview_file_id]).where(
+                        Comment.person_id == person_id
+                    )
+                ),
+                PreviewFile.id.in_(
+                    select([preview_link_table.c.preview_file]).where(
+                        preview_link_table.c.comment.in_(comment_ids)
+                    )
+                ),
+            )
+        )
+    )
+    remove_comments_and_preview_files(
+        comment_ids, [preview_file["id"] for preview_file in preview_files]
+    )
+    Notification.query.filter(
+        or_(
+            Notification.person_id == person_id,
+            Notification.author_id == person_id,
+        )
+    ).delete(synchronize_session=False)
+    News.query.filter(News.author_id == person_id).delete(
+        synchronize_session=False
+    )
+    for model in [
+        SearchFilter,
+        DesktopLoginLog,
+        LoginLog,
+        Subscription,
+        TimeSpent,
+        ProjectPersonLink,
+    ]:
+        model.query.filter(model.person_id == person_id).delete(
+            synchronize_session=False
+        )
+    db.session.execute(
+        assignees_table.delete().where(assignees_table.c.person == person_id)
+    )
+    db.session.execute(
+        mentions_table.delete().where(mentions_table.c.person == person_id)
+    )
+    Task.query.filter(Task.assigner_id == person_id).update(
+        {"assigner_id": None}, synchronize_session=False
+    )
+    for model in [OutputFile, WorkingFile, PreviewFile]:
+        model.query.filter(model.person_id == person_id).update(
+            {"person_id": None}, synchronize_session=False
+        )
+    return preview_files
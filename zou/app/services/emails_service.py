@@ -1,4 +1,7 @@
+from flask import current_app
+
 from zou.app import config
+from zou.app.models.person import Person
 from zou.app.utils import emails, chats
 
 from zou.app.services import (
@@ -17,30 +20,128 @@ def send_notification(person_id, subject, messages):
     activated.
     """
     person = persons_service.get_person_raw(person_id)
-    email_message = messages["email_message"]
-    slack_message = messages["slack_message"]
-    if person.notifications_enabled:
-        if config.ENABLE_JOB_QUEUE:
-            queue_store.job_queue.enqueue(
-                emails.send_email,
-                args=(subject, email_message + get_signature(), person.email),
-            )
-        else:
-            emails.send_email(
-                subject, email_message + get_signature(), person.email
-            )
+    (emails, slack_messages) = build_notification_messages(
+        person, subject, messages
+    )
+    queue_notifications(emails, slack_messages)
+    return True
 
-    if person.notifications_slack_enabled:
+
+def build_notification_messages(person, subject, messages, organisation=None):
+    """
+    Return the emails (subject, body, recipient email) and the Slack messages
+    (token, user id, message) to send to given person for a notification,
+    depending on the person settings. People who receive a digest get no
+    email: the notification will be part of their next digest.
+    """
+    if organisation is None:
         organisation = persons_service.get_organisation()
-        userid = person.notifications_slack_userid
-        token = organisation.get("chat_token_slack", "")
-        if config.ENABLE_JOB_QUEUE:
-            queue_store.job_queue.enqueue(
-                chats.send_to_slack, args=(token, userid, slack_message)
+    emails = []
+    slack_messages = []
+    if (
+        person.notifications_enabled
+        and not person.notifications_digest_enabled
+    ):
+        body = messages["email_message"] + get_signature(organisation)
+        emails.append((subject, body, person.email))
+
+    if person.notifications_slack_enabled:
+        slack_messages.append(
+            (
+                organisation.get("chat_token_slack", ""),
+                person.notifications_slack_userid,
+                messages["slack_message"],
+            )
+        )
+    return (emails, slack_messages)
+
+
+def queue_notifications(emails, slack_messages):
+    """
+    Hand given emails and Slack messages to the job queue if it is activated,
+    send them right away otherwise.
+    """
+    if len(emails) == 0 and len(slack_messages) == 0:
+        return
+    if config.ENABLE_JOB_QUEUE:
+        queue_store.job_queue.enqueue(
+            send_notifications_job, args=(emails, slack_messages)
+        )
+    else:
+        send_notifications(emails, slack_messages)
+
+
+def send_notifications(emails_to_send, slack_messages):
+    """
+    Send given emails through a single SMTP connection, then given Slack
+    messages.
+    """
+    emails.send_emails(emails_to_send)
+    for (token, userid, message) in slack_messages:
+        try:
+            chats.send_to_slack(token, userid, message)
+        except Exception:
+            current_app.logger.error(
+                "Slack message can't be sent", exc_info=1
             )
-        else:
-            chats.send_to_slack(token, userid, slack_message)
 
+
+def send_notifications_job(emails_to_send, slack_messages):
+    """
+    Send given emails and Slack messages. This function is aimed at being
+    runned as a job in a job queue.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        send_notifications(emails_to_send, slack_messages)
+
+
+def send_comment_notifications(
+    recipient_ids, mention_ids, author_id, comment, task
+):
+    """
+    Send the notifications related to a new comment: a comment notification
+    to every recipient and a mention notification to every mentioned person.
+    Task information and recipients are retrieved once, then all messages are
+    queued together.
+    """
+    person_ids = set(recipient_ids) | set(mention_ids)
+    persons = {
+        str(person.id): person
+        for person in Person.query.filter(Person.id.in_(list(person_ids)))
+        if person.notifications_enabled or person.notifications_slack_enabled
+    }
+    if len(persons) == 0:
+        return True
+
+    task_status = tasks_service.get_task_status(task["task_status_id"])
+    (author, task_name, task_url) = get_task_descriptors(author_id, task)
+    comment_messages = build_comment_messages(
+        author, task_name, task_url, task_status, comment
+    )
+    mention_messages = build_mention_messages(
+        author, task_name, task_url, comment
+    )
+
+    organisation = persons_service.get_organisation()
+    emails = []
+    slack_messages = []
+    for (ids, (subject, messages)) in [
+        (recipient_ids, comment_messages),
+        (mention_ids, mention_messages),
+    ]:
+        for person_id in ids:
+            person = persons.get(str(person_id), None)
+            if person is not None:
+                (person_emails, person_slack_messages) = (
+                    build_notification_messages(
+                        person, subject, messages, organisation=organisation
+                    )
+                )
+                emails += person_emails
+                slack_messages += person_slack_messages
+    queue_notifications(emails, slack_messages)
     return True
 
 
@@ -53,97 +154,119 @@ def send_comment_notification(person_id, author_id, comment, task):
     if person.notifications_enabled or person.notifications_slack_enabled:
         task_status = tasks_service.get_task_status(task["task_status_id"])
         (author, task_name, task_url) = get_task_descriptors(author_id, task)
-        subject = "[Kitsu] %s - %s commented on %s" % (
-            task_status["short_name"],
-            author["first_name"],
-            task_name,
+        (subject, messages) = build_comment_messages(
+            author, task_name, task_url, task_status, comment
         )
-        if len(comment["text"]) > 0:
-            email_message = """<strong>%s</strong> wrote a comment on <a href="%s">%s</a> and set the status to <strong>%s</strong>.
-
-<em>%s</em>
-""" % (
-                author["full_name"],
-                task_url,
-                task_name,
-                task_status["short_name"],
-                comment["text"],
-            )
-            slack_message = """*%s* wrote a comment on <%s|%s> and set the status to *%s*.
-
-_%s_
-""" % (
-                author["full_name"],
-                task_url,
-                task_name,
-                task_status["short_name"],
-                comment["text"],
-            )
-
-        else:
-            email_message = """<strong>%s</strong> set changed status of <a href="%s">%s</a> to <strong>%s</strong>.
-""" % (
-                author["full_name"],
-                task_url,
-                task_name,
-                task_status["short_name"],
-            )
-            slack_message = """*%s* set changed status of <%s|%s> to *%s*.
-""" % (
-                author["full_name"],
-                task_url,
-                task_name,
-                task_status["short_name"],
-            )
-        messages = {
-            "email_message": email_message,
-            "slack_message": slack_message,
-        }
         send_notification(person_id, subject, messages)
 
     return True
 
 
-def send_mention_notification(person_id, author_id, comment, task):
+def build_comment_messages(author, task_name, task_url, task_status, comment):
     """
-    Send a notification email telling that somenone mentioned the
-    person matching given person id.
+    Build subject, email message and Slack message telling that a new comment
+    was posted.
     """
-    person = persons_service.get_person_raw(person_id)
-    if person.notifications_enabled or person.notifications_slack_enabled:
-        (author, task_name, task_url) = get_task_descriptors(author_id, task)
-        subject = "[Kitsu] %s mentioned you on %s" % (
-            author["first_name"],
-            task_name,
-        )
-        email_message = """<strong>%s</strong> mentioned you in a comment on <a href="%s">%s</a>:
+    subject = "[Kitsu] %s - %s commented on %s" % (
+        task_status["short_name"],
+        author["first_name"],
+        task_name,
+    )
+    if len(comment["text"]) > 0:
+        email_message = """<strong>%s</strong> wrote a comment on <a href="%s">%s</a> and set the status to <strong>%s</strong>.
 
 <em>%s</em>
 """ % (
             author["full_name"],
             task_url,
             task_name,
+            task_status["short_name"],
             comment["text"],
         )
-        slack_message = """*%s* mentioned you in a comment on <%s|%s>.
+        slack_message = """*%s* wrote a comment on <%s|%s> and set the status to *%s*.
 
 _%s_
 """ % (
             author["full_name"],
             task_url,
             task_name,
+            task_status["short_name"],
             comment["text"],
         )
 
-        messages = {
-            "email_message": email_message,
-            "slack_message": slack_message,
-        }
+    else:
+        email_message = """<strong>%s</strong> set changed status of <a href="%s">%s</a> to <strong>%s</strong>.
+""" % (
+            author["full_name"],
+            task_url,
+            task_name,
+            task_status["short_name"],
+        )
+        slack_message = """*%s* set changed status of <%s|%s> to *%s*.
+""" % (
+            author["full_name"],
+            task_url,
+            task_name,
+            task_status["short_name"],
+        )
+    messages = {
+        "email_message": email_message,
+        "slack_message": slack_message,
+    }
+    return (subject, messages)
+
+
+def send_mention_notification(person_id, author_id, comment, task):
+    """
+    Send a notification email telling that somenone mentioned the
+    person matching given person id.
+    """
+    person = persons_service.get_person_raw(person_id)
+    if person.notifications_enabled or person.notifications_slack_enabled:
+        (author, task_name, task_url) = get_task_descriptors(author_id, task)
+        (subject, messages) = build_mention_messages(
+            author, task_name, task_url, comment
+        )
         return send_notification(person_id, subject, messages)
     else:
         return True
 
 
+def build_mention_messages(author, task_name, task_url, comment):
+    """
+    Build subject, email message and Slack message telling that somenone
+    mentioned a person in a comment.
+    """
+    subject = "[Kitsu] %s mentioned you on %s" % (
+        author["first_name"],
+        task_name,
+    )
+    email_message = """<strong>%s</strong> mentioned you in a comment on <a href="%s">%s</a>:
+
+<em>%s</em>
+""" % (
+        author["full_name"],
+        task_url,
+        task_name,
+        comment["text"],
+    )
+    slack_message = """*%s* mentioned you in a comment on <%s|%s>.
+
+_%s_
+""" % (
+        author["full_name"],
+        task_url,
+        task_name,
+        comment["text"],
+    )
+
+    messages = {
+        "email_message": email_message,
+        "slack_message": slack_message,
+    }
+    return (subject, messages)
+
+
 def send_assignation_notification(person_id, author_id, task):
     """
     Send a notification email telling that somenone assigned to a task the
@@ -152,32 +275,99 @@ def send_assignation_notification(person_id, author_id, task):
     person = persons_service.get_person_raw(person_id)
     if person.notifications_enabled or person.notifications_slack_enabled:
         (author, task_name, task_url) = get_task_descriptors(author_id, task)
-        subject = "[Kitsu] You were assigned to %s" % task_name
-        email_message = """<strong>%s</strong> assigned you to <a href="%s">%s</a>.
-""" % (
-            author["full_name"],
-            task_url,
-            task_name,
+        (subject, messages) = build_assignation_messages(
+            author, task_name, task_url
         )
-        slack_message = """*%s* assigned you to <%s|%s>.
-""" % (
-            author["full_name"],
-            task_url,
-            task_name,
-        )
-        messages = {
-            "email_message": email_message,
-            "slack_message": slack_message,
-        }
         return send_notification(person_id, subject, messages)
     return True
 
 
-def get_signature():
+def build_assignation_messages(author, task_name, task_url):
     """
-    Build signature for Zou emails.
+    Build subject, email message and Slack message telling that somenone
+    assigned a person to a task.
+    """
+    subject = "[Kitsu] You were assigned to %s" % task_name
+    email_message = """<strong>%s</strong> assigned you to <a href="%s">%s</a>.
+""" % (
+        author["full_name"],
+        task_url,
+        task_name,
+    )
+    slack_message = """*%s* assigned you to <%s|%s>.
+""" % (
+        author["full_name"],
+        task_url,
+        task_name,
+    )
+    messages = {
+        "email_message": email_message,
+        "slack_message": slack_message,
+    }
+    return (subject, messages)
+
+
+def send_notification_digests(notifications_by_person):
+    """
+    Send to each person a single email listing given notifications (a dict
+    of notification lists, the key is the person id). All emails are sent
+    through a single SMTP connection. It returns the number of emails sent.
     """
     organisation = persons_service.get_organisation()
+    descriptors = {}
+    emails = []
+    for person_id, notifications in notifications_by_person.items():
+        person = persons_service.get_person_raw(person_id)
+        email_messages = []
+        for notification in notifications:
+            (subject, messages) = build_digest_entry_messages(
+                notification, descriptors
+            )
+            email_messages.append(messages["email_message"])
+        if len(email_messages) > 0:
+            subject = "[Kitsu] You have %s new notifications" % len(
+                email_messages
+            )
+            body = "\n<br />\n".join(email_messages) + get_signature(
+                organisation
+            )
+            emails.append((subject, body, person.email))
+    queue_notifications(emails, [])
+    return len(emails)
+
+
+def build_digest_entry_messages(notification, descriptors):
+    """
+    Build the messages describing given notification. Task descriptors are
+    stored in given dict to build them once per author and task.
+    """
+    key = (notification["author_id"], notification["task_id"])
+    if key not in descriptors:
+        task = tasks_service.get_task(notification["task_id"])
+        descriptors[key] = get_task_descriptors(
+            notification["author_id"], task
+        )
+    (author, task_name, task_url) = descriptors[key]
+
+    notification_type = notification["notification_type"]
+    if notification_type == "assignation":
+        return build_assignation_messages(author, task_name, task_url)
+    comment = tasks_service.get_comment(notification["comment_id"])
+    if notification_type == "mention":
+        return build_mention_messages(author, task_name, task_url, comment)
+    else:
+        task_status = tasks_service.get_task_status(comment["task_status_id"])
+        return build_comment_messages(
+            author, task_name, task_url, task_status, comment
+        )
+
+
+def get_signature(organisation=None):
+    """
+    Build signature for Zou emails.
+    """
+    if organisation is None:
+        organisation = persons_service.get_organisation()
     return (
         """
 Best,
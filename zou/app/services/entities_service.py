@@ -60,6 +60,19 @@ def get_entity(entity_id):
     ).serialize()
 
 
+def get_move_data(entity, previous_parent_id, previous_entity_type_id):
+    """
+    Return the event data fields giving the parent and the entity type that
+    given entity had before an update, only for the ones that changed.
+    """
+    data = {}
+    if str(entity.parent_id) != str(previous_parent_id):
+        data["previous_parent_id"] = previous_parent_id
+    if str(entity.entity_type_id) != str(previous_entity_type_id):
+        data["previous_entity_type_id"] = previous_entity_type_id
+    return data
+
+
 def update_entity_preview(entity_id, preview_file_id):
     """
     Update given entity main preview. If entity or preview is not found, it
@@ -103,6 +116,25 @@ def get_entities_for_project(project_id, entity_type_id, obj_type="Entity"):
     return Entity.serialize_list(result, obj_type=obj_type)
 
 
+def get_entity_ids_for_project(project_id, entity_ids):
+    """
+    Retrieve, among given entity ids, the ones of entities related to given
+    project. Entities are returned as dicts with id and project_id fields.
+    """
+    if len(entity_ids) == 0:
+        return []
+    result = (
+        Entity.query.with_entities(Entity.id)
+        .filter(Entity.project_id == project_id)
+        .filter(Entity.id.in_(entity_ids))
+        .all()
+    )
+    return [
+        {"id": str(entity_id), "project_id": str(project_id)}
+        for (entity_id,) in result
+    ]
+
+
 def get_entity_links_for_project(project_id):
     """
     Retrieve entity links for
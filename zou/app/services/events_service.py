@@ -1,3 +1,11 @@
+import datetime
+import gzip
+import json
+import re
+
+from sqlalchemy import select
+
+from zou.app import db
 from zou.app.models.event import ApiEvent
 from zou.app.models.login_log import LoginLog
 from zou.app.utils import fields
@@ -69,3 +77,162 @@ def get_last_login_logs(before=None, page_size=100):
         }
         for (created_at, ip_address, person_id) in login_logs
     ]
+
+
+def is_event_table_partitioned():
+    """
+    Return True if the event table is partitioned by month (it requires
+    Postgres 11).
+    """
+    relkind = db.session.execute(
+        "SELECT relkind FROM pg_class WHERE relname = 'api_event'"
+    ).scalar()
+    return relkind == "p"
+
+
+def get_event_partition_name(date):
+    return "api_event_y%04dm%02d" % (date.year, date.month)
+
+
+def get_event_partitions():
+    """
+    Return monthly partitions of the event table as (name, first day of the
+    month) tuples, sorted by date.
+    """
+    rows = db.session.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'api_event'::regclass"
+    )
+    partitions = []
+    for (name,) in rows:
+        match = re.match(r"^api_event_y(\d{4})m(\d{2})$", name)
+        if match is not None:
+            date = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append((name, date))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def get_next_month(date):
+    if date.month == 12:
+        return datetime.date(date.year + 1, 1, 1)
+    else:
+        return datetime.date(date.year, date.month + 1, 1)
+
+
+def create_event_partitions(months_ahead=3):
+    """
+    Create partitions of the event table for the current month and the
+    next ones. Events of months without partition are stored in the default
+    partition. It returns names of created partitions.
+    """
+    if not is_event_table_partitioned():
+        return []
+
+    names = [name for (name, _) in get_event_partitions()]
+    today = datetime.date.today()
+    date = datetime.date(today.year, today.month, 1)
+    created = []
+    for _ in range(months_ahead + 1):
+        name = get_event_partition_name(date)
+        next_date = get_next_month(date)
+        if name not in names:
+            create_event_partition(name, date, next_date)
+            created.append(name)
+        date = next_date
+    db.session.commit()
+    return created
+
+
+def create_event_partition(name, start_date, end_date):
+    """
+    Create a partition of the event table for given date range. The default
+    partition may already hold events of this range (if partitions were not
+    created in time), it would prevent the partition creation. So the
+    partition is created as a standalone table, events of the range are moved
+    from the default partition to it, then it is attached to the event table.
+    """
+    db.session.execute(
+        "CREATE TABLE %s (LIKE api_event INCLUDING DEFAULTS)" % name
+    )
+    db.session.execute(
+        "WITH moved_events AS ("
+        "DELETE FROM api_event_default "
+        "WHERE created_at >= '%s' AND created_at < '%s' RETURNING *) "
+        "INSERT INTO %s SELECT * FROM moved_events"
+        % (start_date, end_date, name)
+    )
+    db.session.execute(
+        "ALTER TABLE api_event ATTACH PARTITION %s "
+        "FOR VALUES FROM ('%s') TO ('%s')" % (name, start_date, end_date)
+    )
+
+
+def archive_events(limit_date, archive_path):
+    """
+    Append events created before given date to given gzipped file, one JSON
+    object by line. It returns the number of archived events.
+    """
+    query = (
+        ApiEvent.query.with_entities(
+            ApiEvent.id,
+            ApiEvent.created_at,
+            ApiEvent.name,
+            ApiEvent.user_id,
+            ApiEvent.data,
+        )
+        .filter(ApiEvent.created_at < limit_date)
+        .order_by(ApiEvent.created_at)
+        .yield_per(1000)
+    )
+    nb_events = 0
+    with gzip.open(archive_path, "at") as archive_file:
+        for (event_id, created_at, name, user_id, data) in query:
+            event = {
+                "id": fields.serialize_value(event_id),
+                "created_at": fields.serialize_value(created_at),
+                "name": name,
+                "user_id": fields.serialize_value(user_id),
+                "data": data,
+            }
+            archive_file.write(json.dumps(event) + "\n")
+            nb_events += 1
+    return nb_events
+
+
+def remove_old_events(days, archive_path=None, batch_size=10000):
+    """
+    Remove events older than given number of days. When an archive path is
+    given, events are written to it before being removed. Monthly partitions
+    that contain only old events are dropped, remaining old events are
+    deleted by batches.
+    """
+    limit_date = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    result = {"archived": 0, "dropped_partitions": [], "deleted": 0}
+    if archive_path is not None:
+        result["archived"] = archive_events(limit_date, archive_path)
+
+    if is_event_table_partitioned():
+        for (name, date) in get_event_partitions():
+            if get_next_month(date) <= limit_date.date():
+                db.session.execute("DROP TABLE %s" % name)
+                result["dropped_partitions"].append(name)
+        db.session.commit()
+
+    table = ApiEvent.__table__
+    while True:
+        old_ids = (
+            select([table.c.id])
+            .where(table.c.created_at < limit_date)
+            .limit(batch_size)
+        )
+        deletion = db.session.execute(
+            table.delete()
+            .where(table.c.created_at < limit_date)
+            .where(table.c.id.in_(old_ids))
+        )
+        db.session.commit()
+        result["deleted"] += deletion.rowcount
+        if deletion.rowcount < batch_size:
+            break
+    return result
@@ -597,6 +597,21 @@ def get_preview_file(preview_file_id):
     return preview_file.serialize()
 
 
+def get_project_ids_for_preview_files(preview_file_ids):
+    """
+    Get ids of the projects related to given preview files.
+    """
+    if len(preview_file_ids) == 0:
+        return []
+    query = (
+        Task.query.with_entities(Task.project_id)
+        .join(PreviewFile, PreviewFile.task_id == Task.id)
+        .filter(PreviewFile.id.in_(preview_file_ids))
+        .distinct()
+    )
+    return [str(project_id) for (project_id,) in query.all()]
+
+
 def get_preview_files_for_task(task_id):
     """
     Get all preview files for given task.
@@ -733,7 +748,9 @@ def get_project_from_preview_file(preview_file_id):
     return project.serialize()
 
 
-def get_preview_files_for_project(project_id, page=-1):
+def get_preview_files_for_project(
+    project_id, page=-1, cursor=None, limit=None
+):
     """
     Return all preview files for given project.
     """
@@ -742,4 +759,6 @@ def get_preview_files_for_project(project_id, page=-1):
         .filter(Task.project_id == project_id)
         .order_by(desc(PreviewFile.updated_at))
     )
-    return query_utils.get_paginated_results(query, page)
+    return query_utils.get_paginated_results(
+        query, page, cursor=cursor, limit=limit
+    )
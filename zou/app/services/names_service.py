@@ -1,6 +1,14 @@
 import slugify
 
+from sqlalchemy.orm import aliased
+
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
 from zou.app.models.organisation import Organisation
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.models.task_type import TaskType
 from zou.app.services import (
     entities_service,
     files_service,
@@ -50,19 +58,143 @@ def get_preview_file_name(preview_file_id):
     project = projects_service.get_project(task["project_id"])
     (entity_name, _) = get_full_entity_name(task["entity_id"])
 
-    if (
-        organisation.use_original_file_name
-        and preview_file.get("original_name", None) is not None
-    ):
-        name = preview_file["original_name"]
+    return build_preview_file_name(
+        organisation,
+        project["name"],
+        entity_name,
+        task_type["name"],
+        preview_file["revision"],
+        preview_file["extension"],
+        preview_file.get("original_name", None),
+    )
+
+
+def build_preview_file_name(
+    organisation,
+    project_name,
+    entity_name,
+    task_type_name,
+    revision,
+    extension,
+    original_name=None,
+):
+    """
+    Apply preview file naming convention to given information.
+    """
+    if organisation.use_original_file_name and original_name is not None:
+        name = original_name
     else:
         name = "%s_%s_%s_v%s" % (
-            project["name"],
+            project_name,
             entity_name,
-            task_type["name"],
-            preview_file["revision"],
+            task_type_name,
+            revision,
         )
-    return "%s.%s" % (
-        slugify.slugify(name, separator="_"),
-        preview_file["extension"],
+    return "%s.%s" % (slugify.slugify(name, separator="_"), extension)
+
+
+def get_full_entity_names(entity_ids):
+    """
+    Batch version of get_full_entity_name: it returns a dict where keys are
+    given entity ids and values are (full name, episode id) tuples. All names
+    are retrieved through a single query.
+    """
+    result = {}
+    if len(entity_ids) == 0:
+        return result
+
+    Sequence = aliased(Entity, name="sequence")
+    Episode = aliased(Entity, name="episode")
+    shot_type = shots_service.get_shot_type()
+    query = (
+        Entity.query.with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.entity_type_id,
+            Entity.source_id,
+            EntityType.name,
+            Sequence.name,
+            Sequence.parent_id,
+            Episode.name,
+        )
+        .join(EntityType, EntityType.id == Entity.entity_type_id)
+        .outerjoin(Sequence, Sequence.id == Entity.parent_id)
+        .outerjoin(Episode, Episode.id == Sequence.parent_id)
+        .filter(Entity.id.in_(entity_ids))
     )
+    for (
+        entity_id,
+        entity_name,
+        entity_type_id,
+        source_id,
+        entity_type_name,
+        sequence_name,
+        episode_id,
+        episode_name,
+    ) in query.all():
+        if str(entity_type_id) != shot_type["id"]:
+            name = "%s / %s" % (entity_type_name, entity_name)
+            episode_id = source_id
+        elif sequence_name is None:
+            name = entity_name
+        elif episode_id is None:
+            name = "%s / %s" % (sequence_name, entity_name)
+        else:
+            name = "%s / %s / %s" % (episode_name, sequence_name, entity_name)
+        result[str(entity_id)] = (
+            name,
+            str(episode_id) if episode_id is not None else None,
+        )
+    return result
+
+
+def get_preview_file_names(preview_file_ids):
+    """
+    Batch version of get_preview_file_name: it returns a dict where keys are
+    given preview file ids and values are file names. The number of queries
+    doesn't depend on the number of preview files.
+    """
+    result = {}
+    if len(preview_file_ids) == 0:
+        return result
+
+    organisation = Organisation.query.first()
+    query = (
+        PreviewFile.query.with_entities(
+            PreviewFile.id,
+            PreviewFile.revision,
+            PreviewFile.extension,
+            PreviewFile.original_name,
+            Task.entity_id,
+            TaskType.name,
+            Project.name,
+        )
+        .join(Task, Task.id == PreviewFile.task_id)
+        .join(TaskType, TaskType.id == Task.task_type_id)
+        .join(Project, Project.id == Task.project_id)
+        .filter(PreviewFile.id.in_(preview_file_ids))
+    )
+    preview_files = query.all()
+    entity_names = get_full_entity_names(
+        list({str(preview_file[4]) for preview_file in preview_files})
+    )
+    for (
+        preview_file_id,
+        revision,
+        extension,
+        original_name,
+        entity_id,
+        task_type_name,
+        project_name,
+    ) in preview_files:
+        (entity_name, _) = entity_names[str(entity_id)]
+        result[str(preview_file_id)] = build_preview_file_name(
+            organisation,
+            project_name,
+            entity_name,
+            task_type_name,
+            revision,
+            extension,
+            original_name,
+        )
+    return result
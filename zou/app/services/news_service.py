@@ -117,6 +117,9 @@ def get_last_news_for_project(
     query = query.limit(page_size)
     query = query.offset(offset)
     news_list = query.all()
+    full_entity_names = names_service.get_full_entity_names(
+        list({str(entry[6]) for entry in news_list})
+    )
     result = []
 
     for (
@@ -130,9 +133,9 @@ def get_last_news_for_project(
         preview_file_extension,
         entity_preview_file_id,
     ) in news_list:
-        (full_entity_name, episode_id) = names_service.get_full_entity_name(
-            task_entity_id
-        )
+        (full_entity_name, episode_id) = full_entity_names[
+            str(task_entity_id)
+        ]
 
         result.append(
             fields.serialize_dict(
@@ -1,15 +1,20 @@
+import datetime
+
+from sqlalchemy import func
 from sqlalchemy.exc import StatementError
 
+from zou.app import db
+
 from zou.app.models.comment import Comment
 from zou.app.models.project import Project
 from zou.app.models.entity import Entity
 from zou.app.models.notification import Notification
+from zou.app.models.person import Person
 from zou.app.models.subscription import Subscription
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
 
-from zou.app.services import emails_service, tasks_service
-from zou.app.services.exception import PersonNotFoundException
+from zou.app.services import emails_service, persons_service, tasks_service
 from zou.app.utils import events, fields, query as query_utils
 
 
@@ -39,26 +44,27 @@ def create_notification(
 
 def get_notification_recipients(task):
     """
-    Get the list of notification recipients for given task: assignees and
-    every people who commented the task.
+    Get the list of notification recipients for given task: assignees, every
+    people who commented the task and people who subscribed to the task or to
+    its sequence. Everyone but assignees is retrieved with a single query.
     """
-    recipients = set()
-    comments = Comment.get_all_by(object_id=task["id"])
-    task_subscriptions = get_task_subscriptions(task)
-    sequence_subscriptions = get_sequence_subscriptions(task)
-
-    for assignee_id in task["assignees"]:
-        recipients.add(assignee_id)
-
-    for comment in comments:
-        recipients.add(str(comment.person_id))
-
-    for subscription in task_subscriptions:
-        recipients.add(str(subscription.person_id))
-
-    for subscription in sequence_subscriptions:
-        recipients.add(str(subscription.person_id))
-
+    recipients = set(str(assignee_id) for assignee_id in task["assignees"])
+    commenters = Comment.query.with_entities(Comment.person_id).filter(
+        Comment.object_id == task["id"]
+    )
+    task_subscribers = Subscription.query.with_entities(
+        Subscription.person_id
+    ).filter(Subscription.task_id == task["id"])
+    sequence_subscribers = (
+        Subscription.query.with_entities(Subscription.person_id)
+        .join(Entity, Entity.parent_id == Subscription.entity_id)
+        .filter(Entity.id == task["entity_id"])
+        .filter(Subscription.task_type_id == task["task_type_id"])
+    )
+    for (person_id,) in commenters.union(
+        task_subscribers, sequence_subscribers
+    ):
+        recipients.add(str(person_id))
     return recipients
 
 
@@ -83,64 +89,119 @@ def get_sequence_subscriptions(task):
     return sequence_subscriptions
 
 
-def create_notifications_for_task_and_comment(task, comment, change=False):
-    """
-    For given task and comment, create a notification for every assignee
-    to the task and to every person participating to this task.
+def create_notifications(
+    person_ids,
+    author_id,
+    task_id,
+    comment_id=None,
+    change=False,
+    type="comment",
+):
     """
-    recipient_ids = get_notification_recipients(task)
-    recipient_ids.remove(comment["person_id"])
-    author_id = comment["person_id"]
+    Create a notification for each given person with a single multi-row
+    insert. Notifications that already exist are skipped. A
+    notification:new event is emitted for each created notification. It
+    returns a dict of created notification ids by person id.
+    """
+    now = datetime.datetime.utcnow()
+    rows = [
+        {
+            "id": fields.gen_uuid(),
+            "created_at": now,
+            "updated_at": now,
+            "read": False,
+            "change": change,
+            "person_id": person_id,
+            "author_id": author_id,
+            "comment_id": comment_id,
+            "task_id": task_id,
+            "type": type,
+        }
+        for person_id in person_ids
+    ]
+    if len(rows) == 0:
+        return {}
 
-    for recipient_id in recipient_ids:
-        try:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=author_id,
-                task_id=comment["object_id"],
-                read=False,
-                change=change,
-                type="comment",
-            )
-            emails_service.send_comment_notification(
-                recipient_id, author_id, comment, task
-            )
+    notification_ids = set(
+        str(notification_id)
+        for notification_id in Notification.create_all_ignore_conflicts(rows)
+    )
+    created = {}
+    for row in rows:
+        if str(row["id"]) in notification_ids:
+            created[str(row["person_id"])] = str(row["id"])
             events.emit(
                 "notification:new",
                 {
-                    "notification_id": notification["id"],
-                    "person_id": recipient_id,
+                    "notification_id": row["id"],
+                    "person_id": row["person_id"],
                 },
                 persist=False,
             )
-        except PersonNotFoundException:
-            pass
+    return created
 
-    for recipient_id in comment["mentions"]:
-        if recipient_id != comment["person_id"]:
-            notification = create_notification(
-                recipient_id,
-                comment_id=comment["id"],
-                author_id=comment["person_id"],
-                task_id=comment["object_id"],
-                type="mention",
-            )
-            emails_service.send_mention_notification(
-                recipient_id, author_id, comment, task
-            )
-            events.emit(
-                "notification:new",
-                {
-                    "notification_id": notification["id"],
-                    "person_id": recipient_id,
-                },
-                persist=False,
-            )
 
+def create_notifications_for_task_and_comment(task, comment, change=False):
+    """
+    For given task and comment, create a notification for every assignee
+    to the task and to every person participating to this task. Mentioned
+    people get a mention notification too. Notifications are inserted in
+    batch and all emails are handed to the mail queue at once. Emails are
+    sent only for the notifications that didn't exist yet.
+    """
+    author_id = str(comment["person_id"])
+    recipient_ids = get_notification_recipients(task)
+    recipient_ids.discard(author_id)
+    mention_ids = [
+        str(person_id)
+        for person_id in comment["mentions"]
+        if str(person_id) != author_id
+    ]
+
+    created_recipients = create_notifications(
+        recipient_ids,
+        author_id,
+        comment["object_id"],
+        comment_id=comment["id"],
+        change=change,
+        type="comment",
+    )
+    created_mentions = create_notifications(
+        mention_ids,
+        author_id,
+        comment["object_id"],
+        comment_id=comment["id"],
+        type="mention",
+    )
+    emails_service.send_comment_notifications(
+        [
+            person_id
+            for person_id in recipient_ids
+            if str(person_id) in created_recipients
+        ],
+        [
+            person_id
+            for person_id in mention_ids
+            if str(person_id) in created_mentions
+        ],
+        author_id,
+        comment,
+        task,
+    )
     return recipient_ids
 
 
+def create_notifications_for_task_and_comment_job(task, comment, change):
+    """
+    Create notifications for given task and comment. This function is aimed
+    at being runned as a job in a job queue.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        create_notifications_for_task_and_comment(task, comment, change=change)
+
+
 def reset_notifications_for_mentions(comment):
     """
     For given task and comment, delete all mention notifications related
@@ -196,6 +257,65 @@ def create_assignation_notification(task_id, person_id, author_id=None):
         return None
 
 
+def get_digest_notifications(until):
+    """
+    Return unread notifications not sent yet for people who receive their
+    notification emails as a digest: the ones created after the last digest
+    sent to the person and before given date. When no digest was sent yet,
+    only the notifications of the last day are listed. Notifications are
+    grouped by person id.
+    """
+    since = func.coalesce(
+        Person.notifications_digest_sent_at,
+        until - datetime.timedelta(days=1),
+    )
+    notifications = (
+        Notification.query.join(Person, Person.id == Notification.person_id)
+        .filter(Person.notifications_enabled == True)
+        .filter(Person.notifications_digest_enabled == True)
+        .filter(Notification.read == False)
+        .filter(Notification.created_at > since)
+        .filter(Notification.created_at <= until)
+        .order_by(Notification.created_at)
+        .all()
+    )
+    result = {}
+    for notification in notifications:
+        result.setdefault(str(notification.person_id), []).append(
+            notification.serialize()
+        )
+    return result
+
+
+def set_digests_sent(until):
+    """
+    Store given date as the date of the last digest sent to every people who
+    receive their notification emails as a digest.
+    """
+    Person.query.filter(Person.notifications_enabled == True).filter(
+        Person.notifications_digest_enabled == True
+    ).update(
+        {"notifications_digest_sent_at": until}, synchronize_session=False
+    )
+    db.session.commit()
+    persons_service.clear_person_cache()
+
+
+def send_notification_digests():
+    """
+    Send to people who chose to receive their notifications as a digest an
+    email listing their unread notifications created since their last
+    digest. It is aimed at being run periodically. It returns the number of
+    sent digests.
+    """
+    until = datetime.datetime.utcnow()
+    nb_digests = emails_service.send_notification_digests(
+        get_digest_notifications(until)
+    )
+    set_digests_sent(until)
+    return nb_digests
+
+
 def get_task_subscription_raw(person_id, task_id):
     """
     Return subscription matching given person and task.
@@ -339,7 +459,9 @@ def get_subscriptions_for_project(project_id):
     return fields.serialize_list(subscriptions)
 
 
-def get_notifications_for_project(project_id, page=0):
+def get_notifications_for_project(
+    project_id, page=0, cursor=None, limit=None
+):
     """
     Return all notifications for given project.
     """
@@ -348,4 +470,6 @@ def get_notifications_for_project(project_id, page=0):
         .filter(Task.project_id == project_id)
         .order_by(Notification.updated_at.desc())
     )
-    return query_utils.get_paginated_results(query, page)
+    return query_utils.get_paginated_results(
+        query, page, cursor=cursor, limit=limit
+    )
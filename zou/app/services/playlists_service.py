@@ -1,8 +1,6 @@
 import os
 from slugify import slugify
 
-from shutil import copyfile
-from zipfile import ZipFile
 
 from flask import current_app
 from flask_mail import Message
@@ -16,12 +14,11 @@ from zou.app.models.preview_file import PreviewFile
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
 
-from zou.app.utils import fields, movie_utils, events
+from zou.app.utils import fields, fs, movie_utils, events
 from zou.app.utils import query as query_utils
 
 from zou.app.services import (
     base_service,
-    files_service,
     projects_service,
     shots_service,
     tasks_service,
@@ -257,60 +254,68 @@ def get_playlist(playlist_id):
     return get_playlist_raw(playlist_id).serialize()
 
 
-def retrieve_playlist_tmp_files(playlist):
+def get_playlist_movie_ids(playlist):
+    """
+    Return ids of movie previews set on playlist shots, in playlist order.
     """
-    Retrieve all files for a given playlist into the temporary folder.
-    """
-    preview_file_ids = []
-    for shot in playlist["shots"]:
-        if (
-            "preview_file_id" in shot
-            and shot["preview_file_id"] is not None
-            and len(shot["preview_file_id"]) > 0
-        ):
-            preview_file = files_service.get_preview_file(
-                shot["preview_file_id"]
+    shot_preview_file_ids = [
+        shot["preview_file_id"]
+        for shot in playlist["shots"]
+        if shot.get("preview_file_id", None) is not None
+        and len(shot["preview_file_id"]) > 0
+    ]
+    movie_ids = set()
+    if len(shot_preview_file_ids) > 0:
+        movie_ids = {
+            str(preview_file_id)
+            for (preview_file_id,) in PreviewFile.query.with_entities(
+                PreviewFile.id
             )
-            if preview_file is not None and preview_file["extension"] == "mp4":
-                preview_file_ids.append(preview_file["id"])
+            .filter(PreviewFile.id.in_(shot_preview_file_ids))
+            .filter(PreviewFile.extension == "mp4")
+        }
+    return [
+        preview_file_id
+        for preview_file_id in shot_preview_file_ids
+        if preview_file_id in movie_ids
+    ]
+
 
+def retrieve_playlist_tmp_files(playlist):
+    """
+    Retrieve all files for a given playlist into the temporary folder. Files
+    of a local storage are used in place.
+    """
+    preview_file_ids = get_playlist_movie_ids(playlist)
+    file_names = names_service.get_preview_file_names(preview_file_ids)
     file_paths = []
     for preview_file_id in preview_file_ids:
-        if config.FS_BACKEND == "local":
-            file_path = file_store.get_local_movie_path(
-                "previews", preview_file_id
-            )
-        else:
-            file_path = os.path.join(
-                config.TMP_DIR,
-                "cache-previews-%s.%s" % (preview_file_id, "mp4"),
-            )
-            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-                with open(file_path, "wb") as tmp_file:
-                    for chunk in file_store.open_movie(
-                        "previews", preview_file_id
-                    ):
-                        tmp_file.write(chunk)
-
-        file_name = names_service.get_preview_file_name(preview_file_id)
-        tmp_file_path = os.path.join(config.TMP_DIR, file_name)
-        copyfile(file_path, tmp_file_path)
-        file_paths.append((tmp_file_path, file_name))
+        file_path = fs.get_file_path(
+            config,
+            file_store.get_local_movie_path,
+            file_store.open_movie,
+            "previews",
+            preview_file_id,
+            "mp4",
+        )
+        file_paths.append((file_path, file_names[preview_file_id]))
     return file_paths
 
 
-def build_playlist_zip_file(playlist):
+def get_playlist_zip_entries(playlist):
     """
-    Build a zip for all files for a given playlist into the temporary folder.
+    Generate the zip entries of all movies of given playlist: file name,
+    chunk reader from the file storage and size. Movies are read when the
+    zip generation reaches them.
     """
-    tmp_file_paths = retrieve_playlist_tmp_files(playlist)
-    zip_file_path = get_playlist_zip_file_path(playlist)
-    if os.path.exists(zip_file_path):
-        os.remove(zip_file_path)
-    with ZipFile(zip_file_path, "w") as zip:
-        for file_path, file_name in tmp_file_paths:
-            zip.write(file_path, file_name)
-    return zip_file_path
+    preview_file_ids = get_playlist_movie_ids(playlist)
+    file_names = names_service.get_preview_file_names(preview_file_ids)
+    for preview_file_id in preview_file_ids:
+        yield (
+            file_names[preview_file_id],
+            file_store.open_movie("previews", preview_file_id),
+            file_store.get_movie_file_size("previews", preview_file_id),
+        )
 
 
 def build_playlist_movie_file(playlist, app=None):
@@ -325,7 +330,12 @@ def build_playlist_movie_file(playlist, app=None):
     fps = shots_service.get_preview_fps(project)
 
     result = movie_utils.build_playlist_movie(
-        tmp_file_paths, movie_file_path, width, height, fps
+        tmp_file_paths,
+        movie_file_path,
+        width,
+        height,
+        fps,
+        max_workers=config.PLAYLIST_BUILD_WORKERS,
     )
     if result["success"] == True:
         file_store.add_movie("playlists", job["id"], movie_file_path)
@@ -428,14 +438,6 @@ def get_playlist_movie_file_path(playlist, build_job):
     return os.path.join(config.TMP_DIR, movie_file_name)
 
 
-def get_playlist_zip_file_path(playlist):
-    """
-    Build file path for the archive file matching given playlist.
-    """
-    zip_file_name = "%s.zip" % playlist["id"]
-    return os.path.join(config.TMP_DIR, zip_file_name)
-
-
 def get_build_job_raw(build_job_id):
     """
     Return given build job as active record.
@@ -499,9 +501,11 @@ def get_build_jobs_for_project(project_id):
     return fields.serialize_list(build_jobs)
 
 
-def get_playlists_for_project(project_id, page=0):
+def get_playlists_for_project(project_id, page=0, cursor=None, limit=None):
     """
     Return all time spents for given project.
     """
     query = Playlist.query.filter(Playlist.project_id == project_id)
-    return query_utils.get_paginated_results(query, page, relations=True)
+    return query_utils.get_paginated_results(
+        query, page, relations=True, cursor=cursor, limit=limit
+    )
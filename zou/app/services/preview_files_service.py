@@ -0,0 +1,186 @@
+"""
+Process uploaded movie previews out of the HTTP request. The raw upload is
+stored first and the preview file is flagged as processing. Then the movie is
+normalized and its thumbnails are built by a background worker: the job
+queue when it is enabled, a local pool of workers otherwise. Each worker
+drives an ffmpeg process, so several uploads are transcoded at the same time
+on several cores.
+"""
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from zou.app import config
+from zou.app.services import files_service, shots_service, tasks_service
+from zou.app.stores import file_store, queue_store
+from zou.app.utils import events, movie_utils, thumbnail as thumbnail_utils
+
+
+executor = None
+executor_pid = None
+
+
+def get_executor():
+    """
+    Return the local pool of workers. It's built on first use and again
+    after a fork, so each web server process gets its own pool.
+    """
+    global executor, executor_pid
+    if executor is None or executor_pid != os.getpid():
+        executor = ThreadPoolExecutor(
+            max_workers=config.PREVIEW_PROCESSING_WORKERS
+        )
+        executor_pid = os.getpid()
+    return executor
+
+
+def start_movie_processing(
+    preview_file_id, uploaded_movie_path, original_file_name
+):
+    """
+    Store the uploaded movie as it is, flag the preview file as processing
+    and ask a worker to normalize it. It returns the preview file without
+    waiting for the end of the processing.
+    """
+    file_store.add_movie("source", preview_file_id, uploaded_movie_path)
+    os.remove(uploaded_movie_path)
+    preview_file = files_service.update_preview_file(
+        preview_file_id,
+        {
+            "extension": "mp4",
+            "original_name": original_file_name,
+            "status": "processing",
+        },
+    )
+    events.emit(
+        "preview-file:processing", {"preview_file_id": preview_file_id}
+    )
+
+    if config.ENABLE_JOB_QUEUE:
+        queue_store.job_queue.enqueue(
+            prepare_and_store_movie_job,
+            args=(preview_file_id,),
+            job_timeout=7200,
+        )
+    elif config.PREVIEW_PROCESSING_WORKERS > 0:
+        get_executor().submit(prepare_and_store_movie_job, preview_file_id)
+    else:
+        prepare_and_store_movie(preview_file_id)
+    return preview_file
+
+
+def prepare_and_store_movie_job(preview_file_id):
+    """
+    Normalize the movie of given preview file. This function is aimed at
+    being runned as a job in a job queue or in the local pool of workers.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        prepare_and_store_movie(preview_file_id)
+
+
+def prepare_and_store_movie(preview_file_id):
+    """
+    Normalize the stored raw movie and generate its thumbnails from the same
+    ffmpeg run. Normalized movie and pictures are saved in the file storage
+    and the raw movie is removed. The preview file is flagged as broken if
+    something goes wrong.
+    """
+    raw_movie_path = None
+    try:
+        raw_movie_path = get_raw_movie_path(preview_file_id)
+        project = files_service.get_project_from_preview_file(preview_file_id)
+        fps = shots_service.get_preview_fps(project)
+        (width, height) = shots_service.get_preview_dimensions(project)
+        (
+            normalized_movie_path,
+            original_tmp_path,
+        ) = movie_utils.normalize_movie_with_thumbnail(
+            raw_movie_path, fps=fps, width=width, height=height
+        )
+        file_store.add_movie("previews", preview_file_id, normalized_movie_path)
+        save_variants(original_tmp_path, preview_file_id)
+        os.remove(raw_movie_path)
+        os.remove(normalized_movie_path)
+        file_store.remove_movie("source", preview_file_id)
+    except Exception as e:
+        current_app.logger.error(e, exc_info=1)
+        current_app.logger.error("Normalization failed.")
+        if raw_movie_path is not None and os.path.exists(raw_movie_path):
+            os.remove(raw_movie_path)
+        files_service.update_preview_file(
+            preview_file_id, {"status": "broken"}
+        )
+        return None
+
+    preview_file = files_service.update_preview_file(
+        preview_file_id,
+        {"status": "ready", "thumbnail_format": config.THUMBNAIL_FORMAT},
+    )
+    events.emit("preview-file:ready", {"preview_file_id": preview_file_id})
+    emit_app_preview_event(preview_file_id)
+    return preview_file
+
+
+def get_raw_movie_path(preview_file_id):
+    """
+    Copy the raw movie in the temporary folder, the normalization writes its
+    results next to it.
+    """
+    raw_movie_path = os.path.join(
+        config.TMP_DIR, "%s.raw.tmp" % preview_file_id
+    )
+    if config.FS_BACKEND == "local":
+        shutil.copyfile(
+            file_store.get_local_movie_path("source", preview_file_id),
+            raw_movie_path,
+        )
+    else:
+        with open(raw_movie_path, "wb") as tmp_file:
+            for chunk in file_store.open_movie("source", preview_file_id):
+                tmp_file.write(chunk)
+    return raw_movie_path
+
+
+def save_variants(original_tmp_path, preview_file_id):
+    """
+    Build variants of a picture file and save them in the main storage.
+    Thumbnails are written in the configured format, it must be stored in
+    the preview file to serve them with the right type.
+    """
+    variants = thumbnail_utils.generate_preview_variants(
+        original_tmp_path, preview_file_id, config.THUMBNAIL_FORMAT
+    )
+    variants.append(("original", original_tmp_path))
+    for (name, path) in variants:
+        file_store.add_picture(name, preview_file_id, path)
+        os.remove(path)
+    return variants
+
+
+def emit_app_preview_event(preview_file_id):
+    """
+    Emit an event, each time a preview is added.
+    """
+    preview_file = files_service.get_preview_file(preview_file_id)
+    comment = tasks_service.get_comment_by_preview_file_id(preview_file_id)
+    comment_id = None
+    events.emit("preview-file:update", {"preview_file_id": preview_file["id"]})
+
+    if comment is not None:
+        comment_id = comment["id"]
+        events.emit("comment:update", {"comment_id": comment_id})
+        events.emit(
+            "preview-file:add-file",
+            {
+                "comment_id": comment_id,
+                "task_id": preview_file["task_id"],
+                "preview_file_id": preview_file["id"],
+                "revision": preview_file["revision"],
+                "extension": preview_file["extension"],
+            },
+        )
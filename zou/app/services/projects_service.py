@@ -234,7 +234,9 @@ def add_team_member(project_id, person_id):
     project.team.append(person)
     project.save()
     clear_project_cache(str(project_id))
-    events.emit("project:update", {"project_id": project_id})
+    events.emit(
+        "project:update", {"project_id": project_id, "person_id": person_id}
+    )
     return project.serialize()
 
 
@@ -247,7 +249,9 @@ def remove_team_member(project_id, person_id):
     project.team.remove(person)
     project.save()
     clear_project_cache(str(project_id))
-    events.emit("project:update", {"project_id": project_id})
+    events.emit(
+        "project:update", {"project_id": project_id, "person_id": person_id}
+    )
     return project.serialize()
 
 
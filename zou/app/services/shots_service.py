@@ -1,6 +1,6 @@
 import re
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError, StatementError
 
@@ -11,6 +11,7 @@ from zou.app.models.project import Project
 from zou.app.models.subscription import Subscription
 from zou.app.models.task import Task
 from zou.app.models.task import assignees_table
+from zou.app.models.task_stats import TaskStats
 from zou.app.models.task_status import TaskStatus
 
 from zou.app.services import (
@@ -176,20 +177,50 @@ def get_shots_and_tasks(criterions={}):
     """
     Get all shots for given criterions with related tasks for each shot.
     """
+    return list(get_shots_and_tasks_iterator(criterions))
+
+
+def get_shots_and_tasks_iterator(criterions={}):
+    """
+    Yield, one by one, all shots for given criterions with related tasks for
+    each shot. Only needed columns are selected and assignees are aggregated
+    by the database, so there is one row per task and no model is built.
+    Rows are read progressively, which allows to stream the result.
+    """
     shot_type = get_shot_type()
-    shot_map = {}
-    task_map = {}
 
     Sequence = aliased(Entity, name="sequence")
     Episode = aliased(Entity, name="episode")
+    assignees = (
+        select(
+            [
+                assignees_table.columns.task,
+                func.array_agg(assignees_table.columns.person).label(
+                    "persons"
+                ),
+            ]
+        )
+        .group_by(assignees_table.columns.task)
+        .alias("task_assignees")
+    )
 
     query = (
         Entity.query.join(Project)
         .join(Sequence, Sequence.id == Entity.parent_id)
         .outerjoin(Episode, Episode.id == Sequence.parent_id)
         .outerjoin(Task, Task.entity_id == Entity.id)
-        .outerjoin(assignees_table)
-        .add_columns(
+        .outerjoin(assignees, assignees.columns.task == Task.id)
+        .with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.description,
+            Entity.canceled,
+            Entity.data,
+            Entity.entity_type_id,
+            Entity.nb_frames,
+            Entity.parent_id,
+            Entity.preview_file_id,
+            Entity.source_id,
             Episode.name,
             Episode.id,
             Sequence.name,
@@ -206,7 +237,7 @@ def get_shots_and_tasks(criterions={}):
             Task.start_date,
             Task.due_date,
             Task.last_comment_date,
-            assignees_table.columns.person,
+            assignees.columns.persons,
             Project.id,
             Project.name,
         )
@@ -221,8 +252,22 @@ def get_shots_and_tasks(criterions={}):
     if "episode_id" in criterions:
         query = query.filter(Sequence.parent_id == criterions["episode_id"])
 
+    # Rows of a same shot must be contiguous to be able to yield each shot
+    # as soon as all its tasks are read.
+    query = query.order_by(Entity.id).yield_per(1000)
+
+    shot_dict = None
     for (
-        shot,
+        shot_id,
+        shot_name,
+        shot_description,
+        shot_canceled,
+        shot_data,
+        shot_entity_type_id,
+        shot_nb_frames,
+        shot_parent_id,
+        shot_preview_file_id,
+        shot_source_id,
         episode_name,
         episode_id,
         sequence_name,
@@ -239,43 +284,44 @@ def get_shots_and_tasks(criterions={}):
         task_start_date,
         task_due_date,
         task_last_comment_date,
-        person_id,
+        person_ids,
         project_id,
         project_name,
-    ) in query.all():
-        shot_id = str(shot.id)
-
-        shot.data = shot.data or {}
-
-        if shot_id not in shot_map:
-
-            shot_map[shot_id] = {
-                "canceled": shot.canceled,
-                "data": fields.serialize_value(shot.data),
-                "description": shot.description,
-                "entity_type_id": str(shot.entity_type_id),
+    ) in query:
+        shot_id = str(shot_id)
+
+        if shot_dict is None or shot_dict["id"] != shot_id:
+            if shot_dict is not None:
+                yield shot_dict
+
+            shot_data = shot_data or {}
+            shot_dict = {
+                "canceled": shot_canceled,
+                "data": fields.serialize_value(shot_data),
+                "description": shot_description,
+                "entity_type_id": str(shot_entity_type_id),
                 "episode_id": str(episode_id),
                 "episode_name": episode_name or "",
-                "fps": shot.data.get("fps", None),
-                "frame_in": shot.data.get("frame_in", None),
-                "frame_out": shot.data.get("frame_out", None),
-                "id": str(shot.id),
-                "name": shot.name,
-                "nb_frames": shot.nb_frames,
-                "parent_id": str(shot.parent_id),
-                "preview_file_id": str(shot.preview_file_id or ""),
+                "fps": shot_data.get("fps", None),
+                "frame_in": shot_data.get("frame_in", None),
+                "frame_out": shot_data.get("frame_out", None),
+                "id": shot_id,
+                "name": shot_name,
+                "nb_frames": shot_nb_frames,
+                "parent_id": str(shot_parent_id),
+                "preview_file_id": str(shot_preview_file_id or ""),
                 "project_id": str(project_id),
                 "project_name": project_name,
                 "sequence_id": str(sequence_id),
                 "sequence_name": sequence_name,
-                "source_id": str(shot.source_id),
+                "source_id": str(shot_source_id),
                 "tasks": [],
                 "type": "Shot",
             }
 
         if task_id is not None:
-            if task_id not in task_map:
-                task_dict = {
+            shot_dict["tasks"].append(
+                {
                     "id": str(task_id),
                     "entity_id": shot_id,
                     "task_status_id": str(task_status_id),
@@ -293,16 +339,14 @@ def get_shots_and_tasks(criterions={}):
                     "last_comment_date": fields.serialize_value(
                         task_last_comment_date
                     ),
-                    "assignees": [],
+                    "assignees": [
+                        str(person_id) for person_id in person_ids or []
+                    ],
                 }
-                task_map[task_id] = task_dict
-                shot_dict = shot_map[shot_id]
-                shot_dict["tasks"].append(task_dict)
+            )
 
-            if person_id:
-                task_map[task_id]["assignees"].append(str(person_id))
-
-    return list(shot_map.values())
+    if shot_dict is not None:
+        yield shot_dict
 
 
 def get_shot_raw(shot_id):
@@ -337,7 +381,7 @@ def get_shot_with_relations(shot_id):
     return get_shot_raw(shot_id).serialize(obj_type="Shot", relations=True)
 
 
-@cache.memoize_function(3)
+@cache.memoize_function(3600)
 def get_full_shot(shot_id):
     """
     Return given shot as a dictionary with extra data like project and
@@ -700,7 +744,9 @@ def remove_shot(shot_id, force=False):
     if is_tasks_related and not force:
         shot.update({"canceled": True})
         clear_shot_cache(shot_id)
-        events.emit("shot:update", {"shot_id": shot_id})
+        events.emit(
+            "shot:update", {"shot_id": shot_id}, project_id=shot.project_id
+        )
     else:
         from zou.app.services import tasks_service
 
@@ -712,7 +758,9 @@ def remove_shot(shot_id, force=False):
         Subscription.delete_all_by(entity_id=shot_id)
         shot.delete()
         clear_shot_cache(shot_id)
-        events.emit("shot:delete", {"shot_id": shot_id})
+        events.emit(
+            "shot:delete", {"shot_id": shot_id}, project_id=shot.project_id
+        )
 
     deleted_shot = shot.serialize(obj_type="Shot")
     return deleted_shot
@@ -781,7 +829,7 @@ def create_episode(project_id, name):
             entity_type_id=episode_type["id"], project_id=project_id, name=name
         )
     events.emit(
-        "episode:new", {"episode_id": episode.id, "project_id": project_id}
+        "episode:new", {"episode_id": episode.id}, project_id=project_id
     )
     return episode.serialize(obj_type="Episode")
 
@@ -809,7 +857,7 @@ def create_sequence(project_id, episode_id, name):
             name=name,
         )
     events.emit(
-        "sequence:new", {"sequence_id": sequence.id, "project_id": project_id}
+        "sequence:new", {"sequence_id": sequence.id}, project_id=project_id
     )
     return sequence.serialize(obj_type="Sequence")
 
@@ -837,7 +885,7 @@ def create_shot(project_id, sequence_id, name, data={}):
             name=name,
             data=data,
         )
-    events.emit("shot:new", {"shot_id": shot.id, "project_id": project_id})
+    events.emit("shot:new", {"shot_id": shot.id}, project_id=project_id)
     return shot.serialize(obj_type="Shot")
 
 
@@ -867,7 +915,7 @@ def create_scene(project_id, sequence_id, name):
             name=name,
             data={},
         )
-    events.emit("scene:new", {"scene_id": scene.id, "project_id": project_id})
+    events.emit("scene:new", {"scene_id": scene.id}, project_id=project_id)
     return scene.serialize(obj_type="Scene")
 
 
@@ -876,9 +924,14 @@ def update_shot(shot_id, data_dict):
     Update shot fields matching given id with data from dict given in parameter.
     """
     shot = get_shot_raw(shot_id)
+    (parent_id, entity_type_id) = (shot.parent_id, shot.entity_type_id)
     shot.update(data_dict)
     clear_shot_cache(shot_id)
-    events.emit("shot:update", {"shot_id": shot_id})
+    event_data = {"shot_id": shot_id}
+    event_data.update(
+        entities_service.get_move_data(shot, parent_id, entity_type_id)
+    )
+    events.emit("shot:update", event_data, project_id=shot.project_id)
     return shot.serialize()
 
 
@@ -887,33 +940,45 @@ def get_episode_stats_for_project(project_id):
     Retrieve number of tasks by status, task_types and episodes
     for given project.
     """
-    Sequence = aliased(Entity, name="sequence")
-    Episode = aliased(Entity, name="episode")
+    return get_task_stats_for_project(project_id, TaskStats.episode_id)
+
+
+def get_sequence_stats_for_project(project_id):
+    """
+    Retrieve number of tasks by status, task_types and sequences
+    for given project.
+    """
+    return get_task_stats_for_project(project_id, TaskStats.sequence_id)
+
+
+def get_task_stats_for_project(project_id, group_field):
+    """
+    Retrieve number of tasks by status, task types and given group field
+    (episode, sequence or asset type) for given project. Data are read from
+    the task stats table which is kept up to date from task events.
+    """
     query = (
-        Task.query.with_entities(
-            Task.project_id,
-            Episode.id,
-            Task.task_type_id,
-            Task.task_status_id,
+        TaskStats.query.with_entities(
+            TaskStats.project_id,
+            group_field,
+            TaskStats.task_type_id,
+            TaskStats.task_status_id,
             TaskStatus.short_name,
             TaskStatus.color,
         )
-        .filter(Task.project_id == project_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(TaskStatus, TaskStatus.id == Task.task_status_id)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Sequence, Sequence.id == Entity.parent_id)
-        .join(Episode, Episode.id == Sequence.parent_id)
+        .filter(TaskStats.project_id == project_id)
+        .filter(group_field != None)
+        .join(TaskStatus, TaskStatus.id == TaskStats.task_status_id)
         .group_by(
-            Task.project_id,
-            Episode.id,
-            Task.task_type_id,
-            Task.task_status_id,
+            TaskStats.project_id,
+            group_field,
+            TaskStats.task_type_id,
+            TaskStats.task_status_id,
             TaskStatus.short_name,
             TaskStatus.color,
         )
-        .add_columns(func.count(Task.id))
-        .add_columns(func.sum(Entity.nb_frames))
+        .add_columns(func.sum(TaskStats.count))
+        .add_columns(func.sum(TaskStats.frames))
     )
 
     results = {}
@@ -926,7 +991,7 @@ def get_episode_stats_for_project(project_id):
 def add_entry_to_stats(
     results,
     project_id,
-    episode_id,
+    group_id,
     task_type_id,
     task_status_id,
     task_status_short_name,
@@ -935,25 +1000,25 @@ def add_entry_to_stats(
     entity_nb_frames,
 ):
     """
-    Add to stats results, information of given count for given entity, task
-    type and task satus.
+    Add to stats results, information of given count for given group (episode,
+    sequence or asset type), task type and task satus.
     """
-    episode_id = str(episode_id)
+    group_id = str(group_id)
     task_type_id = str(task_type_id)
     task_status_id = str(task_status_id)
-    results.setdefault(episode_id, {})
-    results[episode_id].setdefault(task_type_id, {})
-    results[episode_id][task_type_id].setdefault(task_status_id, {})
-    results[episode_id][task_type_id][task_status_id] = {
+    results.setdefault(group_id, {})
+    results[group_id].setdefault(task_type_id, {})
+    results[group_id][task_type_id].setdefault(task_status_id, {})
+    results[group_id][task_type_id][task_status_id] = {
         "name": task_status_short_name,
         "color": task_status_color,
         "count": task_count,
         "frames": entity_nb_frames or 0,
     }
 
-    # Aggregate for episode
-    results[episode_id].setdefault("all", {})
-    results[episode_id]["all"].setdefault(
+    # Aggregate for group
+    results[group_id].setdefault("all", {})
+    results[group_id]["all"].setdefault(
         task_status_id,
         {
             "name": task_status_short_name,
@@ -962,8 +1027,8 @@ def add_entry_to_stats(
             "frames": 0,
         },
     )
-    results[episode_id]["all"][task_status_id]["count"] += task_count or 0
-    results[episode_id]["all"][task_status_id]["frames"] += (
+    results[group_id]["all"][task_status_id]["count"] += task_count or 0
+    results[group_id]["all"][task_status_id]["frames"] += (
         entity_nb_frames or 0
     )
 
@@ -971,7 +1036,7 @@ def add_entry_to_stats(
 def add_entry_to_all_stats(
     results,
     project_id,
-    episode_id,
+    group_id,
     task_type_id,
     task_status_id,
     task_status_short_name,
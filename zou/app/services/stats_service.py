@@ -0,0 +1,289 @@
+"""
+Maintain the task statistics table used by production dashboards. Counts are
+stored by sequence for shot tasks and by asset type for asset tasks. When a
+task event is emitted, only the rows of the sequence or of the asset type of
+the task are computed again, which requires a small aggregation instead of
+one over the whole project.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+
+from zou.app import db
+from zou.app.models.entity import Entity
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.models.task_stats import TaskStats
+
+from zou.app.services import assets_service, shots_service
+
+
+Sequence = aliased(Entity, name="sequence")
+
+
+def get_shot_stats_query(project_id):
+    """
+    Build the query that counts shot tasks by sequence, task type and task
+    status for given project.
+    """
+    shot_type = shots_service.get_shot_type()
+    return (
+        Task.query.with_entities(
+            Sequence.parent_id,
+            Sequence.id,
+            Task.task_type_id,
+            Task.task_status_id,
+        )
+        .join(Entity, Entity.id == Task.entity_id)
+        .join(Sequence, Sequence.id == Entity.parent_id)
+        .filter(Task.project_id == project_id)
+        .filter(Entity.entity_type_id == shot_type["id"])
+        .group_by(
+            Sequence.parent_id,
+            Sequence.id,
+            Task.task_type_id,
+            Task.task_status_id,
+        )
+        .add_columns(func.count(Task.id))
+        .add_columns(func.sum(Entity.nb_frames))
+    )
+
+
+def get_asset_stats_query(project_id):
+    """
+    Build the query that counts asset tasks by asset type, task type and task
+    status for given project.
+    """
+    return (
+        Task.query.with_entities(
+            Entity.entity_type_id, Task.task_type_id, Task.task_status_id
+        )
+        .join(Entity, Entity.id == Task.entity_id)
+        .filter(Task.project_id == project_id)
+        .filter(assets_service.build_asset_type_filter())
+        .group_by(
+            Entity.entity_type_id, Task.task_type_id, Task.task_status_id
+        )
+        .add_columns(func.count(Task.id))
+        .add_columns(func.sum(Entity.nb_frames))
+    )
+
+
+def compute_shot_stats(project_id, sequence_id=None):
+    query = get_shot_stats_query(project_id)
+    if sequence_id is not None:
+        query = query.filter(Sequence.id == sequence_id)
+    return [
+        {
+            "project_id": project_id,
+            "episode_id": episode_id,
+            "sequence_id": sequence_id,
+            "task_type_id": task_type_id,
+            "task_status_id": task_status_id,
+            "count": count,
+            "frames": frames or 0,
+        }
+        for (
+            episode_id,
+            sequence_id,
+            task_type_id,
+            task_status_id,
+            count,
+            frames,
+        ) in query.all()
+    ]
+
+
+def compute_asset_stats(project_id, asset_type_id=None):
+    query = get_asset_stats_query(project_id)
+    if asset_type_id is not None:
+        query = query.filter(Entity.entity_type_id == asset_type_id)
+    return [
+        {
+            "project_id": project_id,
+            "asset_type_id": asset_type_id,
+            "task_type_id": task_type_id,
+            "task_status_id": task_status_id,
+            "count": count,
+            "frames": frames or 0,
+        }
+        for (
+            asset_type_id,
+            task_type_id,
+            task_status_id,
+            count,
+            frames,
+        ) in query.all()
+    ]
+
+
+def lock_stats(project_id, scope_id=None):
+    """
+    Take the transaction lock protecting the stats rows of given scope
+    (sequence or asset type) of given project. The project lock is taken
+    too: shared for a scope, exclusive when the whole project is rebuilt.
+    Locks are released at the end of the transaction.
+    """
+    project_key = func.hashtext("task-stats:%s" % project_id)
+    if scope_id is None:
+        db.session.execute(func.pg_advisory_xact_lock(project_key))
+    else:
+        db.session.execute(func.pg_advisory_xact_lock_shared(project_key))
+        db.session.execute(
+            func.pg_advisory_xact_lock(
+                func.hashtext("task-stats:%s:%s" % (project_id, scope_id))
+            )
+        )
+
+
+def replace_stats(project_id, scope_id, query, compute_rows):
+    """
+    Remove the stats rows matched by given query and store the new ones in
+    the same transaction. Rows are computed once the lock is taken, so two
+    concurrent refreshes of the same scope run one after the other and the
+    second one sees the changes committed by the first one. The session is
+    rolled back on error.
+    """
+    try:
+        lock_stats(project_id, scope_id)
+        rows = compute_rows()
+        query.delete(synchronize_session=False)
+        for row in rows:
+            TaskStats.create_no_commit(**row)
+        TaskStats.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def refresh_sequence_stats(project_id, sequence_id):
+    """
+    Compute again stats of shot tasks of given sequence.
+    """
+    replace_stats(
+        project_id,
+        sequence_id,
+        TaskStats.query.filter_by(
+            project_id=project_id, sequence_id=sequence_id
+        ),
+        lambda: compute_shot_stats(project_id, sequence_id),
+    )
+
+
+def refresh_asset_type_stats(project_id, asset_type_id):
+    """
+    Compute again stats of asset tasks of given asset type.
+    """
+    replace_stats(
+        project_id,
+        asset_type_id,
+        TaskStats.query.filter_by(
+            project_id=project_id, asset_type_id=asset_type_id
+        ),
+        lambda: compute_asset_stats(project_id, asset_type_id),
+    )
+
+
+def rebuild_project_stats(project_id):
+    """
+    Compute again all stats of given project.
+    """
+    replace_stats(
+        project_id,
+        None,
+        TaskStats.query.filter_by(project_id=project_id),
+        lambda: compute_shot_stats(project_id)
+        + compute_asset_stats(project_id),
+    )
+
+
+def rebuild_stats():
+    """
+    Compute again stats of all projects. Rows of removed projects are
+    deleted.
+    """
+    project_ids = [project.id for project in Project.query.all()]
+    TaskStats.query.filter(~TaskStats.project_id.in_(project_ids)).delete(
+        synchronize_session=False
+    )
+    TaskStats.commit()
+    for project_id in project_ids:
+        rebuild_project_stats(project_id)
+
+
+def refresh_entity_stats(project_id, entity_id):
+    """
+    Compute again the stats rows in which tasks of given entity are counted.
+    """
+    entity = Entity.get(entity_id) if entity_id is not None else None
+    if entity is None:
+        rebuild_project_stats(project_id)
+    elif assets_service.is_asset(entity):
+        refresh_asset_type_stats(project_id, entity.entity_type_id)
+    elif entity.parent_id is not None:
+        refresh_sequence_stats(project_id, entity.parent_id)
+
+
+def handle_task_event(event_name, data):
+    """
+    Update stats after a task creation, change or deletion. Deletion events
+    provide project and entity ids because the task no longer exists.
+    """
+    task = Task.get(data["task_id"]) if "task_id" in data else None
+    if task is not None:
+        refresh_entity_stats(task.project_id, task.entity_id)
+    elif data.get("project_id", None) is not None:
+        refresh_entity_stats(data["project_id"], data.get("entity_id", None))
+
+
+def handle_task_batch_event(event_name, data):
+    """
+    Tasks created in bulk can be spread over many sequences and asset types:
+    stats of the whole project are computed again.
+    """
+    rebuild_project_stats(data["project_id"])
+
+
+def handle_entity_event(event_name, data):
+    """
+    A shot moved to another sequence, a sequence moved to another episode or
+    an asset changing of type impact the rows of their previous and of their
+    new scope: only these rows are computed again. Events of other changes
+    carry no previous parent or entity type and are ignored.
+    """
+    moved = "previous_parent_id" in data
+    retyped = "previous_entity_type_id" in data
+    if not moved and not retyped:
+        return
+    entity_id = None
+    for key in ["shot_id", "sequence_id", "asset_id"]:
+        if data.get(key, None) is not None:
+            entity_id = data[key]
+    entity = Entity.get(entity_id) if entity_id is not None else None
+    if entity is None:
+        return
+
+    project_id = entity.project_id
+    if event_name == "sequence:update" and moved:
+        refresh_sequence_stats(project_id, entity.id)
+    elif event_name == "shot:update" and moved:
+        if entity.parent_id is not None:
+            refresh_sequence_stats(project_id, entity.parent_id)
+        if data["previous_parent_id"] is not None:
+            refresh_sequence_stats(project_id, data["previous_parent_id"])
+    elif event_name == "asset:update" and retyped:
+        refresh_asset_type_stats(project_id, entity.entity_type_id)
+        if data["previous_entity_type_id"] is not None:
+            refresh_asset_type_stats(
+                project_id, data["previous_entity_type_id"]
+            )
+
+
+event_map = {
+    "task:new": [handle_task_event],
+    "task:update": [handle_task_event],
+    "task:delete": [handle_task_event],
+    "task:new-batch": [handle_task_batch_event],
+    "shot:update": [handle_entity_event],
+    "sequence:update": [handle_entity_event],
+    "asset:update": [handle_entity_event],
+}
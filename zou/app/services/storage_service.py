@@ -0,0 +1,254 @@
+"""
+Garbage collection of the file storage. Stored files are named after the id
+of the entry they belong to (preview file, person, project, organisation or
+playlist build job). Files of which the entry no longer exists are orphans:
+they are found by walking the buckets and comparing file ids with the ids
+stored in the database, then removed by a pool of workers.
+"""
+import collections
+import threading
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+from zou.app.models.build_job import BuildJob
+from zou.app.models.organisation import Organisation
+from zou.app.models.person import Person
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.project import Project
+from zou.app.stores import file_store
+
+# Models of which the entries can own the files of a bucket, by key prefix.
+# Files with another prefix are never removed.
+OWNER_MODELS = {
+    "pictures": {
+        "original": [PreviewFile],
+        "originals": [PreviewFile],
+        "previews": [PreviewFile],
+        "thumbnails": [PreviewFile, Person, Project, Organisation],
+        "thumbnails-square": [PreviewFile],
+    },
+    "movies": {
+        "previews": [PreviewFile],
+        "source": [PreviewFile],
+        "playlists": [BuildJob],
+    },
+    "files": {"previews": [PreviewFile]},
+}
+
+SCANNED = "scanned"
+ORPHANS = "orphans"
+IGNORED = "ignored"
+REMOVED = "removed"
+FAILED = "failed"
+
+
+class RateLimiter(object):
+    """
+    Space out calls to `wait` so they don't exceed given rate (calls per
+    second). It is shared by worker threads. No rate means no limit.
+    """
+
+    def __init__(self, max_rate=None):
+        self.interval = 1.0 / max_rate if max_rate else 0
+        self.next_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if self.interval == 0:
+            return
+        with self.lock:
+            now = time.time()
+            wait_time = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def get_buckets():
+    return [
+        ("pictures", file_store.pictures),
+        ("movies", file_store.movies),
+        ("files", file_store.files),
+    ]
+
+
+def load_ids(model, batch_size=10000):
+    """
+    Return the set of all ids of given model. Ids are loaded by batches
+    ordered by id, so a single huge result set is never built.
+    """
+    ids = set()
+    last_id = None
+    while True:
+        query = model.query.with_entities(model.id).order_by(model.id)
+        if last_id is not None:
+            query = query.filter(model.id > last_id)
+        rows = query.limit(batch_size).all()
+        ids.update(str(row_id) for (row_id,) in rows)
+        if len(rows) < batch_size:
+            return ids
+        last_id = rows[-1][0]
+
+
+def parse_key(key):
+    """
+    Return prefix and id of given storage key, (None, None) if the key
+    doesn't end with an id.
+    """
+    if len(key) > 37 and key[-37] == "-":
+        try:
+            return (key[:-37], str(uuid.UUID(key[-36:])))
+        except ValueError:
+            pass
+    return (None, None)
+
+
+def get_existing_ids(models, ids):
+    """
+    Return the ids among given ones that exist for one of given models.
+    """
+    existing_ids = set()
+    for model in models:
+        query = model.query.with_entities(model.id).filter(model.id.in_(ids))
+        existing_ids.update(str(row_id) for (row_id,) in query)
+    return existing_ids
+
+
+def list_orphan_files(bucket_name, bucket, known_ids, stats, batch_size=1000):
+    """
+    Return a generator of (key, size) tuples for the orphan files of given
+    bucket. Files are listed in streaming and compared with known ids (a
+    dict of id sets by model, filled when a model is needed). Candidates are
+    checked again in the database by batches before being returned, so
+    files of entries created during the walk are kept.
+    """
+    owner_models = OWNER_MODELS[bucket_name]
+    candidates = []
+
+    def confirm_candidates():
+        models = set()
+        for (_, _, _, file_models) in candidates:
+            models.update(file_models)
+        existing_ids = get_existing_ids(
+            models, [file_id for (_, file_id, _, _) in candidates]
+        )
+        for (key, file_id, size, _) in candidates:
+            if file_id not in existing_ids:
+                if size is None:
+                    try:
+                        size = file_store.get_stored_file_size(bucket, key)
+                    except Exception:
+                        continue  # Removed in the meantime.
+                stats[ORPHANS] += 1
+                stats["size"] += size
+                yield (key, size)
+        del candidates[:]
+
+    for (key, size) in file_store.list_stored_files(bucket):
+        stats[SCANNED] += 1
+        (prefix, file_id) = parse_key(key)
+        models = owner_models.get(prefix, None)
+        if models is None:
+            stats[IGNORED] += 1
+            continue
+
+        for model in models:
+            if model not in known_ids:
+                known_ids[model] = load_ids(model)
+        if not any(file_id in known_ids[model] for model in models):
+            candidates.append((key, file_id, size, models))
+            if len(candidates) >= batch_size:
+                for orphan in confirm_candidates():
+                    yield orphan
+
+    if len(candidates) > 0:
+        for orphan in confirm_candidates():
+            yield orphan
+
+
+def remove_stored_files(bucket, files, stats, max_workers=4, max_rate=None):
+    """
+    Remove given files (key, size) from given bucket with a pool of workers.
+    The number of removals per second doesn't exceed given rate.
+    """
+    from zou.app import app
+
+    rate_limiter = RateLimiter(max_rate)
+    pending = collections.deque()
+
+    def remove_stored_file(key):
+        rate_limiter.wait()
+        try:
+            with app.app_context():
+                bucket.delete(key)
+            return True
+        except Exception as e:
+            print("%s can't be removed: %s" % (key, e))
+            return False
+
+    def add_result(future):
+        if future.result():
+            stats[REMOVED] += 1
+        else:
+            stats[FAILED] += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (key, _) in files:
+            pending.append(executor.submit(remove_stored_file, key))
+            # Files are listed lazily, don't queue too many of them.
+            if len(pending) > max_workers * 4:
+                add_result(pending.popleft())
+        while len(pending) > 0:
+            add_result(pending.popleft())
+    return stats
+
+
+def collect_garbage(dry_run=False, max_workers=4, max_rate=None):
+    """
+    Find orphan files in every bucket and remove them, unless it's a dry
+    run. It returns statistics by bucket: scanned, orphan, ignored (unknown
+    prefix), removed and failed files, and size of orphan files in bytes.
+    """
+    known_ids = {}
+    result = {}
+    for (bucket_name, bucket) in get_buckets():
+        stats = {
+            SCANNED: 0,
+            ORPHANS: 0,
+            IGNORED: 0,
+            REMOVED: 0,
+            FAILED: 0,
+            "size": 0,
+        }
+        orphans = list_orphan_files(bucket_name, bucket, known_ids, stats)
+        if dry_run:
+            for _ in orphans:
+                pass
+        else:
+            remove_stored_files(
+                bucket,
+                orphans,
+                stats,
+                max_workers=max_workers,
+                max_rate=max_rate,
+            )
+        result[bucket_name] = stats
+    return result
+
+
+def format_stats(bucket_name, stats):
+    return (
+        "%s: %s files scanned, %s orphans (%.1f MB), %s removed, "
+        "%s failed, %s ignored."
+        % (
+            bucket_name,
+            stats[SCANNED],
+            stats[ORPHANS],
+            stats["size"] / 1000000.0,
+            stats[REMOVED],
+            stats[FAILED],
+            stats[IGNORED],
+        )
+    )
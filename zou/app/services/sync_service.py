@@ -1,7 +1,14 @@
+import collections
 import datetime
+import functools
+import itertools
 import logging
 import os
 import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 
 import gazu
 import sqlalchemy
@@ -31,9 +38,10 @@ from zou.app.models.task_status import TaskStatus
 from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
 
+from zou.app.services import backup_service, entities_service
 from zou.app.stores import file_store
 from flask_fs.backends.local import LocalBackend
-from zou.app.utils import events
+from zou.app.utils import events, transfer_utils
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -213,38 +221,166 @@ def run_listeners(event_client):
         run_listeners(event_client)
 
 
-def run_main_data_sync():
+def run_main_data_sync(max_workers=4, checkpoint_file_path=None):
     """
     Retrieve and import all cross-projects data from target instance.
     """
+    run_sync_steps(
+        get_main_sync_steps(),
+        max_workers=max_workers,
+        checkpoint_file_path=checkpoint_file_path,
+    )
+
+
+def run_open_project_data_sync(max_workers=4, checkpoint_file_path=None):
+    """
+    Retrieve and import all data related to projects from target instance.
+    """
+    steps = []
+    for project in gazu.project.all_open_projects():
+        steps += get_project_sync_steps(project)
+    run_sync_steps(
+        steps,
+        max_workers=max_workers,
+        checkpoint_file_path=checkpoint_file_path,
+    )
+
+
+def run_other_sync(max_workers=4, checkpoint_file_path=None):
+    """
+    Retrieve and import all search filters and events from target instance.
+    """
+    run_sync_steps(
+        get_other_sync_steps(),
+        max_workers=max_workers,
+        checkpoint_file_path=checkpoint_file_path,
+    )
+
+
+def get_main_sync_steps():
+    steps = []
     for event in main_events:
         path = event_name_model_path_map[event]
         model = event_name_model_map[event]
-        sync_entries(path, model)
+        steps.append(
+            (
+                "main:%s" % path,
+                path,
+                functools.partial(fetch_entries, path),
+                functools.partial(save_pages, model),
+            )
+        )
+    return steps
 
 
-def run_open_project_data_sync():
+def get_project_sync_steps(project):
+    steps = []
+    for event in project_events:
+        path = event_name_model_path_map[event]
+        model = event_name_model_map[event]
+        steps.append(
+            (
+                "%s:%s" % (project["id"], path),
+                "%s %s" % (project["name"], path),
+                functools.partial(fetch_project_entries, project, path),
+                functools.partial(save_pages, model),
+            )
+        )
+    for path in ["assets", "shots"]:
+        steps.append(
+            (
+                "%s:%s-thumbnails" % (project["id"], path),
+                "%s %s thumbnails" % (project["name"], path),
+                functools.partial(
+                    gazu.client.fetch_all,
+                    "projects/%s/%s" % (project["id"], path),
+                ),
+                save_entity_thumbnails,
+            )
+        )
+    return steps
+
+
+def get_other_sync_steps():
+    return [
+        (
+            "other:%s" % path,
+            path,
+            functools.partial(fetch_entries, path),
+            functools.partial(save_pages, model),
+        )
+        for (path, model) in [
+            ("search-filters", SearchFilter),
+            ("events", ApiEvent),
+        ]
+    ]
+
+
+def run_sync_steps(steps, max_workers=4, checkpoint_file_path=None):
     """
-    Retrieve and import all data related to projects from target instance.
+    Run given sync steps. A step is a tuple (key, label, fetch function, save
+    function). Steps are saved in the given order because data depend on
+    data imported by previous steps. Meanwhile, a pool of workers fetches
+    data of the next steps from the target instance.
+
+    Keys of saved steps are written in the checkpoint file. Steps listed in
+    this file are skipped, so an interrupted sync continues where it stopped.
     """
-    projects = gazu.project.all_open_projects()
-    for project in projects:
-        logger.info("Syncing %s..." % project["name"])
-        for event in project_events:
-            path = event_name_model_path_map[event]
-            model = event_name_model_map[event]
-            sync_project_entries(project, path, model)
-        sync_entity_thumbnails(project, "assets")
-        sync_entity_thumbnails(project, "shots")
-        logger.info("Sync of %s complete." % project["name"])
+    done_keys = read_checkpoint(checkpoint_file_path)
+    steps = [step for step in steps if step[0] not in done_keys]
+    nb_steps = len(steps)
+    pending_steps = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (index, step) in enumerate(steps):
+            pending_steps.append((index, step, executor.submit(step[2])))
+            if len(pending_steps) > max_workers:
+                save_step(
+                    pending_steps.popleft(), nb_steps, checkpoint_file_path
+                )
+        while len(pending_steps) > 0:
+            save_step(pending_steps.popleft(), nb_steps, checkpoint_file_path)
 
 
-def run_other_sync():
+def save_step(pending_step, nb_steps, checkpoint_file_path=None):
     """
-    Retrieve and import all search filters and events from target instance.
+    Save data of given step once they are fetched and report progress.
+    """
+    (index, (key, label, _, save), future) = pending_step
+    start = time.time()
+    nb_entries = save(future.result())
+    logger.info(
+        "[%s/%s] %s %s synced (%.1fs)."
+        % (index + 1, nb_steps, nb_entries, label, time.time() - start)
+    )
+    write_checkpoint(checkpoint_file_path, key)
+
+
+def read_checkpoint(checkpoint_file_path):
+    """
+    Return keys of steps already saved, listed in the checkpoint file.
     """
-    sync_entries("search-filters", SearchFilter)
-    sync_entries("events", ApiEvent)
+    if checkpoint_file_path is None or not os.path.exists(
+        checkpoint_file_path
+    ):
+        return set()
+    with open(checkpoint_file_path) as checkpoint_file:
+        return set(line.strip() for line in checkpoint_file)
+
+
+def write_checkpoint(checkpoint_file_path, key):
+    if checkpoint_file_path is not None:
+        with open(checkpoint_file_path, "a") as checkpoint_file:
+            checkpoint_file.write("%s\n" % key)
+
+
+def clear_checkpoint(checkpoint_file_path):
+    """
+    Remove the checkpoint file, once a sync is complete.
+    """
+    if checkpoint_file_path is not None and os.path.exists(
+        checkpoint_file_path
+    ):
+        os.remove(checkpoint_file_path)
 
 
 def run_last_events_sync(minutes=0, page_size=300):
@@ -318,40 +454,53 @@ def sync_event(event):
         model.delete_from_import(instance_id)
 
 
-def sync_entries(model_name, model):
+def fetch_pages(path):
     """
-    Retrieve cross-projects data from target instance.
+    Retrieve entries of given route page by page, by following the cursor
+    returned by the target instance. If the target doesn't support cursor
+    pagination, it returns all entries at once.
     """
-    instances = []
+    separator = "&" if "?" in path else "?"
+    cursor = ""
+    while cursor is not None:
+        results = gazu.client.fetch_all(
+            "%s%scursor=%s" % (path, separator, quote(cursor))
+        )
+        if isinstance(results, list):
+            yield results
+            cursor = None
+        else:
+            yield results["data"]
+            cursor = results["next_cursor"]
 
-    if model_name in ["organisations", "persons"]:
-        instances = gazu.client.fetch_all(model_name + "?relations=true")
-        model.create_from_import_list(instances)
-    else:
-        page = 1
-        init = True
-        results = {"nb_pages": 2}
-        while init or results["nb_pages"] >= page:
-            results = gazu.client.fetch_all(
-                "%s?relations=true&page=%d" % (model_name, page)
-            )
-            instances += results["data"]
-            page += 1
-            init = False
-            model.create_from_import_list(results["data"])
 
-    logger.info("%s %s synced." % (len(instances), model_name))
+def prefetch_pages(pages):
+    """
+    Fetch the first page of given page generator right away (in the sync
+    worker) and return a generator of all pages. Next pages are fetched while
+    previous ones are saved, so only one page is held in memory.
+    """
+    first_page = next(pages, None)
+    if first_page is None:
+        return iter([])
+    return itertools.chain([first_page], pages)
 
 
-def sync_project_entries(project, model_name, model):
+def fetch_entries(model_name):
     """
-    Retrieve all project data from target instance.
+    Retrieve cross-projects data from target instance, page by page.
     """
-    instances = []
-    page = 1
-    init = True
-    results = {"nb_pages": 2}
+    if model_name in ["organisations", "persons"]:
+        return [gazu.client.fetch_all(model_name + "?relations=true")]
+    else:
+        return prefetch_pages(fetch_pages("%s?relations=true" % model_name))
+
 
+def fetch_project_entries(project, model_name):
+    """
+    Retrieve all project data from target instance, page by page.
+    """
+    path = "projects/%s/%s" % (project["id"], model_name)
     if model_name not in [
         "tasks",
         "comments",
@@ -359,32 +508,54 @@ def sync_project_entries(project, model_name, model):
         "playlists",
         "preview-files",
     ]:
-        results = gazu.client.fetch_all(
-            "projects/%s/%s" % (project["id"], model_name)
-        )
-        instances += results
-        try:
-            model.create_from_import_list(instances)
-        except sqlalchemy.exc.IntegrityError:
-            logger.error("An error occured", exc_info=1)
-
+        return [gazu.client.fetch_all(path)]
     else:
-        while init or results["nb_pages"] >= page:
-            path = "projects/%s/%s?page=%d" % (project["id"], model_name, page)
-            if model_name == "playlists":
-                path = "projects/%s/playlists/all?page=%d" % (
-                    project["id"],
-                    page,
-                )
-            results = gazu.client.fetch_all(path)
-            instances += results["data"]
+        if model_name == "playlists":
+            path = "projects/%s/playlists/all" % project["id"]
+        return prefetch_pages(fetch_pages(path))
+
+
+def save_pages(model, pages):
+    """
+    Save given pages of entries. It returns the number of entries.
+    """
+    nb_entries = 0
+    for entries in pages:
+        import_entries(model, entries)
+        nb_entries += len(entries)
+    return nb_entries
+
+
+def import_entries(model, entries):
+    """
+    Save given entries with a few bulk requests. If it fails because of
+    conflicting data, entries are saved one by one to keep the valid ones.
+    """
+    try:
+        model.create_from_import_list(entries)
+    except sqlalchemy.exc.IntegrityError:
+        logger.error("Bulk import failed, import entries one by one.")
+        for entry in entries:
             try:
-                model.create_from_import_list(results["data"])
+                model.create_from_import(dict(entry))
             except sqlalchemy.exc.IntegrityError:
                 logger.error("An error occured", exc_info=1)
-            page += 1
-            init = False
-    logger.info("    %s %s synced." % (len(instances), model_name))
+
+
+def sync_entries(model_name, model):
+    """
+    Retrieve cross-projects data from target instance.
+    """
+    nb_entries = save_pages(model, fetch_entries(model_name))
+    logger.info("%s %s synced." % (nb_entries, model_name))
+
+
+def sync_project_entries(project, model_name, model):
+    """
+    Retrieve all project data from target instance.
+    """
+    nb_entries = save_pages(model, fetch_project_entries(project, model_name))
+    logger.info("    %s %s synced." % (nb_entries, model_name))
 
 
 def sync_entity_thumbnails(project, model_name):
@@ -396,6 +567,15 @@ def sync_entity_thumbnails(project, model_name):
     results = gazu.client.fetch_all(
         "projects/%s/%s" % (project["id"], model_name)
     )
+    total = save_entity_thumbnails(results)
+    logger.info("    %s %s thumbnails synced." % (total, model_name))
+
+
+def save_entity_thumbnails(results):
+    """
+    Set thumbnails of entities described by given results. It returns the
+    number of thumbnails set.
+    """
     total = 0
     for result in results:
         if result.get("preview_file_id") is not None:
@@ -410,7 +590,7 @@ def sync_entity_thumbnails(project, model_name):
                 total += 1
             except sqlalchemy.exc.IntegrityError:
                 logger.error("An error occured", exc_info=1)
-    logger.info("    %s %s thumbnails synced." % (total, model_name))
+    return total
 
 
 def add_main_sync_listeners(event_client):
@@ -478,7 +658,19 @@ def create_entry(model_name, event_name, model, event_type):
         model_id = data[model_id_field_name]
         try:
             instance = gazu.client.fetch_one(model_name, model_id)
-            model.create_from_import(instance)
+            previous_entity = None
+            if model is Entity and event_type == "update":
+                previous_entity = Entity.get(model_id)
+            if previous_entity is not None:
+                previous_values = (
+                    previous_entity.parent_id,
+                    previous_entity.entity_type_id,
+                )
+            instance = model.create_from_import(instance)
+            if previous_entity is not None:
+                data.update(
+                    entities_service.get_move_data(instance, *previous_values)
+                )
             forward_base_event(event_name, event_type, data)
             if event_type == "new":
                 logger.info("Creation: %s %s" % (event_name, model_id))
@@ -581,117 +773,153 @@ def get_retrieve_thumbnail(model_name):
     return retrieve_thumbnail
 
 
-def download_entity_thumbnails_from_storage():
+def download_entity_thumbnails_from_storage(
+    max_workers=4, manifest_path=None
+):
     """
     Download all thumbnail files for non preview entries from object storage
-    and store them locally.
+    and store them locally. Files already downloaded are skipped.
     """
-    for project in Project.query.all():
-        download_entity_thumbnail(project)
-    for organisation in Organisation.query.all():
-        download_entity_thumbnail(organisation)
-    for person in Person.query.all():
-        download_entity_thumbnail(person)
+    transfers = (
+        build_storage_download_transfer(
+            "picture",
+            "thumbnails",
+            str(entity.id),
+            local_picture.path("thumbnails-%s" % entity.id),
+        )
+        for model in [Project, Organisation, Person]
+        for entity in model.query.filter(model.has_avatar == True).all()
+    )
+    return transfer_utils.run_transfers(
+        transfers, max_workers=max_workers, manifest_path=manifest_path
+    )
 
 
-def download_preview_files_from_storage():
+def download_preview_files_from_storage(max_workers=4, manifest_path=None):
     """
     Download all thumbnail and original files for preview entries from object
-    storage and store them locally.
+    storage and store them locally. Files already downloaded are skipped.
     """
-    for preview_file in PreviewFile.query.all():
-        download_preview(preview_file)
+    transfers = (
+        build_storage_download_transfer(
+            kind, prefix, str(preview_file.id), file_path
+        )
+        for preview_file in PreviewFile.query.all()
+        for (
+            prefix,
+            kind,
+            file_path,
+        ) in backup_service.get_local_preview_files(preview_file)
+    )
+    return transfer_utils.run_transfers(
+        transfers, max_workers=max_workers, manifest_path=manifest_path
+    )
 
 
-def download_entity_thumbnail(entity):
+def build_storage_download_transfer(kind, prefix, instance_id, file_path):
     """
-    Download thumbnail file for given entity from object storage and store it
-    locally.
+    Build the transfer of given stored file to given local path.
     """
-    local = LocalBackend(
-        "local", {"root": os.path.join(preview_folder, "pictures")}
+    (_, open_func, get_size_func) = backup_service.storage_functions[kind]
+    return transfer_utils.Transfer(
+        key="storage-download:%s:%s-%s" % (kind, prefix, instance_id),
+        run=functools.partial(
+            backup_service.run_in_app_context,
+            download_stored_file,
+            open_func,
+            prefix,
+            instance_id,
+            file_path,
+        ),
+        get_source_size=functools.partial(
+            backup_service.run_in_app_context,
+            transfer_utils.get_size_or_none,
+            get_size_func,
+            prefix,
+            instance_id,
+        ),
+        get_destination_size=functools.partial(
+            transfer_utils.get_local_file_size, file_path
+        ),
     )
 
-    file_path = local.path("thumbnails-" + str(entity.id))
-    dirname = os.path.dirname(file_path)
-    if entity.has_avatar:
-        if not os.path.exists(dirname):
-            os.makedirs(dirname)
-        with open(file_path, "wb") as tmp_file:
-            for chunk in file_store.open_picture("thumbnails", str(entity.id)):
-                tmp_file.write(chunk)
 
-
-def download_file(file_path, prefix, dl_func, preview_file_id):
+def download_stored_file(open_func, prefix, instance_id, file_path):
     """
-    Download preview file for given preview from object storage and store it
-    locally.
+    Write the stored file in a temporary file next to given path, then move
+    it, so an interrupted download doesn't leave a truncated file.
     """
-    dirname = os.path.dirname(file_path)
-    if not os.path.exists(dirname):
-        os.makedirs(dirname)
-    try:
-        with open(file_path, "wb") as tmp_file:
-            for chunk in dl_func(prefix, preview_file_id):
-                tmp_file.write(chunk)
-        print("%s downloaded" % file_path)
-    except:
-        pass
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_file_path = file_path + ".tmp"
+    with open(tmp_file_path, "wb") as tmp_file:
+        for chunk in open_func(prefix, instance_id):
+            tmp_file.write(chunk)
+    os.rename(tmp_file_path, file_path)
 
 
-def download_preview(preview_file):
+def download_files_from_another_instance(max_workers=4, manifest_path=None):
     """
-    Download all files link to preview file entry: orginal file and variants.
+    Download all files from target instance. Files already downloaded are
+    skipped.
     """
-    print(
-        "download preview %s (%s)" % (preview_file.id, preview_file.extension)
+    transfers = itertools.chain(
+        get_thumbnail_download_transfers("person"),
+        get_thumbnail_download_transfers("organisation"),
+        get_thumbnail_download_transfers("project"),
+        get_preview_download_transfers(),
+    )
+    return transfer_utils.run_transfers(
+        transfers, max_workers=max_workers, manifest_path=manifest_path
     )
-    is_movie = preview_file.extension == "mp4"
-    is_picture = preview_file.extension == "png"
-    is_file = not is_movie and not is_picture
 
-    preview_file_id = str(preview_file.id)
-    file_key = "previews-%s" % preview_file_id
-    if is_file:
-        file_path = local_file.path(file_key)
-        dl_func = file_store.open_picture
-    elif is_movie:
-        file_path = local_movie.path(file_key)
-        dl_func = file_store.open_movie
-    else:
-        file_path = local_picture.path(file_key)
-        dl_func = file_store.open_file
-
-    if is_movie or is_picture:
-        for prefix in ["thumbnails", "thumbnails-square", "original"]:
-            pic_dl_func = file_store.open_picture
-            pic_file_path = local_picture.path(
-                "%s-%s" % (prefix, str(preview_file.id))
-            )
-            download_file(pic_file_path, prefix, pic_dl_func, preview_file_id)
 
-    download_file(file_path, "previews", dl_func, preview_file_id)
+def get_thumbnail_download_transfers(model_name):
+    model = event_name_model_map[model_name]
+    for instance in model.query.filter(model.has_avatar == True).all():
+        yield build_instance_download_transfer(
+            "/pictures/thumbnails/%ss/%s.png" % (model_name, instance.id),
+            local_picture.path("thumbnails-%s" % instance.id),
+        )
 
 
-def download_files_from_another_instance():
+def get_preview_download_transfers():
+    for preview_file in PreviewFile.query.all():
+        preview_file_id = str(preview_file.id)
+        for (prefix, _, file_path) in backup_service.get_local_preview_files(
+            preview_file
+        ):
+            yield build_instance_download_transfer(
+                get_instance_file_path(
+                    prefix, preview_file_id, preview_file.extension
+                ),
+                file_path,
+            )
+
+
+def build_instance_download_transfer(path, file_path):
     """
-    Download all files from target instance.
+    Build the transfer of the file at given path of the target instance to
+    given local path. File size is not known before the download.
     """
-    download_thumbnails_from_another_instance("person")
-    download_thumbnails_from_another_instance("organisation")
-    download_thumbnails_from_another_instance("project")
-    for preview_file in PreviewFile.query.all():
-        download_preview_from_another_instance(preview_file)
+    return transfer_utils.Transfer(
+        key="download:%s" % path,
+        run=functools.partial(download_from_another_instance, path, file_path),
+        get_source_size=None,
+        get_destination_size=functools.partial(
+            transfer_utils.get_local_file_size, file_path
+        ),
+    )
 
 
-def download_thumbnails_from_another_instance(model_name):
+def download_from_another_instance(path, file_path):
     """
-    Download all thumbnails from target instance for given model.
+    Download the file at given path of the target instance in a temporary
+    file, then move it to given path.
     """
-    model = event_name_model_map[model_name]
-    for instance in model.query.all():
-        if instance.has_avatar:
-            download_thumbnail_from_another_instance(model_name, instance.id)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_file_path = file_path + ".tmp"
+    gazu.client.download(path, tmp_file_path)
+    os.rename(tmp_file_path, file_path)
 
 
 def download_thumbnail_from_another_instance(model_name, model_id):
@@ -770,6 +998,19 @@ def download_file_from_another_instance(
     dirname = os.path.dirname(file_path)
     if not os.path.exists(dirname):
         os.makedirs(dirname)
+    path = get_instance_file_path(prefix, preview_file_id, extension)
+    try:
+        gazu.client.download(path, file_path)
+        print("%s downloaded" % file_path)
+    except Exception as e:
+        print(e)
+        print("%s download failed" % file_path)
+
+
+def get_instance_file_path(prefix, preview_file_id, extension):
+    """
+    Return the route of the target instance that serves given preview file.
+    """
     if prefix == "previews":
         if extension == "mp4":
             path = "/movies/originals/preview-files/%s.mp4" % preview_file_id
@@ -786,9 +1027,4 @@ def download_file_from_another_instance(
             path_prefix,
             preview_file_id
         )
-    try:
-        gazu.client.download(path, file_path)
-        print("%s downloaded" % file_path)
-    except Exception as e:
-        print(e)
-        print("%s download failed" % file_path)
+    return path
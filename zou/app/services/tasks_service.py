@@ -59,7 +59,6 @@ def clear_task_cache(task_id):
     cache.cache.delete_memoized(get_full_task, task_id)
 
 
-@cache.memoize_function(120)
 def clear_comment_cache(comment_id):
     cache.cache.delete_memoized(get_comment, comment_id)
 
@@ -500,6 +499,7 @@ def create_comment(
     Create a new comment for given object (by default, it considers this object
     as a Task).
     """
+    task = get_task(object_id)
     comment = Comment.create(
         object_id=object_id,
         object_type=object_type,
@@ -508,7 +508,11 @@ def create_comment(
         mentions=get_comment_mentions(object_id, text),
         text=text,
     )
-    events.emit("comment:new", {"comment_id": comment.id})
+    events.emit(
+        "comment:new",
+        {"comment_id": comment.id},
+        project_id=task["project_id"],
+    )
     return comment.serialize(relations=True)
 
 
@@ -738,13 +742,108 @@ def create_task(task_type, entity, name="main"):
                 "task_type_priority": task_type["priority"],
             }
         )
-        events.emit("task:new", {"task_id": task.id})
+        events.emit(
+            "task:new", {"task_id": task.id}, project_id=task.project_id
+        )
         return task_dict
 
     except IntegrityError:
         pass  # Tasks already exists, no need to create it.
 
 
+def create_tasks(task_type, entities, name="main", emit_task_events=False):
+    """
+    Create tasks of given task type for given entities. All tasks are
+    inserted with multi-row requests in a single transaction, entities that
+    already have such a task are skipped. One task:new-batch event is
+    emitted per project. task:new events are emitted for each task only if
+    it's asked. It returns ids of created tasks.
+    """
+    task_status = get_todo_status()
+    try:
+        current_user_id = persons_service.get_current_user()["id"]
+    except RuntimeError:
+        current_user_id = None
+    now = datetime.datetime.utcnow()
+    rows = [
+        {
+            "id": fields.gen_uuid(),
+            "created_at": now,
+            "updated_at": now,
+            "name": name,
+            "duration": 0,
+            "estimation": 0,
+            "completion_rate": 0,
+            "retake_count": 0,
+            "sort_order": 0,
+            "priority": 0,
+            "project_id": entity["project_id"],
+            "task_type_id": task_type["id"],
+            "task_status_id": task_status["id"],
+            "entity_id": entity["id"],
+            "assigner_id": current_user_id,
+        }
+        for entity in entities
+    ]
+    task_ids = [
+        str(task_id) for task_id in Task.create_all_ignore_conflicts(rows)
+    ]
+
+    created_ids = set(task_ids)
+    batches = {}
+    for row in rows:
+        if str(row["id"]) in created_ids:
+            batch = batches.setdefault(
+                str(row["project_id"]), {"task_ids": [], "entity_ids": []}
+            )
+            batch["task_ids"].append(str(row["id"]))
+            batch["entity_ids"].append(str(row["entity_id"]))
+    for (project_id, batch) in batches.items():
+        events.emit(
+            "task:new-batch",
+            {
+                "task_type_id": task_type["id"],
+                "task_ids": batch["task_ids"],
+                "entity_ids": batch["entity_ids"],
+            },
+            project_id=project_id,
+        )
+        if emit_task_events:
+            for task_id in batch["task_ids"]:
+                events.emit(
+                    "task:new", {"task_id": task_id}, project_id=project_id
+                )
+    return task_ids
+
+
+def get_created_tasks(task_type, task_ids):
+    """
+    Return given tasks, just created for given task type, as dicts with the
+    same fields as the ones returned by create_task.
+    """
+    if len(task_ids) == 0:
+        return []
+    task_status = get_todo_status()
+    tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+    result = []
+    for task in tasks:
+        task_dict = task.serialize(relations=True)
+        task_dict.update(
+            {
+                "task_status_id": task_status["id"],
+                "task_status_name": task_status["name"],
+                "task_status_short_name": task_status["short_name"],
+                "task_status_color": task_status["color"],
+                "task_type_id": task_type["id"],
+                "task_type_name": task_type["name"],
+                "task_type_color": task_type["color"],
+                "task_type_priority": task_type["priority"],
+            }
+        )
+        result.append(task_dict)
+    return result
+
+
 def update_task(task_id, data):
     """
     Update task with given data.
@@ -756,7 +855,9 @@ def update_task(task_id, data):
 
     task.update(data)
     clear_task_cache(task_id)
-    events.emit("task:update", {"task_id": task_id})
+    events.emit(
+        "task:update", {"task_id": task_id}, project_id=task.project_id
+    )
     return task.serialize()
 
 
@@ -849,6 +950,7 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
     except DataError:
         raise WrongDateFormatException
 
+    task = Task.get(task_id)
     if time_spent is not None:
         if duration == 0:
             time_spent.delete()
@@ -856,21 +958,30 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
             time_spent.update({"duration": time_spent.duration + duration})
         else:
             time_spent.update({"duration": duration})
-        events.emit("time-spent:update", {"time_spent_id": str(time_spent.id)})
+        events.emit(
+            "time-spent:update",
+            {"time_spent_id": str(time_spent.id), "date": str(time_spent.date)},
+            project_id=task.project_id,
+        )
     else:
         time_spent = TimeSpent.create(
             task_id=task_id, person_id=person_id, date=date, duration=duration
         )
-        events.emit("time-spent:new", {"time_spent_id": str(time_spent.id)})
+        events.emit(
+            "time-spent:new",
+            {"time_spent_id": str(time_spent.id), "date": str(time_spent.date)},
+            project_id=task.project_id,
+        )
 
-    task = Task.get(task_id)
     task.duration = 0
     time_spents = TimeSpent.get_all_by(task_id=task_id)
     for time_spent in time_spents:
         task.duration += time_spent.duration
     task.save()
     clear_task_cache(task_id)
-    events.emit("task:update", {"task_id": task_id})
+    events.emit(
+        "task:update", {"task_id": task_id}, project_id=task.project_id
+    )
 
     return time_spent.serialize()
 
@@ -898,9 +1009,13 @@ def clear_assignation(task_id):
     task_dict = task.serialize()
     for assignee in assignees:
         events.emit(
-            "task:unassign", {"person_id": assignee["id"], "task_id": task_id}
+            "task:unassign",
+            {"person_id": assignee["id"], "task_id": task_id},
+            project_id=task.project_id,
         )
-    events.emit("task:update", {"task_id": task_id})
+    events.emit(
+        "task:update", {"task_id": task_id}, project_id=task.project_id
+    )
     return task_dict
 
 
@@ -913,9 +1028,15 @@ def assign_task(task_id, person_id):
     task.assignees.append(person)
     task.save()
     task_dict = task.serialize()
-    events.emit("task:assign", {"task_id": task.id, "person_id": person.id})
+    events.emit(
+        "task:assign",
+        {"task_id": task.id, "person_id": person.id},
+        project_id=task.project_id,
+    )
     clear_task_cache(task_id)
-    events.emit("task:update", {"task_id": task_id})
+    events.emit(
+        "task:update", {"task_id": task_id}, project_id=task.project_id
+    )
     return task_dict
 
 
@@ -947,6 +1068,7 @@ def start_task(task_id):
                 "real_start_date": task.real_start_date,
                 "shotgun_id": task_dict_before["shotgun_id"],
             },
+            project_id=task.project_id,
         )
 
     return task.serialize()
@@ -994,6 +1116,7 @@ def task_to_review(
             "preview_path": preview_path,
             "change_status": change_status,
         },
+        project_id=task.project_id,
     )
 
     return task_dict_after
@@ -1032,7 +1155,7 @@ def reset_mentions(comment):
     return comment_to_update.serialize(relations=True)
 
 
-def get_comments_for_project(project_id, page=0):
+def get_comments_for_project(project_id, page=0, cursor=None, limit=None):
     """
     Return all comments for given project.
     """
@@ -1041,25 +1164,33 @@ def get_comments_for_project(project_id, page=0):
         .filter(Task.project_id == project_id)
         .order_by(Comment.updated_at.desc())
     )
-    return query_utils.get_paginated_results(query, page, relations=True)
+    return query_utils.get_paginated_results(
+        query, page, relations=True, cursor=cursor, limit=limit
+    )
 
 
-def get_time_spents_for_project(project_id, page=0):
+def get_time_spents_for_project(
+    project_id, page=0, cursor=None, limit=None
+):
     """
     Return all time spents for given project.
     """
     query = TimeSpent.query.join(Task).filter(Task.project_id == project_id)
-    return query_utils.get_paginated_results(query, page)
+    return query_utils.get_paginated_results(
+        query, page, cursor=cursor, limit=limit
+    )
 
 
-def get_tasks_for_project(project_id, page=0):
+def get_tasks_for_project(project_id, page=0, cursor=None, limit=None):
     """
     Return all tasks for given project.
     """
     query = Task.query.filter(Task.project_id == project_id).order_by(
         Task.updated_at.desc()
     )
-    return query_utils.get_paginated_results(query, page, relations=True)
+    return query_utils.get_paginated_results(
+        query, page, relations=True, cursor=cursor, limit=limit
+    )
 
 
 @cache.memoize_function(120)
@@ -3,111 +3,184 @@ import isoweek
 
 from dateutil import relativedelta
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, cast, func
 from sqlalchemy.exc import DataError
 from sqlalchemy.orm import aliased
 
 from zou.app.models.project import Project
 from zou.app.models.task import Task
+from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 
-from zou.app.utils import fields
+from zou.app.utils import cache, fields
 
-from zou.app.services.exception import WrongDateFormatException
+from zou.app.services.exception import (
+    WrongDateFormatException,
+    WrongParameterException,
+)
 
 
-def get_year_table():
+DETAIL_LEVELS = ["day", "week", "month", "year"]
+BREAKDOWNS = [None, "project", "department"]
+
+
+def get_year_table(breakdown=None):
     """
-    Return a table giving time spent by user and by month for given year.
+    Return a table giving time spent by user and by year.
     """
-    return get_yearly_table(None, detail_level="year")
+    return get_table(None, None, "year", breakdown)
 
 
-def get_month_table(year):
+def get_month_table(year, breakdown=None):
     """
     Return a table giving time spent by user and by month for given year.
     """
-    return get_yearly_table(year)
+    return get_table(get_year(year), None, "month", breakdown)
 
 
-def get_week_table(year):
+def get_week_table(year, breakdown=None):
     """
     Return a table giving time spent by user and by week for given year.
     """
-    return get_yearly_table(year, "week")
+    return get_table(get_year(year), None, "week", breakdown)
 
 
-def get_day_table(year, month):
+def get_day_table(year, month, breakdown=None):
     """
     Return a table giving time spent by user and by day for given year and
     month.
     """
-    time_spents = get_time_spents_for_month(year, month)
-    return get_table_from_time_spents(time_spents, "day")
+    return get_table(get_year(year), get_month(month), "day", breakdown)
 
 
-def get_yearly_table(year=None, detail_level="month"):
+def get_yearly_table(year=None, detail_level="month", breakdown=None):
     """
     Return a table giving time spent by user and by week or month for given
     year. Week or month detail level can be selected through *detail_level*
     argument.
     """
-    time_spents = get_time_spents_for_year(year=year)
-    return get_table_from_time_spents(time_spents, detail_level)
+    if year is not None:
+        year = get_year(year)
+    return get_table(year, None, detail_level, breakdown)
 
 
-def get_time_spents_for_year(year=None):
-    """
-    Return all time spents for given year.
-    """
-    if year is None:
-        return TimeSpent.query.all()
-    else:
-        return TimeSpent.query.filter(
-            TimeSpent.date.between("%s-01-01" % year, "%s-12-31" % year)
-        ).all()
+def get_year(year):
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        raise WrongDateFormatException
 
 
-def get_time_spents_for_month(year, month):
+def get_month(month):
+    try:
+        month = int(month)
+    except (TypeError, ValueError):
+        raise WrongDateFormatException
+    if month < 1 or month > 12:
+        raise WrongDateFormatException
+    return month
+
+
+@cache.memoize_function(1200)
+def get_table(year, month, detail_level, breakdown):
     """
-    Return all time spents for given month.
+    Build a time spent table for given period (all time if year is None, a
+    single month if month is given) and level of detail (day, week, month or
+    year). Durations are summed by Postgres. When a breakdown is given
+    (project or department), each duration is split by project or department.
+
+    Arguments are all positional to make memoized entries easy to invalidate:
+    see `get_table_arguments`.
     """
-    date = datetime.datetime(int(year), int(month), 1)
-    next_month = date + relativedelta.relativedelta(months=1)
-    return (
-        TimeSpent.query.filter(TimeSpent.date >= date.strftime("%Y-%m-%d"))
-        .filter(TimeSpent.date < next_month.strftime("%Y-%m-%d"))
-        .all()
+    if detail_level not in DETAIL_LEVELS or breakdown not in BREAKDOWNS:
+        raise WrongParameterException(
+            "Wrong detail level or breakdown: %s, %s"
+            % (detail_level, breakdown)
+        )
+
+    unit = func.date_trunc(detail_level, cast(TimeSpent.date, DateTime))
+    columns = [unit, TimeSpent.person_id]
+    query = TimeSpent.query
+    if breakdown == "project":
+        query = query.join(Task, Task.id == TimeSpent.task_id)
+        columns.append(Task.project_id)
+    elif breakdown == "department":
+        query = query.join(Task, Task.id == TimeSpent.task_id).join(
+            TaskType, TaskType.id == Task.task_type_id
+        )
+        columns.append(TaskType.department_id)
+
+    if year is not None:
+        date = datetime.date(year, month or 1, 1)
+        if month is None:
+            end_date = date + relativedelta.relativedelta(years=1)
+        else:
+            end_date = date + relativedelta.relativedelta(months=1)
+        query = query.filter(TimeSpent.date >= date).filter(
+            TimeSpent.date < end_date
+        )
+
+    query = (
+        query.with_entities(*columns)
+        .add_columns(func.sum(TimeSpent.duration))
+        .group_by(*columns)
     )
+    return build_table(query.all(), detail_level, breakdown is not None)
 
 
-def get_table_from_time_spents(time_spents, detail_level="month"):
+def build_table(entries, detail_level, with_breakdown=False):
     """
-    Buid a time spent table based on given time spents and given level
-    of detail (week, day or month).
+    Buid a time spent table from (truncated date, person id, [breakdown id,]
+    duration) entries, for given level of detail (day, week, month or year).
     """
     result = {}
-    for time_spent in time_spents:
-        if detail_level is "week":
-            unit = str(time_spent.date.isocalendar()[1])
-        elif detail_level is "day":
-            unit = str(time_spent.date.day)
-        elif detail_level is "year":
-            unit = str(time_spent.date.year)
+    for entry in entries:
+        date = entry[0]
+        if detail_level == "week":
+            unit = str(date.isocalendar()[1])
+        elif detail_level == "day":
+            unit = str(date.day)
+        elif detail_level == "year":
+            unit = str(date.year)
+        else:
+            unit = str(date.month)
+
+        person_id = str(entry[1])
+        duration = entry[-1]
+        persons = result.setdefault(unit, {})
+        if with_breakdown:
+            breakdown_id = "none" if entry[2] is None else str(entry[2])
+            durations = persons.setdefault(person_id, {})
+            durations[breakdown_id] = durations.get(breakdown_id, 0) + duration
         else:
-            unit = str(time_spent.date.month)
-
-        person_id = str(time_spent.person_id)
-        if unit not in result:
-            result[unit] = {}
-        if person_id not in result[unit]:
-            result[unit][person_id] = 0
-        result[unit][person_id] += time_spent.duration
+            persons[person_id] = persons.get(person_id, 0) + duration
     return result
 
 
+def get_table_arguments(data):
+    """
+    Return arguments of the memoized tables made outdated by a change on a
+    time spent of given date (or None to remove all entries if the date is
+    unknown).
+    """
+    try:
+        date = datetime.datetime.strptime(data["date"][:10], "%Y-%m-%d")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    arguments = []
+    for breakdown in BREAKDOWNS:
+        arguments += [
+            (None, None, "year", breakdown),
+            (date.year, None, "month", breakdown),
+            (date.year, None, "week", breakdown),
+            (date.year, date.month, "day", breakdown),
+        ]
+    return arguments
+
+
 def get_time_spents(person_id, date):
     """
     Return time spents for given person and date.
@@ -1,10 +1,11 @@
+from sqlalchemy import exists
 from sqlalchemy.orm import aliased
 
 from zou.app.models.comment import Comment
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 from zou.app.models.notification import Notification
-from zou.app.models.project import Project
+from zou.app.models.project import Project, ProjectPersonLink
 from zou.app.models.project_status import ProjectStatus
 from zou.app.models.search_filter import SearchFilter
 from zou.app.models.task import Task
@@ -27,6 +28,9 @@ from zou.app.services.exception import (
 from zou.app.utils import cache, fields, permissions
 
 
+OPEN_STATUS_NAMES = ("Active", "open", "Open")
+
+
 def clear_filter_cache():
     cache.cache.delete_memoized(get_filters)
 
@@ -44,15 +48,15 @@ def build_team_filter():
     Query filter for task to retrieve only models from project for which the
     user is part of the team.
     """
-    current_user = persons_service.get_current_user_raw()
-    return Project.team.contains(current_user)
+    access = get_current_user_project_access()
+    return build_project_ids_filter(access["project_ids"])
 
 
 def build_open_project_filter():
     """
     Query filter for project to retrieve only open projects.
     """
-    return ProjectStatus.name.in_(("Active", "open", "Open"))
+    return ProjectStatus.name.in_(OPEN_STATUS_NAMES)
 
 
 def build_related_projects_filter():
@@ -60,15 +64,13 @@ def build_related_projects_filter():
     Query filter for project to retrieve open projects of which the user
     is part of the team.
     """
-    projects = (
-        Project.query.join(ProjectStatus)
-        .filter(build_team_filter())
-        .filter(build_open_project_filter())
-        .all()
-    )
-    project_ids = [project.id for project in projects]
+    access = get_current_user_project_access()
+    return build_project_ids_filter(access["open_project_ids"])
+
+
+def build_project_ids_filter(project_ids):
     if len(project_ids) > 0:
-        return Project.id.in_(project_ids)
+        return Project.id.in_(list(project_ids))
     else:
         return Project.id.in_(["00000000-0000-0000-0000-000000000000"])
 
@@ -79,15 +81,44 @@ def related_projects():
     is part of the team.
     """
     projects = (
-        Project.query.join(Task)
-        .join(ProjectStatus)
-        .filter(build_team_filter())
-        .filter(build_open_project_filter())
+        Project.query.filter(build_related_projects_filter())
+        .filter(exists().where(Task.project_id == Project.id))
         .all()
     )
     return Project.serialize_list(projects)
 
 
+@cache.memoize_function(120)
+def get_project_access(person_id):
+    """
+    Return the project access index of given person: ids of the projects of
+    which the person is part of the team and ids of the open ones among
+    them, as sets. It is cached and rebuilt when teams, projects or the
+    person change, so access checks are a set lookup.
+    """
+    rows = (
+        ProjectPersonLink.query.join(
+            Project, Project.id == ProjectPersonLink.project_id
+        )
+        .outerjoin(
+            ProjectStatus, ProjectStatus.id == Project.project_status_id
+        )
+        .filter(ProjectPersonLink.person_id == person_id)
+        .with_entities(ProjectPersonLink.project_id, ProjectStatus.name)
+    )
+    project_ids = set()
+    open_project_ids = set()
+    for (project_id, status_name) in rows:
+        project_ids.add(str(project_id))
+        if status_name in OPEN_STATUS_NAMES:
+            open_project_ids.add(str(project_id))
+    return {"project_ids": project_ids, "open_project_ids": open_project_ids}
+
+
+def get_current_user_project_access():
+    return get_project_access(persons_service.get_current_user()["id"])
+
+
 def get_todos():
     """
     Get all unfinished tasks assigned to current user.
@@ -309,11 +340,12 @@ def check_belong_to_project(project_id):
     if project_id is None:
         return False
 
-    project = projects_service.get_project_with_relations(str(project_id))
-    current_user = persons_service.get_current_user()
-    if current_user["id"] in project["team"]:
+    access = get_current_user_project_access()
+    if str(project_id) in access["project_ids"]:
         return True
     else:
+        # Raise a not found error if the project doesn't exist.
+        projects_service.get_project(str(project_id))
         return False
 
 
@@ -1,5 +1,4 @@
 import os
-import io
 import flask_fs as fs
 
 from flask_fs.backends.local import LocalBackend
@@ -62,14 +61,113 @@ def make_key(prefix, id):
     return "%s-%s" % (prefix, id)
 
 
-def make_read_generator(bucket, key):
-    read_stream = bucket.read(key)
+CHUNK_SIZE = 1024 * 1024
 
-    def read_generator(read_stream):
-        for chunk in io.BytesIO(read_stream):
+
+def make_read_generator(bucket, key, start=0, end=None):
+    """
+    Return a generator that reads the stored file chunk by chunk. If start
+    and end (inclusive) positions are given, only this range of bytes is
+    read. Chunks are of fixed size, whole file is never loaded in memory.
+    """
+    backend = bucket.backend
+    if isinstance(backend, LocalBackend):
+        return read_local_file(path(bucket, key), start, end)
+    elif isinstance(backend, SwiftBackend):
+        headers = {}
+        if start > 0 or end is not None:
+            headers["Range"] = "bytes=%s-%s" % (
+                start,
+                end if end is not None else "",
+            )
+        (_, read_stream) = backend.conn.get_object(
+            backend.name, key, resp_chunk_size=CHUNK_SIZE, headers=headers
+        )
+        return read_stream
+    else:
+        return split_in_chunks(bucket.read(key), start, end)
+
+
+def read_local_file(file_path, start=0, end=None):
+    with open(file_path, "rb") as local_file:
+        local_file.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk_size = CHUNK_SIZE
+            if remaining is not None:
+                chunk_size = min(CHUNK_SIZE, remaining)
+                remaining -= chunk_size
+            chunk = local_file.read(chunk_size)
+            if not chunk:
+                break
             yield chunk
 
-    return read_generator(read_stream)
+
+def split_in_chunks(data, start=0, end=None):
+    data = data[start:] if end is None else data[start : end + 1]
+    for position in range(0, len(data), CHUNK_SIZE):
+        yield data[position : position + CHUNK_SIZE]
+
+
+def get_stored_file_size(bucket, key):
+    """
+    Return size in bytes of the stored file, without reading it.
+    """
+    backend = bucket.backend
+    if isinstance(backend, LocalBackend):
+        return os.path.getsize(path(bucket, key))
+    elif isinstance(backend, SwiftBackend):
+        headers = backend.conn.head_object(backend.name, key)
+        return int(headers["content-length"])
+    else:
+        return bucket.metadata(key)["size"]
+
+
+def list_stored_files(bucket, page_size=1000):
+    """
+    Return a generator of (key, size) tuples for every file of given bucket.
+    Files are listed folder by folder or page by page, the whole listing is
+    never loaded in memory. Size is None when it can't be known without an
+    extra request.
+    """
+    backend = bucket.backend
+    if isinstance(backend, LocalBackend):
+        return list_local_files(backend)
+    elif isinstance(backend, SwiftBackend):
+        return list_swift_files(backend, page_size)
+    else:
+        return ((key, None) for key in bucket.list_files())
+
+
+def list_local_files(backend):
+    """
+    Local files are stored in a folder tree built from their key (see
+    `path`): the key is rebuilt from the first folder and the file name.
+    """
+    for (folder_path, _, file_names) in os.walk(backend.root):
+        relative_path = os.path.relpath(folder_path, backend.root)
+        if relative_path == os.curdir:
+            continue
+        prefix = relative_path.split(os.sep)[0]
+        for file_name in file_names:
+            try:
+                size = os.path.getsize(os.path.join(folder_path, file_name))
+            except OSError:
+                continue  # Removed in the meantime.
+            yield ("%s-%s" % (prefix, file_name), size)
+
+
+def list_swift_files(backend, page_size=1000):
+    marker = None
+    while True:
+        (_, objects) = backend.conn.get_container(
+            backend.name, marker=marker, limit=page_size
+        )
+        if len(objects) == 0:
+            break
+        for stored_object in objects:
+            yield (stored_object["name"], stored_object["bytes"])
+        marker = objects[-1]["name"]
 
 
 def make_storage(bucket):
@@ -105,9 +203,9 @@ def get_picture(prefix, id):
     return pictures.read(key)
 
 
-def open_picture(prefix, id):
+def open_picture(prefix, id, start=0, end=None):
     key = make_key(prefix, id)
-    return make_read_generator(pictures, key)
+    return make_read_generator(pictures, key, start, end)
 
 
 def read_picture(prefix, id):
@@ -129,6 +227,10 @@ def get_local_picture_path(prefix, id):
     return path(pictures, make_key(prefix, id))
 
 
+def get_picture_file_size(prefix, id):
+    return get_stored_file_size(pictures, make_key(prefix, id))
+
+
 def add_movie(prefix, id, path):
     key = make_key(prefix, id)
     with open(path, "rb") as fd:
@@ -140,9 +242,9 @@ def get_movie(prefix, id):
     return movies.read(key)
 
 
-def open_movie(prefix, id):
+def open_movie(prefix, id, start=0, end=None):
     key = make_key(prefix, id)
-    return make_read_generator(movies, key)
+    return make_read_generator(movies, key, start, end)
 
 
 def read_movie(prefix, id):
@@ -164,6 +266,10 @@ def get_local_movie_path(prefix, id):
     return path(movies, make_key(prefix, id))
 
 
+def get_movie_file_size(prefix, id):
+    return get_stored_file_size(movies, make_key(prefix, id))
+
+
 def add_file(prefix, id, path):
     key = make_key(prefix, id)
     with open(path, "rb") as fd:
@@ -175,9 +281,9 @@ def get_file(prefix, id):
     return files.read(key)
 
 
-def open_file(prefix, id):
+def open_file(prefix, id, start=0, end=None):
     key = make_key(prefix, id)
-    return make_read_generator(files, key)
+    return make_read_generator(files, key, start, end)
 
 
 def read_file(prefix, id):
@@ -197,3 +303,7 @@ def remove_file(prefix, id):
 
 def get_local_file_path(prefix, id):
     return path(files, make_key(prefix, id))
+
+
+def get_file_size(prefix, id):
+    return get_stored_file_size(files, make_key(prefix, id))
@@ -12,9 +12,13 @@ redis_url = "redis://%s:%s/%s" % (host, port, redis_db)
 socketio = None
 
 
-def publish(event, data):
+def publish(event, data, room=None):
+    """
+    Publish event to the event stream. If a room is given, only clients that
+    joined it receive the event.
+    """
     if socketio is not None:
-        socketio.emit(event, data, namespace="/events")
+        socketio.emit(event, data, namespace="/events", room=room)
 
 
 def init():
@@ -2,15 +2,116 @@
 This module is a wrapper for flask_caching. It configures it and rename
 the memoize function. The aim with that cache is to minimize the requests
 made on the target database.
+
+Memoized results are stored in Redis. An optional in-process LRU tier can be
+placed in front of it (see LOCAL_CACHE_ENABLED setting). It avoids a Redis
+round trip and a network transfer for the most requested results. Entries of
+the local tier are evicted on every worker through Redis pub/sub when a
+memoized function is invalidated.
 """
+import inspect
+import json
+import os
+import pickle
 import redis
+import threading
+import time
 
+from collections import OrderedDict
 from functools import wraps
 from flask_caching import Cache
 from zou.app import config
 
 
+INVALIDATION_CHANNEL = "zou:cache-invalidation"
+
+
+class LocalCache(object):
+    """
+    In-memory LRU store bounded by entry count and by size in bytes. Values
+    are stored pickled so callers can't alter cached results by mutating
+    returned objects.
+    """
+
+    def __init__(self, max_entries, max_size):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                return None
+            (expiration, payload) = entry
+            if expiration < time.time():
+                self._delete(key)
+                return None
+            self.entries.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_size:
+            return
+        with self.lock:
+            self._delete(key)
+            self.entries[key] = (time.time() + timeout, payload)
+            self.size += len(payload)
+            while (
+                len(self.entries) > self.max_entries
+                or self.size > self.max_size
+            ):
+                (_, (_, evicted_payload)) = self.entries.popitem(last=False)
+                self.size -= len(evicted_payload)
+
+    def delete(self, key):
+        with self.lock:
+            self._delete(key)
+
+    def delete_namespace(self, namespace):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == namespace]:
+                self._delete(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _delete(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class TwoTierCache(Cache):
+    """
+    Flask-Caching extension that keeps the local tier in sync when memoized
+    functions are invalidated through `delete_memoized` or `clear`.
+    """
+
+    def delete_memoized(self, f, *args, **kwargs):
+        super(TwoTierCache, self).delete_memoized(f, *args, **kwargs)
+        namespace = getattr(f, "local_namespace", None)
+        if namespace is not None:
+            key = None
+            if args or kwargs:
+                key = get_local_key(f, args, kwargs)
+            evict_local(namespace, key)
+            publish_invalidation(namespace, key)
+
+    def clear(self):
+        result = super(TwoTierCache, self).clear()
+        evict_local()
+        publish_invalidation()
+        return result
+
+
 cache = None
+redis_cache = None
 
 try:
     redis_cache = redis.StrictRedis(
@@ -20,7 +121,7 @@ try:
         decode_responses=True,
     )
     redis_cache.get("test")
-    cache = Cache(
+    cache = TwoTierCache(
         config={
             "CACHE_TYPE": "redis",
             "CACHE_REDIS_HOST": config.KEY_VALUE_STORE["host"],
@@ -32,9 +133,212 @@ try:
 # This is needed to run tests which. This way they do not require a Redis
 # instance to work properly
 except redis.ConnectionError:
-    cache = Cache(config={"CACHE_TYPE": "simple"})
+    redis_cache = None
+    cache = TwoTierCache(config={"CACHE_TYPE": "simple"})
+
+local_cache = None
+if config.LOCAL_CACHE_ENABLED:
+    local_cache = LocalCache(
+        config.LOCAL_CACHE_MAX_ENTRIES, config.LOCAL_CACHE_MAX_SIZE
+    )
+
+stats = {}
+stats_lock = threading.Lock()
+call_state = threading.local()
+
+listener_pid = None
+listener_lock = threading.Lock()
+
+invalidation_map = {}
+
+
+def memoize_function(timeout):
+    """
+    Memoize decorated function results for `timeout` seconds. Results are
+    looked up in the local tier (when enabled) then in the Redis tier before
+    running the function.
+    """
+
+    def decorator(func):
+        namespace = "%s.%s" % (func.__module__, func.__qualname__)
+        signature = inspect.signature(func)
+        stats[namespace] = {"local_hits": 0, "remote_hits": 0, "misses": 0}
+
+        @wraps(func)
+        def compute(*args, **kwargs):
+            result = func(*args, **kwargs)
+            call_state.computed = True
+            increment_stat(namespace, "misses")
+            return result
+
+        memoized = cache.memoize(timeout)(compute)
+
+        @wraps(memoized)
+        def wrapper(*args, **kwargs):
+            key = None
+            if local_cache is not None:
+                key = (namespace, build_local_key(signature, args, kwargs))
+                result = local_cache.get(key)
+                if result is not None:
+                    increment_stat(namespace, "local_hits")
+                    return result
+
+            call_state.computed = False
+            result = memoized(*args, **kwargs)
+            if not call_state.computed:
+                increment_stat(namespace, "remote_hits")
+
+            if key is not None and result is not None:
+                start_invalidation_listener()
+                local_cache.set(key, result, timeout)
+            return result
+
+        wrapper.local_namespace = namespace
+        wrapper.local_signature = signature
+        return wrapper
+
+    return decorator
+
+
+def build_local_key(signature, args, kwargs):
+    """
+    Build a key that doesn't depend on the way arguments are given (positional
+    or named, default values omitted or not).
+    """
+    try:
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        return repr(tuple(arguments.arguments.items()))
+    except TypeError:
+        return repr((args, sorted(kwargs.items())))
+
+
+def get_local_key(f, args, kwargs):
+    return build_local_key(f.local_signature, args, kwargs)
+
+
+def evict_local(namespace=None, key=None):
+    """
+    Remove entries from the local tier: a single entry when key is given,
+    all entries of the namespace else, everything if namespace is not given.
+    """
+    if local_cache is None:
+        return
+    elif namespace is None:
+        local_cache.clear()
+    elif key is None:
+        local_cache.delete_namespace(namespace)
+    else:
+        local_cache.delete((namespace, key))
+
+
+def publish_invalidation(namespace=None, key=None):
+    """
+    Tell other workers to evict given entries from their local tier.
+    """
+    if local_cache is None or redis_cache is None:
+        return
+    try:
+        redis_cache.publish(
+            INVALIDATION_CHANNEL,
+            json.dumps({"namespace": namespace, "key": key}),
+        )
+    except redis.ConnectionError:
+        pass
+
+
+def handle_invalidation_message(message):
+    data = json.loads(message["data"])
+    evict_local(data["namespace"], data["key"])
+
+
+def start_invalidation_listener():
+    """
+    Subscribe (once per process) to the invalidation channel. A new
+    subscription is made after a fork, since the listener thread is not
+    copied in the child process.
+    """
+    global listener_pid
+
+    if redis_cache is None or listener_pid == os.getpid():
+        return
+    with listener_lock:
+        if listener_pid != os.getpid():
+            pubsub = redis_cache.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{INVALIDATION_CHANNEL: handle_invalidation_message}
+            )
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+            local_cache.clear()
+            listener_pid = os.getpid()
+
+
+def increment_stat(namespace, counter):
+    with stats_lock:
+        stats[namespace][counter] += 1
+
+
+def get_stats():
+    """
+    Return hit and miss counters of every memoized function for the current
+    process.
+    """
+    with stats_lock:
+        return {
+            namespace: dict(counters)
+            for namespace, counters in stats.items()
+            if any(counters.values())
+        }
+
+
+def reset_stats():
+    with stats_lock:
+        for counters in stats.values():
+            for counter in counters:
+                counters[counter] = 0
+
+
+def register_invalidations(event_map):
+    """
+    Register the memoized functions to invalidate when an event is emitted.
+    The key is the event name, the value is a list of (function, key) pairs.
+    The key is None (all entries are removed), the name of the event data
+    field that holds the function argument or a function that builds the
+    argument list from event data. Arguments of functions taking several
+    parameters are given as tuples.
+    """
+    for event_name, targets in event_map.items():
+        if event_name not in invalidation_map:
+            invalidation_map[event_name] = []
+        invalidation_map[event_name] += targets
+
+
+def unregister_invalidations():
+    invalidation_map.clear()
+
+
+def invalidate_from_event(event_name, data):
+    """
+    Remove the memoized entries made outdated by given event.
+    """
+    for (function, key) in invalidation_map.get(event_name, []):
+        if key is None:
+            arguments = None
+        elif callable(key):
+            arguments = key(data)
+        elif data.get(key, None) is not None:
+            arguments = [data[key]]
+        else:
+            arguments = None
 
-memoize_function = cache.memoize
+        if arguments is None:
+            cache.delete_memoized(function)
+        else:
+            for argument in arguments:
+                if isinstance(argument, tuple):
+                    cache.delete_memoized(function, *argument)
+                else:
+                    cache.delete_memoized(function, argument)
 
 
 def invalidate(*args):
@@ -6,15 +6,19 @@ import datetime
 
 
 from ldap3 import Server, Connection, ALL, NTLM, SIMPLE
-from zou.app.utils import thumbnail as thumbnail_utils
+from zou.app.utils import thumbnail as thumbnail_utils, transfer_utils
 from zou.app.stores import auth_tokens_store, file_store
 from zou.app.services import (
     assets_service,
     backup_service,
     deletion_service,
+    events_service,
+    notifications_service,
     persons_service,
     projects_service,
     shots_service,
+    stats_service,
+    storage_service,
     sync_service,
     tasks_service,
 )
@@ -303,15 +307,26 @@ def sync_with_ldap_server():
     update_person_list_with_ldap_users(ldap_users)
 
 
-def import_data_from_another_instance(target, login, password):
+def import_data_from_another_instance(
+    target, login, password, max_workers=4, checkpoint_file_path=None
+):
     """
     Retrieve and save all the data from another API instance. It doesn't
-    change the IDs.
+    change the IDs. Saved steps are listed in the checkpoint file: if the
+    sync is interrupted, running it again continues where it stopped. The
+    file is removed once the sync is complete.
     """
     sync_service.init(target, login, password)
-    sync_service.run_main_data_sync()
-    sync_service.run_open_project_data_sync()
-    sync_service.run_other_sync()
+    sync_service.run_main_data_sync(
+        max_workers=max_workers, checkpoint_file_path=checkpoint_file_path
+    )
+    sync_service.run_open_project_data_sync(
+        max_workers=max_workers, checkpoint_file_path=checkpoint_file_path
+    )
+    sync_service.run_other_sync(
+        max_workers=max_workers, checkpoint_file_path=checkpoint_file_path
+    )
+    sync_service.clear_checkpoint(checkpoint_file_path)
 
 
 def run_sync_change_daemon(event_target, target, login, password, logs_dir):
@@ -374,18 +389,29 @@ def import_last_file_changes_from_another_instance(
     print("Syncing ended.")
 
 
-def import_files_from_another_instance(target, login, password):
+def import_files_from_another_instance(
+    target, login, password, max_workers=4, manifest_path=None
+):
     """
     Retrieve and save all the data related most recent events from another API
     instance. It doesn't change the IDs.
     """
     sync_service.init(target, login, password)
-    sync_service.download_files_from_another_instance()
+    stats = sync_service.download_files_from_another_instance(
+        max_workers=max_workers, manifest_path=manifest_path
+    )
+    print(transfer_utils.format_stats(stats))
 
 
-def download_file_from_storage():
-    sync_service.download_entity_thumbnails_from_storage()
-    sync_service.download_preview_files_from_storage()
+def download_file_from_storage(max_workers=4, manifest_path=None):
+    stats = sync_service.download_entity_thumbnails_from_storage(
+        max_workers=max_workers, manifest_path=manifest_path
+    )
+    print("Thumbnails: %s" % transfer_utils.format_stats(stats))
+    stats = sync_service.download_preview_files_from_storage(
+        max_workers=max_workers, manifest_path=manifest_path
+    )
+    print("Previews: %s" % transfer_utils.format_stats(stats))
 
 
 def dump_database():
@@ -400,10 +426,57 @@ def dump_database():
     backup_service.store_db_backup(filename)
 
 
-def upload_files_to_cloud_storage(days):
-    backup_service.upload_entity_thumbnails_to_storage(days)
-    backup_service.upload_preview_files_to_storage(days)
+def upload_files_to_cloud_storage(days, max_workers=4, manifest_path=None):
+    stats = backup_service.upload_entity_thumbnails_to_storage(
+        days, max_workers=max_workers, manifest_path=manifest_path
+    )
+    print("Thumbnails: %s" % transfer_utils.format_stats(stats))
+    stats = backup_service.upload_preview_files_to_storage(
+        days, max_workers=max_workers, manifest_path=manifest_path
+    )
+    print("Previews: %s" % transfer_utils.format_stats(stats))
 
 
 def reset_tasks_data(project_id):
     deletion_service.reset_tasks_data(project_id)
+
+
+def compute_task_stats(project_id=None):
+    if project_id is None:
+        stats_service.rebuild_stats()
+    else:
+        stats_service.rebuild_project_stats(project_id)
+
+
+def clean_events(days, archive_path=None, months_ahead=3):
+    created = events_service.create_event_partitions(months_ahead)
+    for name in created:
+        print("Partition %s created." % name)
+    result = events_service.remove_old_events(days, archive_path)
+    if archive_path is not None:
+        print("%s events archived in %s." % (result["archived"], archive_path))
+    for name in result["dropped_partitions"]:
+        print("Partition %s removed." % name)
+    print("%s old events deleted." % result["deleted"])
+
+
+def send_notification_digests():
+    from zou.app import app
+
+    with app.app_context():
+        nb_digests = notifications_service.send_notification_digests()
+    print("%s notification digests sent." % nb_digests)
+
+
+def clean_storage(dry_run=False, max_workers=4, max_rate=None):
+    from zou.app import app
+
+    with app.app_context():
+        result = storage_service.collect_garbage(
+            dry_run=dry_run, max_workers=max_workers, max_rate=max_rate
+        )
+    for bucket_name in sorted(result.keys()):
+        print(storage_service.format_stats(bucket_name, result[bucket_name]))
+    if dry_run:
+        size = sum(stats["size"] for stats in result.values())
+        print("%.1f MB can be reclaimed." % (size / 1000000.0))
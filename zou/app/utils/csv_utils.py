@@ -5,7 +5,7 @@ except ImportError:
 import csv
 
 from zou.app import config
-from flask import make_response
+from flask import Response, make_response, stream_with_context
 from slugify import slugify
 
 
@@ -21,6 +21,19 @@ def build_csv_response(csv_content, file_name="export"):
     return csv_response
 
 
+def build_csv_stream_response(rows, file_name="export"):
+    """
+    Construct a Flask response that sends given rows as a csv file. Rows are
+    read from the iterable and written to the client one by one, so the
+    whole file is never held in memory. The request context is kept alive
+    until the last row is sent.
+    """
+    file_name = build_csv_file_name(file_name)
+    csv_response = Response(stream_with_context(generate_csv_lines(rows)))
+    csv_response = build_csv_headers(csv_response, file_name)
+    return csv_response
+
+
 def build_csv_file_name(file_name):
     """
     Add application name as prefix of the file name.
@@ -41,6 +54,44 @@ def build_csv_string(csv_content):
     return string_wrapper.getvalue()
 
 
+def generate_csv_lines(rows, batch_size=500):
+    """
+    Generate CSV formatted strings from an iterable of rows. Rows are grouped
+    by batches to avoid sending too many small chunks.
+    """
+    string_wrapper = StringIO()
+    csv_writer = csv.writer(string_wrapper, delimiter=";")
+    nb_rows = 0
+    for row in rows:
+        csv_writer.writerow(row)
+        nb_rows += 1
+        if nb_rows == batch_size:
+            yield string_wrapper.getvalue()
+            string_wrapper.seek(0)
+            string_wrapper.truncate()
+            nb_rows = 0
+    if nb_rows > 0:
+        yield string_wrapper.getvalue()
+
+
+def read_csv_file(file_path, delimiters=",;\t"):
+    """
+    Read given CSV file. Its dialect (delimiter, quote character) is guessed
+    once from the first lines. It returns the column names and the rows as
+    dicts.
+    """
+    with open(file_path, newline="") as csv_file:
+        sample = csv_file.read(64 * 1024)
+        csv_file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=delimiters)
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(csv_file, dialect=dialect)
+        rows = list(reader)
+        return (reader.fieldnames or [], rows)
+
+
 def build_csv_headers(csv_response, file_name):
     """
     Build HTTP response headers needed to return CSV content as a file.
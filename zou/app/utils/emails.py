@@ -1,18 +1,48 @@
+from flask import current_app
 from flask_mail import Message
 
 from zou.app import mail
 
 
-def send_email(subject, body, recipient_email, html=None):
+def build_message(subject, body, recipient_email, html=None):
     """
-    Send an email with given subject and body to given recipient.
+    Build an email message with given subject and body for given recipient.
     """
     if html is None:
         html = body
-    message = Message(
+    return Message(
         body=body,
         html=html,
         subject=subject,
         recipients=[recipient_email]
     )
-    mail.send(message)
+
+
+def send_email(subject, body, recipient_email, html=None):
+    """
+    Send an email with given subject and body to given recipient.
+    """
+    mail.send(build_message(subject, body, recipient_email, html=html))
+
+
+def send_emails(emails):
+    """
+    Send given emails (tuples of subject, body and recipient email) through
+    a single SMTP connection. A failing email doesn't prevent the other ones
+    from being sent. It returns the number of sent emails.
+    """
+    nb_sent = 0
+    if len(emails) > 0:
+        with mail.connect() as connection:
+            for (subject, body, recipient_email) in emails:
+                try:
+                    connection.send(
+                        build_message(subject, body, recipient_email)
+                    )
+                    nb_sent += 1
+                except Exception:
+                    current_app.logger.error(
+                        "Email to %s can't be sent" % recipient_email,
+                        exc_info=1,
+                    )
+    return nb_sent
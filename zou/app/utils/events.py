@@ -1,13 +1,20 @@
+import datetime
+
 from collections import OrderedDict
 
-from flask import current_app
+from flask import current_app, g, has_request_context
 
+from zou.app import db
 from zou.app.stores import publisher_store
 from zou.app.models.event import ApiEvent
-from zou.app.utils import fields
+from zou.app.utils import cache, fields
 
 
 handlers = {}
+listeners = {}
+
+# Maximum number of events kept in memory during a request.
+EVENT_BUFFER_SIZE = 1000
 
 publisher_store.init()
 
@@ -56,16 +63,48 @@ def unregister_all():
     handlers = {}
 
 
-def emit(event, data={}, persist=True):
+def register_listeners(event_map):
+    """
+    Register functions run in the current process each time an event is
+    emitted, before the event is published. The key is the event name, the
+    value is a list of functions that receive the event name and its data.
+    Unlike handlers, they are never sent to the job queue, which makes them
+    suitable to keep derived data in sync.
+    """
+    for event_name, functions in event_map.items():
+        if event_name not in listeners:
+            listeners[event_name] = []
+        listeners[event_name] += functions
+
+
+def unregister_listeners():
+    listeners.clear()
+
+
+def emit(event, data={}, persist=True, project_id=None):
     """
     Emit an event which leads to the execution of all event handlers registered
     for that event name.
     It publishes too the event to other services
     (like the realtime event daemon).
+    Memoized results made outdated by the event are removed from the cache
+    before anything else.
+    When a project id is given, the event is tagged with it and the event
+    stream delivers it only to clients that joined the project room.
     """
     event_handlers = handlers.get(event, {})
     data = fields.serialize_dict(data)
-    publisher_store.publish(event, data)
+    if project_id is not None:
+        data["project_id"] = fields.serialize_value(project_id)
+    cache.invalidate_from_event(event, data)
+    for listener in listeners.get(event, []):
+        try:
+            listener(event, data)
+        except Exception:
+            current_app.logger.error("Error running listener", exc_info=1)
+    publisher_store.publish(
+        event, data, room=get_room(event, data, project_id is not None)
+    )
     if persist:
         save_event(event, data)
 
@@ -83,16 +122,80 @@ def emit(event, data={}, persist=True):
                 current_app.logger.error("Error handling event", exc_info=1)
 
 
+def get_room(event, data, is_project_event=False):
+    """
+    Return the event stream room the event must be delivered to: the person
+    room for notifications, the project room for events tagged with a
+    project. None means the event is delivered to every client.
+    """
+    if event.startswith("notification:") and data.get("person_id"):
+        return "person:%s" % data["person_id"]
+    elif is_project_event:
+        return "project:%s" % data["project_id"]
+    else:
+        return None
+
+
 def save_event(event, data):
     """
-    Store event information in the database.
+    Store event information in the database. During a request, events are
+    buffered and stored with a single insert when the request ends (see
+    `flush_events`). Elsewhere (jobs, commands), they are stored right away.
     """
-    try:
-        from zou.app.services.persons_service import get_current_user_raw
+    now = datetime.datetime.utcnow()
+    row = {
+        "id": fields.gen_uuid(),
+        "created_at": now,
+        "updated_at": now,
+        "name": event,
+        "data": data,
+        "user_id": get_current_user_id(),
+    }
+    if has_request_context():
+        if "event_rows" not in g:
+            g.event_rows = []
+        g.event_rows.append(row)
+        if len(g.event_rows) >= EVENT_BUFFER_SIZE:
+            flush_events()
+    else:
+        insert_events([row])
+    return row
+
+
+def get_current_user_id():
+    """
+    Return the id of the user that does the request, looked up once per
+    request. None is returned outside of requests or for anonymous requests.
+    """
+    if not has_request_context():
+        return None
+    if "event_user_id" not in g:
+        try:
+            from zou.app.services.persons_service import get_current_user
+
+            g.event_user_id = get_current_user()["id"]
+        except Exception:
+            g.event_user_id = None
+    return g.event_user_id
 
-        person = get_current_user_raw()
-        person_id = person.id
-    except:
-        person_id = None
 
-    return ApiEvent.create(name=event, data=data, user_id=person_id)
+def flush_events(exception=None):
+    """
+    Store events buffered during the current request. It is run when the
+    request ends.
+    """
+    rows = g.pop("event_rows", [])
+    if len(rows) > 0:
+        try:
+            insert_events(rows)
+        except Exception:
+            current_app.logger.error("Events can't be saved", exc_info=1)
+
+
+def insert_events(rows):
+    """
+    Store given events with a multi-row insert. It uses its own connection,
+    so it doesn't commit or depend on the state of the current session.
+    """
+    with db.engine.begin() as connection:
+        connection.execute(ApiEvent.__table__.insert().values(rows))
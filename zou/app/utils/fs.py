@@ -1,7 +1,10 @@
 import os
 import shutil
+import time
+import uuid
 
 import errno
+import fcntl
 
 
 def mkdir_p(path):
@@ -31,14 +34,135 @@ def copyfile(src, dest):
 def get_file_path(
     config, get_local_path, open_file, prefix, instance_id, extension
 ):
+    """
+    Return a local path for given stored file. If it's not a local storage,
+    the file is downloaded in the file cache folder first.
+    """
     if config.FS_BACKEND == "local":
         file_path = get_local_path(prefix, instance_id)
     else:
-        file_path = os.path.join(
-            config.TMP_DIR, "cache-%s-%s.%s" % (prefix, instance_id, extension)
+        file_path = get_cached_file_path(
+            config,
+            get_cache_file_name(prefix, instance_id, extension),
+            lambda: open_file(prefix, instance_id),
         )
-        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-            with open(file_path, "wb") as tmp_file:
-                for chunk in open_file(prefix, instance_id):
-                    tmp_file.write(chunk)
     return file_path
+
+
+def get_cache_file_name(prefix, instance_id, extension):
+    return "cache-%s-%s.%s" % (prefix, instance_id, extension)
+
+
+def is_cached(config, prefix, instance_id, extension):
+    file_path = os.path.join(
+        config.FS_CACHE_FOLDER,
+        get_cache_file_name(prefix, instance_id, extension),
+    )
+    return os.path.exists(file_path)
+
+
+def get_cached_file_path(config, file_name, open_file):
+    """
+    Return path of given file in the file cache folder. If it is not cached
+    yet, it is downloaded with given open_file function. A lock file prevents
+    several processes from downloading the same file at the same time: the
+    others wait for the end of the download. Downloads are written in a
+    temporary file renamed once complete, so a partial file is never served.
+    """
+    mkdir_p(config.FS_CACHE_FOLDER)
+    file_path = os.path.join(config.FS_CACHE_FOLDER, file_name)
+    if os.path.exists(file_path):
+        os.utime(file_path, None)
+        return file_path
+
+    with open(file_path + ".lock", "w") as lock_file:
+        acquire_lock(lock_file, config.FS_CACHE_LOCK_TIMEOUT)
+        try:
+            if os.path.exists(file_path):
+                os.utime(file_path, None)
+            else:
+                tmp_file_path = "%s.%s.part" % (file_path, uuid.uuid4())
+                try:
+                    with open(tmp_file_path, "wb") as tmp_file:
+                        for chunk in open_file():
+                            tmp_file.write(chunk)
+                    os.rename(tmp_file_path, file_path)
+                finally:
+                    rm_file(tmp_file_path)
+                evict_cached_files(config, keep=file_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return file_path
+
+
+def acquire_lock(lock_file, timeout, delay=0.05, max_delay=1):
+    """
+    Lock given file without blocking the thread: the lock is requested again
+    after a growing delay until it is obtained. Waiting through sleep lets
+    other greenlets (including the one holding the lock) run in the
+    meantime. It raises a TimeoutError if the lock is not obtained after
+    `timeout` seconds.
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except (IOError, OSError) as exception:
+            if exception.errno not in (errno.EAGAIN, errno.EACCES):
+                raise
+        if time.time() >= deadline:
+            raise TimeoutError("Lock wait timeout on %s." % lock_file.name)
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+def evict_cached_files(config, keep=None):
+    """
+    Remove least recently used files from the file cache folder until its
+    size is under the configured limit. Files are touched each time they are
+    used, so the modification date tells when they were used for the last
+    time.
+    """
+    cached_files = []
+    total_size = 0
+    for file_name in os.listdir(config.FS_CACHE_FOLDER):
+        if file_name.endswith(".lock") or file_name.endswith(".part"):
+            continue
+        file_path = os.path.join(config.FS_CACHE_FOLDER, file_name)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        cached_files.append((stat.st_mtime, stat.st_size, file_path))
+        total_size += stat.st_size
+
+    for (_, size, file_path) in sorted(cached_files):
+        if total_size <= config.FS_CACHE_MAX_SIZE:
+            break
+        if file_path != keep:
+            rm_file(file_path)
+            rm_unused_lock_file(file_path + ".lock")
+            total_size -= size
+    return total_size
+
+
+def rm_unused_lock_file(lock_file_path):
+    """
+    Remove given lock file unless a process holds it. Removing a held lock
+    would let another process lock a new file with the same name and
+    download the same file at the same time.
+    """
+    try:
+        lock_file = open(lock_file_path, "r")
+    except (IOError, OSError):
+        return
+    with lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            return
+        try:
+            rm_file(lock_file_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,8 +1,21 @@
 import os
 import math
 import ffmpeg
+
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
+PREVIEW_AUDIO_CODEC = "aac"
+PREVIEW_AUDIO_RATE = 48000
+PREVIEW_AUDIO_CHANNELS = 2
+# H264 profiles reported by ffprobe and matching x264 profile names.
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+}
+
 
 def save_file(tmp_folder, instance_id, file_to_save):
     """
@@ -34,24 +47,50 @@ def generate_thumbnail(movie_path):
 
 def get_movie_size(movie_path):
     """
-    Returns movie resolution (extract a frame and returns its size).
+    Returns movie resolution. It's read from the file header, so no frame is
+    decoded. If the header doesn't provide it, a frame is extracted to get
+    its size.
     """
-    image_path = generate_thumbnail(movie_path)
-    im = Image.open(image_path)
-    size = im.size
-    im.close()
-    os.remove(image_path)
-    return size
+    try:
+        probe = ffmpeg.probe(movie_path, select_streams="v:0")
+        stream = probe["streams"][0]
+        return (int(stream["width"]), int(stream["height"]))
+    except (ffmpeg.Error, IndexError, KeyError, ValueError):
+        image_path = generate_thumbnail(movie_path)
+        im = Image.open(image_path)
+        size = im.size
+        im.close()
+        os.remove(image_path)
+        return size
 
 
 def normalize_movie(movie_path, fps="24.00", width=None, height=1080):
     """
     Turn movie in a 1080p movie file (or use resolution given in parameter).
     """
+    (file_target_path, _) = run_normalization(movie_path, fps, width, height)
+    return file_target_path
+
+
+def normalize_movie_with_thumbnail(
+    movie_path, fps="24.00", width=None, height=1080
+):
+    """
+    Same as normalize_movie, but the first frame is saved as a picture by the
+    same ffmpeg run: the source is decoded once for both outputs. It returns
+    the normalized movie path and the picture path.
+    """
+    return run_normalization(
+        movie_path, fps, width, height, with_thumbnail=True
+    )
+
+
+def run_normalization(movie_path, fps, width, height, with_thumbnail=False):
     folder_path = os.path.dirname(movie_path)
     file_source_name = os.path.basename(movie_path)
     file_target_name = "%s.mp4" % file_source_name[:-8]
     file_target_path = os.path.join(folder_path, file_target_name)
+    thumbnail_path = None
 
     (w, h) = get_movie_size(movie_path)
     resize_factor = w / h
@@ -62,8 +101,10 @@ def normalize_movie(movie_path, fps="24.00", width=None, height=1080):
     if width % 2 == 1:
         width = width + 1
 
-    try:
-        ffmpeg.input(movie_path).output(
+    size = "%sx%s" % (width, height)
+    movie_input = ffmpeg.input(movie_path)
+    outputs = [
+        movie_input.output(
             file_target_path,
             pix_fmt="yuv420p",
             format="mp4",
@@ -71,46 +112,237 @@ def normalize_movie(movie_path, fps="24.00", width=None, height=1080):
             b="28M",
             preset="medium",
             vcodec="libx264",
-            s="%sx%s" % (width, height),
-        ).run(quiet=False, capture_stderr=True)
+            s=size,
+            acodec=PREVIEW_AUDIO_CODEC,
+            ar=PREVIEW_AUDIO_RATE,
+            ac=PREVIEW_AUDIO_CHANNELS,
+        )
+    ]
+    if with_thumbnail:
+        thumbnail_path = "%s.png" % file_target_path[:-4]
+        outputs.append(movie_input.output(thumbnail_path, vframes=1, s=size))
+
+    try:
+        ffmpeg.merge_outputs(*outputs).overwrite_output().run(
+            quiet=False, capture_stderr=True
+        )
     except ffmpeg.Error as exc:
         from flask import current_app
 
         current_app.logger.error(exc.stderr)
         raise
 
-    return file_target_path
+    return (file_target_path, thumbnail_path)
 
 
 def build_playlist_movie(
-    tmp_file_paths, movie_file_path, width=None, height=1080, fps="24.00"
+    tmp_file_paths,
+    movie_file_path,
+    width=None,
+    height=1080,
+    fps="24.00",
+    max_workers=1,
 ):
     """
-    Build a single movie file from a playlist.
+    Build a single movie file from a playlist. Clips that match the target
+    profile (size, fps, codecs) are joined as they are with the concat
+    demuxer, without decoding them. Clips that don't match are encoded again
+    first, several at the same time (max_workers ffmpeg processes). The
+    first clip gives the H264 profile, level and time base that the other
+    clips must share to be joined.
     """
-    in_files = []
-    if len(tmp_file_paths) > 0:
-        (first_movie_file_path, _) = tmp_file_paths[0]
-        if width is None:
-            (width, height) = get_movie_size(first_movie_file_path)
+    if len(tmp_file_paths) == 0:
+        return {"success": True}
 
-        for tmp_file_path, file_name in tmp_file_paths:
-            in_file = ffmpeg.input(tmp_file_path)
-            in_files.append(
-                in_file["v"]
-                .filter("setsar", "1/1")
-                .filter("scale", width, height)
-            )
-            in_files.append(in_file["a"])
-        joined = ffmpeg.concat(*in_files, v=1, a=1).node
-        video = joined[0]
-        audio = joined[1]
-
-        try:
-            ffmpeg.output(
-                audio, video, movie_file_path
-            ).overwrite_output().run()
-        except Exception as e:
-            print(e)
-            return {"success": False, "message": str(e)}
+    (first_movie_file_path, _) = tmp_file_paths[0]
+    if width is None:
+        (width, height) = get_movie_size(first_movie_file_path)
+    if width % 2 == 1:
+        width = width + 1
+
+    file_paths = [file_path for (file_path, _) in tmp_file_paths]
+    futures = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            futures = [
+                executor.submit(
+                    prepare_playlist_clip, file_paths[0], width, height, fps
+                )
+            ]
+            (video, _) = get_movie_streams(futures[0].result())
+            encoding_profile = get_encoding_profile(video)
+            futures += [
+                executor.submit(
+                    prepare_playlist_clip,
+                    file_path,
+                    width,
+                    height,
+                    fps,
+                    encoding_profile,
+                )
+                for file_path in file_paths[1:]
+            ]
+        concat_movies([future.result() for future in futures], movie_file_path)
+    except ffmpeg.Error as e:
+        return {"success": False, "message": e.stderr.decode("utf-8")}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+    finally:
+        for (future, file_path) in zip(futures, file_paths):
+            if future.exception() is None:
+                clip_path = future.result()
+                if clip_path != file_path and os.path.exists(clip_path):
+                    os.remove(clip_path)
     return {"success": True}
+
+
+def get_movie_streams(movie_path):
+    """
+    Return the first video stream and the first audio stream descriptions
+    of given movie. A missing stream is returned as None.
+    """
+    streams = ffmpeg.probe(movie_path)["streams"]
+    video = next((s for s in streams if s["codec_type"] == "video"), None)
+    audio = next((s for s in streams if s["codec_type"] == "audio"), None)
+    return (video, audio)
+
+
+def get_frame_rate(stream):
+    (numerator, denominator) = stream.get("r_frame_rate", "0/1").split("/")
+    if float(denominator) == 0:
+        return 0
+    return float(numerator) / float(denominator)
+
+
+def get_encoding_profile(video):
+    """
+    Return H264 profile, level and time base of given video stream. Clips
+    joined by stream copy must share them.
+    """
+    return {
+        "profile": video.get("profile"),
+        "level": video.get("level"),
+        "time_base": video.get("time_base"),
+    }
+
+
+def is_video_conform(video, width, height, fps, encoding_profile=None):
+    return (
+        video is not None
+        and video.get("codec_name") == "h264"
+        and video.get("profile") in X264_PROFILES
+        and video.get("pix_fmt") == "yuv420p"
+        and video.get("width") == width
+        and video.get("height") == height
+        and video.get("sample_aspect_ratio", "1:1") in ["1:1", "0:1"]
+        and abs(get_frame_rate(video) - float(fps)) < 0.01
+        and (
+            encoding_profile is None
+            or get_encoding_profile(video) == encoding_profile
+        )
+    )
+
+
+def get_encoding_options(encoding_profile):
+    """
+    Return x264 options that produce a video stream with given encoding
+    profile (High profile if no profile is given).
+    """
+    if encoding_profile is None:
+        return {"profile:v": "high"}
+    options = {"profile:v": X264_PROFILES[encoding_profile["profile"]]}
+    if encoding_profile["level"] is not None:
+        options["level"] = "%.1f" % (encoding_profile["level"] / 10.0)
+    if encoding_profile["time_base"] is not None:
+        options["video_track_timescale"] = encoding_profile[
+            "time_base"
+        ].split("/")[1]
+    return options
+
+
+def is_audio_conform(audio):
+    return (
+        audio is not None
+        and audio.get("codec_name") == PREVIEW_AUDIO_CODEC
+        and int(audio.get("sample_rate", 0)) == PREVIEW_AUDIO_RATE
+        and audio.get("channels") == PREVIEW_AUDIO_CHANNELS
+    )
+
+
+def prepare_playlist_clip(
+    movie_path, width, height, fps, encoding_profile=None
+):
+    """
+    Return path of a clip that can be joined by stream copy: the given path
+    if the movie matches the playlist profile, the path of a conform copy
+    otherwise. When only audio differs, video is copied as it is. A silent
+    track is added to clips without audio.
+    """
+    (video, audio) = get_movie_streams(movie_path)
+    video_conform = is_video_conform(
+        video, width, height, fps, encoding_profile
+    )
+    audio_conform = is_audio_conform(audio)
+    if video_conform and audio_conform:
+        return movie_path
+
+    clip_path = "%s.playlist.mp4" % movie_path
+    movie_input = ffmpeg.input(movie_path)
+    if video_conform:
+        video_stream = movie_input["v"]
+        video_options = {"vcodec": "copy"}
+    else:
+        video_stream = movie_input["v"].filter("setsar", "1/1")
+        video_stream = video_stream.filter("scale", width, height)
+        video_options = dict(
+            get_encoding_options(encoding_profile),
+            vcodec="libx264",
+            pix_fmt="yuv420p",
+            r=fps,
+            b="28M",
+            preset="medium",
+        )
+    if audio is not None:
+        audio_stream = movie_input["a"]
+        audio_options = {}
+    else:
+        audio_stream = ffmpeg.input(
+            "anullsrc=channel_layout=stereo:sample_rate=%s"
+            % PREVIEW_AUDIO_RATE,
+            f="lavfi",
+        )["a"]
+        audio_options = {"shortest": None}
+
+    options = dict(video_options, **audio_options)
+    ffmpeg.output(
+        video_stream,
+        audio_stream,
+        clip_path,
+        format="mp4",
+        acodec=PREVIEW_AUDIO_CODEC,
+        ar=PREVIEW_AUDIO_RATE,
+        ac=PREVIEW_AUDIO_CHANNELS,
+        **options
+    ).overwrite_output().run(quiet=True)
+    return clip_path
+
+
+def concat_movies(movie_paths, movie_file_path):
+    """
+    Join given movies, without encoding them again, with the concat demuxer.
+    All movies must share the same codecs and parameters.
+    """
+    list_file_path = "%s.txt" % movie_file_path
+    with open(list_file_path, "w") as list_file:
+        for movie_path in movie_paths:
+            list_file.write(
+                "file '%s'\n"
+                % os.path.abspath(movie_path).replace("'", "'\\''")
+            )
+    try:
+        ffmpeg.input(list_file_path, format="concat", safe=0).output(
+            movie_file_path, c="copy", movflags="+faststart"
+        ).overwrite_output().run(quiet=True)
+    finally:
+        os.remove(list_file_path)
+    return movie_file_path
@@ -1,7 +1,17 @@
+import base64
+import binascii
+import datetime
+import json
 import math
 
-from zou.app import app
+from sqlalchemy import func, literal, text, tuple_
+
+from zou.app import app, db
 from zou.app.utils import fields
+from zou.app.services.exception import WrongParameterException
+
+
+CURSOR_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 
 
 def get_query_criterions_from_request(request):
@@ -11,7 +21,7 @@ def get_query_criterions_from_request(request):
     """
     criterions = {}
     for key, value in request.args.items():
-        if key not in ["page"]:
+        if key not in ["page", "cursor", "limit"]:
             criterions[key] = value
     return criterions
 
@@ -36,11 +46,19 @@ def apply_criterions_to_db_query(model, db_query, criterions):
     return db_query.filter_by(**criterions)
 
 
-def get_paginated_results(query, page, relations=False):
+def get_paginated_results(
+    query, page, relations=False, cursor=None, limit=None
+):
     """
-    Apply pagination to the query object.
+    Apply pagination to the query object. When a cursor is given (an empty
+    string for the first page), keyset pagination is used instead of page
+    numbers.
     """
-    if page < 1:
+    if cursor is not None:
+        return get_cursor_paginated_results(
+            query, cursor, limit=limit, relations=relations
+        )
+    elif page < 1:
         entries = query.all()
         return fields.serialize_list(entries)
     else:
@@ -72,3 +90,96 @@ def get_paginated_results(query, page, relations=False):
                 "page": page,
             }
         return result
+
+
+def get_cursor_paginated_results(query, cursor, limit=None, relations=False):
+    """
+    Return the entries that follow given cursor, ordered by update date then
+    by id. Entries never updated are ordered by their creation date. Contrary
+    to page based pagination, the database seeks the position directly
+    through the (update date, id) index, so deep pages are as fast as the
+    first one and no count is performed. The returned total is an estimation
+    of the number of rows of the whole table: it is given only when the
+    query is not filtered.
+    """
+    model = query.column_descriptions[0]["entity"]
+    if limit is None:
+        limit = app.config["NB_RECORDS_PER_PAGE"]
+    elif limit < 1:
+        raise WrongParameterException("Limit must be positive.")
+
+    is_filtered = query.whereclause is not None
+    sort_date = func.coalesce(model.updated_at, model.created_at)
+    query = query.order_by(None).order_by(sort_date, model.id)
+    if cursor:
+        (updated_at, entry_id) = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(sort_date, model.id)
+            > tuple_(
+                literal(updated_at, type_=model.updated_at.type),
+                literal(entry_id, type_=model.id.type),
+            )
+        )
+
+    entries = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1])
+
+    result = {
+        "data": fields.serialize_models(entries, relations=relations),
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+    if not is_filtered:
+        result["estimated_total"] = get_estimated_count(model)
+    return result
+
+
+def encode_cursor(entry):
+    """
+    Build an opaque cursor pointing after given entry. The creation date is
+    used for entries never updated.
+    """
+    sort_date = entry.updated_at or entry.created_at
+    updated_at = sort_date.strftime(CURSOR_DATE_FORMAT)
+    value = json.dumps([updated_at, str(entry.id)])
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor):
+    """
+    Return update date and id stored in given cursor.
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode("utf-8"))
+        (updated_at, entry_id) = json.loads(value.decode("utf-8"))
+        updated_at = datetime.datetime.strptime(
+            updated_at, CURSOR_DATE_FORMAT
+        )
+        return (updated_at, entry_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise WrongParameterException("Wrong cursor value: %s" % cursor)
+
+
+def get_estimated_count(model):
+    """
+    Return the number of rows of the model table estimated by the Postgres
+    planner. It's immediate, while an exact count scans the whole table.
+    The estimation of a partitioned table is the sum of the estimations of
+    its partitions.
+    """
+    result = db.session.execute(
+        text(
+            "SELECT (CASE WHEN parent.relkind = 'p' THEN ("
+            "SELECT COALESCE(SUM(GREATEST(child.reltuples, 0)), 0) "
+            "FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = parent.oid"
+            ") ELSE parent.reltuples END)::bigint "
+            "FROM pg_class parent WHERE parent.relname = :name"
+        ),
+        {"name": model.__tablename__},
+    ).scalar()
+    return max(result or 0, 0)
@@ -0,0 +1,91 @@
+"""
+Helpers to send large results progressively: data are written to the client
+while they are still read from the database or from the file storage.
+"""
+import json
+
+from flask import Response, request, stream_with_context
+
+from zou.app.utils import zip_utils
+
+
+def generate_json_list(entries):
+    """
+    Generate a JSON array, chunk by chunk, from an iterable of JSON
+    serializable entries.
+    """
+    yield "["
+    is_first = True
+    for entry in entries:
+        if is_first:
+            is_first = False
+            yield json.dumps(entry, ensure_ascii=False)
+        else:
+            yield "," + json.dumps(entry, ensure_ascii=False)
+    yield "]"
+
+
+def build_json_list_response(entries):
+    """
+    Build a response that streams given entries as a JSON array. The request
+    context is kept alive until the last entry is sent.
+    """
+    return Response(
+        stream_with_context(generate_json_list(entries)),
+        mimetype="application/json",
+    )
+
+
+def build_range_response(open_range, size, mimetype):
+    """
+    Build a response that streams the part of a stored file asked by the
+    Range header of the current request. open_range is called with the first
+    and the last (inclusive) byte positions and must return a generator of
+    chunks. Without range (or with several ranges), the whole file is
+    streamed. A range that doesn't fit in the file leads to a 416 response.
+    """
+    byte_range = request.range
+    content_range = None
+    if byte_range is not None and len(byte_range.ranges) == 1:
+        content_range = byte_range.range_for_length(size)
+        if content_range is None:
+            response = Response(status=416)
+            response.headers["Content-Range"] = "bytes */%s" % size
+            return response
+
+    if content_range is None:
+        (start, end, status) = (0, size - 1, 200)
+    else:
+        (start, end, status) = (content_range[0], content_range[1] - 1, 206)
+
+    response = Response(
+        stream_with_context(open_range(start, end)),
+        status=status,
+        mimetype=mimetype,
+        direct_passthrough=True,
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["Content-Length"] = str(end - start + 1)
+    if status == 206:
+        response.headers["Content-Range"] = "bytes %s-%s/%s" % (
+            start,
+            end,
+            size,
+        )
+    return response
+
+
+def build_zip_response(entries, attachment_filename):
+    """
+    Build a response that streams a zip archive of given entries (see
+    zip_utils.generate_zip) as an attachment.
+    """
+    response = Response(
+        stream_with_context(zip_utils.generate_zip(entries)),
+        mimetype="application/zip",
+        direct_passthrough=True,
+    )
+    response.headers["Content-Disposition"] = (
+        'attachment; filename="%s"' % attachment_filename
+    )
+    return response
@@ -1,5 +1,4 @@
 import os
-import shutil
 import math
 
 from zou.app.utils import fs
@@ -11,6 +10,12 @@ SQUARE_SIZE = 100, 100
 PREVIEW_SIZE = 1200, 0
 BIG_SQUARE_SIZE = 400, 400
 
+FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
 
 def save_file(tmp_folder, instance_id, file_to_save):
     """
@@ -22,9 +27,10 @@ def save_file(tmp_folder, instance_id, file_to_save):
     file_path = os.path.join(tmp_folder, file_name)
     file_to_save.save(file_path)
     im = Image.open(file_path)
-    if im.mode == "CMYK":
-        im = im.convert("RGB")
-    im.save(file_path, "PNG")
+    if im.format != "PNG" or im.mode == "CMYK":
+        if im.mode == "CMYK":
+            im = im.convert("RGB")
+        im.save(file_path, "PNG")
     return file_path
 
 
@@ -63,6 +69,63 @@ def get_full_size_from_width(im, width):
     return (width, height)
 
 
+def open_image(file_path, size=None):
+    """
+    Open and decode given picture. When a target size is given, JPEG files
+    are downscaled by the decoder while reading, which is much faster than
+    decoding them at full resolution.
+    """
+    im = Image.open(file_path)
+    if size is not None and im.format == "JPEG":
+        im.draft(im.mode, size)
+    if im.mode == "CMYK":
+        im = im.convert("RGB")
+    im.load()
+    return im
+
+
+def resize_image(im, size):
+    """
+    Resize given image. When the image is at least twice bigger than the
+    target, it is first shrinked by an integer factor with a box filter (cheap)
+    then the LANCZOS filter is applied on the smaller image.
+    """
+    (width, height) = size
+    factor = min(im.size[0] // width, im.size[1] // height) // 2
+    if factor > 1:
+        im = im.resize(
+            (im.size[0] // factor, im.size[1] // factor), Image.BOX
+        )
+    return im.resize(size, Image.LANCZOS)
+
+
+def build_thumbnail(im, size):
+    """
+    Crop given image to the target ratio and resize it.
+    """
+    im = prepare_image_for_thumbnail(im, size)
+    return resize_image(im, size)
+
+
+def save_image(im, file_path, image_format="png"):
+    """
+    Save given image in given format (png, jpeg or webp).
+    """
+    (pil_format, _) = FORMATS[image_format]
+    if pil_format == "JPEG" and im.mode != "RGB":
+        im = im.convert("RGB")
+    im.save(file_path, pil_format)
+    return file_path
+
+
+def get_mimetype(image_format):
+    """
+    Return the mimetype matching given picture format.
+    """
+    (_, mimetype) = FORMATS[image_format]
+    return mimetype
+
+
 def turn_into_thumbnail(file_path, size=None):
     """
     Turn given picture into a smaller version.
@@ -74,14 +137,15 @@ def turn_into_thumbnail(file_path, size=None):
 
         if height == 0:
             size = get_full_size_from_width(im, width)
+            im = open_image(file_path, size)
         else:
+            im = open_image(file_path, size)
             im = prepare_image_for_thumbnail(im, size)
     else:
         size = im.size
+        im = open_image(file_path)
 
-    im = im.resize(size, Image.LANCZOS)
-    if im.mode == "CMYK":
-        im = im.convert("RGB")
+    im = resize_image(im, size)
     im.save(file_path, "PNG")
     return file_path
 
@@ -116,30 +180,45 @@ def prepare_image_for_thumbnail(im, size):
     return im
 
 
-def generate_preview_variants(original_path, instance_id):
+def generate_preview_variants(
+    original_path, instance_id, thumbnail_format="png"
+):
     """
     Generate three thumbnails for given picture path.
 
     1. Rectangle thumbnail
     2. Square thumbnail
     3. Big rectangle thumbnail
+
+    The original picture is decoded once. The big rectangle is built first,
+    then the small thumbnails are built from it when it's smaller than the
+    original. Small thumbnails are written in given format (png, jpeg or
+    webp), the big rectangle is always a png file.
     """
-    file_name = get_file_name(instance_id)
+    folder_path = os.path.dirname(original_path)
+    im = Image.open(original_path)
+    preview_size = get_full_size_from_width(im, PREVIEW_SIZE[0])
+    im = open_image(original_path, preview_size)
+    preview = resize_image(im, preview_size)
+    if preview.size[0] < im.size[0]:
+        im = preview
+
     variants = [
-        ("thumbnails", RECTANGLE_SIZE),
-        ("thumbnails-square", SQUARE_SIZE),
-        ("previews", PREVIEW_SIZE),
+        ("thumbnails", build_thumbnail(im, RECTANGLE_SIZE), thumbnail_format),
+        (
+            "thumbnails-square",
+            build_thumbnail(im, SQUARE_SIZE),
+            thumbnail_format,
+        ),
+        ("previews", preview, "png"),
     ]
 
     result = []
-    for picture_data in variants:
-        (picture_type, size) = picture_data
-        folder_path = os.path.dirname(original_path)
+    for (picture_type, variant, image_format) in variants:
         picture_path = os.path.join(
-            folder_path, "%s-%s" % (picture_type, file_name)
+            folder_path, "%s-%s.%s" % (picture_type, instance_id, image_format)
         )
-        shutil.copyfile(original_path, picture_path)
-        turn_into_thumbnail(picture_path, size)
+        save_image(variant, picture_path, image_format)
         result.append((picture_type, picture_path))
     return result
 
@@ -0,0 +1,183 @@
+"""
+Move many files between the local disk, the file storage and another
+instance. Transfers are run by a pool of workers. Files already present at
+the destination with the same size are skipped, failed transfers are retried
+with an increasing delay and each completed transfer is recorded in a
+manifest file. When a transfer is run again, files listed in the manifest
+with an unchanged size are skipped without checking the destination.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+Transfer = collections.namedtuple(
+    "Transfer", ["key", "run", "get_source_size", "get_destination_size"]
+)
+Transfer.__doc__ = """
+A file transfer. key identifies the transfer in the manifest, run performs
+the transfer. get_source_size and get_destination_size return the size of the
+file at both ends or None if the file is missing. get_source_size can be None
+when the source size can't be known before the transfer.
+"""
+
+TRANSFERRED = "transferred"
+SKIPPED = "skipped"
+MISSING = "missing"
+FAILED = "failed"
+
+
+class Manifest(object):
+    """
+    Sizes of transferred files by transfer key. Entries are appended to the
+    manifest file as JSON lines, so progress is kept if the process is
+    interrupted.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.sizes = {}
+        self.lock = threading.Lock()
+        if file_path is not None and os.path.exists(file_path):
+            with open(file_path) as manifest_file:
+                for line in manifest_file:
+                    try:
+                        entry = json.loads(line)
+                        self.sizes[entry["key"]] = entry["size"]
+                    except ValueError:
+                        pass  # Line truncated by an interruption.
+
+    def get_size(self, key):
+        return self.sizes.get(key, None)
+
+    def add(self, key, size):
+        with self.lock:
+            self.sizes[key] = size
+            if self.file_path is not None:
+                with open(self.file_path, "a") as manifest_file:
+                    manifest_file.write(
+                        json.dumps({"key": key, "size": size}) + "\n"
+                    )
+
+
+def get_local_file_size(file_path):
+    """
+    Return size of given local file or None if it doesn't exist.
+    """
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
+
+
+def get_size_or_none(get_size, *args):
+    """
+    Call given size function, return None if it fails because the file is
+    missing.
+    """
+    try:
+        return get_size(*args)
+    except Exception:
+        return None
+
+
+def run_transfers(
+    transfers, max_workers=4, manifest_path=None, retries=3, retry_delay=1.0
+):
+    """
+    Run given transfers with a pool of workers and return statistics: number
+    of transferred, skipped, missing and failed files, transferred bytes,
+    duration and throughput.
+    """
+    manifest = Manifest(manifest_path)
+    stats = {
+        TRANSFERRED: 0,
+        SKIPPED: 0,
+        MISSING: 0,
+        FAILED: 0,
+        "size": 0,
+    }
+    start = time.time()
+    pending = collections.deque()
+
+    def add_result(future):
+        (status, size) = future.result()
+        stats[status] += 1
+        if status == TRANSFERRED:
+            stats["size"] += size or 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for transfer in transfers:
+            pending.append(
+                executor.submit(
+                    run_transfer, transfer, manifest, retries, retry_delay
+                )
+            )
+            # Transfers are listed lazily, don't queue too many of them.
+            if len(pending) > max_workers * 4:
+                add_result(pending.popleft())
+        while len(pending) > 0:
+            add_result(pending.popleft())
+
+    stats["duration"] = time.time() - start
+    stats["throughput"] = stats["size"] / max(stats["duration"], 0.001)
+    return stats
+
+
+def run_transfer(transfer, manifest, retries=3, retry_delay=1.0):
+    """
+    Run given transfer unless the file is already at the destination. It
+    returns the transfer status and the size of the file.
+    """
+    source_size = None
+    if transfer.get_source_size is not None:
+        source_size = transfer.get_source_size()
+        if source_size is None:
+            return (MISSING, None)
+
+    manifest_size = manifest.get_size(transfer.key)
+    if manifest_size is not None and manifest_size == source_size:
+        return (SKIPPED, source_size)
+
+    destination_size = transfer.get_destination_size()
+    if destination_size is not None and (
+        destination_size == source_size
+        or (source_size is None and destination_size > 0)
+    ):
+        manifest.add(transfer.key, destination_size)
+        return (SKIPPED, destination_size)
+
+    for attempt in range(retries + 1):
+        try:
+            transfer.run()
+            break
+        except Exception as e:
+            if attempt == retries:
+                print("%s transfer failed: %s" % (transfer.key, e))
+                return (FAILED, None)
+            time.sleep(retry_delay * 2 ** attempt)
+
+    if source_size is None:
+        source_size = transfer.get_destination_size()
+    manifest.add(transfer.key, source_size)
+    return (TRANSFERRED, source_size)
+
+
+def format_stats(stats):
+    return (
+        "%s files transferred (%.1f MB in %.1fs, %.1f MB/s), %s skipped, "
+        "%s missing, %s failed."
+        % (
+            stats[TRANSFERRED],
+            stats["size"] / 1000000.0,
+            stats["duration"],
+            stats["throughput"] / 1000000.0,
+            stats[SKIPPED],
+            stats[MISSING],
+            stats[FAILED],
+        )
+    )
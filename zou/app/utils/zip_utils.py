@@ -0,0 +1,192 @@
+"""
+Write zip archives on the fly: entries are stored without compression and
+sent chunk by chunk while they are read. Nothing is written on disk. CRC and
+sizes are written after each entry in a data descriptor, and Zip64 records
+are used for big entries and big archives.
+"""
+import struct
+import time
+import zlib
+
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+VERSION = 20
+ZIP64_VERSION = 45
+UNIX_HOST = 3 << 8
+
+
+def get_dos_date_time(timestamp=None):
+    date_time = time.localtime(timestamp)
+    dos_time = (
+        date_time.tm_hour << 11
+        | date_time.tm_min << 5
+        | date_time.tm_sec // 2
+    )
+    dos_date = (
+        max(date_time.tm_year - 1980, 0) << 9
+        | date_time.tm_mon << 5
+        | date_time.tm_mday
+    )
+    return (dos_time, dos_date)
+
+
+def build_local_header(file_name, dos_time, dos_date, is_zip64):
+    if is_zip64:
+        extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+        size = ZIP64_LIMIT
+        version = ZIP64_VERSION
+    else:
+        extra = b""
+        size = 0
+        version = VERSION
+    header = struct.pack(
+        "<LHHHHHLLLHH",
+        0x04034B50,
+        version,
+        FLAG_DATA_DESCRIPTOR | FLAG_UTF8,
+        0,
+        dos_time,
+        dos_date,
+        0,
+        size,
+        size,
+        len(file_name),
+        len(extra),
+    )
+    return header + file_name + extra
+
+
+def build_data_descriptor(crc, size, is_zip64):
+    if is_zip64:
+        return struct.pack("<LLQQ", 0x08074B50, crc, size, size)
+    else:
+        return struct.pack("<LLLL", 0x08074B50, crc, size, size)
+
+
+def build_central_header(entry):
+    (file_name, dos_time, dos_date, crc, size, offset, is_zip64) = entry
+    if is_zip64 or size >= ZIP64_LIMIT or offset >= ZIP64_LIMIT:
+        extra = struct.pack("<HHQQQ", 0x0001, 24, size, size, offset)
+        (size, offset) = (ZIP64_LIMIT, ZIP64_LIMIT)
+        version = ZIP64_VERSION
+    else:
+        extra = b""
+        version = VERSION
+    header = struct.pack(
+        "<LHHHHHHLLLHHHHHLL",
+        0x02014B50,
+        UNIX_HOST | version,
+        version,
+        FLAG_DATA_DESCRIPTOR | FLAG_UTF8,
+        0,
+        dos_time,
+        dos_date,
+        crc,
+        size,
+        size,
+        len(file_name),
+        len(extra),
+        0,
+        0,
+        0,
+        0o100644 << 16,
+        offset,
+    )
+    return header + file_name + extra
+
+
+def build_end_records(nb_entries, directory_offset, directory_size):
+    records = b""
+    if (
+        nb_entries >= ZIP64_COUNT_LIMIT
+        or directory_offset >= ZIP64_LIMIT
+        or directory_size >= ZIP64_LIMIT
+    ):
+        zip64_end_offset = directory_offset + directory_size
+        records += struct.pack(
+            "<LQHHLLQQQQ",
+            0x06064B50,
+            44,
+            ZIP64_VERSION,
+            ZIP64_VERSION,
+            0,
+            0,
+            nb_entries,
+            nb_entries,
+            directory_size,
+            directory_offset,
+        )
+        records += struct.pack("<LLQL", 0x07064B50, 0, zip64_end_offset, 1)
+        nb_entries = min(nb_entries, ZIP64_COUNT_LIMIT)
+        directory_offset = min(directory_offset, ZIP64_LIMIT)
+        directory_size = min(directory_size, ZIP64_LIMIT)
+
+    records += struct.pack(
+        "<LHHHHLLH",
+        0x06054B50,
+        0,
+        0,
+        nb_entries,
+        nb_entries,
+        directory_size,
+        directory_offset,
+        0,
+    )
+    return records
+
+
+def generate_zip(entries):
+    """
+    Generate a zip archive, chunk by chunk, from given entries. Each entry
+    is a tuple (file name, iterable of byte chunks, size). Size can be None
+    when it's unknown, Zip64 records are used in that case. Chunks of an
+    entry are only read when the archive generation reaches it.
+    """
+    offset = 0
+    central_entries = []
+    for (file_name, chunks, size) in entries:
+        file_name = file_name.encode("utf-8")
+        (dos_time, dos_date) = get_dos_date_time()
+        is_zip64 = size is None or size >= ZIP64_LIMIT
+        header = build_local_header(file_name, dos_time, dos_date, is_zip64)
+        entry_offset = offset
+        offset += len(header)
+        yield header
+
+        crc = 0
+        written = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            written += len(chunk)
+            yield chunk
+        crc = crc & 0xFFFFFFFF
+        offset += written
+
+        descriptor = build_data_descriptor(crc, written, is_zip64)
+        offset += len(descriptor)
+        yield descriptor
+        central_entries.append(
+            (
+                file_name,
+                dos_time,
+                dos_date,
+                crc,
+                written,
+                entry_offset,
+                is_zip64,
+            )
+        )
+
+    directory_offset = offset
+    directory_size = 0
+    for entry in central_entries:
+        header = build_central_header(entry)
+        directory_size += len(header)
+        yield header
+    yield build_end_records(
+        len(central_entries), directory_offset, directory_size
+    )
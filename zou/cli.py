@@ -173,31 +173,50 @@ def sync_with_ldap_server():
 
 @cli.command()
 @click.option("--target", default="http://localhost:5000")
-def sync_full(target):
+@click.option("--workers", default=4)
+@click.option("--checkpoint-file", default="zou_sync_full.checkpoint")
+def sync_full(target, workers, checkpoint_file):
     """
     Retrieve all data from target instance. It expects that credentials to
     connect to target instance are given through SYNC_LOGIN and SYNC_PASSWORD
-    environment variables.
+    environment variables. Data are fetched by several workers. If the sync
+    is interrupted, running it again with the same checkpoint file continues
+    where it stopped.
     """
     print("Start syncing.")
     login = os.getenv("SYNC_LOGIN")
     password = os.getenv("SYNC_PASSWORD")
-    commands.import_data_from_another_instance(target, login, password)
+    commands.import_data_from_another_instance(
+        target,
+        login,
+        password,
+        max_workers=workers,
+        checkpoint_file_path=checkpoint_file,
+    )
     print("Syncing ended.")
 
 
 @cli.command()
 @click.option("--target", default="http://localhost:5000")
-def sync_full_files(target):
+@click.option("--workers", default=4)
+@click.option("--manifest-file", default="zou_sync_full_files.manifest")
+def sync_full_files(target, workers, manifest_file):
     """
     Retrieve all files from target instance. It expects that credentials to
     connect to target instance are given through SYNC_LOGIN and SYNC_PASSWORD
-    environment variables.
+    environment variables. Files listed in the manifest file or already
+    downloaded are skipped.
     """
     print("Start syncing.")
     login = os.getenv("SYNC_LOGIN")
     password = os.getenv("SYNC_PASSWORD")
-    commands.import_files_from_another_instance(target, login, password)
+    commands.import_files_from_another_instance(
+        target,
+        login,
+        password,
+        max_workers=workers,
+        manifest_path=manifest_file,
+    )
     print("Syncing ended.")
 
 
@@ -270,12 +289,16 @@ def sync_last_preview_files(target, minutes, page_size):
 
 
 @cli.command()
-def download_storage_files():
+@click.option("--workers", default=4)
+@click.option("--manifest-file", default="zou_download_storage.manifest")
+def download_storage_files(workers, manifest_file):
     """
     Download all files from a Swift object storage and store them in a local
-    storage.
+    storage. Files already downloaded are skipped.
     """
-    commands.download_file_from_storage()
+    commands.download_file_from_storage(
+        max_workers=workers, manifest_path=manifest_file
+    )
 
 
 @cli.command()
@@ -289,11 +312,16 @@ def dump_database():
 
 @cli.command()
 @click.option("--days", default=None)
-def upload_files_to_cloud_storage(days):
+@click.option("--workers", default=4)
+@click.option("--manifest-file", default="zou_upload_storage.manifest")
+def upload_files_to_cloud_storage(days, workers, manifest_file):
     """
-    Upload all files related to previews to configured object storage.
+    Upload all files related to previews to configured object storage. Files
+    already uploaded with the same size are skipped.
     """
-    commands.upload_files_to_cloud_storage(days)
+    commands.upload_files_to_cloud_storage(
+        days, max_workers=workers, manifest_path=manifest_file
+    )
 
 
 @cli.command()
@@ -306,5 +334,55 @@ def clean_tasks_data(projectid):
         commands.reset_tasks_data(projectid)
 
 
+@cli.command()
+@click.option("--projectid", default=None)
+def compute_task_stats(projectid):
+    """
+    Compute again task statistics (counts by sequence and by asset type) used
+    by production dashboards, for all projects or for given project.
+    """
+    commands.compute_task_stats(projectid)
+
+
+@cli.command()
+@click.option("--days", default=365)
+@click.option("--archive-file", default=None)
+@click.option("--months-ahead", default=3)
+def clean_events(days, archive_file, months_ahead):
+    """
+    Remove events older than given number of days, after appending them to
+    the archive file if one is given (gzipped JSON lines). It also creates
+    the monthly partitions of the event table for the next months: run it
+    at least once a month.
+    """
+    commands.clean_events(
+        days, archive_path=archive_file, months_ahead=months_ahead
+    )
+
+
+@cli.command()
+def send_notification_digests():
+    """
+    Send to people who receive their notifications as a digest an email
+    listing their unread notifications created since their last digest. Run
+    it periodically (a cron job for instance).
+    """
+    commands.send_notification_digests()
+
+
+@cli.command()
+@click.option("--dry-run", is_flag=True, default=False)
+@click.option("--workers", default=4)
+@click.option("--max-rate", default=50.0)
+def clean_storage(dry_run, workers, max_rate):
+    """
+    Remove from the storage the files of which the preview file, person,
+    project, organisation or build job no longer exists. With --dry-run,
+    orphan files are counted but kept. --max-rate limits the number of
+    removals per second (0 for no limit).
+    """
+    commands.clean_storage(dry_run, max_workers=workers, max_rate=max_rate)
+
+
 if __name__ == "__main__":
     cli()
@@ -1,11 +1,25 @@
-from flask import Flask, jsonify
-from flask_socketio import SocketIO
-from zou.app import config
-
 from gevent import monkey
 
 monkey.patch_all()
 
+from flask import Flask, jsonify, session
+from flask_jwt_extended import (
+    JWTManager,
+    get_jwt_identity,
+    verify_jwt_in_request,
+)
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_socketio import SocketIO, join_room, leave_room
+from jwt import InvalidTokenError
+
+from zou.app import app as zou_app, config
+from zou.app.services import persons_service, projects_service
+from zou.app.services.exception import (
+    PersonNotFoundException,
+    ProjectNotFoundException,
+)
+from zou.app.stores import auth_tokens_store
+
 
 def get_redis_url():
     redis_host = config.KEY_VALUE_STORE["host"]
@@ -13,11 +27,48 @@ def get_redis_url():
     return "redis://%s:%s/2" % (redis_host, redis_port)
 
 
+def get_person(email):
+    """
+    Return the person matching given email, None if there is no such person.
+    """
+    with zou_app.app_context():
+        try:
+            return persons_service.get_person_by_email(email)
+        except PersonNotFoundException:
+            return None
+
+
+def has_project_access(person, project_id):
+    """
+    Return True if given person can receive events of given project: admins
+    receive events of every project, other people those of the projects
+    they are part of.
+    """
+    if person["role"] == "admin":
+        return True
+    with zou_app.app_context():
+        try:
+            project = projects_service.get_project_with_relations(project_id)
+        except ProjectNotFoundException:
+            return False
+        return person["id"] in project["team"]
+
+
 def create_app(redis_url):
     socketio = SocketIO(logger=True)
 
     app = Flask(__name__)
-    app.config["SECRET_KEY"] = config.SECRET_KEY
+    app.config.from_object(config)
+    # Websocket clients can't always send headers, let them give the token
+    # as a query parameter.
+    app.config["JWT_TOKEN_LOCATION"] = config.JWT_TOKEN_LOCATION + [
+        "query_string"
+    ]
+    jwt = JWTManager(app)
+
+    @jwt.token_in_blacklist_loader
+    def check_if_token_is_revoked(decrypted_token):
+        return auth_tokens_store.is_revoked(decrypted_token)
 
     @app.route("/")
     def index():
@@ -25,8 +76,48 @@ def create_app(redis_url):
 
     @socketio.on("connect", namespace="/events")
     def connected():
+        """
+        Refuse connections without a valid token. Authenticated clients join
+        the room of their person to receive their notifications.
+        """
+        try:
+            verify_jwt_in_request()
+            person = get_person(get_jwt_identity())
+        except (JWTExtendedException, InvalidTokenError):
+            person = None
+
+        if person is None:
+            app.logger.info("Unauthenticated websocket client refused")
+            return False
+
+        session["person"] = {"id": person["id"], "role": person["role"]}
+        join_room("person:%s" % person["id"])
         app.logger.info("New websocket client connected")
 
+    @socketio.on("project:join", namespace="/events")
+    def join_project(data):
+        """
+        Subscribe to events of given project. It returns False when the
+        client is not allowed to access the project.
+        """
+        project_id = data.get("project_id", None)
+        person = session.get("person", None)
+        if (
+            person is None
+            or project_id is None
+            or not has_project_access(person, project_id)
+        ):
+            return False
+        join_room("project:%s" % project_id)
+        return True
+
+    @socketio.on("project:leave", namespace="/events")
+    def leave_project(data):
+        project_id = data.get("project_id", None)
+        if project_id is not None:
+            leave_room("project:%s" % project_id)
+        return True
+
     @socketio.on_error("/events")
     def on_error(error):
         app.logger.error(error)
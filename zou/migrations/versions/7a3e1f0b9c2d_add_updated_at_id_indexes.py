@@ -0,0 +1,40 @@
+"""Add (updated_at, id) indexes for cursor pagination
+
+Revision ID: 7a3e1f0b9c2d
+Revises: 3c1a2b4d5e6f
+Create Date: 2020-01-10 15:03:27.502861
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e1f0b9c2d'
+down_revision = '3c1a2b4d5e6f'
+branch_labels = None
+depends_on = None
+
+tables = [
+    'api_event',
+    'comment',
+    'notification',
+    'preview_file',
+    'task',
+    'time_spent',
+]
+
+
+def upgrade():
+    for table in tables:
+        op.create_index(
+            'ix_%s_updated_at_id' % table,
+            table,
+            [sa.text('coalesce(updated_at, created_at)'), 'id'],
+            unique=False
+        )
+
+
+def downgrade():
+    for table in tables:
+        op.drop_index('ix_%s_updated_at_id' % table, table_name=table)
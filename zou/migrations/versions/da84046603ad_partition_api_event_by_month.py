@@ -0,0 +1,162 @@
+"""Partition api_event by month
+
+Revision ID: da84046603ad
+Revises: b8e2c6f4a1d7
+Create Date: 2020-01-21 10:12:31.518420
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'da84046603ad'
+down_revision = 'b8e2c6f4a1d7'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, created_at, updated_at, name, user_id, data"
+# Partitions are created ahead for the next months. Then the clean_events
+# command creates them.
+MONTHS_AHEAD = 3
+
+
+def get_partition_name(date):
+    return "api_event_y%04dm%02d" % (date.year, date.month)
+
+
+def get_next_month(date):
+    if date.month == 12:
+        return datetime.date(date.year + 1, 1, 1)
+    else:
+        return datetime.date(date.year, date.month + 1, 1)
+
+
+def is_partitioning_supported(connection):
+    """
+    Default partitions and primary keys on partitioned tables require
+    Postgres 11.
+    """
+    version = connection.execute("SHOW server_version_num").scalar()
+    return int(version) >= 110000
+
+
+def is_partitioned(connection):
+    relkind = connection.execute(
+        "SELECT relkind FROM pg_class WHERE relname = 'api_event'"
+    ).scalar()
+    return relkind == "p"
+
+
+def create_indexes(with_created_at=True):
+    op.create_index('ix_api_event_name', 'api_event', ['name'])
+    op.create_index('ix_api_event_user_id', 'api_event', ['user_id'])
+    op.create_index(
+        'ix_api_event_updated_at_id', 'api_event', ['updated_at', 'id']
+    )
+    if with_created_at:
+        op.create_index(
+            'ix_api_event_created_at', 'api_event', ['created_at']
+        )
+
+
+def upgrade():
+    connection = op.get_bind()
+    op.execute(
+        "UPDATE api_event SET created_at = COALESCE(updated_at, now()) "
+        "WHERE created_at IS NULL"
+    )
+
+    if not is_partitioning_supported(connection):
+        op.alter_column('api_event', 'created_at', nullable=False)
+        op.drop_constraint('api_event_pkey', 'api_event', type_='primary')
+        op.create_primary_key(
+            'api_event_pkey', 'api_event', ['id', 'created_at']
+        )
+        op.create_index('ix_api_event_created_at', 'api_event', ['created_at'])
+        return
+
+    op.execute(
+        "CREATE TABLE api_event_partitioned "
+        "(LIKE api_event INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+    )
+    op.alter_column('api_event_partitioned', 'created_at', nullable=False)
+    op.create_primary_key(
+        'api_event_partitioned_pkey',
+        'api_event_partitioned',
+        ['id', 'created_at'],
+    )
+    op.create_foreign_key(
+        'api_event_partitioned_user_id_fkey',
+        'api_event_partitioned',
+        'person',
+        ['user_id'],
+        ['id'],
+    )
+    op.execute(
+        "CREATE TABLE api_event_default "
+        "PARTITION OF api_event_partitioned DEFAULT"
+    )
+
+    first_date = connection.execute(
+        "SELECT min(created_at) FROM api_event"
+    ).scalar()
+    today = datetime.date.today()
+    if first_date is None:
+        first_date = today
+    date = datetime.date(first_date.year, first_date.month, 1)
+    last_date = datetime.date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last_date = get_next_month(last_date)
+    while date <= last_date:
+        next_date = get_next_month(date)
+        op.execute(
+            "CREATE TABLE %s PARTITION OF api_event_partitioned "
+            "FOR VALUES FROM ('%s') TO ('%s')"
+            % (get_partition_name(date), date, next_date)
+        )
+        date = next_date
+
+    op.execute(
+        "INSERT INTO api_event_partitioned (%s) SELECT %s FROM api_event"
+        % (COLUMNS, COLUMNS)
+    )
+    op.drop_table('api_event')
+    op.rename_table('api_event_partitioned', 'api_event')
+    op.execute(
+        "ALTER TABLE api_event RENAME CONSTRAINT "
+        "api_event_partitioned_pkey TO api_event_pkey"
+    )
+    op.execute(
+        "ALTER TABLE api_event RENAME CONSTRAINT "
+        "api_event_partitioned_user_id_fkey TO api_event_user_id_fkey"
+    )
+    create_indexes()
+
+
+def downgrade():
+    connection = op.get_bind()
+    if not is_partitioned(connection):
+        op.drop_index('ix_api_event_created_at', table_name='api_event')
+        op.drop_constraint('api_event_pkey', 'api_event', type_='primary')
+        op.create_primary_key('api_event_pkey', 'api_event', ['id'])
+        op.alter_column('api_event', 'created_at', nullable=True)
+        return
+
+    op.execute(
+        "CREATE TABLE api_event_plain (LIKE api_event INCLUDING DEFAULTS)"
+    )
+    op.execute(
+        "INSERT INTO api_event_plain (%s) SELECT %s FROM api_event"
+        % (COLUMNS, COLUMNS)
+    )
+    op.drop_table('api_event')
+    op.rename_table('api_event_plain', 'api_event')
+    op.alter_column('api_event', 'created_at', nullable=True)
+    op.create_primary_key('api_event_pkey', 'api_event', ['id'])
+    op.create_foreign_key(
+        'api_event_user_id_fkey', 'api_event', 'person', ['user_id'], ['id']
+    )
+    create_indexes(with_created_at=False)